@@ -1,7 +1,10 @@
 import contextlib
 import logging
 import os
+import re
 import subprocess
+import threading
+from collections.abc import Callable
 from pathlib import Path
 from urllib.parse import urlparse
 
@@ -11,15 +14,24 @@ from pygments import highlight
 from pygments.formatters.terminal import TerminalFormatter
 from pygments.lexers.data import YamlLexer
 
+from ctfcli.core.api import API
 from ctfcli.core.challenge import Challenge
 from ctfcli.core.config import Config
 from ctfcli.core.deployment import get_deployment_handler
 from ctfcli.core.exceptions import (
     ChallengeException,
     LintException,
+    ProjectNotInitialized,
     RemoteChallengeNotFound,
 )
+from ctfcli.core.image import build_images, is_bake_available
+from ctfcli.core.lint import LintReport, LintResult, lint_challenges
+from ctfcli.core.remote import RemoteState
+from ctfcli.core.store import Store
+from ctfcli.utils.concurrency import run_concurrently, run_pipeline
 from ctfcli.utils.git import check_if_git_subrepo_is_installed, resolve_repo_url
+from ctfcli.utils.registry import registry_logins
+from ctfcli.utils.tools import get_flag_pattern
 
 log = logging.getLogger("ctfcli.cli.challenges")
 
@@ -564,71 +576,120 @@ class ChallengeCommand:
         return 1
 
     def install(
-        self, challenge: str | None = None, force: bool = False, hidden: bool = False, ignore: str | tuple[str] = ()
+        self,
+        challenge: str | None = None,
+        force: bool = False,
+        hidden: bool = False,
+        ignore: str | tuple[str] = (),
+        jobs: int = 1,
+        full: bool = False,
+        rehash: bool = False,
     ) -> int:
-        log.debug(f"install: (challenge={challenge}, force={force}, hidden={hidden}, ignore={ignore})")
+        log.debug(
+            f"install: (challenge={challenge}, force={force}, hidden={hidden}, ignore={ignore}, jobs={jobs}, "
+            f"full={full}, rehash={rehash})"
+        )
+
+        if jobs < 1:
+            click.secho("The number of jobs has to be at least 1", fg="red")
+            return 1
+
+        API.set_pool_size(jobs)
+
+        # Share a single snapshot of the remote between all installed challenges
+        remote_state = RemoteState()
 
         if challenge:
-            challenge_instance = self._resolve_single_challenge(challenge)
+            challenge_instance = self._resolve_single_challenge(challenge, remote_state=remote_state)
             if not challenge_instance:
                 return 1
 
             local_challenges = [challenge_instance]
         else:
-            local_challenges = self._resolve_all_challenges()
+            local_challenges = self._resolve_all_challenges(remote_state=remote_state)
 
         if isinstance(ignore, str):
             ignore = (ignore,)
 
-        _config = Config()
-        remote_challenges = Challenge.load_installed_challenges()
-
-        failed_installs = []
-        with click.progressbar(local_challenges, label="Installing challenges") as challenges:
-            for challenge_instance in challenges:
-                click.echo()
+        config = Config()
+        instance_url = self._get_instance_url(config)
+        store = Store(config.project_path)
+        self._use_file_digest_store(local_challenges, store, rehash)
 
-                if hidden:
-                    challenge_instance["state"] = "hidden"
+        def install_challenge(challenge_instance: Challenge) -> bool:
+            if hidden:
+                challenge_instance["state"] = "hidden"
 
-                click.secho(
-                    f"Installing '{challenge_instance}' ({challenge_instance.challenge_file_path}) ...",
-                    fg="blue",
-                )
+            challenge_key = store.get_challenge_key(challenge_instance.challenge_file_path)
+            fingerprint = challenge_instance.get_fingerprint(ignore=ignore)
+            if not full and store.get_fingerprint(instance_url, challenge_key) == fingerprint:
+                click.secho(f"Skipping '{challenge_instance}' - no changes since it was last installed", fg="green")
+                return True
 
-                found_duplicate = False
-                for remote_challenge in remote_challenges:
-                    if remote_challenge["name"] == challenge_instance["name"]:
-                        click.secho(
-                            f"Found already existing challenge with the same name ({remote_challenge['name']}). "
-                            "Perhaps you meant sync instead of install?",
-                            fg="red",
-                        )
-                        found_duplicate = True
-                        break
+            # Forget the fingerprint until the challenge is successfully installed again
+            store.remove_fingerprint(instance_url, challenge_key)
 
-                if found_duplicate:
-                    if not force:
-                        failed_installs.append(challenge_instance)
-                        continue
+            click.secho(
+                f"Installing '{challenge_instance}' ({challenge_instance.challenge_file_path}) ...",
+                fg="blue",
+            )
 
-                    click.secho("Syncing existing challenge instead (because of --force)", fg="yellow")
-                    try:
-                        challenge_instance.sync(ignore=ignore)
-                    except ChallengeException as e:
-                        click.secho("Failed to sync challenge", fg="red")
-                        click.secho(str(e), fg="red")
-                        failed_installs.append(challenge_instance)
+            # Prefer the remote challenge this challenge was installed as before, even if it was renamed since
+            challenge_instance.known_remote = store.get_remote_challenge(instance_url, challenge_key)
+            remote_challenge = challenge_instance.load_known_remote_challenge()
+            if remote_challenge is not None:
+                click.secho(
+                    f"Challenge is already installed as '{remote_challenge['name']}' (id={remote_challenge['id']}). "
+                    "Perhaps you meant sync instead of install?",
+                    fg="red",
+                )
+            else:
+                remote_challenge = remote_state.get_challenge_by_name(challenge_instance["name"])
+                if remote_challenge is not None:
+                    click.secho(
+                        f"Found already existing challenge with the same name ({remote_challenge['name']}). "
+                        "Perhaps you meant sync instead of install?",
+                        fg="red",
+                    )
 
-                    continue
+            if remote_challenge is not None:
+                if not force:
+                    return False
 
-                # If we don't break because of duplicated challenge names - continue the installation
+                click.secho("Syncing existing challenge instead (because of --force)", fg="yellow")
                 try:
-                    challenge_instance.create(ignore=ignore)
+                    challenge_instance.sync(ignore=ignore)
                 except ChallengeException as e:
-                    click.secho("Failed to install challenge", fg="red")
+                    click.secho(f"Failed to sync challenge '{challenge_instance}'", fg="red")
                     click.secho(str(e), fg="red")
-                    failed_installs.append(challenge_instance)
+                    return False
+
+                store.set_remote_challenge(
+                    instance_url, challenge_key, challenge_instance.challenge_id, challenge_instance["name"]
+                )
+                store.set_fingerprint(instance_url, challenge_key, fingerprint)
+                return True
+
+            # If we don't break because of duplicated challenge names - continue the installation
+            try:
+                challenge_instance.create(ignore=ignore)
+            except ChallengeException as e:
+                click.secho(f"Failed to install challenge '{challenge_instance}'", fg="red")
+                click.secho(str(e), fg="red")
+                return False
+
+            store.set_remote_challenge(
+                instance_url, challenge_key, challenge_instance.challenge_id, challenge_instance["name"]
+            )
+            store.set_fingerprint(instance_url, challenge_key, fingerprint)
+            return True
+
+        results = self._run_with_progress(install_challenge, local_challenges, "Installing challenges", jobs)
+        failed_installs = [c for c, installed in zip(local_challenges, results, strict=True) if not installed]
+
+        # Challenges may also fail after being installed, when setting their next challenge
+        for challenge_instance in failed_installs:
+            store.remove_fingerprint(instance_url, store.get_challenge_key(challenge_instance.challenge_file_path))
 
         if len(failed_installs) == 0:
             click.secho("Success! All challenges installed!", fg="green")
@@ -640,49 +701,84 @@ class ChallengeCommand:
 
         return 1
 
-    def sync(self, challenge: str | None = None, ignore: str | tuple[str] = ()) -> int:
-        log.debug(f"sync: (challenge={challenge}, ignore={ignore})")
+    def sync(
+        self,
+        challenge: str | None = None,
+        ignore: str | tuple[str] = (),
+        jobs: int = 1,
+        full: bool = False,
+        rehash: bool = False,
+    ) -> int:
+        log.debug(f"sync: (challenge={challenge}, ignore={ignore}, jobs={jobs}, full={full}, rehash={rehash})")
+
+        if jobs < 1:
+            click.secho("The number of jobs has to be at least 1", fg="red")
+            return 1
+
+        API.set_pool_size(jobs)
+
+        # Share a single snapshot of the remote between all synced challenges
+        remote_state = RemoteState()
 
         if challenge:
-            challenge_instance = self._resolve_single_challenge(challenge)
+            challenge_instance = self._resolve_single_challenge(challenge, remote_state=remote_state)
             if not challenge_instance:
                 return 1
 
             local_challenges = [challenge_instance]
         else:
-            local_challenges = self._resolve_all_challenges()
+            local_challenges = self._resolve_all_challenges(remote_state=remote_state)
 
         if isinstance(ignore, str):
             ignore = (ignore,)
 
-        _config = Config()
-        remote_challenges = Challenge.load_installed_challenges()
+        config = Config()
+        instance_url = self._get_instance_url(config)
+        store = Store(config.project_path)
+        self._use_file_digest_store(local_challenges, store, rehash)
 
-        failed_syncs = []
-        with click.progressbar(local_challenges, label="Syncing challenges") as challenges:
-            for challenge_instance in challenges:
-                click.echo()
+        def sync_challenge(challenge_instance: Challenge) -> bool:
+            challenge_name = challenge_instance["name"]
 
-                challenge_name = challenge_instance["name"]
-                if not any(c["name"] == challenge_name for c in remote_challenges):
-                    click.secho(
-                        f"Could not find existing challenge {challenge_name}. "
-                        f"Perhaps you meant install instead of sync?",
-                        fg="red",
-                    )
-                    failed_syncs.append(challenge_instance)
-                    continue
+            challenge_key = store.get_challenge_key(challenge_instance.challenge_file_path)
+            fingerprint = challenge_instance.get_fingerprint(ignore=ignore)
+            if not full and store.get_fingerprint(instance_url, challenge_key) == fingerprint:
+                click.secho(f"Skipping '{challenge_name}' - no changes since it was last synced", fg="green")
+                return True
 
+            # Forget the fingerprint until the challenge is successfully synced again
+            store.remove_fingerprint(instance_url, challenge_key)
+
+            # A challenge installed before is looked up by its id, which also allows renaming it
+            challenge_instance.known_remote = store.get_remote_challenge(instance_url, challenge_key)
+            if challenge_instance.known_remote is None and remote_state.get_challenge_by_name(challenge_name) is None:
                 click.secho(
-                    f"Syncing '{challenge_name}' ({challenge_instance.challenge_file_path}) ...",
-                    fg="blue",
+                    f"Could not find existing challenge {challenge_name}. Perhaps you meant install instead of sync?",
+                    fg="red",
                 )
-                try:
-                    challenge_instance.sync(ignore=ignore)
-                except ChallengeException as e:
-                    click.secho("Failed to sync challenge", fg="red")
-                    click.secho(str(e), fg="red")
-                    failed_syncs.append(challenge_instance)
+                return False
+
+            click.secho(
+                f"Syncing '{challenge_name}' ({challenge_instance.challenge_file_path}) ...",
+                fg="blue",
+            )
+            try:
+                challenge_instance.sync(ignore=ignore)
+            except ChallengeException as e:
+                click.secho(f"Failed to sync challenge '{challenge_name}'", fg="red")
+                click.secho(str(e), fg="red")
+                return False
+
+            store.set_remote_challenge(instance_url, challenge_key, challenge_instance.challenge_id, challenge_name)
+            store.set_fingerprint(instance_url, challenge_key, fingerprint)
+            return True
+
+        results = self._run_with_progress(sync_challenge, local_challenges, "Syncing challenges", jobs)
+        failed_syncs = [c for c, synced in zip(local_challenges, results, strict=True) if not synced]
+
+        # Challenges may also fail after being synced, when setting their next challenge
+        for challenge_instance in failed_syncs:
+            store.remove_fingerprint(instance_url, store.get_challenge_key(challenge_instance.challenge_file_path))
 
         if len(failed_syncs) == 0:
             click.secho("Success! All challenges synced!", fg="green")
@@ -699,17 +795,35 @@ class ChallengeCommand:
         challenge: str | None = None,
         host: str | None = None,
         skip_login: bool = False,
+        rebuild: bool = False,
+        jobs: int = 1,
+        build_jobs: int | None = None,
+        host_jobs: int = 2,
+        changed_only: bool = False,
     ) -> int:
-        log.debug(f"deploy: (challenge={challenge}, host={host}, skip_login={skip_login})")
+        log.debug(
+            f"deploy: (challenge={challenge}, host={host}, skip_login={skip_login}, rebuild={rebuild}, "
+            f"jobs={jobs}, build_jobs={build_jobs}, host_jobs={host_jobs}, changed_only={changed_only})"
+        )
+
+        if jobs < 1:
+            click.secho("The number of jobs has to be at least 1", fg="red")
+            return 1
+
+        API.set_pool_size(jobs)
+
+        # Share a single snapshot of the remote between all deployed challenges
+        remote_state = RemoteState()
+        registry_logins.clear()
 
         if challenge:
-            challenge_instance = self._resolve_single_challenge(challenge)
+            challenge_instance = self._resolve_single_challenge(challenge, remote_state=remote_state)
             if not challenge_instance:
                 return 1
 
             challenges = [challenge_instance]
         else:
-            challenges = self._resolve_all_challenges()
+            challenges = self._resolve_all_challenges(remote_state=remote_state)
 
         deployable_challenges, failed_deployments, skipped_deployments, failed_syncs = [], [], [], []
 
@@ -720,97 +834,257 @@ class ChallengeCommand:
             else:
                 skipped_deployments.append(challenge_instance)
 
-        _config = Config()
-        with click.progressbar(deployable_challenges, label="Deploying challenges") as challenges:
-            for challenge_instance in challenges:
-                click.echo()
+        # Resolve all images up front, checking local pre-built images with a single docker call
+        for challenge_instance in Challenge.resolve_images(deployable_challenges):
+            click.secho(
+                f"Image '{challenge_instance['image']}' of challenge '{challenge_instance}' could not be resolved",
+                fg="red",
+            )
+            deployable_challenges.remove(challenge_instance)
+            failed_deployments.append(challenge_instance)
 
-                challenge_name = challenge_instance.get("name")
-                target_host = host or challenge_instance.get("host")
+        # Images are not rebuilt or pushed again if their build context is unchanged, unless requested
+        for challenge_instance in deployable_challenges:
+            challenge_instance.image.rebuild = rebuild
 
-                # Default to cloud deployment if host is not specified
-                scheme = "cloud"
-                if bool(target_host):
-                    url = urlparse(target_host)
-                    if not bool(url.netloc):
-                        click.secho(
-                            f"Host for challenge service '{challenge_name}' has no URI scheme - {target_host}. "
-                            "Provide a URI scheme like ssh:// or registry://",
-                            fg="red",
-                        )
-                        continue
+        # Record what is deployed where, so that unchanged deployments can be skipped with --changed-only
+        config = Config()
+        instance_url = self._get_instance_url(config)
+        store = Store(config.project_path)
+
+        def get_ledger_key(challenge_instance: Challenge) -> tuple[str, str]:
+            # Cloud deployments are recorded for the instance they are deployed to
+            target_host = host or challenge_instance.get("host") or instance_url
+            return store.get_challenge_key(challenge_instance.challenge_file_path), target_host
+
+        # ids of challenges whose image did not change since it was last deployed to the same target
+        unchanged_deployments: set[int] = set()
+        if changed_only and not rebuild:
+            for challenge_instance in deployable_challenges:
+                deployment = store.get_deployment(*get_ledger_key(challenge_instance))
+                if deployment is None:
+                    continue
+
+                # Pre-built images are compared by their id, so pull them to pick up changes to their tag
+                if challenge_instance.image.build_path is None and not challenge_instance.image.pull():
+                    continue
+
+                if challenge_instance.image.get_digest() != deployment["image_digest"]:
+                    continue
+
+                unchanged_deployments.add(id(challenge_instance))
+                if deployment["connection_info"]:
+                    challenge_instance["connection_info"] = deployment["connection_info"]
+
+        # (challenge_key, target_host, image_digest, port) of deployed challenges, which have not been synced yet
+        pending_deployments: dict[int, tuple[str, str, str, str | None]] = {}
 
-                    scheme = url.scheme
+        def get_target(challenge_instance: Challenge) -> tuple[str, str] | None:
+            # Returns the scheme and netloc of the host to deploy a challenge to, defaulting to cloud deployment
+            target_host = host or challenge_instance.get("host")
+            if not target_host:
+                return "cloud", ""
 
-                deployment_handler = get_deployment_handler(scheme)(
-                    challenge_instance, host=host, protocol=challenge_instance.get("protocol")
+            url = urlparse(target_host)
+            if not url.netloc:
+                return None
+
+            return url.scheme, url.netloc
+
+        # Limit how many challenges are deployed to the same SSH host at once
+        host_slots = {}
+        for challenge_instance in deployable_challenges:
+            target = get_target(challenge_instance)
+            if target and target[0] == "ssh":
+                host_slots.setdefault(target[1], threading.BoundedSemaphore(max(host_jobs, 1)))
+
+        def build_image(challenge_instance: Challenge) -> bool:
+            if id(challenge_instance) in unchanged_deployments:
+                return True
+
+            if challenge_instance.image.built or challenge_instance.image.build():
+                return True
+
+            click.secho(f"Could not build the image of challenge '{challenge_instance}'", fg="red")
+            return False
+
+        def deploy_service(challenge_instance: Challenge) -> bool:
+            challenge_name = challenge_instance.get("name")
+            target = get_target(challenge_instance)
+            if target is None:
+                click.secho(
+                    f"Host for challenge service '{challenge_name}' has no URI scheme - "
+                    f"{host or challenge_instance.get('host')}. Provide a URI scheme like ssh:// or registry://",
+                    fg="red",
                 )
+                return False
 
+            if id(challenge_instance) in unchanged_deployments:
                 click.secho(
-                    f"Deploying challenge service '{challenge_name}' "
-                    f"({challenge_instance.challenge_file_path}) "
-                    f"with {deployment_handler.__class__.__name__} ...",
-                    fg="blue",
+                    f"Skipping '{challenge_name}' - its image is unchanged since it was last deployed",
+                    fg="green",
                 )
+                return True
+
+            scheme, netloc = target
+            deployment_handler = get_deployment_handler(scheme)(
+                challenge_instance, host=host, protocol=challenge_instance.get("protocol")
+            )
+
+            click.secho(
+                f"Deploying challenge service '{challenge_name}' "
+                f"({challenge_instance.challenge_file_path}) "
+                f"with {deployment_handler.__class__.__name__} ...",
+                fg="blue",
+            )
 
+            # Forget the deployment until it succeeds again, as the service may be left in any state
+            challenge_key, target_host = get_ledger_key(challenge_instance)
+            store.remove_deployment(challenge_key, target_host)
+
+            with host_slots.get(netloc, contextlib.nullcontext()):
                 deployment_result = deployment_handler.deploy(skip_login=skip_login)
 
-                # Save connection_info from the deployment result if returned
-                if deployment_result.connection_info:
-                    click.secho("Saving connection_info in challenge.yml", fg="yellow")
-                    challenge_instance["connection_info"] = deployment_result.connection_info
+            # Save connection_info from the deployment result if returned
+            if deployment_result.connection_info:
+                click.secho("Saving connection_info in challenge.yml", fg="yellow")
+                challenge_instance["connection_info"] = deployment_result.connection_info
 
-                # If no connection_info was provided by the challenge
-                # and the deployment didn't result in one either, just ensure it's not present
-                elif not challenge_instance.get("connection_info"):
-                    challenge_instance["connection_info"] = None
+            # If no connection_info was provided by the challenge
+            # and the deployment didn't result in one either, just ensure it's not present
+            elif not challenge_instance.get("connection_info"):
+                challenge_instance["connection_info"] = None
 
-                if not deployment_result.success:
-                    click.secho("An error occurred during service deployment!", fg="red")
-                    failed_deployments.append(challenge_instance)
-                    continue
+            if not deployment_result.success:
+                click.secho(f"An error occurred during service deployment of '{challenge_name}'!", fg="red")
+                return False
 
-                installed_challenges = Challenge.load_installed_challenges()
-                existing_challenge = next(
-                    (c for c in installed_challenges if c["name"] == challenge_instance["name"]),
-                    None,
+            # The deployment is only recorded once the challenge has been synced as well, see sync_challenge
+            image_digest = challenge_instance.image.get_digest()
+            if image_digest:
+                pending_deployments[id(challenge_instance)] = (
+                    challenge_key,
+                    target_host,
+                    image_digest,
+                    deployment_result.port,
                 )
 
-                if challenge_instance.get("connection_info"):
-                    click.secho(
-                        f"Challenge service deployed at: {challenge_instance['connection_info']}",
-                        fg="green",
-                    )
+            if challenge_instance.get("connection_info"):
+                click.secho(
+                    f"Challenge service deployed at: {challenge_instance['connection_info']}",
+                    fg="green",
+                )
 
-                    challenge_instance.save()  # Save the challenge with the new connection_info
-                else:
-                    click.secho(
-                        "Could not resolve a connection_info for the deployed service.\n"
-                        "If your DeploymentHandler does not return a connection_info, "
-                        "make sure to provide one in the challenge.yml file.",
-                        fg="yellow",
-                    )
+                challenge_instance.save()  # Save the challenge with the new connection_info
+            else:
+                click.secho(
+                    "Could not resolve a connection_info for the deployed service.\n"
+                    "If your DeploymentHandler does not return a connection_info, "
+                    "make sure to provide one in the challenge.yml file.",
+                    fg="yellow",
+                )
 
-                try:
-                    if existing_challenge:
-                        click.secho(f"Updating challenge '{challenge_name}'", fg="blue")
-                        challenge_instance.sync(
-                            ignore=["flags", "topics", "tags", "files", "hints", "requirements", "module", "state"]
-                        )
-                    else:
-                        click.secho(f"Creating challenge '{challenge_name}'", fg="blue")
-                        challenge_instance.create()
+            return True
 
-                except ChallengeException as e:
-                    click.secho(
-                        "Challenge service has been deployed, however the challenge could not be "
-                        f"{'synced' if existing_challenge else 'created'}",
-                        fg="red",
+        def sync_challenge(challenge_instance: Challenge) -> bool:
+            challenge_name = challenge_instance.get("name")
+            existing_challenge = remote_state.get_challenge_by_name(challenge_instance["name"])
+
+            try:
+                if existing_challenge:
+                    click.secho(f"Updating challenge '{challenge_name}'", fg="blue")
+                    challenge_instance.sync(
+                        ignore=["flags", "topics", "tags", "files", "hints", "requirements", "module", "state"]
                     )
-                    click.secho(str(e), fg="red")
+                else:
+                    click.secho(f"Creating challenge '{challenge_name}'", fg="blue")
+                    challenge_instance.create()
+
+            except ChallengeException as e:
+                click.secho(
+                    "Challenge service has been deployed, however the challenge could not be "
+                    f"{'synced' if existing_challenge else 'created'}",
+                    fg="red",
+                )
+                click.secho(str(e), fg="red")
+                return False
+
+            deployment = pending_deployments.pop(id(challenge_instance), None)
+            if deployment is not None:
+                challenge_key, target_host, image_digest, port = deployment
+                store.set_deployment(
+                    challenge_key,
+                    target_host,
+                    image_digest,
+                    port=port,
+                    connection_info=challenge_instance.get("connection_info"),
+                )
+
+            click.secho(f"Success! Deployed '{challenge_name}'\n", fg="green")
+            return True
+
+        # next is set once all challenges are synced, as it may reference a challenge created later in this run
+        self._defer_next(deployable_challenges)
+
+        # Build all images up front in a single bake session, so that shared layers are built once and images
+        # concurrently. Without buildx, images are built by the build stage of the pipeline in parallel instead
+        buildable_challenges = [
+            challenge_instance
+            for challenge_instance in deployable_challenges
+            if not challenge_instance.image.built and id(challenge_instance) not in unchanged_deployments
+        ]
+        if buildable_challenges and (jobs == 1 or (len(buildable_challenges) > 1 and is_bake_available())):
+            click.secho(f"Building {len(buildable_challenges)} image(s)", fg="blue")
+            build_results = build_images([challenge_instance.image for challenge_instance in buildable_challenges])
+
+            for challenge_instance, built in zip(buildable_challenges, build_results, strict=True):
+                if not built:
+                    click.secho(f"Could not build the image of challenge '{challenge_instance}'", fg="red")
+                    deployable_challenges.remove(challenge_instance)
+                    failed_deployments.append(challenge_instance)
+
+        if jobs == 1:
+            # Deploy the challenges one by one
+            with click.progressbar(deployable_challenges, label="Deploying challenges") as challenges:
+                for challenge_instance in challenges:
+                    click.echo()
+
+                    if not deploy_service(challenge_instance):
+                        failed_deployments.append(challenge_instance)
+                    elif not sync_challenge(challenge_instance):
+                        failed_syncs.append(challenge_instance)
+        else:
+            # Pipeline the deployments: images not built up front are built while other challenges are pushed and
+            # synced, with separate pools for builds (CPU bound), deployments (network bound) and syncs (API bound)
+            click.secho(f"Deploying {len(deployable_challenges)} challenge(s) with {jobs} jobs", fg="blue")
+            with click.progressbar(length=len(deployable_challenges), label="Deploying challenges") as progress:
+                failed_stages = run_pipeline(
+                    deployable_challenges,
+                    [
+                        (build_image, build_jobs or min(jobs, os.cpu_count() or 1)),
+                        (deploy_service, jobs),
+                        (sync_challenge, jobs),
+                    ],
+                    on_done=lambda *_: progress.update(1),
+                    dependencies=self._get_challenge_dependencies(deployable_challenges),
+                )
+
+            for challenge_instance, failed_stage in zip(deployable_challenges, failed_stages, strict=True):
+                if failed_stage == 2:
                     failed_syncs.append(challenge_instance)
+                elif failed_stage is not None:
+                    failed_deployments.append(challenge_instance)
 
-                click.secho("Success!\n", fg="green")
+        failed_ids = {id(challenge_instance) for challenge_instance in failed_deployments + failed_syncs}
+        synced_challenges = [
+            challenge_instance
+            for challenge_instance in deployable_challenges
+            if id(challenge_instance) not in failed_ids
+        ]
+        next_results = self._set_deferred_next(synced_challenges, [True] * len(synced_challenges))
+        for challenge_instance, next_set in zip(synced_challenges, next_results, strict=True):
+            if not next_set:
+                failed_syncs.append(challenge_instance)
 
         if len(skipped_deployments) > 0:
             click.secho("Deployment skipped (no image specified) for:", fg="yellow")
@@ -831,7 +1105,7 @@ class ChallengeCommand:
 
         if len(failed_syncs) > 0:
             click.secho("Install / Sync failed for:", fg="red")
-            for challenge_instance in failed_deployments:
+            for challenge_instance in failed_syncs:
                 click.echo(f" - {challenge_instance}")
 
         return 1
@@ -840,24 +1114,106 @@ class ChallengeCommand:
         self,
         challenge: str | None = None,
         skip_hadolint: bool = False,
-        flag_format: str = "flag{",
+        flag_format: str | tuple[str] = "flag{",
+        flag_regex: str | tuple[str] = (),
+        utf16: bool = False,
+        all_challenges: bool = False,
+        jobs: int = 1,
+        json_report: str | None = None,
+        sarif_report: str | None = None,
     ) -> int:
-        log.debug(f"lint: (challenge={challenge}, skip_hadolint={skip_hadolint}, flag_format='{flag_format}')")
+        log.debug(
+            f"lint: (challenge={challenge}, skip_hadolint={skip_hadolint}, flag_format='{flag_format}', "
+            f"flag_regex='{flag_regex}', utf16={utf16}, all_challenges={all_challenges}, jobs={jobs}, "
+            f"json_report={json_report}, sarif_report={sarif_report})"
+        )
 
-        challenge_instance = self._resolve_single_challenge(challenge)
-        if not challenge_instance:
+        if jobs < 1:
+            click.secho("The number of jobs has to be at least 1", fg="red")
             return 1
 
-        click.secho(f"Loaded {challenge_instance}", fg="blue")
+        if isinstance(flag_format, str):
+            flag_format = (flag_format,)
+
+        if isinstance(flag_regex, str):
+            flag_regex = (flag_regex,)
+
         try:
-            challenge_instance.lint(skip_hadolint=skip_hadolint, flag_format=flag_format)
-        except LintException as e:
-            click.secho("Linting found issues!\n", fg="yellow")
-            e.print_summary()
+            get_flag_pattern(flag_format, flag_regex)
+        except re.error as e:
+            click.secho(f"Invalid flag regex: {e}", fg="red")
             return 1
 
-        click.secho("Success! Lint didn't find any issues!", fg="green")
-        return 0
+        lint_options = {
+            "skip_hadolint": skip_hadolint,
+            "flag_format": flag_format,
+            "flag_regex": flag_regex,
+            "utf16": utf16,
+        }
+
+        if all_challenges:
+            challenge_paths = [str(challenge_path) for challenge_path in self._get_all_challenge_paths()]
+        else:
+            challenge_instance = self._resolve_single_challenge(challenge)
+            if not challenge_instance:
+                return 1
+
+            click.secho(f"Loaded {challenge_instance}", fg="blue")
+            challenge_paths = [str(challenge_instance.challenge_file_path)]
+
+        project_path = None
+        with contextlib.suppress(ProjectNotInitialized):
+            project_path = Config.get_project_path()
+
+        # Every challenge is linted before reporting the results, regardless of how many of them fail
+        results = []
+        lint_project_path = str(project_path) if project_path else None
+        for result in lint_challenges(challenge_paths, jobs=jobs, project_path=lint_project_path, **lint_options):
+            results.append(result)
+            if all_challenges:
+                self._print_lint_result(result)
+
+        report = LintReport(results, project_path=project_path)
+        if json_report:
+            report.write_json(json_report)
+            click.secho(f"Written JSON report to {json_report}", fg="blue")
+
+        if sarif_report:
+            report.write_sarif(sarif_report)
+            click.secho(f"Written SARIF report to {sarif_report}", fg="blue")
+
+        if report.passed:
+            click.secho("Success! Lint didn't find any issues!", fg="green")
+            return 0
+
+        if all_challenges:
+            click.secho("Lint failed for:", fg="red")
+            for result in report.failed_results:
+                click.echo(f" - {result.name or result.challenge_path}")
+
+            return 1
+
+        [result] = results
+        if result.error:
+            click.secho(result.error, fg="red")
+            return 1
+
+        click.secho("Linting found issues!\n", fg="yellow")
+        LintException(issues=result.issues).print_summary()
+        return 1
+
+    @staticmethod
+    def _print_lint_result(result: LintResult) -> None:
+        if result.passed:
+            click.secho(f"Linted '{result.name}' ({result.challenge_path}) - no issues", fg="green")
+            return
+
+        if result.error:
+            click.secho(f"Failed to lint {result.challenge_path}: {result.error}", fg="red")
+            return
+
+        click.secho(f"Linting '{result.name}' ({result.challenge_path}) found issues!\n", fg="yellow")
+        LintException(issues=result.issues).print_summary()
 
     def healthcheck(self, challenge: str | None = None) -> int:
         log.debug(f"healthcheck: (challenge={challenge})")
@@ -876,14 +1232,9 @@ class ChallengeCommand:
             return 1
 
         # Get challenges installed from CTFd and try to find our challenge
-        remote_challenges = Challenge.load_installed_challenges()
-
-        challenge_id = None
-        for remote_challenge in remote_challenges:
-            if challenge_instance["name"] == remote_challenge["name"]:
-                challenge_id = remote_challenge["id"]
+        remote_challenge = challenge_instance.remote.get_challenge_by_name(challenge_instance["name"])
 
-        if challenge_id is None:
+        if remote_challenge is None:
             click.secho(
                 f"Could not find existing challenge '{challenge_instance}'. "
                 f"Challenge needs to be installed and deployed to run a healthcheck.",
@@ -892,7 +1243,7 @@ class ChallengeCommand:
             return 1
 
         try:
-            challenge_data = Challenge.load_installed_challenge(challenge_id)
+            challenge_data = Challenge.load_installed_challenge(remote_challenge["id"])
         except RemoteChallengeNotFound:
             click.secho(f"Could not load data for challenge '{challenge_instance}'.", fg="red")
             return 1
@@ -929,30 +1280,35 @@ class ChallengeCommand:
         skip_verify: bool = False,
         ignore: str | tuple[str] = (),
         create: bool = False,
+        rehash: bool = False,
     ) -> int:
         log.debug(
             f"mirror: (challenge={challenge}, files_directory={files_directory}, "
-            f"skip_verify={skip_verify}, ignore={ignore})"
+            f"skip_verify={skip_verify}, ignore={ignore}, rehash={rehash})"
         )
         config = Config()
 
+        # Share a single snapshot of the remote between all mirrored challenges
+        remote_state = RemoteState()
+
         if challenge:
-            challenge_instance = self._resolve_single_challenge(challenge)
+            challenge_instance = self._resolve_single_challenge(challenge, remote_state=remote_state)
             if not challenge_instance:
                 return 1
 
             local_challenges = [challenge_instance]
         else:
-            local_challenges = self._resolve_all_challenges()
+            local_challenges = self._resolve_all_challenges(remote_state=remote_state)
 
         if isinstance(ignore, str):
             ignore = (ignore,)
 
-        remote_challenges = Challenge.load_installed_challenges()
+        self._load_known_remote_challenges(local_challenges)
+        self._use_file_digest_store(local_challenges, Store(config.project_path), rehash)
 
         # Issue a warning if there are extra challenges on the remote that do not have a local version
         local_challenge_names = [c["name"] for c in local_challenges]
-        for remote_challenge in remote_challenges:
+        for remote_challenge in remote_state.challenges:
             if remote_challenge["name"] not in local_challenge_names:
                 click.secho(
                     f"Found challenge '{remote_challenge['name']}' in CTFd, but not in .ctf/config",
@@ -963,7 +1319,9 @@ class ChallengeCommand:
                         f"Mirroring '{remote_challenge['name']}' to local due to --create",
                         fg="yellow",
                     )
-                    challenge_instance = Challenge.clone(config=config, remote_challenge=remote_challenge)
+                    challenge_instance = Challenge.clone(
+                        config=config, remote_challenge=remote_challenge, remote_state=remote_state
+                    )
                     challenge_instance.mirror(files_directory_name=files_directory, ignore=ignore)
 
         failed_mirrors = []
@@ -993,27 +1351,32 @@ class ChallengeCommand:
 
         return 1
 
-    def verify(self, challenge: str | None = None, ignore: tuple[str] = ()) -> int:
-        log.debug(f"verify: (challenge={challenge}, ignore={ignore})")
+    def verify(self, challenge: str | None = None, ignore: tuple[str] = (), rehash: bool = False) -> int:
+        log.debug(f"verify: (challenge={challenge}, ignore={ignore}, rehash={rehash})")
+
+        # Share a single snapshot of the remote between all verified challenges
+        remote_state = RemoteState()
 
         if challenge:
-            challenge_instance = self._resolve_single_challenge(challenge)
+            challenge_instance = self._resolve_single_challenge(challenge, remote_state=remote_state)
             if not challenge_instance:
                 return 1
 
             local_challenges = [challenge_instance]
         else:
-            local_challenges = self._resolve_all_challenges()
+            local_challenges = self._resolve_all_challenges(remote_state=remote_state)
 
         if isinstance(ignore, str):
             ignore = (ignore,)
 
-        remote_challenges = Challenge.load_installed_challenges()
+        self._load_known_remote_challenges(local_challenges)
+        self._use_file_digest_store(local_challenges, Store(Config().project_path), rehash)
+
         if len(local_challenges) > 1:
             # Issue a warning if there are extra challenges on the remote that do not have a local version
             local_challenge_names = [c["name"] for c in local_challenges]
 
-            for remote_challenge in remote_challenges:
+            for remote_challenge in remote_state.challenges:
                 if remote_challenge["name"] not in local_challenge_names:
                     click.secho(
                         f"Found challenge '{remote_challenge['name']}' in CTFd, but not in .ctf/config\n"
@@ -1092,7 +1455,9 @@ class ChallengeCommand:
         return 1
 
     @staticmethod
-    def _resolve_single_challenge(challenge: str | None = None) -> Challenge | None:
+    def _resolve_single_challenge(
+        challenge: str | None = None, remote_state: RemoteState | None = None
+    ) -> Challenge | None:
         # if a challenge is specified
         if challenge:
             # check if it's a path to challenge.yml, or the current directory
@@ -1112,25 +1477,113 @@ class ChallengeCommand:
             challenge_path = challenge_path / "challenge.yml"
 
         try:
-            return Challenge(challenge_path)
+            return Challenge(challenge_path, remote_state=remote_state)
         except ChallengeException as e:
             click.secho(str(e), fg="red")
             return None
 
     @staticmethod
-    def _resolve_all_challenges() -> list[Challenge]:
+    def _get_instance_url(config: Config) -> str:
+        return config.config.get("config", "url", fallback="").rstrip("/")
+
+    @staticmethod
+    def _load_known_remote_challenges(challenges: list[Challenge]) -> None:
+        # Use remote challenge ids remembered by install and sync, instead of looking challenges up by name
+        config = Config()
+        instance_url = ChallengeCommand._get_instance_url(config)
+        store = Store(config.project_path)
+
+        for challenge_instance in challenges:
+            challenge_key = store.get_challenge_key(challenge_instance.challenge_file_path)
+            challenge_instance.known_remote = store.get_remote_challenge(instance_url, challenge_key)
+
+    @staticmethod
+    def _use_file_digest_store(challenges: list[Challenge], store: Store, rehash: bool = False) -> None:
+        # Cache digests of challenge files, so that unchanged files are not hashed again on every run
+        for challenge_instance in challenges:
+            challenge_instance.file_digest_store = store
+            challenge_instance.rehash = rehash
+
+    @staticmethod
+    def _run_with_progress(
+        func: Callable[[Challenge], bool], challenges: list[Challenge], label: str, jobs: int = 1
+    ) -> list[bool]:
+        def run(challenge_instance: Challenge) -> bool:
+            click.echo()
+            return func(challenge_instance)
+
+        # Challenges referenced by requirements are processed first, so that their ids can be resolved
+        dependencies = ChallengeCommand._get_challenge_dependencies(challenges)
+        ChallengeCommand._defer_next(challenges)
+
+        # Progress is only ever rendered from the calling thread, as challenges finish
+        with click.progressbar(length=len(challenges), label=label) as progress:
+            results = run_concurrently(
+                run, challenges, jobs=jobs, on_done=lambda *_: progress.update(1), dependencies=dependencies
+            )
+
+        return ChallengeCommand._set_deferred_next(challenges, results)
+
+    @staticmethod
+    def _get_challenge_dependencies(challenges: list[Challenge]) -> list[set[int]]:
+        # Only references to challenges processed in the same run matter,
+        # others are expected to already exist in the remote
+        indexes_by_name = {}
+        for idx, challenge_instance in enumerate(challenges):
+            indexes_by_name.setdefault(challenge_instance["name"], idx)
+
+        return [
+            {indexes_by_name[name] for name in challenge_instance.get_dependency_names() if name in indexes_by_name}
+            for challenge_instance in challenges
+        ]
+
+    @staticmethod
+    def _defer_next(challenges: list[Challenge]) -> None:
+        # next may reference a challenge created later in the same run - often one requiring this challenge,
+        # so it is only set once all challenges have been processed, see _set_deferred_next
+        names = {challenge_instance["name"] for challenge_instance in challenges}
+        for challenge_instance in challenges:
+            _next = challenge_instance.get("next")
+            challenge_instance.defer_next = type(_next) == str and _next in names
+
+    @staticmethod
+    def _set_deferred_next(challenges: list[Challenge], results: list[bool]) -> list[bool]:
+        results = list(results)
+        for idx, challenge_instance in enumerate(challenges):
+            if not results[idx] or not challenge_instance.next_pending:
+                continue
+
+            try:
+                challenge_instance.set_next()
+            except ChallengeException as e:
+                click.secho(f"Failed to set the next challenge of '{challenge_instance}'", fg="red")
+                click.secho(str(e), fg="red")
+                results[idx] = False
+
+        return results
+
+    @staticmethod
+    def _get_all_challenge_paths() -> list[Path]:
         config = Config()
         challenge_keys = config.challenges.keys()
 
-        challenges = []
+        challenge_paths = []
         for challenge_key in challenge_keys:
             challenge_path = config.project_path / Path(challenge_key)
 
             if not challenge_path.name.endswith(".yml"):
                 challenge_path = challenge_path / "challenge.yml"
 
+            challenge_paths.append(challenge_path)
+
+        return challenge_paths
+
+    @staticmethod
+    def _resolve_all_challenges(remote_state: RemoteState | None = None) -> list[Challenge]:
+        challenges = []
+        for challenge_path in ChallengeCommand._get_all_challenge_paths():
             try:
-                challenges.append(Challenge(challenge_path))
+                challenges.append(Challenge(challenge_path, remote_state=remote_state))
             except ChallengeException as e:
                 click.secho(str(e), fg="red")
                 continue
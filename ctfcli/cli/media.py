@@ -13,7 +13,7 @@ class MediaCommand:
         if config.config.has_section("media") is False:
             config.config.add_section("media")
 
-        api = API()
+        api = API.shared()
 
         filename = os.path.basename(path)
         new_file = (filename, open(path, mode="rb"))
@@ -40,7 +40,7 @@ class MediaCommand:
     def rm(self, path):
         """Remove local media file from remote server and local config"""
         config = Config()
-        api = API()
+        api = API.shared()
 
         local_location = config["media"][path]
 
@@ -59,7 +59,7 @@ class MediaCommand:
     def url(self, path):
         """Get server URL for a file key"""
         config = Config()
-        api = API()
+        api = API.shared()
 
         if config.config.has_section("media") is False:
             config.config.add_section("media")
@@ -1,25 +1,202 @@
+import logging
+import random
+import threading
+import time
+from contextlib import nullcontext
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from typing import Mapping
 from urllib.parse import urljoin
 
-from requests import Session
+from requests import ConnectionError, Session, Timeout
+from requests.adapters import DEFAULT_POOLSIZE, HTTPAdapter
 from requests_toolbelt.multipart.encoder import MultipartEncoder
 
 from ctfcli.core.config import Config
 from ctfcli.core.exceptions import MissingAPIKey, MissingInstanceURL
+from ctfcli.utils.ratelimit import TokenBucket
+
+log = logging.getLogger("ctfcli.core.api")
+
+
+class SharedHTTPAdapter(HTTPAdapter):
+    def close(self):
+        # The adapter is shared between sessions - closing one of them must not close the connection pool
+        pass
+
+
+class RetryBudget:
+    # Limits the number of retries made by all API clients during a single command,
+    # so that an unhealthy instance fails the command quickly instead of being retried for every request
+    def __init__(self, retries: int):
+        self.remaining = retries
+        self._lock = threading.Lock()
+
+    def consume(self) -> bool:
+        with self._lock:
+            if self.remaining <= 0:
+                return False
+
+            self.remaining -= 1
+            return True
+
+
+class RetryPolicy:
+    # The request has been rejected without being processed - it is safe to retry any method
+    retry_statuses = (429, 503)
+
+    # The request may have been processed - only retry methods which can be safely repeated.
+    # PATCH is included, as CTFd PATCH endpoints set absolute values
+    idempotent_retry_statuses = (502, 504)
+    idempotent_methods = ("GET", "HEAD", "OPTIONS", "PUT", "DELETE", "PATCH")
+
+    # Do not wait longer than this between retries, even if the server asks for it
+    max_retry_delay = 120
+
+    def __init__(self, retries: int, backoff: float, budget: RetryBudget):
+        self.retries = retries
+        self.backoff = backoff
+        self.budget = budget
+
+    def get_error_delay(self, method: str, attempt: int) -> float | None:
+        # A request which failed to complete may have still been processed
+        if method.upper() not in self.idempotent_methods or not self._can_retry(attempt):
+            return None
+
+        return self._get_backoff_delay(attempt)
+
+    def get_response_delay(self, method: str, status_code: int, headers: Mapping, attempt: int) -> float | None:
+        if status_code in self.retry_statuses:
+            retry_after = self.parse_retry_after(headers)
+        elif status_code in self.idempotent_retry_statuses and method.upper() in self.idempotent_methods:
+            retry_after = None
+        else:
+            return None
+
+        if retry_after is not None and retry_after > self.max_retry_delay:
+            return None
+
+        if not self._can_retry(attempt):
+            return None
+
+        return retry_after if retry_after is not None else self._get_backoff_delay(attempt)
+
+    def _can_retry(self, attempt: int) -> bool:
+        return attempt < self.retries and self.budget.consume()
+
+    def _get_backoff_delay(self, attempt: int) -> float:
+        # Exponential backoff with full jitter
+        return random.uniform(0, min(self.max_retry_delay, self.backoff * 2**attempt))  # noqa: S311
+
+    @staticmethod
+    def parse_retry_after(headers: Mapping) -> float | None:
+        retry_after = headers.get("Retry-After")
+        if not retry_after:
+            return None
+
+        # Retry-After is either a number of seconds, or an HTTP date
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            pass
+
+        try:
+            return max(0.0, (parsedate_to_datetime(retry_after) - datetime.now(timezone.utc)).total_seconds())
+        except (TypeError, ValueError):
+            return None
 
 
 class API(Session):
+    # A single connection pool is shared by all API sessions in the process,
+    # so that connections (and TLS sessions) are kept alive and reused across all of them
+    _adapter: SharedHTTPAdapter | None = None
+    _adapter_lock = threading.Lock()
+    _pool_size = DEFAULT_POOLSIZE
+
+    # Retry budget shared by all API clients in the process
+    _retry_budget: RetryBudget | None = None
+
+    # Client-side rate limits shared by all API clients in the process, so that bulk commands
+    # stay under a known request rate regardless of how many threads they use. See _configure_limits()
+    _limits_configured = False
+    _rate_limiters: dict[str, TokenBucket] = {}
+    _request_slots: threading.BoundedSemaphore | None = None
+
+    # Client shared by everything in the process, see shared()
+    _shared: "API | None" = None
+    _shared_lock = threading.Lock()
+
+    read_methods = ("GET", "HEAD", "OPTIONS")
+
+    @classmethod
+    def shared(cls) -> "API":
+        # Created lazily, so that the project config is only loaded once, and only by commands which use the API
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+
+            return cls._shared
+
+    @classmethod
+    def set_pool_size(cls, size: int) -> None:
+        # Size the shared connection pool to the number of concurrent requests a command is going to make
+        with cls._adapter_lock:
+            size = max(size, DEFAULT_POOLSIZE)
+            if size == cls._pool_size:
+                return
+
+            cls._pool_size = size
+            cls._adapter = None
+
+        # The shared client is created again, with the resized pool
+        with cls._shared_lock:
+            cls._shared = None
+
+    @classmethod
+    def get_shared_adapter(cls) -> SharedHTTPAdapter:
+        with cls._adapter_lock:
+            if cls._adapter is None:
+                cls._adapter = SharedHTTPAdapter(pool_maxsize=cls._pool_size)
+
+            return cls._adapter
+
     def __init__(self):
         config = Config()
+        self.url, self.access_token, ssl_verify = self.load_connection_config(config)
+
+        self.configure_shared_limits(config)
+        self.retry_policy = self.load_retry_policy(config)
 
+        super().__init__()
+
+        adapter = self.get_shared_adapter()
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+
+        # Strip out ending slashes and append a singular one, so we generate
+        # clean base URLs for both main deployments and subdir deployments
+        self.prefix_url = self.url.rstrip("/") + "/"
+
+        # Handle SSL verification
+        self.verify = ssl_verify
+
+        # Handle Authorization
+        self.headers.update({"Authorization": f"Token {self.access_token}"})
+
+        # Handle cookies section in config
+        if "cookies" in config:
+            self.cookies.update(dict(config["cookies"]))
+
+    @staticmethod
+    def load_connection_config(config: Config) -> tuple[str, str, bool | str]:
         # Load required configuration values
         try:
-            self.url = config["config"]["url"]
+            url = config["config"]["url"]
         except KeyError as e:
             raise MissingInstanceURL() from e
 
         try:
-            self.access_token = config["config"]["access_token"]
+            access_token = config["config"]["access_token"]
         except KeyError as e:
             raise MissingAPIKey() from e
 
@@ -32,27 +209,124 @@ class API(Session):
             # https://requests.kennethreitz.org/en/master/user/advanced/#ssl-cert-verification
             ssl_verify = config["config"].get("ssl_verify")
 
-        super().__init__()
+        return url, access_token, ssl_verify
 
-        # Strip out ending slashes and append a singular one, so we generate
-        # clean base URLs for both main deployments and subdir deployments
-        self.prefix_url = self.url.rstrip("/") + "/"
+    @staticmethod
+    def load_retry_policy(config: Config) -> RetryPolicy:
+        # Retries with exponential backoff, see request()
+        return RetryPolicy(
+            int(config["config"].get("retries", 3)),
+            float(config["config"].get("retry_backoff", 0.5)),
+            API._retry_budget,
+        )
 
-        # Handle SSL verification
-        self.verify = ssl_verify
+    @staticmethod
+    def configure_shared_limits(config: Config) -> None:
+        # The retry budget and rate limits are read from the config once, and shared by all clients in the process
+        with API._adapter_lock:
+            if API._retry_budget is None:
+                API._retry_budget = RetryBudget(int(config["config"].get("retry_budget", 50)))
 
-        # Handle Authorization
-        self.headers.update({"Authorization": f"Token {self.access_token}"})
+            if not API._limits_configured:
+                API._configure_limits(config["config"])
 
-        # Handle cookies section in config
-        if "cookies" in config:
-            self.cookies.update(dict(config["cookies"]))
+    @classmethod
+    def _configure_limits(cls, config_section) -> None:
+        # rate_limit_read, rate_limit_write and rate_limit_upload are requests per second,
+        # max_concurrent_requests caps the number of requests in flight. All of them are unlimited by default
+        rate_limiters = {}
+        for category in ["read", "write", "upload"]:
+            rate = config_section.get(f"rate_limit_{category}")
+            if rate and float(rate) > 0:
+                rate_limiters[category] = TokenBucket(float(rate))
+
+        max_concurrent_requests = config_section.get("max_concurrent_requests")
+        if max_concurrent_requests and int(max_concurrent_requests) > 0:
+            cls._request_slots = threading.BoundedSemaphore(int(max_concurrent_requests))
+        else:
+            cls._request_slots = None
+
+        cls._rate_limiters = rate_limiters
+        cls._limits_configured = True
+
+    @classmethod
+    def reset_limits(cls) -> None:
+        with cls._adapter_lock:
+            cls._retry_budget = None
+            cls._rate_limiters = {}
+            cls._request_slots = None
+            cls._limits_configured = False
+
+    @staticmethod
+    def get_rate_limiter(method: str, files) -> TokenBucket | None:
+        if files:
+            return API._rate_limiters.get("upload")
+
+        if method.upper() in API.read_methods:
+            return API._rate_limiters.get("read")
+
+        return API._rate_limiters.get("write")
 
     def request(self, method, url, data=None, files=None, *args, **kwargs):
         # Strip out the preceding / so that urljoin creates the right url
         # considering the appended / on the prefix_url
         url = urljoin(self.prefix_url, url.lstrip("/"))
 
+        # Remember the positions of uploaded files, so that a retry can send them again
+        file_positions = self._get_file_positions(files)
+
+        rate_limiter = self.get_rate_limiter(method, files)
+
+        attempt = 0
+        while True:
+            # Every attempt counts against the rate limit
+            if rate_limiter is not None:
+                waited = rate_limiter.acquire()
+                if waited:
+                    log.debug(f"{method} {url} rate limited for {waited:.2f}s")
+
+            try:
+                with self._request_slots or nullcontext():
+                    response = self._send(method, url, data, files, *args, **kwargs)
+            except (ConnectionError, Timeout) as e:
+                delay = self.retry_policy.get_error_delay(method, attempt)
+                if delay is None:
+                    raise
+
+                log.debug(f"{method} {url} failed ({e}), retrying in {delay:.2f}s")
+            else:
+                delay = self.retry_policy.get_response_delay(method, response.status_code, response.headers, attempt)
+                if delay is None:
+                    return response
+
+                log.debug(f"{method} {url} returned {response.status_code}, retrying in {delay:.2f}s")
+                response.close()
+
+            attempt += 1
+            time.sleep(delay)
+
+            for fp, position in file_positions:
+                fp.seek(position)
+
+    @staticmethod
+    def _get_file_positions(files) -> list:
+        if files is None:
+            return []
+
+        if isinstance(files, Mapping):
+            files = files.items()
+
+        # files are (field, (filename, fileobj, ...)) tuples
+        positions = []
+        for _, file_value in files:
+            if isinstance(file_value, (list, tuple)) and len(file_value) > 1 and hasattr(file_value[1], "seek"):
+                positions.append((file_value[1], file_value[1].tell()))
+
+        return positions
+
+    def _send(self, method, url, data=None, files=None, *args, **kwargs):
+        # A new MultipartEncoder is created for every attempt, as its stream is consumed by sending it
+
         # If data or files are any kind of key/value iterable
         # then encode the body as form-data
         if isinstance(data, (list, tuple, Mapping)) or isinstance(files, (list, tuple, Mapping)):
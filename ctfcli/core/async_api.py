@@ -0,0 +1,196 @@
+import asyncio
+import logging
+import os
+import ssl
+from collections.abc import Mapping
+from urllib.parse import urljoin
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+from ctfcli.core.api import API
+from ctfcli.core.config import Config
+from ctfcli.core.exceptions import MissingAsyncDependency
+
+log = logging.getLogger("ctfcli.core.async_api")
+
+
+class AsyncAPI:
+    """
+    asyncio counterpart of API, for fanning out many concurrent requests on a single event loop.
+
+    Requires the optional aiohttp dependency (pip install ctfcli[async]). Configuration, URL prefixing, authorization,
+    cookies, ssl_verify, multipart uploads, retries and rate limits behave exactly like in API.
+
+    Responses are read in full before being returned, so that they do not hold on to a connection:
+
+        async with AsyncAPI() as api:
+            responses = await asyncio.gather(*[api.get(f"/api/v1/challenges/{i}") for i in challenge_ids])
+            challenges = [(await r.json())["data"] for r in responses]
+    """
+
+    # Default maximum number of connections kept open by a single client
+    default_max_connections = 100
+
+    def __init__(self):
+        if aiohttp is None:
+            raise MissingAsyncDependency()
+
+        config = Config()
+        self.url, self.access_token, self.ssl_verify = API.load_connection_config(config)
+
+        API.configure_shared_limits(config)
+        self.retry_policy = API.load_retry_policy(config)
+
+        max_concurrent_requests = config["config"].get("max_concurrent_requests")
+        if max_concurrent_requests and int(max_concurrent_requests) > 0:
+            self.max_connections = int(max_concurrent_requests)
+        else:
+            self.max_connections = self.default_max_connections
+
+        # Strip out ending slashes and append a singular one, so we generate
+        # clean base URLs for both main deployments and subdir deployments
+        self.prefix_url = self.url.rstrip("/") + "/"
+
+        # Handle Authorization
+        self.headers = {"Authorization": f"Token {self.access_token}"}
+
+        # Handle cookies section in config
+        self.cookies = dict(config["cookies"]) if "cookies" in config else {}
+
+        self._session: aiohttp.ClientSession | None = None
+
+    async def __aenter__(self) -> "AsyncAPI":
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.close()
+
+    @property
+    def session(self) -> "aiohttp.ClientSession":
+        # The session has to be created from within the event loop it is going to be used in
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.max_connections, ssl=self.get_ssl_context(self.ssl_verify))
+            self._session = aiohttp.ClientSession(connector=connector, headers=self.headers, cookies=self.cookies)
+
+        return self._session
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    @staticmethod
+    def get_ssl_context(ssl_verify: bool | str) -> ssl.SSLContext | bool:
+        # Mirror the requests semantics of verify: a boolean, or a path to a CA bundle file or directory
+        if ssl_verify is False:
+            return False
+
+        if ssl_verify is True or not ssl_verify:
+            return True
+
+        if os.path.isdir(ssl_verify):
+            return ssl.create_default_context(capath=ssl_verify)
+
+        return ssl.create_default_context(cafile=ssl_verify)
+
+    async def request(self, method: str, url: str, data=None, files=None, **kwargs) -> "aiohttp.ClientResponse":
+        # Strip out the preceding / so that urljoin creates the right url
+        # considering the appended / on the prefix_url
+        url = urljoin(self.prefix_url, url.lstrip("/"))
+
+        # Remember the positions of uploaded files, so that a retry can send them again
+        file_positions = API._get_file_positions(files)
+
+        rate_limiter = API.get_rate_limiter(method, files)
+
+        attempt = 0
+        while True:
+            # Every attempt counts against the rate limit, which is shared with the threaded API clients
+            if rate_limiter is not None:
+                waited = rate_limiter.reserve()
+                if waited > 0:
+                    log.debug(f"{method} {url} rate limited for {waited:.2f}s")
+                    await asyncio.sleep(waited)
+
+            try:
+                response = await self._send(method, url, data, files, **kwargs)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                delay = self.retry_policy.get_error_delay(method, attempt)
+                if delay is None:
+                    raise
+
+                log.debug(f"{method} {url} failed ({e}), retrying in {delay:.2f}s")
+            else:
+                delay = self.retry_policy.get_response_delay(method, response.status, response.headers, attempt)
+                if delay is None:
+                    return response
+
+                log.debug(f"{method} {url} returned {response.status}, retrying in {delay:.2f}s")
+
+            attempt += 1
+            await asyncio.sleep(delay)
+
+            for fp, position in file_positions:
+                fp.seek(position)
+
+    async def _send(self, method: str, url: str, data=None, files=None, **kwargs) -> "aiohttp.ClientResponse":
+        headers = dict(kwargs.pop("headers", None) or {})
+
+        # If data or files are any kind of key/value iterable
+        # then encode the body as form-data - a new form is created for every attempt
+        if isinstance(data, (list, tuple, Mapping)) or isinstance(files, (list, tuple, Mapping)):
+            data = self._get_form_data(data, files)
+
+        # otherwise set the content-type to application/json for all API requests
+        elif data is None and files is None:
+            headers["Content-Type"] = "application/json"
+
+        async with self.session.request(method, url, data=data, headers=headers, **kwargs) as response:
+            # Read the body, so that the connection is released back to the pool
+            await response.read()
+
+        return response
+
+    @staticmethod
+    def _get_form_data(data, files) -> "aiohttp.FormData":
+        form = aiohttp.FormData()
+
+        if isinstance(data, Mapping):
+            data = data.items()
+
+        for key, value in data or []:
+            # int are not allowed as values in form data
+            form.add_field(key, str(value) if isinstance(value, int) else value)
+
+        if isinstance(files, Mapping):
+            files = files.items()
+
+        # The files structure is the same as for API:
+        # List[Tuple[str, Tuple[str, BinaryIO, Optional[str]]]]
+        for key, file_value in files or []:
+            if isinstance(file_value, (list, tuple)):
+                filename, fileobj, *rest = file_value
+                content_type = rest[0] if rest else None
+                form.add_field(key, fileobj, filename=filename, content_type=content_type)
+            else:
+                form.add_field(key, file_value, filename=key)
+
+        return form
+
+    async def get(self, url: str, **kwargs) -> "aiohttp.ClientResponse":
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, data=None, **kwargs) -> "aiohttp.ClientResponse":
+        return await self.request("POST", url, data=data, **kwargs)
+
+    async def patch(self, url: str, data=None, **kwargs) -> "aiohttp.ClientResponse":
+        return await self.request("PATCH", url, data=data, **kwargs)
+
+    async def put(self, url: str, data=None, **kwargs) -> "aiohttp.ClientResponse":
+        return await self.request("PUT", url, data=data, **kwargs)
+
+    async def delete(self, url: str, **kwargs) -> "aiohttp.ClientResponse":
+        return await self.request("DELETE", url, **kwargs)
@@ -1,6 +1,8 @@
+import hashlib
+import json
 import logging
 import re
-import subprocess
+from collections.abc import Sequence
 from datetime import datetime, timezone
 from os import PathLike
 from pathlib import Path
@@ -19,9 +21,13 @@ from ctfcli.core.exceptions import (
     LintException,
     RemoteChallengeNotFound,
 )
-from ctfcli.core.image import Image
-from ctfcli.utils.hashing import hash_file
-from ctfcli.utils.tools import strings
+from ctfcli.core.hadolint import Hadolint
+from ctfcli.core.image import Image, get_local_images
+from ctfcli.core.remote import RemoteState
+from ctfcli.core.store import Store
+from ctfcli.utils.hashing import hash_paths
+from ctfcli.utils.reconcile import reconcile
+from ctfcli.utils.tools import find_flags
 
 log = logging.getLogger("ctfcli.core.challenge")
 
@@ -90,8 +96,10 @@ class Challenge(dict):
     ]
 
     @staticmethod
-    def load_installed_challenge(challenge_id) -> dict:
-        api = API()
+    def load_installed_challenge(challenge_id, api: API | None = None) -> dict:
+        if api is None:
+            api = API.shared()
+
         r = api.get(f"/api/v1/challenges/{challenge_id}?view=admin")
 
         if not r.ok:
@@ -105,7 +113,7 @@ class Challenge(dict):
 
     @staticmethod
     def load_installed_challenges() -> list:
-        api = API()
+        api = API.shared()
         r = api.get("/api/v1/challenges?view=admin")
 
         if not r.ok:
@@ -211,7 +219,7 @@ class Challenge(dict):
         return local_parsed.astimezone(timezone.utc) == remote_parsed.astimezone(timezone.utc)
 
     @staticmethod
-    def clone(config, remote_challenge):
+    def clone(config, remote_challenge, remote_state: RemoteState | None = None):
         name = remote_challenge["name"]
 
         if name is None:
@@ -245,18 +253,27 @@ class Challenge(dict):
         with open(config.config_path, "w+") as f:
             config.write(f)
 
-        return Challenge(f"{challenge_dir_name}/challenge.yml")
+        return Challenge(f"{challenge_dir_name}/challenge.yml", remote_state=remote_state)
 
     @property
     def api(self):
         if not self._api:
-            self._api = API()
+            # Reuse the client of a shared remote state, instead of creating one per challenge
+            self._api = self._remote.api if self._remote else API.shared()
 
         return self._api
 
+    @property
+    def remote(self) -> RemoteState:
+        if not self._remote:
+            self._remote = RemoteState(self.api)
+
+        return self._remote
+
     # __init__ expects an absolute path to challenge_yml, or a relative one from the cwd
     # it does not join that path with the project_path
-    def __init__(self, challenge_yml: str | PathLike, overrides=None):
+    # remote_state can be provided to share a single snapshot of the remote between multiple challenges
+    def __init__(self, challenge_yml: str | PathLike, overrides=None, remote_state: RemoteState | None = None):
         log.debug(f"Challenge.__init__: ({challenge_yml=}, {overrides=}")
         if overrides is None:
             overrides = {}
@@ -287,19 +304,95 @@ class Challenge(dict):
         # Challenge id is unknown before loading the remote challenge
         self.challenge_id = None
 
+        # (id, name) of the remote challenge this challenge was last installed or synced as, if known
+        self.known_remote: tuple[int, str] | None = None
+
+        # Store used to cache digests of local files, and whether cached digests should be ignored
+        self.file_digest_store: Store | None = None
+        self.rehash = False
+
+        # Files already hashed again with rehash, whose fresh digests are cached in the file digest store
+        self._rehashed_paths: set[Path] = set()
+
+        # Whether next is set in a second pass, after the challenge it references has been created, see set_next()
+        self.defer_next = False
+        self.next_pending = False
+
         # API is not initialized before running an API-related operation, but should be reused later
         self._api = None
 
-        # Assign an image if the challenge provides one, otherwise this will be set to None
-        self.image = self._process_challenge_image(self.get("image"))
+        # Remote state is loaded lazily as well, unless a shared one is provided
+        self._remote = remote_state
+
+        # Image is resolved lazily, as resolving a local pre-built image requires docker, see resolve_images()
+        self._image: Image | None = None
+        self._image_resolved = False
 
     def __str__(self):
         return self["name"]
 
+    @property
+    def image(self) -> Image | None:
+        # Image defined by the challenge, or None if it does not provide one
+        if not self._image_resolved:
+            self.image = self._process_challenge_image(self.get("image"))
+
+        return self._image
+
+    @image.setter
+    def image(self, image: Image | None):
+        self._image = image
+        self._image_resolved = True
+
+    @classmethod
+    def resolve_images(cls, challenges: Sequence["Challenge"]) -> list["Challenge"]:
+        """
+        Resolves the images of many challenges at once, checking all local pre-built images with a single docker call.
+        Returns the challenges which define an image that could not be resolved.
+        """
+        pending: dict[str, list[Challenge]] = {}
+        for challenge in challenges:
+            if challenge._image_resolved or not challenge.get("image"):
+                continue
+
+            image = challenge._get_defined_image(challenge["image"])
+            if image is not None:
+                challenge.image = image
+            else:
+                pending.setdefault(challenge["image"], []).append(challenge)
+
+        local_images = get_local_images(list(pending.keys()))
+
+        unresolved = []
+        for challenge_image, pending_challenges in pending.items():
+            for challenge in pending_challenges:
+                if challenge_image in local_images:
+                    challenge.image = Image(challenge_image)
+                else:
+                    unresolved.append(challenge)
+
+        return unresolved
+
     def _process_challenge_image(self, challenge_image: str | None) -> Image | None:
         if not challenge_image:
             return None
 
+        image = self._get_defined_image(challenge_image)
+        if image is not None:
+            return image
+
+        # Check if it's a local pre-built image
+        if challenge_image in get_local_images([challenge_image]):
+            return Image(challenge_image)
+
+        # If the image is set, but we fail to determine whether it's local / remote - raise an exception
+        raise InvalidChallengeFile(
+            f"Challenge file at {self.challenge_file_path} defines an image, but it couldn't be resolved"
+        )
+
+    def _get_defined_image(self, challenge_image: str) -> Image | None:
+        # Resolve images which can be determined without docker, returns None for (possibly) local pre-built images
+
         # Check if challenge_image is explicitly marked with registry:// prefix
         if challenge_image.startswith("registry://"):
             challenge_image = challenge_image.replace("registry://", "")
@@ -328,37 +421,47 @@ class Challenge(dict):
         if (self.challenge_directory / challenge_image / "Dockerfile").exists():
             return Image(slugify(self["name"]), self.challenge_directory / self["image"])
 
-        # Check if it's a local pre-built image
-        if (
-            subprocess.call(
-                ["docker", "inspect", challenge_image],
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL,
-            )
-            == 0
-        ):
-            return Image(challenge_image)
-
-        # If the image is set, but we fail to determine whether it's local / remote - raise an exception
-        raise InvalidChallengeFile(
-            f"Challenge file at {self.challenge_file_path} defines an image, but it couldn't be resolved"
-        )
+        return None
 
     def _load_challenge_id(self):
-        remote_challenges = self.load_installed_challenges()
-        if not remote_challenges:
+        if not self.remote.challenges:
             raise RemoteChallengeNotFound("Could not load any remote challenges")
 
         # get challenge id from the remote
-        for inspected_challenge in remote_challenges:
-            if inspected_challenge["name"] == self["name"]:
-                self.challenge_id = inspected_challenge["id"]
-                break
+        remote_challenge = self.remote.get_challenge_by_name(self["name"])
 
         # return if we failed to determine the challenge id (failed to find the challenge)
-        if self.challenge_id is None:
+        if remote_challenge is None:
             raise RemoteChallengeNotFound(f"Could not load remote challenge with name '{self['name']}'")
 
+        self.challenge_id = remote_challenge["id"]
+
+    def load_known_remote_challenge(self) -> dict | None:
+        if self.known_remote is None:
+            return None
+
+        # Validate the known remote challenge with a single request instead of listing all challenges.
+        # The remote name has to be the one it was last synced with, otherwise the id may belong to another challenge
+        challenge_id, remote_name = self.known_remote
+        r = self.api.get(f"/api/v1/challenges/{challenge_id}?view=admin")
+        remote_challenge = r.json().get("data", None) if r.ok else None
+
+        if not remote_challenge or remote_challenge.get("name") != remote_name:
+            log.debug(f"Known remote challenge (id={challenge_id}, name={remote_name}) is no longer valid")
+            self.known_remote = None
+            return None
+
+        self.challenge_id = challenge_id
+        return remote_challenge
+
+    def _load_remote_challenge(self) -> dict:
+        remote_challenge = self.load_known_remote_challenge()
+        if remote_challenge is not None:
+            return remote_challenge
+
+        self._load_challenge_id()
+        return self.load_installed_challenge(self.challenge_id, api=self.api)
+
     def _validate_files(self):
         files = self.get("files") or []
         for challenge_file in files:
@@ -406,31 +509,19 @@ class Challenge(dict):
 
         return challenge_payload
 
-    def _delete_existing_flags(self):
-        remote_flags = self.api.get("/api/v1/flags").json()["data"]
-        for flag in remote_flags:
-            if flag["challenge_id"] == self.challenge_id:
-                r = self.api.delete(f"/api/v1/flags/{flag['id']}")
-                r.raise_for_status()
+    def _get_flag_payload(self, flag: str | dict) -> dict:
+        if type(flag) == str:
+            return {
+                "content": flag,
+                "type": "static",
+                "challenge_id": self.challenge_id,
+            }
+
+        return {**flag, "challenge_id": self.challenge_id}
 
     def _create_flags(self):
         for flag in self["flags"]:
-            if type(flag) == str:
-                flag_payload = {
-                    "content": flag,
-                    "type": "static",
-                    "challenge_id": self.challenge_id,
-                }
-            else:
-                flag_payload = {**flag, "challenge_id": self.challenge_id}
-
-            r = self.api.post("/api/v1/flags", json=flag_payload)
-            r.raise_for_status()
-
-    def _delete_existing_topics(self):
-        remote_topics = self.api.get(f"/api/v1/challenges/{self.challenge_id}/topics").json()["data"]
-        for topic in remote_topics:
-            r = self.api.delete(f"/api/v1/topics?type=challenge&target_id={topic['id']}")
+            r = self.api.post("/api/v1/flags", json=self._get_flag_payload(flag))
             r.raise_for_status()
 
     def _create_topics(self):
@@ -445,13 +536,6 @@ class Challenge(dict):
             )
             r.raise_for_status()
 
-    def _delete_existing_tags(self):
-        remote_tags = self.api.get("/api/v1/tags").json()["data"]
-        for tag in remote_tags:
-            if tag["challenge_id"] == self.challenge_id:
-                r = self.api.delete(f"/api/v1/tags/{tag['id']}")
-                r.raise_for_status()
-
     def _create_tags(self):
         for tag in self["tags"]:
             r = self.api.post(
@@ -461,12 +545,12 @@ class Challenge(dict):
             r.raise_for_status()
 
     def _delete_file(self, remote_location: str):
-        remote_files = self.api.get("/api/v1/files?type=challenge").json()["data"]
+        remote_file = self.remote.get_file(remote_location)
 
-        for remote_file in remote_files:
-            if remote_file["location"] == remote_location:
-                r = self.api.delete(f"/api/v1/files/{remote_file['id']}")
-                r.raise_for_status()
+        if remote_file is not None:
+            r = self.api.delete(f"/api/v1/files/{remote_file['id']}")
+            r.raise_for_status()
+            self.remote.remove_file(remote_location)
 
     def _create_file(self, local_path: Path):
         new_file = (local_path.name, open(local_path, mode="rb"))
@@ -495,13 +579,6 @@ class Challenge(dict):
         for file_payload in new_files:
             file_payload[1][1].close()
 
-    def _delete_existing_hints(self):
-        remote_hints = self.api.get("/api/v1/hints").json()["data"]
-        for hint in remote_hints:
-            if hint["challenge_id"] == self.challenge_id:
-                r = self.api.delete(f"/api/v1/hints/{hint['id']}")
-                r.raise_for_status()
-
     def _create_hints(self):
         key_to_id = {}
         target_hints = {}
@@ -571,6 +648,164 @@ class Challenge(dict):
             )
             r.raise_for_status()
 
+    def _sync_flags(self):
+        local_flags = [self._get_flag_payload(flag) for flag in self.get("flags") or []]
+        remote_flags = self.remote.get_resources("flags", self.challenge_id)
+
+        def flag_key(flag: dict) -> tuple:
+            return flag.get("type", "static"), flag["content"], flag.get("data") or ""
+
+        plan = reconcile(local_flags, remote_flags, key=flag_key)
+
+        for idx, remote_flag in plan.updated:
+            r = self.api.patch(f"/api/v1/flags/{remote_flag['id']}", json=local_flags[idx])
+            r.raise_for_status()
+
+        # Create before deleting, so that the challenge is never left without a valid flag
+        for idx in plan.created:
+            r = self.api.post("/api/v1/flags", json=local_flags[idx])
+            r.raise_for_status()
+
+        for remote_flag in plan.deleted:
+            r = self.api.delete(f"/api/v1/flags/{remote_flag['id']}")
+            r.raise_for_status()
+            self.remote.remove_resource("flags", self.challenge_id, remote_flag["id"])
+
+    def _sync_topics(self):
+        local_topics = self.get("topics") or []
+        remote_topics = self.api.get(f"/api/v1/challenges/{self.challenge_id}/topics").json()["data"]
+
+        # Topics are shared between challenges, and can only be attached or detached - not updated
+        plan = reconcile(
+            local_topics, remote_topics, key=lambda t: t, remote_key=lambda t: t["value"], allow_updates=False
+        )
+
+        for idx in plan.created:
+            r = self.api.post(
+                "/api/v1/topics",
+                json={
+                    "value": local_topics[idx],
+                    "type": "challenge",
+                    "challenge_id": self.challenge_id,
+                },
+            )
+            r.raise_for_status()
+
+        for remote_topic in plan.deleted:
+            r = self.api.delete(f"/api/v1/topics?type=challenge&target_id={remote_topic['id']}")
+            r.raise_for_status()
+
+    def _sync_tags(self):
+        local_tags = self.get("tags") or []
+        remote_tags = self.remote.get_resources("tags", self.challenge_id)
+
+        plan = reconcile(local_tags, remote_tags, key=lambda t: t, remote_key=lambda t: t["value"])
+
+        for idx, remote_tag in plan.updated:
+            r = self.api.patch(f"/api/v1/tags/{remote_tag['id']}", json={"value": local_tags[idx]})
+            r.raise_for_status()
+
+        for idx in plan.created:
+            r = self.api.post(
+                "/api/v1/tags",
+                json={"challenge_id": self.challenge_id, "value": local_tags[idx]},
+            )
+            r.raise_for_status()
+
+        for remote_tag in plan.deleted:
+            r = self.api.delete(f"/api/v1/tags/{remote_tag['id']}")
+            r.raise_for_status()
+            self.remote.remove_resource("tags", self.challenge_id, remote_tag["id"])
+
+    def _sync_hints(self):
+        local_hints = []
+        for hint in self.get("hints") or []:
+            if type(hint) == str:
+                local_hints.append({"content": hint, "title": "", "cost": 0, "key": None, "requirements": []})
+            else:
+                local_hints.append(
+                    {
+                        "content": hint["content"],
+                        "title": hint.get("title", ""),
+                        "cost": hint.get("cost", 0),
+                        "key": hint.get("key"),
+                        "requirements": hint.get("requirements") or [],
+                    }
+                )
+
+        # The global hints listing does not include hint content - use the challenge endpoint instead
+        r = self.api.get(f"/api/v1/challenges/{self.challenge_id}/hints")
+        r.raise_for_status()
+        remote_hints = r.json()["data"] or []
+
+        def hint_key(hint: dict) -> tuple:
+            return hint.get("title") or "", hint.get("content") or "", hint.get("cost") or 0
+
+        plan = reconcile(local_hints, remote_hints, key=hint_key)
+
+        hint_ids = {}
+        remote_prerequisites = {}
+        for idx, remote_hint in plan.unchanged + plan.updated:
+            hint_ids[idx] = remote_hint["id"]
+            remote_prerequisites[idx] = (remote_hint.get("requirements") or {}).get("prerequisites") or []
+
+        # Create new hints; hints with requirements get blank content initially
+        # to prevent content from being exposed before prerequisites are enforced
+        for idx in plan.created:
+            hint = local_hints[idx]
+            r = self.api.post(
+                "/api/v1/hints",
+                json={
+                    "content": "" if hint["requirements"] else hint["content"],
+                    "title": hint["title"],
+                    "cost": hint["cost"],
+                    "challenge_id": self.challenge_id,
+                },
+            )
+            r.raise_for_status()
+            hint_ids[idx] = r.json()["data"]["id"]
+            remote_prerequisites[idx] = []
+
+        key_to_id = {hint["key"]: hint_ids[idx] for idx, hint in enumerate(local_hints) if hint["key"] is not None}
+
+        # Update requirements only where they differ from the remote state
+        for idx, hint in enumerate(local_hints):
+            prerequisite_ids = []
+            for req_key in hint["requirements"]:
+                if req_key in key_to_id:
+                    prerequisite_ids.append(key_to_id[req_key])
+                else:
+                    click.secho(
+                        f'Hint key "{req_key}" not found. Skipping invalid hint requirement.',
+                        fg="yellow",
+                    )
+
+            if sorted(prerequisite_ids) != sorted(remote_prerequisites[idx]):
+                r = self.api.patch(
+                    f"/api/v1/hints/{hint_ids[idx]}",
+                    json={"requirements": {"prerequisites": prerequisite_ids}},
+                )
+                r.raise_for_status()
+
+        # Now safe to set the real content
+        for idx, remote_hint in plan.updated:
+            hint = local_hints[idx]
+            r = self.api.patch(
+                f"/api/v1/hints/{remote_hint['id']}",
+                json={"content": hint["content"], "title": hint["title"], "cost": hint["cost"]},
+            )
+            r.raise_for_status()
+
+        for idx in plan.created:
+            if local_hints[idx]["requirements"]:
+                r = self.api.patch(f"/api/v1/hints/{hint_ids[idx]}", json={"content": local_hints[idx]["content"]})
+                r.raise_for_status()
+
+        for remote_hint in plan.deleted:
+            r = self.api.delete(f"/api/v1/hints/{remote_hint['id']}")
+            r.raise_for_status()
+            self.remote.remove_resource("hints", self.challenge_id, remote_hint["id"])
+
     def _parse_solution_definition(self) -> tuple[str, str] | None:
         solution = self.get("solution", None)
         if not solution:
@@ -615,19 +850,16 @@ class Challenge(dict):
         return solution_path, solution_state
 
     def _delete_existing_solution(self):
-        remote_solutions = self.api.get("/api/v1/solutions").json()["data"]
-        for solution in remote_solutions:
-            if solution["challenge_id"] == self.challenge_id:
-                r = self.api.delete(f"/api/v1/solutions/{solution['id']}")
-                r.raise_for_status()
+        for solution in self.remote.get_resources("solutions", self.challenge_id):
+            r = self.api.delete(f"/api/v1/solutions/{solution['id']}")
+            r.raise_for_status()
+            self.remote.remove_resource("solutions", self.challenge_id, solution["id"])
 
     def _get_existing_solution_id(self) -> int | None:
-        r = self.api.get("/api/v1/solutions")
-        r.raise_for_status()
-        remote_solutions = r.json().get("data") or []
-        for solution in remote_solutions:
-            if solution["challenge_id"] == self.challenge_id:
-                return solution["id"]
+        remote_solutions = self.remote.get_resources("solutions", self.challenge_id)
+        if remote_solutions:
+            return remote_solutions[0]["id"]
+
         return None
 
     def _delete_solution_files(self, content: str) -> None:
@@ -635,16 +867,29 @@ class Challenge(dict):
         if not locations:
             return
 
-        remote_files = self.api.get("/api/v1/files?type=solution").json()["data"]
-        file_ids_by_location = {f["location"]: f["id"] for f in remote_files}
-
         # A writeup can reference the same file more than once - deduplicate so
         # that each file is only deleted once (a second DELETE would 404)
         for location in dict.fromkeys(locations):
-            file_id = file_ids_by_location.get(location)
-            if file_id is not None:
-                r = self.api.delete(f"/api/v1/files/{file_id}")
+            remote_file = self.remote.get_file(location, file_type="solution")
+            if remote_file is not None:
+                r = self.api.delete(f"/api/v1/files/{remote_file['id']}")
                 r.raise_for_status()
+                self.remote.remove_file(location, file_type="solution")
+
+    @staticmethod
+    def _find_solution_assets(content: str) -> tuple[list[tuple[str, str, str]], list[tuple[str, str]]]:
+        # Find all images in the content (markdown format; ignore html format)
+        # Markdown format: ![alt text](image_url)
+        # Returns tuples: (full_match, alt_text, image_path)
+        # content.replace() rewrites every occurrence, so uploading once per
+        # regex match would orphan a file for each repeated reference. Deduplicate.
+        markdown_images = list(dict.fromkeys(re.findall(r"(!\[([^\]]*)\]\(([^\)]+)\))", content)))
+
+        # Find all snippet includes (MkDocs style: --8<-- "filename")
+        # Returns tuples: (full_match, filename)
+        snippet_includes = re.findall(r'(--8<--\s+["\']([^"\']+)["\'])', content)
+
+        return markdown_images, snippet_includes
 
     def _create_solution(self):
         resolved_solution = self._resolve_solution_path()
@@ -674,17 +919,7 @@ class Challenge(dict):
 
         with solution_path.open("r") as solution_file:
             content = solution_file.read()
-
-            # Find all images in the content (markdown format; ignore html format)
-            # Markdown format: ![alt text](image_url)
-            # Returns tuples: (full_match, alt_text, image_path)
-            # content.replace() below rewrites every occurrence, so uploading once per
-            # regex match would orphan a file for each repeated reference. Deduplicate.
-            markdown_images = list(dict.fromkeys(re.findall(r"(!\[([^\]]*)\]\(([^\)]+)\))", content)))
-
-            # Find all snippet includes (MkDocs style: --8<-- "filename")
-            # Returns tuples: (full_match, filename)
-            snippet_includes = re.findall(r'(--8<--\s+["\']([^"\']+)["\'])', content)
+            markdown_images, snippet_includes = self._find_solution_assets(content)
 
             for mdx, alt, path in markdown_images:
                 local_path = solution_path.parent / path
@@ -716,8 +951,23 @@ class Challenge(dict):
             r = self.api.patch(f"/api/v1/solutions/{solution_id}", json=solution_payload_patch)
             r.raise_for_status()
 
+    def get_dependency_names(self) -> set[str]:
+        # Names of challenges which have to exist remotely, before requirements can be set.
+        # next is not a dependency - challenges commonly point to the next one, which requires them in turn
+        requirements = self.get("requirements") or []
+        if type(requirements) == dict:
+            requirements = requirements.get("prerequisites") or []
+
+        dependency_names = {r for r in requirements if type(r) == str}
+        dependency_names.discard(self.get("name"))
+        return dependency_names
+
+    def set_next(self) -> None:
+        # Second pass of create / sync with defer_next, once all challenges of the run exist
+        self._set_next(self.get("next", None))
+        self.next_pending = False
+
     def _set_required_challenges(self):
-        remote_challenges = self.load_installed_challenges()
         required_challenges = []
         anonymize = False
         if type(self["requirements"]) == dict:
@@ -730,13 +980,10 @@ class Challenge(dict):
             if type(required_challenge) == str:
                 # requirement by name
                 # find the challenge id from installed challenges
-                found = False
-                for remote_challenge in remote_challenges:
-                    if remote_challenge["name"] == required_challenge:
-                        required_challenges.append(remote_challenge["id"])
-                        found = True
-                        break
-                if found is False:
+                remote_challenge = self.remote.get_challenge_by_name(required_challenge)
+                if remote_challenge is not None:
+                    required_challenges.append(remote_challenge["id"])
+                else:
                     click.secho(
                         f'Challenge id cannot be found. Skipping invalid requirement name "{required_challenge}".',
                         fg="yellow",
@@ -770,12 +1017,10 @@ class Challenge(dict):
         if type(_next) == str:
             # nid by name
             # find the challenge id from installed challenges
-            remote_challenges = self.load_installed_challenges()
-            for remote_challenge in remote_challenges:
-                if remote_challenge["name"] == _next:
-                    _next = remote_challenge["id"]
-                    break
-            if type(_next) == str:
+            remote_challenge = self.remote.get_challenge_by_name(_next)
+            if remote_challenge is not None:
+                _next = remote_challenge["id"]
+            else:
                 click.secho(
                     "Challenge cannot find next challenge. Maybe it is invalid name or id. It will be cleared.",
                     fg="yellow",
@@ -784,7 +1029,7 @@ class Challenge(dict):
         elif type(_next) == int and _next > 0:
             # nid by challenge id
             # trust it and use it directly
-            _next = remote_challenge["id"]
+            pass
         else:
             _next = None
 
@@ -837,16 +1082,13 @@ class Challenge(dict):
 
     # Compare challenge requirements, will resolve all IDs to names
     def _compare_challenge_requirements(self, r1: list[str | int], r2: list[str | int]) -> bool:
-        remote_challenges = self.load_installed_challenges()
-
         def normalize_requirements(requirements):
             normalized = []
             for r in requirements:
                 if type(r) == int:
-                    for remote_challenge in remote_challenges:
-                        if remote_challenge["id"] == r:
-                            normalized.append(remote_challenge["name"])
-                            break
+                    remote_challenge = self.remote.get_challenge(r)
+                    if remote_challenge is not None:
+                        normalized.append(remote_challenge["name"])
                 else:
                     normalized.append(r)
 
@@ -864,8 +1106,8 @@ class Challenge(dict):
             normalized = None
             if type(r) == int:
                 if r > 0:
-                    remote_challenge = self.load_installed_challenge(r)
-                    if remote_challenge["id"] == r:
+                    remote_challenge = self.remote.get_challenge(r)
+                    if remote_challenge is not None:
                         normalized = remote_challenge["name"]
             else:
                 normalized = r
@@ -996,10 +1238,9 @@ class Challenge(dict):
         challenge["requirements"] = {"prerequisites": [], "anonymize": False}
         if len(requirements) > 0:
             # Prefer challenge names over IDs
-            r2 = self.api.get("/api/v1/challenges?view=admin")
-            r2.raise_for_status()
-            challenges = r2.json()["data"]
-            challenge["requirements"]["prerequisites"] = [c["name"] for c in challenges if c["id"] in requirements]
+            challenge["requirements"]["prerequisites"] = [
+                c["name"] for c in self.remote.challenges if c["id"] in requirements
+            ]
 
         # Add anonymize flag
         challenge["requirements"]["anonymize"] = (r.json().get("data") or {}).get("anonymize", False)
@@ -1008,9 +1249,8 @@ class Challenge(dict):
         nid = challenge_data.get("next_id")
         if nid:
             # Prefer challenge names over IDs
-            r = self.api.get(f"/api/v1/challenges/{nid}")
-            r.raise_for_status()
-            challenge["next"] = (r.json().get("data") or {}).get("name", None)
+            next_challenge = self.remote.get_challenge(nid)
+            challenge["next"] = next_challenge["name"] if next_challenge else None
         else:
             challenge["next"] = None
 
@@ -1040,9 +1280,71 @@ class Challenge(dict):
 
     # Create a dictionary of sha1sums in { location: sha1sum } format
     def _get_files_sha1sums(self) -> dict[str, str]:
-        r = self.api.get("/api/v1/files?type=challenge")
-        r.raise_for_status()
-        return {f["location"]: f.get("sha1sum", None) for f in r.json()["data"]}
+        return {f["location"]: f.get("sha1sum", None) for f in self.remote.get_files()}
+
+    def _hash_local_file(self, path: Path, algo: str = "sha1") -> str:
+        return self._hash_paths([path], algos=(algo,))[0][algo]
+
+    def _hash_local_files(self, file_paths: list[str], algo: str = "sha1") -> list[str]:
+        local_paths = [self.challenge_directory / file_path for file_path in file_paths]
+        return [digests[algo] for digests in self._hash_paths(local_paths, algos=(algo,))]
+
+    def _hash_paths(self, paths: list[Path], algos: tuple[str, ...]) -> list[dict[str, str]]:
+        # With rehash, every file is only hashed again once per run (e.g. by get_fingerprint),
+        # later lookups reuse the digests which were just cached in the store
+        rehash_paths = []
+        if self.rehash and self.file_digest_store is not None:
+            rehash_paths = list(dict.fromkeys(path for path in paths if path not in self._rehashed_paths))
+
+        cached_paths = [path for path in dict.fromkeys(paths) if path not in rehash_paths]
+
+        digests = {}
+        for batch, rehash in ((rehash_paths, True), (cached_paths, False)):
+            if batch:
+                file_digests = hash_paths(batch, algos=algos, store=self.file_digest_store, rehash=rehash)
+                digests.update(zip(batch, file_digests, strict=True))
+
+        self._rehashed_paths.update(rehash_paths)
+        return [digests[path] for path in paths]
+
+    # Create a digest of everything sync and create send to CTFd:
+    # the challenge definition, the ignored attributes and the contents of challenge and solution files,
+    # including the images and snippets referenced by the solution
+    def get_fingerprint(self, ignore: tuple[str] = ()) -> str:
+        h = hashlib.sha256()
+        definition = json.dumps({"challenge": self, "ignore": sorted(ignore)}, sort_keys=True, default=str)
+        h.update(definition.encode())
+
+        file_paths = [f for f in self.get("files") or [] if type(f) == str]
+
+        solution = self.get("solution")
+        solution_path = solution.get("path") if type(solution) == dict else solution
+        if type(solution_path) == str:
+            file_paths.append(solution_path)
+
+            # Images and snippets referenced by the solution are sent to CTFd with it
+            local_solution_path = self.challenge_directory / solution_path
+            if local_solution_path.is_file():
+                markdown_images, snippet_includes = self._find_solution_assets(local_solution_path.read_text())
+                asset_paths = [path for _, _, path in markdown_images] + [path for _, path in snippet_includes]
+                file_paths.extend(str(Path(solution_path).parent / path) for path in dict.fromkeys(asset_paths))
+
+        # Hash all existing files in parallel. sha1 is computed in the same pass and cached,
+        # as sync and verify compare it with the remote files
+        local_paths = [self.challenge_directory / file_path for file_path in file_paths]
+        existing_paths = [local_path for local_path in local_paths if local_path.is_file()]
+        digests = dict(zip(existing_paths, self._hash_paths(existing_paths, algos=("sha256", "sha1")), strict=True))
+
+        for file_path, local_path in zip(file_paths, local_paths, strict=True):
+            h.update(file_path.encode())
+
+            if local_path not in digests:
+                h.update(b"\0missing")
+                continue
+
+            h.update(digests[local_path]["sha256"].encode())
+
+        return h.hexdigest()
 
     def sync(self, ignore: tuple[str] = ()) -> None:
         challenge = self
@@ -1062,8 +1364,7 @@ class Challenge(dict):
 
         challenge_payload = self._get_initial_challenge_payload(ignore=ignore)
 
-        self._load_challenge_id()
-        remote_challenge = self.load_installed_challenge(self.challenge_id)
+        remote_challenge = self._load_remote_challenge()
 
         # if value, category, type or description are ignored, revert them to the remote state in the initial payload
         reset_properties_if_ignored = [
@@ -1085,21 +1386,15 @@ class Challenge(dict):
 
         # Update flags
         if "flags" not in ignore:
-            self._delete_existing_flags()
-            if challenge.get("flags"):
-                self._create_flags()
+            self._sync_flags()
 
         # Update topics
         if "topics" not in ignore:
-            self._delete_existing_topics()
-            if challenge.get("topics"):
-                self._create_topics()
+            self._sync_topics()
 
         # Update tags
         if "tags" not in ignore:
-            self._delete_existing_tags()
-            if challenge.get("tags"):
-                self._create_tags()
+            self._sync_tags()
 
         # Create / Upload files
         if "files" not in ignore:
@@ -1118,6 +1413,16 @@ class Challenge(dict):
             # Only check for file changes if there are files to upload
             if local_files:
                 sha1sums = self._get_files_sha1sums()
+
+                # Hash all local files which can be compared with the remote ones in parallel
+                comparable_files = [
+                    local_file_name
+                    for local_file_name in local_files
+                    if local_file_name in remote_files and sha1sums[remote_files[local_file_name]["location"]]
+                ]
+                local_sha1sums = self._hash_local_files([local_files[name] for name in comparable_files])
+                local_sha1sums = dict(zip(comparable_files, local_sha1sums, strict=True))
+
                 for local_file_name in local_files:
                     # Creating a new file
                     if local_file_name not in remote_files:
@@ -1128,11 +1433,7 @@ class Challenge(dict):
                     # sha1sum is present in CTFd 3.7+, use it instead of always re-uploading the file if possible
                     remote_file_sha1sum = sha1sums[remote_files[local_file_name]["location"]]
                     if remote_file_sha1sum is not None:
-                        with open(
-                            self.challenge_directory / local_files[local_file_name],
-                            "rb",
-                        ) as lf:
-                            local_file_sha1sum = hash_file(lf)
+                        local_file_sha1sum = local_sha1sums[local_file_name]
 
                         # Allow users to specify sha1sum in ignore to force reuploads
                         if "sha1sum" not in ignore:
@@ -1145,9 +1446,7 @@ class Challenge(dict):
 
         # Update hints
         if "hints" not in ignore:
-            self._delete_existing_hints()
-            if challenge.get("hints"):
-                self._create_hints()
+            self._sync_hints()
 
         # Update requirements
         if challenge.get("requirements") and "requirements" not in ignore:
@@ -1156,7 +1455,10 @@ class Challenge(dict):
         # Set next
         _next = challenge.get("next", None)
         if "next" not in ignore:
-            self._set_next(_next)
+            if self.defer_next:
+                self.next_pending = True
+            else:
+                self._set_next(_next)
 
         # Update module
         # Only touch the module assignment if the key is present in challenge.yml -
@@ -1226,6 +1528,9 @@ class Challenge(dict):
 
         self.challenge_id = r.json()["data"]["id"]
 
+        # Make the new challenge known to other challenges sharing the remote state (e.g. for requirements)
+        self.remote.add_challenge(r.json()["data"])
+
         # Create flags
         if challenge.get("flags") and "flags" not in ignore:
             self._create_flags()
@@ -1253,7 +1558,10 @@ class Challenge(dict):
         # Add next
         _next = challenge.get("next", None)
         if "next" not in ignore:
-            self._set_next(_next)
+            if self.defer_next:
+                self.next_pending = True
+            else:
+                self._set_next(_next)
 
         # Assign module
         if challenge.get("module") and "module" not in ignore:
@@ -1269,9 +1577,19 @@ class Challenge(dict):
             r = self.api.patch(f"/api/v1/challenges/{self.challenge_id}", json={"state": "visible"})
             r.raise_for_status()
 
-    def lint(self, skip_hadolint=False, flag_format="flag{") -> bool:
+    def lint(
+        self,
+        skip_hadolint=False,
+        flag_format: str | Sequence[str] = "flag{",
+        flag_regex: str | Sequence[str] = (),
+        utf16: bool = False,
+        hadolint: Hadolint | None = None,
+    ) -> bool:
         challenge = self
 
+        flag_formats = (flag_format,) if isinstance(flag_format, str) else tuple(flag_format)
+        flag_regexes = (flag_regex,) if isinstance(flag_regex, str) else tuple(flag_regex)
+
         issues = {"fields": [], "dockerfile": [], "hadolint": [], "files": []}
 
         # Check if required fields are present
@@ -1318,14 +1636,12 @@ class Challenge(dict):
 
                     if not skip_hadolint:
                         # Check Dockerfile with hadolint
-                        hadolint = subprocess.run(
-                            ["docker", "run", "--rm", "-i", "hadolint/hadolint"],
-                            capture_output=True,
-                            input=dockerfile_source.encode(),
-                        )
+                        if hadolint is None:
+                            hadolint = Hadolint()
 
-                        if hadolint.returncode != 0:
-                            issues["hadolint"].append(hadolint.stdout.decode())
+                        hadolint_output = hadolint.check([dockerfile_path])[dockerfile_path]
+                        if hadolint_output is not None:
+                            issues["hadolint"].append(hadolint_output)
 
                     else:
                         click.secho("Skipping Hadolint", fg="yellow")
@@ -1375,10 +1691,9 @@ class Challenge(dict):
                 # The check for files present is above; this is only to look for flags in files that we do have
                 continue
 
-            for s in strings(challenge_file_path):
-                if flag_format in s:
-                    s = s.strip()
-                    issues["files"].append(f"Potential flag found in distributed file '{challenge_file}':\n {s}")
+            for s in find_flags(challenge_file_path, flag_formats, flag_regexes, utf16=utf16):
+                s = s.strip()
+                issues["files"].append(f"Potential flag found in distributed file '{challenge_file}':\n {s}")
 
         if any(messages for messages in issues.values() if len(messages) > 0):
             raise LintException(issues=issues)
@@ -1386,8 +1701,7 @@ class Challenge(dict):
         return True
 
     def mirror(self, files_directory_name: str = "dist", ignore: tuple[str] = ()) -> None:
-        self._load_challenge_id()
-        remote_challenge = self.load_installed_challenge(self.challenge_id)
+        remote_challenge = self._load_remote_challenge()
         challenge = self._normalize_challenge(remote_challenge)
 
         remote_challenge["files"] = remote_challenge.get("files") or []
@@ -1432,9 +1746,8 @@ class Challenge(dict):
         self.save()
 
     def verify(self, ignore: tuple[str] = ()) -> bool:
-        self._load_challenge_id()
         challenge = self
-        remote_challenge = self.load_installed_challenge(self.challenge_id)
+        remote_challenge = self._load_remote_challenge()
         normalized_challenge = self._normalize_challenge(remote_challenge)
 
         remote_challenge["files"] = remote_challenge.get("files") or []
@@ -1523,8 +1836,7 @@ class Challenge(dict):
                 # sha1sum is present in CTFd 3.7+, use it instead of downloading the file if possible
                 remote_file_sha1sum = sha1sums[remote_files[remote_file_name]["location"]]
                 if remote_file_sha1sum is not None:
-                    with open(self.challenge_directory / local_files[remote_file_name], "rb") as lf:
-                        local_file_sha1sum = hash_file(lf)
+                    local_file_sha1sum = self._hash_local_file(self.challenge_directory / local_files[remote_file_name])
 
                     if local_file_sha1sum != remote_file_sha1sum:
                         click.secho(
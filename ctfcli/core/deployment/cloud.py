@@ -9,15 +9,19 @@ from slugify import slugify
 from ctfcli.core.api import API
 from ctfcli.core.config import Config
 from ctfcli.core.deployment.base import DeploymentHandler, DeploymentResult
+from ctfcli.utils.registry import registry_logins
 
 log = logging.getLogger("ctfcli.core.deployment.cloud")
 
 
 class CloudDeploymentHandler(DeploymentHandler):
+    # Registries are logged in to once, by all deployments
+    logins = registry_logins
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
-        self.api = API()
+        self.api = API.shared()
         self.config = Config()
 
         # Do not fail here if challenge does not provide an image
@@ -32,23 +36,21 @@ class CloudDeploymentHandler(DeploymentHandler):
             return DeploymentResult(False)
 
         # Check whether instance supports cloud deployments
-        check = self.api.get("/api/v1/images")
-        if not check.ok:
+        if self._get_listing("/api/v1/images") is None:
             click.secho("Target instance does not support cloud deployments", fg="red")
             return DeploymentResult(False)
 
         # Get or create Image in CTFd
         image_data = self._get_or_create_image()
 
-        # Build or Pull / Update the configured image
-        if self.challenge.image.built:
+        # Pull pre-built images, and build the other ones unless they have been built already
+        if self.challenge.image.build_path is None:
             if not self.challenge.image.pull():
                 click.secho("Could not pull the image. Please check docker output above.", fg="red")
                 return DeploymentResult(False)
-        else:
-            if not self.challenge.image.build():
-                click.secho("Could not build the image. Please check docker output above.", fg="red")
-                return DeploymentResult(False)
+        elif not self.challenge.image.built and not self.challenge.image.build():
+            click.secho("Could not build the image. Please check docker output above.", fg="red")
+            return DeploymentResult(False)
 
         if skip_login:
             click.secho(
@@ -56,7 +58,13 @@ class CloudDeploymentHandler(DeploymentHandler):
                 fg="yellow",
             )
         else:
-            login_result = self._registry_login()
+            # Credentials which docker already stores for a user of this instance are used as they are
+            hostname = urlparse(self.api.prefix_url).hostname
+            login_result = self.logins.login(
+                "registry.ctfd.io",
+                self._registry_login,
+                accepts_username=lambda username: bool(hostname) and username.endswith(f"@{hostname}"),
+            )
 
             if not login_result:
                 click.secho(
@@ -96,18 +104,27 @@ class CloudDeploymentHandler(DeploymentHandler):
 
         return DeploymentResult(True, connection_info=connection_info)
 
+    def _get_listing(self, path: str) -> list[dict] | None:
+        # Images and services are listed once per run, in the remote state shared by all deployed challenges
+        return self.challenge.remote.get_listing(path)
+
+    def _add_to_listing(self, path: str, data: dict) -> None:
+        self.challenge.remote.add_to_listing(path, data)
+
     def _get_or_create_image(self):
         # Check if image already exists
-        existing_images = self.api.get("/api/v1/images").json()["data"]
+        existing_images = self._get_listing("/api/v1/images") or []
         for image_data in existing_images:
             if image_data["location"].endswith(self.image_name):
                 return image_data
 
         # Create the image if it doesn't exist
-        return self.api.post("/api/v1/images", json={"name": self.image_name}).json()["data"]
+        image_data = self.api.post("/api/v1/images", json={"name": self.image_name}).json()["data"]
+        self._add_to_listing("/api/v1/images", image_data)
+        return image_data
 
     def _get_or_create_service(self, image_location: str):
-        existing_services = self.api.get("/api/v1/services").json()["data"]
+        existing_services = self._get_listing("/api/v1/services") or []
         for service_data in existing_services:
             if service_data["name"] == self.image_name:
                 # Update the existing service image information
@@ -119,27 +136,30 @@ class CloudDeploymentHandler(DeploymentHandler):
 
         # Create the service if it doesn't exist
         image_name_slug = slugify(self.image_name)
-        return self.api.post("/api/v1/services", json={"name": image_name_slug, "image": image_location}).json()["data"]
+        service_data = self.api.post(
+            "/api/v1/services", json={"name": image_name_slug, "image": image_location}
+        ).json()["data"]
+        self._add_to_listing("/api/v1/services", service_data)
+        return service_data
 
-    def _await_service_deployment(self, service_data, interval=10, timeout=180) -> dict | None:
+    def _await_service_deployment(self, service_data, interval=0.5, max_interval=10, timeout=180) -> dict | None:
+        # Poll with exponential backoff, so that services which are deployed quickly are not waited on for long
         service_id = service_data["id"]
 
-        base_timeout = timeout
-        i = 0
-        while service_data.get("hostname") is None and timeout > 0:
-            click.secho(
-                f"Awaiting service deployment [{i * interval}/{base_timeout}s]",
-                fg="yellow",
-            )
-            service_data = self.api.get(f"/api/v1/services/{service_id}").json()["data"]
+        # The deadline includes the time spent on requests, not only sleeping
+        deadline = time.monotonic() + timeout
+        while service_data.get("hostname") is None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                click.secho("Timeout awaiting challenge deployment", fg="red")
+                return None
 
-            i += 1
-            timeout -= interval
-            time.sleep(interval)
+            click.secho(f"Awaiting service deployment [{round(timeout - remaining, 1):g}/{timeout}s]", fg="yellow")
 
-        if timeout == 0:
-            click.secho("Timeout awaiting challenge deployment", fg="red")
-            return None
+            time.sleep(min(interval, remaining))
+            interval = min(interval * 2, max_interval)
+
+            service_data = self.api.get(f"/api/v1/services/{service_id}").json()["data"]
 
         return service_data
 
@@ -177,7 +197,12 @@ class CloudDeploymentHandler(DeploymentHandler):
         ]
 
         log.debug(f"call({docker_login_command}, stderr=subprocess.PIPE, input=docker_password)")
-        login_response = subprocess.check_output(docker_login_command, input=docker_password, stderr=subprocess.PIPE)
+        try:
+            login_response = subprocess.check_output(
+                docker_login_command, input=docker_password, stderr=subprocess.PIPE
+            )
+        except subprocess.CalledProcessError:
+            return False
 
         return b"Login Succeeded" in login_response
 
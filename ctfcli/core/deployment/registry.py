@@ -6,11 +6,15 @@ import click
 
 from ctfcli.core.config import Config
 from ctfcli.core.deployment.base import DeploymentHandler, DeploymentResult
+from ctfcli.utils.registry import registry_logins
 
 log = logging.getLogger("ctfcli.core.deployment.registry")
 
 
 class RegistryDeploymentHandler(DeploymentHandler):
+    # Registries are logged in to once, by all deployments
+    logins = registry_logins
+
     def deploy(self, skip_login=False, *args, **kwargs) -> DeploymentResult:
         config = Config()
 
@@ -47,24 +51,25 @@ class RegistryDeploymentHandler(DeploymentHandler):
                 click.secho("Config is missing credentials for the registry.", fg="red")
                 return DeploymentResult(False)
 
-            login_result = self._registry_login(
-                registry_username,
-                registry_password,
+            # Credentials which docker already stores for the configured user are used as they are
+            login_result = self.logins.login(
                 host_url.netloc,
+                lambda: self._registry_login(registry_username, registry_password, host_url.netloc),
+                accepts_username=lambda username: username == registry_username,
             )
 
             if not login_result:
                 click.secho("Could not log in to the registry. Please check your configured credentials.", fg="red")
                 return DeploymentResult(False)
 
-        if self.challenge.image.built:
+        # Pull pre-built images, and build the other ones unless they have been built already
+        if self.challenge.image.build_path is None:
             if not self.challenge.image.pull():
                 click.secho("Could not pull the image. Please check docker output above.", fg="red")
                 return DeploymentResult(False)
-        else:
-            if not self.challenge.image.build():
-                click.secho("Could not build the image. Please check docker output above.", fg="red")
-                return DeploymentResult(False)
+        elif not self.challenge.image.built and not self.challenge.image.build():
+            click.secho("Could not build the image. Please check docker output above.", fg="red")
+            return DeploymentResult(False)
 
         push_result = self.challenge.image.push(location)
         if not push_result:
@@ -94,10 +99,15 @@ class RegistryDeploymentHandler(DeploymentHandler):
 
         try:
             log.debug(
-                f"call({docker_login_command}, input=password, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)"
+                f"call({docker_login_command}, input=password, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, "
+                "check=True)"
             )
             subprocess.run(
-                docker_login_command, input=password.encode(), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+                docker_login_command,
+                input=password.encode(),
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                check=True,
             )
         except subprocess.CalledProcessError:
             return False
@@ -1,13 +1,46 @@
+import contextlib
+import hashlib
+import json
+import logging
+import re
+import shutil
 import subprocess
+import tarfile
+import tempfile
+import time
 from pathlib import Path
-from urllib.parse import urlparse
+from typing import IO
+from urllib.parse import ParseResult, urlparse
 
 import click
 
+from ctfcli.core.config import Config
 from ctfcli.core.deployment.base import DeploymentHandler, DeploymentResult
+from ctfcli.core.image import get_chain_ids
+from ctfcli.utils.ssh import ssh_connections
+
+log = logging.getLogger("ctfcli.core.deployment.ssh")
 
 
 class SSHDeploymentHandler(DeploymentHandler):
+    # Commands to compress streamed images with, in order of preference. docker load decompresses gzip and zstd itself
+    compressors = {
+        "gzip": [["pigz", "-c"], ["gzip", "-c"]],
+        "zstd": [["zstd", "-T0", "-q", "-c"]],
+    }
+
+    chunk_size = 1024 * 1024
+    progress_interval = 1.0
+
+    # Connections to the hosts, shared by all deployments
+    connections = ssh_connections
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        # Options passed to every ssh / scp command
+        self.ssh_options: list[str] = []
+
     def deploy(self, *args, **kwargs) -> DeploymentResult:
         if not self.challenge.get("image"):
             click.secho("Challenge does not define an image to deploy", fg="red")
@@ -19,45 +52,50 @@ class SSHDeploymentHandler(DeploymentHandler):
             )
             return DeploymentResult(False)
 
-        if self.challenge.image.built:
+        # Pull pre-built images, and build the other ones unless they have been built already
+        if self.challenge.image.build_path is None:
             if not self.challenge.image.pull():
                 click.secho("Could not pull the image. Please check docker output above.", fg="red")
                 return DeploymentResult(False)
-        else:
-            if not self.challenge.image.build():
-                click.secho("Could not build the image. Please check docker output above.", fg="red")
-                return DeploymentResult(False)
+        elif not self.challenge.image.built and not self.challenge.image.build():
+            click.secho("Could not build the image. Please check docker output above.", fg="red")
+            return DeploymentResult(False)
 
         image_name = self.challenge.image.name
         image_basename = self.challenge.image.basename
-        image_export = self.challenge.image.export()
-        if not image_export:
-            click.secho("Could not export the image. Please check docker output above.", fg="red")
-            return DeploymentResult(False)
-
-        image_export_path = Path(image_export)
-        host_url = urlparse(self.host)
-        target_path = host_url.path or "/tmp"  # noqa: S108
-        target_file = f"{target_path}/{image_export_path.name}"
 
         exposed_port = self.challenge.image.get_exposed_port()
         if not exposed_port:
             click.secho("Could not resolve a port to expose. Make sure your Dockerfile EXPOSE's a port.", fg="red")
             return DeploymentResult(False)
 
+        host_url = urlparse(self.host)
         target_hostname = host_url.netloc[host_url.netloc.find("@") + 1 :]
+
+        config = Config()
+        transfer = config["config"].get("ssh_transfer", "stream")
+        compression = config["config"].get("ssh_compression", "none")
+
+        # Reuse a single connection to the host for all commands, and all deployments to it
+        if config["config"].get("ssh_multiplex", "true").lower() not in ["false", "no", "off", "0"]:
+            self.ssh_options = self.connections.get_options(host_url.netloc)
+
+        if transfer == "copy":
+            if not self._copy_image(host_url):
+                return DeploymentResult(False)
+        elif transfer == "layers":
+            if not self._stream_image_layers(host_url.netloc, compression):
+                click.secho("Failed to transfer the image. Please check docker output above.", fg="red")
+                return DeploymentResult(False)
+        elif not self._stream_image(host_url.netloc, compression):
+            click.secho("Failed to transfer the image. Please check docker output above.", fg="red")
+            return DeploymentResult(False)
+
         try:
-            subprocess.run(["scp", image_export_path, f"{host_url.netloc}:{target_file}"])
-            subprocess.run(
-                [
-                    "ssh",
-                    host_url.netloc,
-                    f"docker load -i {target_file} && rm {target_file}",
-                ]
-            )
             subprocess.run(
                 [
                     "ssh",
+                    *self.ssh_options,
                     host_url.netloc,
                     f"docker stop {image_basename} 2>/dev/null; docker rm {image_basename} 2>/dev/null",
                 ]
@@ -65,6 +103,7 @@ class SSHDeploymentHandler(DeploymentHandler):
             subprocess.run(
                 [
                     "ssh",
+                    *self.ssh_options,
                     host_url.netloc,
                     f"docker run -d -p{exposed_port}:{exposed_port} --name {image_basename} "
                     f"--restart always {image_name}",
@@ -76,11 +115,215 @@ class SSHDeploymentHandler(DeploymentHandler):
             click.secho(str(e), fg="red")
             return DeploymentResult(False)
 
-        image_export_path.unlink()
-
         connection_info = self._get_connection_info(target_hostname, exposed_port)
         return DeploymentResult(True, target_hostname, exposed_port, connection_info)
 
+    def _copy_image(self, host_url: ParseResult) -> bool:
+        # Export the image to a local tarball, copy it to the host and load it there
+        image_export = self.challenge.image.export()
+        if not image_export:
+            click.secho("Could not export the image. Please check docker output above.", fg="red")
+            return False
+
+        image_export_path = Path(image_export)
+        target_path = host_url.path or "/tmp"  # noqa: S108
+        target_file = f"{target_path}/{image_export_path.name}"
+
+        try:
+            subprocess.run(["scp", *self.ssh_options, image_export_path, f"{host_url.netloc}:{target_file}"])
+            subprocess.run(
+                [
+                    "ssh",
+                    *self.ssh_options,
+                    host_url.netloc,
+                    f"docker load -i {target_file} && rm {target_file}",
+                ]
+            )
+        except subprocess.CalledProcessError as e:
+            click.secho("Failed to deploy image!", fg="red")
+            click.secho(str(e), fg="red")
+            return False
+        finally:
+            image_export_path.unlink(missing_ok=True)
+
+        return True
+
+    def _get_compress_command(self, compression: str) -> list[str] | None:
+        if compression == "none":
+            return None
+
+        if compression not in self.compressors:
+            click.secho(f"Unknown compression '{compression}', transferring the image uncompressed", fg="yellow")
+            return None
+
+        for command in self.compressors[compression]:
+            if shutil.which(command[0]):
+                return command
+
+        click.secho(f"{compression} is not installed, transferring the image uncompressed", fg="yellow")
+        return None
+
+    def _stream_image(self, netloc: str, compression: str = "none") -> bool:
+        # Pipe docker save, through an optional compressor, straight into docker load on the host
+        image_name = self.challenge.image.name
+        compress_command = self._get_compress_command(compression)
+
+        log.debug(f"_stream_image: streaming {image_name} to {netloc} ({compress_command=})")
+        docker_save = subprocess.Popen(["docker", "save", image_name], stdout=subprocess.PIPE)
+        processes = [docker_save]
+
+        if compress_command:
+            compressor = subprocess.Popen(compress_command, stdin=docker_save.stdout, stdout=subprocess.PIPE)
+            # Only the compressor reads the output of docker save
+            docker_save.stdout.close()
+            processes.append(compressor)
+
+        source = processes[-1].stdout
+        docker_load = subprocess.Popen(["ssh", *self.ssh_options, netloc, "docker load"], stdin=subprocess.PIPE)
+        processes.append(docker_load)
+
+        progress = TransferProgress(docker_load.stdin, self.progress_interval)
+        try:
+            while chunk := source.read(self.chunk_size):
+                progress.write(chunk)
+        except BrokenPipeError:
+            # docker load (or ssh) exited early, its exit code is reported below
+            log.debug("_stream_image: docker load closed the stream", exc_info=True)
+        finally:
+            source.close()
+            with contextlib.suppress(BrokenPipeError):
+                docker_load.stdin.close()
+
+        return_codes = [process.wait() for process in processes]
+        progress.finish()
+
+        return all(return_code == 0 for return_code in return_codes)
+
+    def _get_remote_chain_ids(self, netloc: str) -> set[str] | None:
+        # Chain ids of all layers of all images on the host, or None if they could not be listed
+        list_layers = subprocess.run(
+            [
+                "ssh",
+                *self.ssh_options,
+                netloc,
+                "docker image inspect --format '{{json .RootFS.Layers}}' $(docker image ls --quiet --no-trunc)",
+            ],
+            capture_output=True,
+            text=True,
+        )
+
+        # ssh exits with 255 if it could not connect. docker fails if there are no images, which is fine
+        if list_layers.returncode == 255:
+            return None
+
+        chain_ids = set()
+        for line in list_layers.stdout.splitlines():
+            try:
+                diff_ids = json.loads(line)
+            except ValueError:
+                continue
+
+            if isinstance(diff_ids, list):
+                chain_ids.update(get_chain_ids(diff_ids))
+
+        return chain_ids
+
+    def _stream_image_layers(self, netloc: str, compression: str = "none") -> bool:
+        # Stream docker save to the host like _stream_image, but leave out the layers which the host already has.
+        # docker load only reads the layers which it does not have, so the image is reassembled from the rest
+        image_name = self.challenge.image.name
+        diff_ids = self.challenge.image.get_layers()
+        remote_chain_ids = self._get_remote_chain_ids(netloc)
+        if not diff_ids or remote_chain_ids is None:
+            click.secho("Could not determine the layers on the host, transferring the full image", fg="yellow")
+            return self._stream_image(netloc, compression)
+
+        present_diff_ids = {
+            diff_id
+            for diff_id, chain_id in zip(diff_ids, get_chain_ids(diff_ids), strict=True)
+            if chain_id in remote_chain_ids
+        }
+        if not present_diff_ids:
+            return self._stream_image(netloc, compression)
+
+        compress_command = self._get_compress_command(compression)
+        log.debug(f"_stream_image_layers: {len(present_diff_ids)} of {len(diff_ids)} layers are on {netloc}")
+
+        docker_save = subprocess.Popen(["docker", "save", image_name], stdout=subprocess.PIPE)
+        docker_load = subprocess.Popen(["ssh", *self.ssh_options, netloc, "docker load"], stdin=subprocess.PIPE)
+        processes = [docker_save, docker_load]
+
+        sink = docker_load.stdin
+        if compress_command:
+            compressor = subprocess.Popen(compress_command, stdin=subprocess.PIPE, stdout=docker_load.stdin)
+            # Only the compressor writes to docker load
+            docker_load.stdin.close()
+            sink = compressor.stdin
+            processes.append(compressor)
+
+        progress = TransferProgress(sink, self.progress_interval)
+        skipped = 0
+        try:
+            with (
+                tarfile.open(fileobj=docker_save.stdout, mode="r|") as image_archive,
+                tarfile.open(fileobj=progress, mode="w|") as reduced_archive,
+            ):
+                for member in image_archive:
+                    if not member.isfile():
+                        reduced_archive.addfile(member)
+                        continue
+
+                    contents, digest = self._read_archive_member(image_archive, member)
+                    if digest in present_diff_ids:
+                        skipped += member.size
+                        contents.close()
+                        continue
+
+                    reduced_archive.addfile(member, contents)
+                    contents.close()
+        except (BrokenPipeError, tarfile.TarError):
+            log.debug("_stream_image_layers: could not stream the image", exc_info=True)
+        finally:
+            docker_save.stdout.close()
+            with contextlib.suppress(BrokenPipeError):
+                sink.close()
+
+        return_codes = [process.wait() for process in processes]
+        progress.finish()
+
+        if any(return_code != 0 for return_code in return_codes):
+            # The host may not be able to reuse its layers (e.g. with the containerd image store)
+            click.secho("Could not load the image from its missing layers, transferring the full image", fg="yellow")
+            return self._stream_image(netloc, compression)
+
+        click.echo(
+            f"Skipped {len(present_diff_ids)} of {len(diff_ids)} layers already on the host "
+            f"({skipped / (1024 * 1024):.1f} MiB saved)"
+        )
+        return True
+
+    def _read_archive_member(self, archive: tarfile.TarFile, member: tarfile.TarInfo) -> tuple[IO[bytes], str | None]:
+        # Returns the contents of a file in the docker save archive, and its digest if it may be a layer
+        contents = archive.extractfile(member)
+
+        # Blobs (docker 25+) are named after their digest, which for layers is their diff id
+        blob = re.fullmatch(r"blobs/sha256/([0-9a-f]{64})", member.name)
+        if blob:
+            return contents, f"sha256:{blob.group(1)}"
+
+        # Older versions save layers as <id>/layer.tar, which have to be hashed to find out their diff id
+        if member.name.endswith("/layer.tar"):
+            spooled = tempfile.SpooledTemporaryFile(max_size=self.chunk_size * 64)  # noqa: SIM115
+            digest = hashlib.sha256()
+            while chunk := contents.read(self.chunk_size):
+                digest.update(chunk)
+                spooled.write(chunk)
+
+            spooled.seek(0)
+            return spooled, f"sha256:{digest.hexdigest()}"
+
+        return contents, None
+
     def _get_connection_info(self, hostname: str, port: int) -> str:
         # if protocol is http(s) - return an URL
         if self.protocol and self.protocol.startswith("http"):
@@ -99,3 +342,34 @@ class SSHDeploymentHandler(DeploymentHandler):
 
         # Otherwise return plain hostname
         return hostname
+
+
+class TransferProgress:
+    """
+    Writes to a stream, periodically reporting how much has been written and the throughput
+    """
+
+    def __init__(self, stream: IO[bytes], interval: float = 1.0):
+        self.stream = stream
+        self.interval = interval
+
+        self.transferred = 0
+        self.started_at = self.reported_at = time.monotonic()
+
+    def write(self, data: bytes) -> int:
+        self.stream.write(data)
+        self.transferred += len(data)
+
+        now = time.monotonic()
+        if now - self.reported_at >= self.interval:
+            click.echo(f"\rTransferred {self.get_throughput(now)}", nl=False)
+            self.reported_at = now
+
+        return len(data)
+
+    def finish(self) -> None:
+        click.echo(f"\rTransferred {self.get_throughput(time.monotonic())}")
+
+    def get_throughput(self, now: float) -> str:
+        megabytes = self.transferred / (1024 * 1024)
+        return f"{megabytes:.1f} MiB ({megabytes / max(now - self.started_at, 0.001):.1f} MiB/s)"
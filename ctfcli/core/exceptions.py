@@ -17,6 +17,11 @@ class MissingInstanceURL(Exception):
         )
 
 
+class MissingAsyncDependency(Exception):
+    def __str__(self):
+        return "The asynchronous API client requires aiohttp. Please install it with: pip install ctfcli[async]"
+
+
 class ProjectNotInitialized(Exception):
     pass
 
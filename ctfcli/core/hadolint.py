@@ -0,0 +1,213 @@
+import hashlib
+import io
+import json
+import logging
+import subprocess
+import tarfile
+from collections.abc import Sequence
+from pathlib import Path
+
+import yaml
+
+from ctfcli.core.store import Store
+
+log = logging.getLogger("ctfcli.core.hadolint")
+
+
+class Hadolint:
+    """
+    Runs hadolint on Dockerfiles, caching the results by the digests of the Dockerfile, the hadolint image
+    and the hadolint config.
+
+    All Dockerfiles which are not cached are checked in a single container - they are sent to it as a tar archive
+    on stdin, so that this works with remote docker hosts too. The results are reported in the same format as
+    `hadolint -` would print them for a single Dockerfile.
+    """
+
+    # The default image has no shell, which is required to unpack the Dockerfiles
+    image = "hadolint/hadolint:latest-alpine"
+
+    config_filenames = (".hadolint.yaml", ".hadolint.yml")
+
+    # Severities in ascending order. Hadolint fails if any rule at or above the failure threshold is violated
+    levels = ("style", "info", "warning", "error")
+    default_failure_threshold = "info"
+
+    def __init__(self, store: Store | None = None, config_path: Path | None = None):
+        self.store = store
+        self.config_path = config_path
+
+        self.config = b""
+        if config_path is not None:
+            self.config = Path(config_path).read_bytes()
+
+        # Id of the local hadolint image, resolved on first use - see get_cache_key()
+        self._image_id: str | None = None
+
+    @classmethod
+    def for_project(cls, project_path: Path | None = None) -> "Hadolint":
+        if project_path is None:
+            return cls()
+
+        project_path = Path(project_path)
+        config_path = None
+        for config_filename in cls.config_filenames:
+            if (project_path / config_filename).is_file():
+                config_path = project_path / config_filename
+                break
+
+        return cls(store=Store(project_path), config_path=config_path)
+
+    def get_image_id(self) -> str | None:
+        # Id of the local hadolint image, pulling it if it's missing. None if docker is not available
+        if self._image_id is None:
+            self._image_id = self._inspect_image()
+            if self._image_id is None and self._pull_image():
+                self._image_id = self._inspect_image()
+
+        return self._image_id
+
+    def _inspect_image(self) -> str | None:
+        try:
+            docker_inspect = subprocess.run(
+                ["docker", "image", "inspect", "--format={{.Id}}", self.image], capture_output=True, text=True
+            )
+        except FileNotFoundError:
+            return None
+
+        if docker_inspect.returncode != 0:
+            return None
+
+        return docker_inspect.stdout.strip() or None
+
+    def _pull_image(self) -> bool:
+        try:
+            docker_pull = subprocess.run(["docker", "pull", self.image], capture_output=True)
+        except FileNotFoundError:
+            return False
+
+        return docker_pull.returncode == 0
+
+    def get_cache_key(self) -> str | None:
+        # The results depend on the config, and on the version of hadolint. The tag of the image floats,
+        # so the version is identified by the id of the image the Dockerfiles are actually checked with
+        image_id = self.get_image_id()
+        if image_id is None:
+            return None
+
+        return hashlib.sha256(image_id.encode() + b"\0" + self.config).hexdigest()
+
+    def check(self, dockerfile_paths: Sequence[Path]) -> dict[Path, str | None]:
+        """
+        Returns the hadolint output for every Dockerfile which does not pass, and None for the ones which do
+        """
+        results: dict[Path, str | None] = {}
+
+        # Results are neither read from nor written to the store if the hadolint image cannot be resolved
+        cache_key = self.get_cache_key() if self.store is not None else None
+
+        pending: dict[str, list[Path]] = {}
+        dockerfiles: dict[str, bytes] = {}
+        for dockerfile_path in dockerfile_paths:
+            dockerfile = Path(dockerfile_path).read_bytes()
+            digest = hashlib.sha256(dockerfile).hexdigest()
+
+            cached = self.store.get_hadolint_result(digest, cache_key) if cache_key else None
+            if cached is not None:
+                # Dockerfiles which pass are cached with an empty output
+                results[dockerfile_path] = cached or None
+                continue
+
+            # Identical Dockerfiles are only checked once
+            pending.setdefault(digest, []).append(dockerfile_path)
+            dockerfiles[digest] = dockerfile
+
+        if not pending:
+            return results
+
+        digests = list(pending.keys())
+        outputs = self._run([dockerfiles[digest] for digest in digests], cache_key)
+
+        for digest, output in zip(digests, outputs, strict=True):
+            for dockerfile_path in pending[digest]:
+                results[dockerfile_path] = output
+
+        return results
+
+    def _run(self, dockerfiles: list[bytes], cache_key: str | None = None) -> list[str | None]:
+        log.debug(f"Hadolint: checking {len(dockerfiles)} Dockerfile(s) in a single container")
+
+        archive = io.BytesIO()
+        with tarfile.open(fileobj=archive, mode="w") as tar:
+            files = {f"{idx}/Dockerfile": dockerfile for idx, dockerfile in enumerate(dockerfiles)}
+            if self.config:
+                files["hadolint.yaml"] = self.config
+
+            for name, contents in files.items():
+                info = tarfile.TarInfo(name)
+                info.size = len(contents)
+                tar.addfile(info, io.BytesIO(contents))
+
+        command = "mkdir /lint && tar -x -C /lint && cd /lint && hadolint --format json --no-fail"
+        if self.config:
+            command += " --config hadolint.yaml"
+        command += " " + " ".join(f"{idx}/Dockerfile" for idx in range(len(dockerfiles)))
+
+        try:
+            hadolint = subprocess.run(
+                ["docker", "run", "--rm", "-i", "--entrypoint", "sh", self.image, "-c", command],
+                capture_output=True,
+                input=archive.getvalue(),
+            )
+        except FileNotFoundError:
+            return ["Failed to run hadolint: docker is not installed"] * len(dockerfiles)
+
+        try:
+            findings = json.loads(hadolint.stdout)
+        except ValueError:
+            findings = None
+
+        # Report a failure to run hadolint for every Dockerfile, and do not cache it
+        if hadolint.returncode != 0 or not isinstance(findings, list):
+            error = (hadolint.stderr or hadolint.stdout).decode(errors="replace").strip()
+            return [f"Failed to run hadolint: {error}"] * len(dockerfiles)
+
+        outputs = [self._format_findings(findings, f"{idx}/Dockerfile") for idx in range(len(dockerfiles))]
+
+        if self.store is not None and cache_key:
+            for dockerfile, output in zip(dockerfiles, outputs, strict=True):
+                digest = hashlib.sha256(dockerfile).hexdigest()
+                self.store.set_hadolint_result(digest, cache_key, output or "")
+
+        return outputs
+
+    def _format_findings(self, findings: list[dict], filename: str) -> str | None:
+        findings = [finding for finding in findings if finding.get("file") == filename]
+
+        threshold = self._get_failure_threshold()
+        if threshold not in self.levels:
+            # none / ignore never fail
+            return None
+
+        failing_levels = self.levels[self.levels.index(threshold) :]
+        if not any(finding.get("level") in failing_levels for finding in findings):
+            return None
+
+        # Same as the default tty format for a Dockerfile read from stdin
+        return "\n".join(
+            f"-:{finding['line']} {finding['code']} {finding['level']}: {finding['message']}" for finding in findings
+        )
+
+    def _get_failure_threshold(self) -> str:
+        if not self.config:
+            return self.default_failure_threshold
+
+        try:
+            config = yaml.safe_load(self.config)
+        except yaml.YAMLError:
+            return self.default_failure_threshold
+
+        if not isinstance(config, dict):
+            return self.default_failure_threshold
+
+        return str(config.get("failure-threshold", self.default_failure_threshold))
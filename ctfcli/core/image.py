@@ -1,11 +1,67 @@
+import hashlib
 import json
+import logging
+import re
 import subprocess
 import tempfile
+from collections.abc import Sequence
 from os import PathLike
 from pathlib import Path
 
+import click
+from slugify import slugify
+
+from ctfcli.utils.build_context import get_context_digest
+
+log = logging.getLogger("ctfcli.core.image")
+
+
+def get_local_images(names: Sequence[str]) -> set[str]:
+    """
+    Returns which of the given image names exist locally, checking all of them with a single `docker image inspect`
+    """
+    names = list(dict.fromkeys(names))
+    if not names:
+        return set()
+
+    try:
+        docker_inspect = subprocess.run(
+            ["docker", "image", "inspect", "--format={{.Id}}", *names], capture_output=True, text=True
+        )
+    except FileNotFoundError:
+        log.debug("get_local_images: docker is not installed")
+        return set()
+
+    if docker_inspect.returncode == 0:
+        return set(names)
+
+    # docker reports every image which could not be found, and inspects the other ones anyway
+    missing = set(re.findall(r"No such image: (\S+)", docker_inspect.stderr))
+    if not missing:
+        log.debug(f"get_local_images: docker image inspect failed: {docker_inspect.stderr.strip()}")
+        return set()
+
+    return {name for name in names if name not in missing and f"{name}:latest" not in missing}
+
+
+def get_chain_ids(diff_ids: Sequence[str]) -> list[str]:
+    """
+    Returns the chain id of every layer: the digest identifying the layer together with all layers below it.
+    Docker only reuses a layer if a layer with the same chain id exists.
+    """
+    chain_ids: list[str] = []
+    for diff_id in diff_ids:
+        if not chain_ids:
+            chain_ids.append(diff_id)
+        else:
+            chain_ids.append(f"sha256:{hashlib.sha256(f'{chain_ids[-1]} {diff_id}'.encode()).hexdigest()}")
+
+    return chain_ids
+
 
 class Image:
+    context_digest_label = "io.ctfd.ctfcli.context-digest"
+
     def __init__(self, name: str, build_path: str | PathLike | None = None):
         # name can be either a new name to assign or an existing image name
         self.name = name
@@ -18,13 +74,89 @@ class Image:
         self.built = True
 
         # if the image provides a build path, assume it is not built yet
+        self.build_path: Path | None = None
         if build_path:
             self.build_path = Path(build_path)
             self.built = False
 
+        # Always build and push, even if an image built from the same context exists locally / in the registry
+        self.rebuild = False
+
+        self._context_digest: str | None = None
+
+    def get_context_digest(self) -> str:
+        # Digest of the build context, which is stamped on the image as a label when it's built
+        if self._context_digest is None:
+            self._context_digest = get_context_digest(self.build_path)
+
+        return self._context_digest
+
+    def get_labels(self) -> dict[str, str]:
+        # Labels of the local image, or an empty dict if it does not exist
+        try:
+            docker_inspect = subprocess.run(
+                ["docker", "image", "inspect", "--format={{json .Config.Labels}}", self.name],
+                capture_output=True,
+                text=True,
+            )
+        except FileNotFoundError:
+            return {}
+
+        if docker_inspect.returncode != 0:
+            return {}
+
+        try:
+            labels = json.loads(docker_inspect.stdout)
+        except ValueError:
+            return {}
+
+        return labels if isinstance(labels, dict) else {}
+
+    def is_up_to_date(self) -> bool:
+        # Whether the local image has been built from the exact same context
+        return not self.rebuild and self.get_labels().get(self.context_digest_label) == self.get_context_digest()
+
+    def get_layers(self) -> list[str] | None:
+        # Digests of the uncompressed layers of the local image (diff ids), from the base layer up
+        try:
+            docker_inspect = subprocess.run(
+                ["docker", "image", "inspect", "--format={{json .RootFS.Layers}}", self.name],
+                capture_output=True,
+                text=True,
+            )
+        except FileNotFoundError:
+            return None
+
+        if docker_inspect.returncode != 0:
+            return None
+
+        try:
+            layers = json.loads(docker_inspect.stdout)
+        except ValueError:
+            return None
+
+        return layers if isinstance(layers, list) else None
+
     def build(self) -> str | None:
+        context_digest = self.get_context_digest()
+
+        if self.is_up_to_date():
+            log.debug(f"Image {self.name}: context is unchanged ({context_digest}), skipping build")
+            self.built = True
+            return self.name
+
         docker_build = subprocess.call(
-            ["docker", "build", "--load", "-t", self.name, "."], cwd=self.build_path.absolute()
+            [
+                "docker",
+                "build",
+                "--load",
+                "-t",
+                self.name,
+                "--label",
+                f"{self.context_digest_label}={context_digest}",
+                ".",
+            ],
+            cwd=self.build_path.absolute(),
         )
         if docker_build != 0:
             return None
@@ -43,6 +175,10 @@ class Image:
         if not self.built:
             self.build()
 
+        if not self.rebuild and self.is_pushed(location):
+            log.debug(f"Image {self.name}: already pushed to {location}, skipping push")
+            return location
+
         docker_tag = subprocess.call(["docker", "tag", self.name, location])
         docker_push = subprocess.call(["docker", "push", location])
 
@@ -51,6 +187,56 @@ class Image:
 
         return location
 
+    def get_id(self) -> str | None:
+        # Id of the local image (the digest of its config), or None if it does not exist
+        try:
+            docker_inspect = subprocess.run(
+                ["docker", "image", "inspect", "--format={{.Id}}", self.name], capture_output=True, text=True
+            )
+        except FileNotFoundError:
+            return None
+
+        if docker_inspect.returncode != 0:
+            return None
+
+        return docker_inspect.stdout.strip() or None
+
+    def get_digest(self) -> str | None:
+        # Identifies the contents of the image without building it: the digest of the build context of images built
+        # by ctfcli, or the id of the local copy of pre-built images
+        if self.build_path is not None:
+            return self.get_context_digest()
+
+        return self.get_id()
+
+    def is_pushed(self, location: str) -> bool:
+        # The registry holds this exact image if its manifest references the same image config, which is what the
+        # local image id is a digest of
+        image_id = self.get_id()
+        if image_id is None:
+            return False
+
+        try:
+            docker_manifest = subprocess.run(
+                ["docker", "manifest", "inspect", location], capture_output=True, text=True
+            )
+        except FileNotFoundError:
+            return False
+
+        if docker_manifest.returncode != 0:
+            return False
+
+        try:
+            manifest = json.loads(docker_manifest.stdout)
+        except ValueError:
+            return False
+
+        # Manifest lists (multi-platform images) do not reference a single config
+        if not isinstance(manifest, dict) or not isinstance(manifest.get("config"), dict):
+            return False
+
+        return manifest["config"].get("digest") == image_id
+
     def export(self) -> str | None:
         if not self.built:
             self.build()
@@ -82,3 +268,64 @@ class Image:
                 # Split '2323/tcp'
                 return ports[0].split("/")[0]
         return None
+
+
+def is_bake_available() -> bool:
+    try:
+        docker_buildx = subprocess.run(["docker", "buildx", "version"], capture_output=True)
+    except FileNotFoundError:
+        return False
+
+    return docker_buildx.returncode == 0
+
+
+def get_bake_plan(images: Sequence[Image]) -> dict:
+    # https://docs.docker.com/build/bake/reference/
+    targets = {}
+    for idx, image in enumerate(images):
+        targets[f"{slugify(image.basename)}-{idx}"] = {
+            "context": str(image.build_path.absolute()),
+            "dockerfile": "Dockerfile",
+            "tags": [image.name],
+            "labels": {Image.context_digest_label: image.get_context_digest()},
+            "output": ["type=docker"],
+        }
+
+    return {"group": {"default": {"targets": list(targets.keys())}}, "target": targets}
+
+
+def build_images(images: Sequence[Image]) -> list[bool]:
+    """
+    Builds many images in a single buildx bake session, so that shared layers are only built once and independent
+    images are built concurrently. Returns whether every image has been built, in the order of images.
+
+    Images which are up-to-date are not built. Without buildx, images are built one by one.
+    """
+    results = [True] * len(images)
+    pending = [idx for idx, image in enumerate(images) if not image.is_up_to_date()]
+    if not pending:
+        return results
+
+    if len(pending) > 1 and is_bake_available():
+        bake_plan = get_bake_plan([images[idx] for idx in pending])
+        with tempfile.NamedTemporaryFile("w", suffix=".docker-bake.json") as bake_file:
+            json.dump(bake_plan, bake_file, indent=2)
+            bake_file.flush()
+
+            log.debug(f"build_images: baking {len(pending)} images")
+            docker_bake = subprocess.call(["docker", "buildx", "bake", "--file", bake_file.name])
+
+        if docker_bake == 0:
+            for idx in pending:
+                images[idx].built = True
+
+            return results
+
+        # A failing target fails the whole bake. Images which were loaded are up-to-date now, so building the
+        # others one by one (reusing the build cache) attributes the failure to the right images
+        click.secho("Could not build all images at once, building them one by one", fg="yellow")
+
+    for idx in pending:
+        results[idx] = images[idx].build() is not None
+
+    return results
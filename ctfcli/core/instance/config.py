@@ -5,7 +5,7 @@ from ctfcli.core.exceptions import InstanceConfigException
 class ServerConfig:
     @staticmethod
     def get(key: str) -> str:
-        api = API()
+        api = API.shared()
         resp = api.get(f"/api/v1/configs/{key}")
         if resp.ok is False:
             raise InstanceConfigException(
@@ -16,7 +16,7 @@ class ServerConfig:
 
     @staticmethod
     def set(key: str, value: str) -> bool:
-        api = API()
+        api = API.shared()
         data = {
             "value": value,
         }
@@ -31,7 +31,7 @@ class ServerConfig:
 
     @staticmethod
     def getall():
-        api = API()
+        api = API.shared()
         resp = api.get("/api/v1/configs")
         if resp.ok is False:
             raise InstanceConfigException(f"Could not get configs because '{resp.content}' with {resp.status_code}")
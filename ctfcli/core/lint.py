@@ -0,0 +1,207 @@
+import json
+import logging
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any
+
+from ctfcli import __version__
+from ctfcli.core.challenge import Challenge
+from ctfcli.core.exceptions import ChallengeException, LintException
+from ctfcli.core.hadolint import Hadolint
+
+log = logging.getLogger("ctfcli.core.lint")
+
+
+class LintResult:
+    def __init__(
+        self,
+        challenge_path: str,
+        name: str | None = None,
+        issues: dict[str, list[str]] | None = None,
+        error: str | None = None,
+    ):
+        self.challenge_path = challenge_path
+        self.name = name
+        self.issues = issues if issues else {}
+
+        # Set if the challenge could not be linted at all, for example because its challenge.yml is invalid
+        self.error = error
+
+    @property
+    def passed(self) -> bool:
+        return self.error is None and not any(self.issues.values())
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "challenge": self.name,
+            "path": self.challenge_path,
+            "passed": self.passed,
+            "error": self.error,
+            "issues": {category: issues for category, issues in self.issues.items() if issues},
+        }
+
+
+def lint_challenge(challenge_path: str, project_path: str | None = None, **lint_options) -> LintResult:
+    # Module level, so that challenges can be linted in a process pool
+    try:
+        challenge = Challenge(challenge_path)
+    except ChallengeException as e:
+        return LintResult(challenge_path, error=str(e))
+
+    # Use the hadolint results cached in the project, see check_dockerfiles()
+    if not lint_options.get("skip_hadolint"):
+        lint_options["hadolint"] = Hadolint.for_project(project_path)
+
+    try:
+        challenge.lint(**lint_options)
+    except LintException as e:
+        return LintResult(challenge_path, name=str(challenge.get("name")), issues=e.issues)
+    except Exception as e:
+        log.debug(f"lint_challenge: ({challenge_path=}) raised", exc_info=True)
+        return LintResult(challenge_path, name=str(challenge.get("name")), error=f"{type(e).__name__}: {e}")
+
+    return LintResult(challenge_path, name=str(challenge.get("name")))
+
+
+def check_dockerfiles(challenge_paths: Sequence[str], project_path: str | None = None) -> None:
+    # Run hadolint on the Dockerfiles of all challenges at once, so that linting every challenge finds its result
+    # in the cache, instead of starting a container per challenge
+    dockerfile_paths = []
+    for challenge_path in challenge_paths:
+        try:
+            challenge = Challenge(challenge_path)
+        except ChallengeException:
+            continue
+
+        dockerfile_path = challenge.challenge_directory / "Dockerfile"
+        if challenge.get("image") == "." and dockerfile_path.is_file():
+            dockerfile_paths.append(dockerfile_path)
+
+    if dockerfile_paths:
+        Hadolint.for_project(project_path).check(dockerfile_paths)
+
+
+def lint_challenges(challenge_paths: Sequence[str], jobs: int = 1, project_path: str | None = None, **lint_options):
+    """
+    Lints challenges and yields their results in order. With jobs > 1 challenges are linted in a pool of processes,
+    as linting is mostly CPU bound (scanning files for flags). Every challenge is linted, regardless of the results.
+
+    With a project_path, hadolint results are cached in the project store.
+    """
+    if project_path is not None and len(challenge_paths) > 1 and not lint_options.get("skip_hadolint"):
+        check_dockerfiles(challenge_paths, project_path)
+
+    if jobs <= 1 or len(challenge_paths) <= 1:
+        for challenge_path in challenge_paths:
+            yield lint_challenge(challenge_path, project_path, **lint_options)
+
+        return
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = [
+            executor.submit(lint_challenge, challenge_path, project_path, **lint_options)
+            for challenge_path in challenge_paths
+        ]
+        for future in futures:
+            yield future.result()
+
+
+class LintReport:
+    """
+    Aggregated results of linting several challenges, which can be written as JSON or SARIF
+    """
+
+    # https://docs.oasis-open.org/sarif/sarif/v2.1.0/sarif-v2.1.0.html
+    sarif_schema = "https://json.schemastore.org/sarif-2.1.0.json"
+
+    rule_descriptions = {
+        "error": "Challenge could not be linted",
+        "fields": "challenge.yml fields are missing or invalid",
+        "dockerfile": "Dockerfile is missing or invalid",
+        "hadolint": "Dockerfile does not pass hadolint",
+        "files": "Challenge files are missing or contain a flag",
+    }
+
+    def __init__(self, results: list[LintResult], project_path: Path | None = None):
+        self.results = results
+        self.project_path = project_path
+
+    @property
+    def passed(self) -> bool:
+        return all(result.passed for result in self.results)
+
+    @property
+    def failed_results(self) -> list[LintResult]:
+        return [result for result in self.results if not result.passed]
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "passed": self.passed,
+            "challenges": [result.to_dict() for result in self.results],
+        }
+
+    def to_sarif(self) -> dict[str, Any]:
+        sarif_results = []
+        for result in self.results:
+            if result.error is not None:
+                sarif_results.append(self._get_sarif_result("error", result.error, result.challenge_path))
+
+            for category, issues in result.issues.items():
+                # Issues concerning the Dockerfile are reported on it, everything else on the challenge.yml
+                location = result.challenge_path
+                if category in ["dockerfile", "hadolint"]:
+                    location = str(Path(result.challenge_path).parent / "Dockerfile")
+
+                for issue in issues:
+                    sarif_results.append(self._get_sarif_result(category, issue, location))
+
+        rules = [
+            {"id": f"ctfcli/{category}", "shortDescription": {"text": description}}
+            for category, description in self.rule_descriptions.items()
+        ]
+
+        return {
+            "$schema": self.sarif_schema,
+            "version": "2.1.0",
+            "runs": [
+                {
+                    "tool": {
+                        "driver": {
+                            "name": "ctfcli",
+                            "version": __version__,
+                            "informationUri": "https://github.com/CTFd/ctfcli",
+                            "rules": rules,
+                        }
+                    },
+                    "results": sarif_results,
+                }
+            ],
+        }
+
+    def _get_sarif_result(self, category: str, message: str, location: str) -> dict[str, Any]:
+        return {
+            "ruleId": f"ctfcli/{category}",
+            "level": "error",
+            "message": {"text": message.strip()},
+            "locations": [{"physicalLocation": {"artifactLocation": {"uri": self._get_uri(location)}}}],
+        }
+
+    def _get_uri(self, location: str) -> str:
+        # SARIF viewers resolve relative URIs against the repository root
+        path = Path(location).resolve()
+        if self.project_path is not None:
+            try:
+                return path.relative_to(Path(self.project_path).resolve()).as_posix()
+            except ValueError:
+                pass
+
+        return path.as_uri()
+
+    def write_json(self, path: str | Path) -> None:
+        with open(path, "w") as f:
+            json.dump(self.to_json(), f, indent=2)
+
+    def write_sarif(self, path: str | Path) -> None:
+        with open(path, "w") as f:
+            json.dump(self.to_sarif(), f, indent=2)
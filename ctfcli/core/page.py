@@ -1,3 +1,5 @@
+import asyncio
+import logging
 from os import PathLike
 from pathlib import Path
 
@@ -10,14 +12,18 @@ import click
 import frontmatter
 
 from ctfcli.core.api import API
+from ctfcli.core.async_api import AsyncAPI
 from ctfcli.core.config import Config
 from ctfcli.core.exceptions import (
     IllegalPageOperation,
     InvalidPageConfiguration,
     InvalidPageFormat,
+    MissingAsyncDependency,
 )
 from ctfcli.core.media import Media
 
+log = logging.getLogger("ctfcli.core.page")
+
 PAGE_FORMATS = {
     ".md": "markdown",
     ".html": "html",
@@ -37,18 +43,25 @@ class Page:
     _remote_pages: list[Self] | None = None
     _remote_page_ids: dict[str, int] | None = None
 
-    def __init__(self, page_path: str | PathLike | None = None, page_id: int | None = None):
+    def __init__(
+        self,
+        page_path: str | PathLike | None = None,
+        page_id: int | None = None,
+        page_data: dict | None = None,
+    ):
         # single page object can only be created as either local or remote at the moment
         # this can be changed later to allow a merge-like behavior
         if (not page_path and not page_id) or (page_path and page_id):
             raise InvalidPageConfiguration
 
-        self.api = API()
+        self.api = API.shared()
 
         if page_id:
             # if page is remote - it can only be used for downloading
+            # its data can be provided if it has already been fetched, see get_remote_pages()
             self.page_id = page_id
-            page_data = self._get_data_by_id()
+            if page_data is None:
+                page_data = self._get_data_by_id()
             self.format = page_data["format"]
 
             # if page is remote we have to infer a local file name
@@ -192,17 +205,37 @@ class Page:
         if cls._remote_pages:
             return cls._remote_pages
 
-        api = API()
+        api = API.shared()
         installed_pages = api.get("/api/v1/pages").json()["data"]
 
+        page_ids = [page["id"] for page in installed_pages]
+        pages_data = cls._get_remote_pages_data(page_ids)
+
         pages = []
-        for page in installed_pages:
-            pages.append(Page(page_id=page["id"]))
+        for page_id, page_data in zip(page_ids, pages_data, strict=True):
+            pages.append(Page(page_id=page_id, page_data=page_data))
 
         # save remote pages for reuse
         cls._remote_pages = pages
         return pages
 
+    @staticmethod
+    def _get_remote_pages_data(page_ids: list[int]) -> list[dict | None]:
+        # The listing does not include the content of pages, so every page has to be fetched on its own.
+        # With aiohttp installed they are fetched concurrently, otherwise pages fetch their data one by one
+        try:
+            async_api = AsyncAPI()
+        except MissingAsyncDependency:
+            return [None] * len(page_ids)
+
+        async def fetch_pages() -> list[dict | None]:
+            async with async_api:
+                responses = await asyncio.gather(*[async_api.get(f"/api/v1/pages/{page_id}") for page_id in page_ids])
+                return [(await r.json())["data"] if r.ok else None for r in responses]
+
+        log.debug(f"_get_remote_pages_data: fetching {len(page_ids)} page(s) concurrently")
+        return asyncio.run(fetch_pages())
+
     @classmethod
     def get_remote_page_id(cls, route: str) -> int | None:
         # if we find a saved cache, and the route has a page_id associated - we can return it
@@ -217,7 +250,7 @@ class Page:
 
         # otherwise we just take the result of listing all pages to search for the id
         # and build the lookup cache for further use
-        api = API()
+        api = API.shared()
         remote_pages = api.get("/api/v1/pages").json()["data"]
 
         remote_page_ids = {}
@@ -0,0 +1,172 @@
+import logging
+import threading
+
+from ctfcli.core.api import API
+
+log = logging.getLogger("ctfcli.core.remote")
+
+
+class RemoteState:
+    """
+    Snapshot of the remote CTFd instance shared by all challenges processed during a single command run.
+
+    Every collection is fetched at most once, lazily, on first use and then indexed so that lookups by challenge id,
+    challenge name or file location do not require another listing. Challenges report the resources they delete, and
+    the challenges they create, so that other challenges processed later in the run do not act on stale data.
+
+    The state is safe to share between worker threads - loading and updating the indexes happens under a lock.
+    """
+
+    # Resources which CTFd lists globally, and which have to be filtered by their challenge_id
+    challenge_resources = ("flags", "tags", "hints", "solutions")
+
+    def __init__(self, api: API | None = None):
+        self._api = api
+        self._lock = threading.RLock()
+
+        self._challenges: dict[int, dict] | None = None
+        self._challenge_ids_by_name: dict[str, int] = {}
+
+        # { resource: { challenge_id: { resource_id: resource } } }
+        self._resources: dict[str, dict[int, dict[int, dict]]] = {}
+
+        # { file_type: { location: file } }
+        self._files: dict[str, dict[str, dict]] = {}
+
+        # { path: list } of other collections, such as cloud images and services
+        self._listings: dict[str, list[dict]] = {}
+
+    @property
+    def api(self) -> API:
+        with self._lock:
+            if not self._api:
+                self._api = API.shared()
+
+            return self._api
+
+    def load_challenges(self) -> list[dict]:
+        r = self.api.get("/api/v1/challenges?view=admin")
+
+        if not r.ok:
+            return []
+
+        return r.json().get("data", None) or []
+
+    @property
+    def challenges(self) -> list[dict]:
+        with self._lock:
+            return list(self._get_challenges().values())
+
+    def get_challenge(self, challenge_id: int) -> dict | None:
+        with self._lock:
+            return self._get_challenges().get(challenge_id)
+
+    def get_challenge_by_name(self, name: str) -> dict | None:
+        with self._lock:
+            challenges = self._get_challenges()
+            challenge_id = self._challenge_ids_by_name.get(name)
+            if challenge_id is None:
+                return None
+
+            return challenges.get(challenge_id)
+
+    def add_challenge(self, challenge_data: dict) -> None:
+        with self._lock:
+            # Only record the challenge if the list has been loaded already,
+            # otherwise it will be included when the list is fetched
+            if self._challenges is None:
+                return
+
+            self._index_challenge(challenge_data)
+
+    def get_resources(self, resource: str, challenge_id: int) -> list[dict]:
+        with self._lock:
+            return list(self._get_resources(resource).get(challenge_id, {}).values())
+
+    def remove_resource(self, resource: str, challenge_id: int, resource_id: int) -> None:
+        with self._lock:
+            if resource not in self._resources:
+                return
+
+            self._resources[resource].get(challenge_id, {}).pop(resource_id, None)
+
+    def get_files(self, file_type: str = "challenge") -> list[dict]:
+        with self._lock:
+            return list(self._get_files(file_type).values())
+
+    def get_file(self, location: str, file_type: str = "challenge") -> dict | None:
+        with self._lock:
+            return self._get_files(file_type).get(location)
+
+    def remove_file(self, location: str, file_type: str = "challenge") -> None:
+        with self._lock:
+            if file_type not in self._files:
+                return
+
+            self._files[file_type].pop(location, None)
+
+    def get_listing(self, path: str) -> list[dict] | None:
+        # Returns None if the remote does not provide the collection
+        with self._lock:
+            if path not in self._listings:
+                log.debug(f"RemoteState: loading {path}")
+                r = self.api.get(path)
+                if not r.ok:
+                    return None
+
+                self._listings[path] = r.json()["data"]
+
+            return self._listings[path]
+
+    def add_to_listing(self, path: str, data: dict) -> None:
+        with self._lock:
+            # Only record the entry if the list has been loaded already, like challenges
+            if path not in self._listings:
+                return
+
+            self._listings[path].append(data)
+
+    # The methods below expect the caller to hold the lock
+    def _get_challenges(self) -> dict[int, dict]:
+        if self._challenges is None:
+            log.debug("RemoteState: loading challenges")
+            self._challenges = {}
+            self._challenge_ids_by_name = {}
+
+            for challenge_data in self.load_challenges():
+                self._index_challenge(challenge_data)
+
+        return self._challenges
+
+    def _index_challenge(self, challenge_data: dict) -> None:
+        self._challenges[challenge_data["id"]] = challenge_data
+
+        # Keep the first challenge with a given name, the same way a linear search through the list would
+        self._challenge_ids_by_name.setdefault(challenge_data["name"], challenge_data["id"])
+
+    def _get_resources(self, resource: str) -> dict[int, dict[int, dict]]:
+        if resource not in self.challenge_resources:
+            raise ValueError(f"Unsupported remote resource: {resource}")
+
+        if resource not in self._resources:
+            log.debug(f"RemoteState: loading {resource}")
+            r = self.api.get(f"/api/v1/{resource}")
+            r.raise_for_status()
+
+            indexed = {}
+            for resource_data in r.json().get("data") or []:
+                indexed.setdefault(resource_data["challenge_id"], {})[resource_data["id"]] = resource_data
+
+            self._resources[resource] = indexed
+
+        return self._resources[resource]
+
+    def _get_files(self, file_type: str) -> dict[str, dict]:
+        if file_type not in self._files:
+            log.debug(f"RemoteState: loading files (type={file_type})")
+            r = self.api.get(f"/api/v1/files?type={file_type}")
+            r.raise_for_status()
+
+            self._files[file_type] = {f["location"]: f for f in r.json().get("data") or []}
+
+        return self._files[file_type]
@@ -0,0 +1,214 @@
+import logging
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+
+from ctfcli.core.config import Config
+
+log = logging.getLogger("ctfcli.core.store")
+
+
+class Store:
+    """
+    Persistent local state of a ctfcli project, kept in an SQLite database under .ctf/
+
+    The store is a cache - it can be deleted at any time, at the cost of the next command doing a full run.
+    A single connection is shared between threads, and all access to it is serialized with a lock.
+    """
+
+    filename = "ctfcli.db"
+
+    schema = """
+        CREATE TABLE IF NOT EXISTS fingerprints (
+            instance_url TEXT NOT NULL,
+            challenge_key TEXT NOT NULL,
+            digest TEXT NOT NULL,
+            updated_at TEXT NOT NULL,
+            PRIMARY KEY (instance_url, challenge_key)
+        );
+
+        CREATE TABLE IF NOT EXISTS remote_challenges (
+            instance_url TEXT NOT NULL,
+            challenge_key TEXT NOT NULL,
+            challenge_id INTEGER NOT NULL,
+            name TEXT NOT NULL,
+            updated_at TEXT NOT NULL,
+            PRIMARY KEY (instance_url, challenge_key)
+        );
+
+        CREATE TABLE IF NOT EXISTS file_digests (
+            path TEXT NOT NULL,
+            algo TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            inode INTEGER NOT NULL,
+            digest TEXT NOT NULL,
+            updated_at TEXT NOT NULL,
+            PRIMARY KEY (path, algo)
+        );
+
+        CREATE TABLE IF NOT EXISTS hadolint_results (
+            dockerfile_digest TEXT NOT NULL,
+            -- digest of the hadolint image id and config, see Hadolint.get_cache_key()
+            config_digest TEXT NOT NULL,
+            output TEXT NOT NULL,
+            updated_at TEXT NOT NULL,
+            PRIMARY KEY (dockerfile_digest, config_digest)
+        );
+
+        CREATE TABLE IF NOT EXISTS deployments (
+            challenge_key TEXT NOT NULL,
+            target TEXT NOT NULL,
+            image_digest TEXT NOT NULL,
+            port TEXT,
+            connection_info TEXT,
+            deployed_at TEXT NOT NULL,
+            PRIMARY KEY (challenge_key, target)
+        );
+    """
+
+    def __init__(self, project_path: Path | None = None):
+        if project_path is None:
+            project_path = Config.get_project_path()
+
+        self.project_path = Path(project_path)
+        self.path = self.project_path / ".ctf" / self.filename
+
+        self._connection: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if self._connection is None:
+            log.debug(f"Store: opening {self.path}")
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.executescript(self.schema)
+
+        return self._connection
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def get_challenge_key(self, challenge_file_path: str | Path) -> str:
+        # Identify challenges by the path to their challenge.yml, relative to the project
+        challenge_file_path = Path(challenge_file_path).resolve()
+        try:
+            return challenge_file_path.relative_to(self.project_path.resolve()).as_posix()
+        except ValueError:
+            return challenge_file_path.as_posix()
+
+    def get_fingerprint(self, instance_url: str, challenge_key: str) -> str | None:
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT digest FROM fingerprints WHERE instance_url = ? AND challenge_key = ?",
+                (instance_url, challenge_key),
+            ).fetchone()
+
+        return row[0] if row else None
+
+    def set_fingerprint(self, instance_url: str, challenge_key: str, digest: str) -> None:
+        with self._lock, self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO fingerprints (instance_url, challenge_key, digest, updated_at) "
+                "VALUES (?, ?, ?, ?)",
+                (instance_url, challenge_key, digest, datetime.now(timezone.utc).isoformat()),
+            )
+
+    def remove_fingerprint(self, instance_url: str, challenge_key: str) -> None:
+        with self._lock, self.connection:
+            self.connection.execute(
+                "DELETE FROM fingerprints WHERE instance_url = ? AND challenge_key = ?",
+                (instance_url, challenge_key),
+            )
+
+    def get_remote_challenge(self, instance_url: str, challenge_key: str) -> tuple[int, str] | None:
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT challenge_id, name FROM remote_challenges WHERE instance_url = ? AND challenge_key = ?",
+                (instance_url, challenge_key),
+            ).fetchone()
+
+        return (row[0], row[1]) if row else None
+
+    def set_remote_challenge(self, instance_url: str, challenge_key: str, challenge_id: int, name: str) -> None:
+        with self._lock, self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO remote_challenges "
+                "(instance_url, challenge_key, challenge_id, name, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (instance_url, challenge_key, challenge_id, name, datetime.now(timezone.utc).isoformat()),
+            )
+
+    def get_file_digest(self, path: str, algo: str, size: int, mtime_ns: int, inode: int) -> str | None:
+        # A cached digest is only valid as long as the file was not modified or replaced
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT digest FROM file_digests "
+                "WHERE path = ? AND algo = ? AND size = ? AND mtime_ns = ? AND inode = ?",
+                (path, algo, size, mtime_ns, inode),
+            ).fetchone()
+
+        return row[0] if row else None
+
+    def set_file_digest(self, path: str, algo: str, size: int, mtime_ns: int, inode: int, digest: str) -> None:
+        with self._lock, self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO file_digests (path, algo, size, mtime_ns, inode, digest, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (path, algo, size, mtime_ns, inode, digest, datetime.now(timezone.utc).isoformat()),
+            )
+
+    def get_hadolint_result(self, dockerfile_digest: str, config_digest: str) -> str | None:
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT output FROM hadolint_results WHERE dockerfile_digest = ? AND config_digest = ?",
+                (dockerfile_digest, config_digest),
+            ).fetchone()
+
+        return row[0] if row else None
+
+    def set_hadolint_result(self, dockerfile_digest: str, config_digest: str, output: str) -> None:
+        with self._lock, self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO hadolint_results (dockerfile_digest, config_digest, output, updated_at) "
+                "VALUES (?, ?, ?, ?)",
+                (dockerfile_digest, config_digest, output, datetime.now(timezone.utc).isoformat()),
+            )
+
+    def get_deployment(self, challenge_key: str, target: str) -> dict[str, str | None] | None:
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT image_digest, port, connection_info, deployed_at FROM deployments "
+                "WHERE challenge_key = ? AND target = ?",
+                (challenge_key, target),
+            ).fetchone()
+
+        if not row:
+            return None
+
+        return {"image_digest": row[0], "port": row[1], "connection_info": row[2], "deployed_at": row[3]}
+
+    def set_deployment(
+        self,
+        challenge_key: str,
+        target: str,
+        image_digest: str,
+        port: str | None = None,
+        connection_info: str | None = None,
+    ) -> None:
+        with self._lock, self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO deployments "
+                "(challenge_key, target, image_digest, port, connection_info, deployed_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (challenge_key, target, image_digest, port, connection_info, datetime.now(timezone.utc).isoformat()),
+            )
+
+    def remove_deployment(self, challenge_key: str, target: str) -> None:
+        with self._lock, self.connection:
+            self.connection.execute(
+                "DELETE FROM deployments WHERE challenge_key = ? AND target = ?",
+                (challenge_key, target),
+            )
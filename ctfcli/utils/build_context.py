@@ -0,0 +1,170 @@
+import hashlib
+import os
+import re
+import stat
+from os import PathLike
+from pathlib import Path
+
+from ctfcli.utils.hashing import hash_paths
+
+# Bump to invalidate all previously computed context digests, if what is included in them changes
+CONTEXT_DIGEST_VERSION = b"ctfcli-build-context-v1"
+
+
+class DockerIgnore:
+    """
+    Matches paths in a build context against the patterns of its .dockerignore, the same way docker does:
+    the last matching pattern wins, patterns starting with ! re-include paths, and a pattern matching a directory
+    matches everything inside it.
+    """
+
+    def __init__(self, patterns: list[str]):
+        # list of (compiled pattern, is exclusion) tuples
+        self.patterns: list[tuple[re.Pattern, bool]] = []
+
+        for pattern in patterns:
+            pattern = pattern.strip()
+            if not pattern or pattern.startswith("#"):
+                continue
+
+            exclusion = pattern.startswith("!")
+            if exclusion:
+                pattern = pattern[1:].strip()
+
+            pattern = os.path.normpath(pattern).replace(os.sep, "/")
+            if len(pattern) > 1 and pattern.startswith("/"):
+                pattern = pattern[1:]
+
+            self.patterns.append((re.compile(self._translate(pattern)), exclusion))
+
+    @classmethod
+    def from_context(cls, context_path: str | PathLike) -> "DockerIgnore":
+        dockerignore_path = Path(context_path) / ".dockerignore"
+        if not dockerignore_path.is_file():
+            return cls([])
+
+        return cls(dockerignore_path.read_text().splitlines())
+
+    @property
+    def has_exclusions(self) -> bool:
+        return any(exclusion for _, exclusion in self.patterns)
+
+    def is_ignored(self, path: str) -> bool:
+        # path is relative to the context, using forward slashes
+        parents = path.split("/")
+        candidates = ["/".join(parents[: idx + 1]) for idx in range(len(parents))]
+
+        ignored = False
+        for pattern, exclusion in self.patterns:
+            if any(pattern.match(candidate) for candidate in candidates):
+                ignored = not exclusion
+
+        return ignored
+
+    @staticmethod
+    def _translate(pattern: str) -> str:
+        regex = ""
+        idx = 0
+        while idx < len(pattern):
+            char = pattern[idx]
+
+            if char == "*":
+                if pattern[idx + 1 : idx + 2] == "*":
+                    idx += 1
+                    # **/ matches any number of directories, including none
+                    if pattern[idx + 1 : idx + 2] == "/":
+                        idx += 1
+                        regex += "(.*/)?"
+                    else:
+                        regex += ".*"
+                else:
+                    regex += "[^/]*"
+            elif char == "?":
+                regex += "[^/]"
+            elif char == "\\" and idx + 1 < len(pattern):
+                idx += 1
+                regex += re.escape(pattern[idx])
+            elif char == "[" and "]" in pattern[idx + 1 :]:
+                end = pattern.index("]", idx + 1)
+                char_class = pattern[idx + 1 : end]
+                if char_class.startswith("!"):
+                    char_class = "^" + char_class[1:]
+                regex += f"[{char_class}]"
+                idx = end
+            else:
+                regex += re.escape(char)
+
+            idx += 1
+
+        return f"^{regex}$"
+
+
+def get_context_paths(context_path: str | PathLike) -> list[str]:
+    """
+    Returns the sorted relative paths of all files, directories and symlinks docker would send as the build context
+    """
+    context_path = Path(context_path)
+    dockerignore = DockerIgnore.from_context(context_path)
+
+    # Ignored directories can only be skipped if no exclusion could re-include something inside them
+    can_skip_directories = not dockerignore.has_exclusions
+
+    paths = []
+    for root, directories, files in os.walk(context_path):
+        relative_root = Path(root).relative_to(context_path).as_posix()
+        prefix = "" if relative_root == "." else f"{relative_root}/"
+
+        for directory in list(directories):
+            relative_path = prefix + directory
+            if dockerignore.is_ignored(relative_path):
+                if can_skip_directories:
+                    directories.remove(directory)
+                continue
+
+            paths.append(relative_path)
+
+        for file in files:
+            relative_path = prefix + file
+            if not dockerignore.is_ignored(relative_path):
+                paths.append(relative_path)
+
+    return sorted(paths)
+
+
+def get_context_digest(context_path: str | PathLike, dockerfile: str = "Dockerfile") -> str:
+    """
+    Returns a digest of everything an image built from the context depends on: the paths, types, permissions
+    and contents of all files which are not excluded by .dockerignore, and the Dockerfile.
+    """
+    context_path = Path(context_path)
+    paths = get_context_paths(context_path)
+
+    entries = []
+    regular_files = []
+    for relative_path in paths:
+        path = context_path / relative_path
+        path_stat = path.lstat()
+        mode = stat.S_IMODE(path_stat.st_mode)
+
+        if stat.S_ISLNK(path_stat.st_mode):
+            entries.append((relative_path, "symlink", mode, os.readlink(path)))
+        elif stat.S_ISDIR(path_stat.st_mode):
+            entries.append((relative_path, "directory", mode, ""))
+        else:
+            entries.append((relative_path, "file", mode, None))
+            regular_files.append(path)
+
+    # Contents of regular files are hashed in parallel, and filled in afterwards
+    file_digests = iter(digests["sha256"] for digests in hash_paths(regular_files, algos=("sha256",)))
+
+    context_hash = hashlib.sha256(CONTEXT_DIGEST_VERSION + b"\0")
+    for relative_path, entry_type, mode, contents in entries:
+        if contents is None:
+            contents = next(file_digests)
+
+        context_hash.update(f"{relative_path}\0{entry_type}\0{mode:o}\0{contents}\0".encode())
+
+    # The Dockerfile is always sent to the builder, even if it's excluded by .dockerignore
+    context_hash.update(b"\0" + (context_path / dockerfile).read_bytes())
+
+    return f"sha256:{context_hash.hexdigest()}"
@@ -0,0 +1,169 @@
+import heapq
+from collections.abc import Callable, Collection, Sequence
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def run_concurrently(
+    func: Callable[[T], R],
+    items: Sequence[T],
+    jobs: int = 1,
+    on_done: Callable[[T, R], Any] | None = None,
+    dependencies: Sequence[Collection[int]] | None = None,
+) -> list[R]:
+    """
+    Calls func for every item using a pool of at most `jobs` worker threads, and returns the results in item order.
+
+    dependencies[i] may list indexes of items which have to finish before item i is started. Items are otherwise
+    started in their original order. If the dependencies contain a cycle, it is broken by starting the first
+    waiting item once nothing else can run.
+
+    on_done is always called from the calling thread as soon as an item finishes, which makes it a safe place to
+    report progress. With jobs <= 1 items are processed sequentially in the calling thread.
+    If func raises, no further items are started and the exception is propagated.
+    """
+    results: list[Any] = [None] * len(items)
+
+    waiting_on = [set(dependencies[idx]) - {idx} if dependencies else set() for idx in range(len(items))]
+    dependents: list[list[int]] = [[] for _ in items]
+    for idx, item_dependencies in enumerate(waiting_on):
+        for dependency in item_dependencies:
+            dependents[dependency].append(idx)
+
+    pending = set(range(len(items)))
+    ready = [idx for idx in pending if not waiting_on[idx]]
+    heapq.heapify(ready)
+
+    def next_item(can_break_cycle: bool) -> int | None:
+        if ready:
+            return heapq.heappop(ready)
+
+        if pending and can_break_cycle:
+            return min(pending)
+
+        return None
+
+    def finish(idx: int, result: Any) -> None:
+        results[idx] = result
+        if on_done:
+            on_done(items[idx], result)
+
+        for dependent in dependents[idx]:
+            waiting_on[dependent].discard(idx)
+            if not waiting_on[dependent] and dependent in pending:
+                heapq.heappush(ready, dependent)
+
+    if jobs <= 1 or len(items) <= 1:
+        while pending:
+            idx = next_item(can_break_cycle=True)
+            pending.discard(idx)
+            finish(idx, func(items[idx]))
+
+        return results
+
+    executor = ThreadPoolExecutor(max_workers=jobs)
+    running: dict[Future, int] = {}
+    try:
+        while pending or running:
+            # Only submit as many items as there are workers, so that a cycle is only broken when the pool is idle
+            while len(running) < jobs:
+                idx = next_item(can_break_cycle=not running)
+                if idx is None:
+                    break
+
+                pending.discard(idx)
+                running[executor.submit(func, items[idx])] = idx
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                finish(running.pop(future), future.result())
+    except BaseException:
+        executor.shutdown(wait=True, cancel_futures=True)
+        raise
+
+    executor.shutdown(wait=True)
+    return results
+
+
+def run_pipeline(
+    items: Sequence[T],
+    stages: Sequence[tuple[Callable[[T], bool], int]],
+    on_done: Callable[[T, int | None], Any] | None = None,
+    dependencies: Sequence[Collection[int]] | None = None,
+) -> list[int | None]:
+    """
+    Passes every item through a sequence of stages, each of which is a (func, jobs) tuple with its own pool of at most
+    `jobs` worker threads. An item moves on to the next stage as soon as the previous one returns True for it, so
+    different items can be in different stages at the same time. Items otherwise enter every stage in their order.
+
+    dependencies[i] may list indexes of items which have to leave a stage before item i enters it. If the
+    dependencies contain a cycle, it is broken by starting the first waiting item once nothing else can run.
+
+    Returns, in item order, the index of the stage which returned False for every item - or None if all stages
+    succeeded. on_done is called from the calling thread as soon as an item passed or failed all stages.
+    If a stage raises, no further items are started and the exception is propagated.
+    """
+    results: list[int | None] = [None] * len(items)
+    if not items or not stages:
+        return results
+
+    waiting_on = [set(dependencies[idx]) - {idx} if dependencies else set() for idx in range(len(items))]
+
+    # Number of stages every item has left, all of them once it failed one
+    passed_stages = [0] * len(items)
+
+    executors = [ThreadPoolExecutor(max_workers=max(jobs, 1)) for _, jobs in stages]
+    queued: list[list[int]] = [list(range(len(items)))] + [[] for _ in stages[1:]]
+    running: dict[Future, tuple[int, int]] = {}
+    running_per_stage = [0] * len(stages)
+
+    def submit(idx: int, stage_idx: int):
+        queued[stage_idx].remove(idx)
+        running[executors[stage_idx].submit(stages[stage_idx][0], items[idx])] = (idx, stage_idx)
+        running_per_stage[stage_idx] += 1
+
+    def finish(idx: int, failed_stage: int | None):
+        passed_stages[idx] = len(stages)
+        results[idx] = failed_stage
+        if on_done is not None:
+            on_done(items[idx], failed_stage)
+
+    try:
+        while running or any(queued):
+            for stage_idx, (_, jobs) in enumerate(stages):
+                for idx in sorted(queued[stage_idx]):
+                    if running_per_stage[stage_idx] >= max(jobs, 1):
+                        break
+
+                    if all(passed_stages[dependency] > stage_idx for dependency in waiting_on[idx]):
+                        submit(idx, stage_idx)
+
+            if not running:
+                # Every queued item waits on another one
+                stage_idx = next(stage_idx for stage_idx, stage_queue in enumerate(queued) if stage_queue)
+                submit(min(queued[stage_idx]), stage_idx)
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                idx, stage_idx = running.pop(future)
+                running_per_stage[stage_idx] -= 1
+
+                if not future.result():
+                    finish(idx, stage_idx)
+                elif stage_idx + 1 < len(stages):
+                    passed_stages[idx] = stage_idx + 1
+                    queued[stage_idx + 1].append(idx)
+                else:
+                    finish(idx, None)
+    except BaseException:
+        for executor in executors:
+            executor.shutdown(wait=True, cancel_futures=True)
+        raise
+
+    for executor in executors:
+        executor.shutdown(wait=True)
+
+    return results
@@ -1,16 +1,102 @@
 import hashlib
+import os
+from collections.abc import Sequence
+from os import PathLike
+from typing import TYPE_CHECKING
+
+from ctfcli.utils.concurrency import run_concurrently
+
+if TYPE_CHECKING:
+    from ctfcli.core.store import Store
+
+# Files are read in large chunks into a single reused buffer. hashlib releases the GIL while hashing
+# chunks of this size, so several files can be hashed in parallel by threads
+CHUNK_SIZE = 1024 * 1024
 
 
 def hash_file(fp, algo="sha1"):
+    return hash_file_digests(fp, algos=(algo,))[algo]
+
+
+def hash_file_digests(fp, algos: Sequence[str] = ("sha1",)) -> dict[str, str]:
+    # Compute several digests of a file object in a single pass
+    for algo in algos:
+        if algo not in hashlib.algorithms_available:
+            raise NotImplementedError
+
     fp.seek(0)
-    if algo == "sha1":
-        h = hashlib.sha1()  # noqa: S324
+    hashes = [hashlib.new(algo) for algo in algos]
+
+    buffer = bytearray(CHUNK_SIZE)
+    view = memoryview(buffer)
+    readinto = getattr(fp, "readinto", None)
+    while True:
+        if readinto is not None:
+            size = readinto(buffer)
+            chunk = view[:size]
+        else:
+            chunk = fp.read(CHUNK_SIZE)
+            size = len(chunk)
+
+        if not size:
+            break
 
-        # https://stackoverflow.com/a/64730457
-        while chunk := fp.read(1024):
+        for h in hashes:
             h.update(chunk)
 
-        fp.seek(0)
-        return h.hexdigest()
+    fp.seek(0)
+    return {algo: h.hexdigest() for algo, h in zip(algos, hashes, strict=True)}
+
+
+def hash_path(path: str | PathLike, algo="sha1", store: "Store | None" = None, rehash: bool = False) -> str:
+    return hash_path_digests(path, algos=(algo,), store=store, rehash=rehash)[algo]
+
+
+def hash_path_digests(
+    path: str | PathLike, algos: Sequence[str] = ("sha1",), store: "Store | None" = None, rehash: bool = False
+) -> dict[str, str]:
+    # Hash a file, reusing the digests cached in the store if the file has not changed since it was last hashed.
+    # Files are identified by (path, size, mtime_ns, inode), so modifying or replacing a file invalidates its digests.
+    # rehash ignores cached digests, and replaces them with freshly computed ones
+    path = os.path.realpath(path)
+    stat = os.stat(path)
+    file_id = (stat.st_size, stat.st_mtime_ns, stat.st_ino)
+
+    digests = {}
+    if store is not None and not rehash:
+        for algo in algos:
+            digest = store.get_file_digest(path, algo, *file_id)
+            if digest is not None:
+                digests[algo] = digest
+
+    # All missing digests are computed in a single pass over the file
+    missing = [algo for algo in algos if algo not in digests]
+    if not missing:
+        return digests
+
+    with open(path, "rb", buffering=0) as fp:
+        computed = hash_file_digests(fp, algos=missing)
+        stat = os.fstat(fp.fileno())
+
+    # Do not cache the digests if the file was modified while it was being hashed
+    if store is not None and (stat.st_size, stat.st_mtime_ns, stat.st_ino) == file_id:
+        for algo, digest in computed.items():
+            store.set_file_digest(path, algo, *file_id, digest)
+
+    return {**digests, **computed}
+
+
+def hash_paths(
+    paths: Sequence[str | PathLike],
+    algos: Sequence[str] = ("sha1",),
+    store: "Store | None" = None,
+    rehash: bool = False,
+    jobs: int | None = None,
+) -> list[dict[str, str]]:
+    # Hash many files in parallel, returning their digests in the order of paths
+    if jobs is None:
+        jobs = min(len(paths), os.cpu_count() or 1)
 
-    raise NotImplementedError
+    return run_concurrently(
+        lambda path: hash_path_digests(path, algos=algos, store=store, rehash=rehash), paths, jobs=jobs
+    )
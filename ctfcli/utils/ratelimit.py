@@ -0,0 +1,51 @@
+import threading
+import time
+from collections.abc import Callable
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket, allowing `rate` acquisitions per second on average, with bursts of up to `capacity`.
+
+    Tokens are reserved ahead of time - a caller which finds the bucket empty takes its token on credit and sleeps
+    until it would have been refilled, so that concurrent callers are served in the order they arrived.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        if rate <= 0:
+            raise ValueError("rate has to be greater than 0")
+
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+
+        self._tokens = self.capacity
+        self._updated_at = clock()
+
+    def acquire(self, tokens: float = 1) -> float:
+        # Returns the time spent waiting for the tokens
+        delay = self.reserve(tokens)
+        if delay > 0:
+            self._sleep(delay)
+
+        return delay
+
+    def reserve(self, tokens: float = 1) -> float:
+        # Takes the tokens without waiting, and returns how long the caller has to wait before using them.
+        # Allows sharing a bucket with callers which cannot block, such as coroutines
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+
+            self._tokens -= tokens
+            return -self._tokens / self.rate if self._tokens < 0 else 0.0
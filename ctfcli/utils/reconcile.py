@@ -0,0 +1,67 @@
+from collections.abc import Callable, Hashable
+from typing import Any
+
+
+class Reconciliation:
+    def __init__(self):
+        # (local index, remote item) pairs which are already identical
+        self.unchanged: list[tuple[int, Any]] = []
+
+        # (local index, remote item) pairs where the remote item should be updated in place
+        self.updated: list[tuple[int, Any]] = []
+
+        # local indexes which have no remote counterpart and have to be created
+        self.created: list[int] = []
+
+        # remote items which have no local counterpart and have to be deleted
+        self.deleted: list[Any] = []
+
+    @property
+    def has_changes(self) -> bool:
+        return bool(self.updated or self.created or self.deleted)
+
+
+def reconcile(
+    local_items: list[Any],
+    remote_items: list[Any],
+    key: Callable[[Any], Hashable],
+    remote_key: Callable[[Any], Hashable] | None = None,
+    allow_updates: bool = True,
+) -> Reconciliation:
+    """
+    Computes the minimal set of operations required to turn remote_items into local_items.
+
+    Items are compared by their key. Identical items (including duplicates) are matched first, in order.
+    Remaining remote items are then reused for the remaining local items by updating them in place
+    (unless allow_updates is False), and whatever is left over is either created or deleted.
+    """
+    if remote_key is None:
+        remote_key = key
+
+    reconciliation = Reconciliation()
+
+    # Group remote items by their key, preserving the order so that duplicates are matched in order
+    remote_by_key: dict[Hashable, list[Any]] = {}
+    for remote_item in remote_items:
+        remote_by_key.setdefault(remote_key(remote_item), []).append(remote_item)
+
+    unmatched_local = []
+    for local_index, local_item in enumerate(local_items):
+        candidates = remote_by_key.get(key(local_item))
+        if candidates:
+            reconciliation.unchanged.append((local_index, candidates.pop(0)))
+        else:
+            unmatched_local.append(local_index)
+
+    # Collect leftover remote items in their original order
+    leftover = {id(remote_item) for candidates in remote_by_key.values() for remote_item in candidates}
+    unmatched_remote = [remote_item for remote_item in remote_items if id(remote_item) in leftover]
+
+    if allow_updates:
+        while unmatched_local and unmatched_remote:
+            reconciliation.updated.append((unmatched_local.pop(0), unmatched_remote.pop(0)))
+
+    reconciliation.created = unmatched_local
+    reconciliation.deleted = unmatched_remote
+
+    return reconciliation
@@ -0,0 +1,122 @@
+import base64
+import json
+import logging
+import os
+import subprocess
+import threading
+from collections.abc import Callable
+from pathlib import Path
+
+log = logging.getLogger("ctfcli.utils.registry")
+
+
+def get_docker_config() -> dict:
+    config_directory = os.environ.get("DOCKER_CONFIG") or Path.home() / ".docker"
+
+    try:
+        config = json.loads((Path(config_directory) / "config.json").read_text())
+    except (OSError, ValueError):
+        return {}
+
+    return config if isinstance(config, dict) else {}
+
+
+def get_stored_username(registry: str) -> str | None:
+    """
+    Returns the username of the credentials docker has stored for the registry, either in a credential helper
+    or in its config file, or None if there are none
+    """
+    config = get_docker_config()
+
+    helper = config.get("credHelpers", {}).get(registry) or config.get("credsStore")
+    if helper:
+        return _get_helper_username(helper, registry)
+
+    for server, auth in config.get("auths", {}).items():
+        # Servers may be stored as URLs, e.g. https://index.docker.io/v1/
+        if server.split("://")[-1].split("/")[0] != registry or not isinstance(auth, dict):
+            continue
+
+        try:
+            username, password = base64.b64decode(auth.get("auth", "")).decode().split(":", 1)
+        except ValueError:
+            continue
+
+        if username and password:
+            return username
+
+    return None
+
+
+def _get_helper_username(helper: str, registry: str) -> str | None:
+    helper_command = [f"docker-credential-{helper}", "get"]
+
+    log.debug(f"_get_helper_username: {helper_command} ({registry=})")
+    try:
+        credentials = subprocess.run(helper_command, input=registry.encode(), capture_output=True)
+    except OSError:
+        return None
+
+    if credentials.returncode != 0:
+        return None
+
+    try:
+        credentials = json.loads(credentials.stdout)
+    except ValueError:
+        return None
+
+    if not isinstance(credentials, dict) or not credentials.get("Secret"):
+        return None
+
+    return credentials.get("Username") or None
+
+
+class RegistryLogins:
+    """
+    Logins to docker registries, shared by all deployments in this process, so that every registry is only logged in
+    to once. Concurrent deployments to the same registry wait for a single login, and share its result.
+    """
+
+    def __init__(self):
+        # whether logging in succeeded for every registry it was attempted for
+        self.results: dict[str, bool] = {}
+
+        self._lock = threading.Lock()
+        self._registry_locks: dict[str, threading.Lock] = {}
+
+    def login(
+        self,
+        registry: str,
+        login: Callable[[], bool],
+        accepts_username: Callable[[str], bool] | None = None,
+    ) -> bool:
+        """
+        Logs in to the registry with the login function, unless docker already stores credentials for it
+        with a username accepted by accepts_username
+        """
+        with self._lock:
+            registry_lock = self._registry_locks.setdefault(registry, threading.Lock())
+
+        with registry_lock:
+            if registry not in self.results:
+                self.results[registry] = self._login(registry, login, accepts_username)
+
+            return self.results[registry]
+
+    def _login(self, registry: str, login: Callable[[], bool], accepts_username: Callable[[str], bool] | None) -> bool:
+        if accepts_username is not None:
+            username = get_stored_username(registry)
+            if username and accepts_username(username):
+                log.debug(f"_login: using the stored credentials of {username} for {registry}")
+                return True
+
+        return login()
+
+    def clear(self) -> None:
+        with self._lock:
+            self.results.clear()
+            self._registry_locks.clear()
+
+
+# Shared by all deployments in this process
+registry_logins = RegistryLogins()
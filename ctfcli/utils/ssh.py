@@ -0,0 +1,110 @@
+import atexit
+import hashlib
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+
+log = logging.getLogger("ctfcli.utils.ssh")
+
+
+class SSHConnections:
+    """
+    Multiplexed SSH connections (ControlMaster), so that all commands sent to a host share a single connection and
+    only authenticate once. A master connection is started for every host on first use, and kept until close().
+    """
+
+    def __init__(self, persist: int = 60):
+        # Masters exit after being idle for this many seconds, in case they are not closed
+        self.persist = persist
+
+        self.control_directory: str | None = None
+
+        # whether a master could be started for every host (netloc) it was requested for
+        self.masters: dict[str, bool] = {}
+
+        self._lock = threading.Lock()
+        self._host_locks: dict[str, threading.Lock] = {}
+
+    def get_options(self, netloc: str) -> list[str]:
+        """
+        Returns the options which make ssh / scp reuse the connection to the host, starting it if required.
+        If the connection cannot be multiplexed, commands open their own connections as usual.
+        """
+        # Windows builds of OpenSSH do not support ControlMaster
+        if os.name == "nt":
+            return []
+
+        with self._lock:
+            if self.control_directory is None:
+                self.control_directory = tempfile.mkdtemp(prefix="ctfcli-ssh-")
+
+            host_lock = self._host_locks.setdefault(netloc, threading.Lock())
+
+        # Hosts are connected to concurrently, but every master is only started once
+        with host_lock:
+            if netloc not in self.masters:
+                self.masters[netloc] = self._start_master(netloc)
+
+        if not self.masters[netloc]:
+            return []
+
+        return ["-o", f"ControlPath={self.get_control_path(netloc)}"]
+
+    def get_control_path(self, netloc: str) -> str:
+        # Sockets are keyed by host. Paths of unix sockets are limited to ~100 characters, hence the short digest
+        return os.path.join(self.control_directory, hashlib.sha256(netloc.encode()).hexdigest()[:16])
+
+    def _start_master(self, netloc: str) -> bool:
+        # -f returns as soon as the connection is authenticated, and leaves the master running in the background.
+        # Its output is discarded, as the background process would otherwise keep the pipes open
+        master_command = [
+            "ssh",
+            "-f",
+            "-N",
+            "-o",
+            "ControlMaster=yes",
+            "-o",
+            f"ControlPersist={self.persist}",
+            "-o",
+            f"ControlPath={self.get_control_path(netloc)}",
+            netloc,
+        ]
+
+        log.debug(f"_start_master: {master_command}")
+        try:
+            ssh_master = subprocess.run(master_command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        except OSError:
+            log.debug(f"_start_master: could not start a master for {netloc}", exc_info=True)
+            return False
+
+        return ssh_master.returncode == 0
+
+    def close(self) -> None:
+        with self._lock:
+            for netloc, started in self.masters.items():
+                if not started:
+                    continue
+
+                try:
+                    subprocess.run(
+                        ["ssh", "-o", f"ControlPath={self.get_control_path(netloc)}", "-O", "exit", netloc],
+                        stdout=subprocess.DEVNULL,
+                        stderr=subprocess.DEVNULL,
+                    )
+                except OSError:
+                    log.debug(f"close: could not stop the master for {netloc}", exc_info=True)
+
+            self.masters.clear()
+            self._host_locks.clear()
+
+            if self.control_directory is not None:
+                shutil.rmtree(self.control_directory, ignore_errors=True)
+                self.control_directory = None
+
+
+# Shared by all deployments in this process, and closed when it exits
+ssh_connections = SSHConnections()
+atexit.register(ssh_connections.close)
@@ -1,27 +1,127 @@
+import mmap
 import re
-import string
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager
 
+# string.printable as a bytes character class
+PRINTABLE_BYTES = rb"\t\n\x0b\x0c\r\x20-\x7e"
 
-def strings(filename, min_length=4):
+# Printable runs longer than this are split, so that scanning a file never holds more than this in memory
+STRINGS_MAX_LENGTH = 1024 * 1024
+
+
+@contextmanager
+def _map_file(filename):
+    # Map the file into memory instead of reading it, so that multi-GB files can be scanned with bounded memory
+    with open(filename, "rb") as f:
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # empty files cannot be mapped
+            yield b""
+            return
+
+        try:
+            yield data
+        finally:
+            data.close()
+
+
+def _get_strings_pattern(min_length: int, max_length: int, utf16: bool) -> re.Pattern:
+    if not utf16:
+        return re.compile(rb"[%s]{%d,%d}" % (PRINTABLE_BYTES, min_length, max_length))
+
+    # Both kinds of strings start with a printable byte - matching it once keeps the alternation cheap
+    return re.compile(
+        rb"[%s](?:(?P<ascii>[%s]{%d,%d})|\x00(?P<utf16>(?:[%s]\x00){%d,%d}))"
+        % (
+            PRINTABLE_BYTES,
+            PRINTABLE_BYTES,
+            min_length - 1,
+            max_length - 1,
+            PRINTABLE_BYTES,
+            min_length - 1,
+            max_length - 1,
+        )
+    )
+
+
+def strings(filename, min_length=4, utf16=False, max_length=STRINGS_MAX_LENGTH) -> Iterator[str]:
     """
     Python implementation of strings
-    https://stackoverflow.com/a/17197027
+
+    Scans the bytes of the file in a single linear pass for runs of at least min_length printable characters.
+    With utf16, printable UTF-16LE strings are found as well.
+    """
+    pattern = _get_strings_pattern(min_length, max_length, utf16)
+
+    with _map_file(filename) as data:
+        for match in pattern.finditer(data):
+            if match.lastgroup == "utf16":
+                yield match.group().decode("utf-16-le")
+            else:
+                yield match.group().decode("ascii")
+
+
+def get_flag_pattern(flag_formats: Sequence[str] = (), flag_regexes: Sequence[str] = ()) -> re.Pattern | None:
+    # Combine literal flag formats and regular expressions, so that strings only have to be searched once
+    alternatives = [re.escape(flag_format) for flag_format in flag_formats if flag_format]
+    alternatives.extend(f"(?:{flag_regex})" for flag_regex in flag_regexes if flag_regex)
+
+    if not alternatives:
+        return None
+
+    return re.compile("|".join(alternatives))
+
+
+def _get_flag_bytes_pattern(flag_pattern: re.Pattern) -> re.Pattern | None:
+    # Not every str pattern has a bytes equivalent - e.g. \N{...} or \uXXXX escapes, and non-ASCII characters
+    if not flag_pattern.pattern.isascii():
+        return None
+
+    try:
+        return re.compile(flag_pattern.pattern.encode("ascii"))
+    except re.error:
+        return None
+
+
+def find_flags(
+    filename,
+    flag_formats: Sequence[str] = (),
+    flag_regexes: Sequence[str] = (),
+    utf16=False,
+    min_length=4,
+    max_length=STRINGS_MAX_LENGTH,
+) -> Iterator[str]:
+    """
+    Yields strings of the file which contain any of the flag formats, or match any of the flag regexes
+
+    All formats and regexes are looked for in the same single pass over the file as the strings themselves.
     """
-    with open(filename, errors="ignore") as f:
-        result = ""
+    flag_pattern = get_flag_pattern(flag_formats, flag_regexes)
+    if flag_pattern is None:
+        return
 
-        for c in f.read():
-            if c in string.printable:
-                result += c
-                continue
+    # Search ASCII strings without decoding the ones which do not contain a flag, unless the pattern can only be
+    # used on decoded strings. Every string is searched on its own, so that anchors match at its start and end
+    flag_bytes_pattern = _get_flag_bytes_pattern(flag_pattern)
+    pattern = _get_strings_pattern(min_length, max_length, utf16)
 
-            if len(result) >= min_length:
-                yield result
+    with _map_file(filename) as data:
+        for match in pattern.finditer(data):
+            if match.lastgroup == "utf16":
+                s = match.group().decode("utf-16-le")
+                if flag_pattern.search(s):
+                    yield s
 
-            result = ""
+            elif flag_bytes_pattern is not None:
+                if flag_bytes_pattern.search(match.group()):
+                    yield match.group().decode("ascii")
 
-        if len(result) >= min_length:  # catch result at EOF
-            yield result
+            else:
+                s = match.group().decode("ascii")
+                if flag_pattern.search(s):
+                    yield s
 
 
 def safe_format(fmt, items):
@@ -0,0 +1,455 @@
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+from unittest.mock import MagicMock, call
+
+from ctfcli.cli.challenges import ChallengeCommand
+from ctfcli.core.challenge import Challenge
+from ctfcli.core.deployment.base import DeploymentResult
+from ctfcli.core.exceptions import ChallengeException
+from ctfcli.core.remote import RemoteState
+from ctfcli.core.store import Store
+
+BASE_DIR = Path(__file__).parent.parent
+
+
+class TestChallengeDependencies(unittest.TestCase):
+    minimal_challenge = BASE_DIR / "fixtures" / "challenges" / "test-challenge-minimal" / "challenge.yml"
+
+    @mock.patch("ctfcli.core.challenge.click.secho")
+    def test_sets_next_once_all_challenges_are_created(self, mock_secho: MagicMock):
+        remote_challenges = []
+
+        def mock_post(*args, **kwargs):
+            mock_response = MagicMock()
+            if args[0] == "/api/v1/challenges":
+                challenge_data = {**kwargs["json"], "id": len(remote_challenges) + 1}
+                remote_challenges.append(challenge_data)
+                mock_response.json.return_value = {"success": True, "data": challenge_data}
+
+            return mock_response
+
+        mock_api = MagicMock()
+        mock_api.post.side_effect = mock_post
+
+        # The first challenge points to the next one, which in turn requires the first
+        remote_state = RemoteState(api=mock_api)
+        challenges = [
+            Challenge(
+                self.minimal_challenge,
+                {"name": "Second Challenge", "requirements": ["First Challenge"]},
+                remote_state=remote_state,
+            ),
+            Challenge(
+                self.minimal_challenge,
+                {"name": "First Challenge", "next": "Second Challenge"},
+                remote_state=remote_state,
+            ),
+        ]
+        self.assertEqual(ChallengeCommand._get_challenge_dependencies(challenges), [{1}, set()])
+
+        def install_challenge(challenge_instance: Challenge) -> bool:
+            challenge_instance.create()
+            return True
+
+        with mock.patch.object(RemoteState, "load_challenges", side_effect=lambda: list(remote_challenges)):
+            results = ChallengeCommand._run_with_progress(install_challenge, challenges, "Installing challenges")
+
+        self.assertEqual(results, [True, True])
+        self.assertEqual([c["name"] for c in remote_challenges], ["First Challenge", "Second Challenge"])
+
+        self.assertEqual(
+            mock_api.patch.mock_calls,
+            [
+                call("/api/v1/challenges/2", json={"requirements": {"prerequisites": [1], "anonymize": False}}),
+                call().raise_for_status(),
+                call("/api/v1/challenges/2", json={"next_id": None}),
+                call().raise_for_status(),
+                call("/api/v1/challenges/1", json={"next_id": 2}),
+                call().raise_for_status(),
+            ],
+        )
+        self.assertNotIn(
+            call(
+                "Challenge cannot find next challenge. Maybe it is invalid name or id. It will be cleared.",
+                fg="yellow",
+            ),
+            mock_secho.call_args_list,
+        )
+        self.assertFalse(challenges[1].next_pending)
+
+
+class TestDeployChallenges(unittest.TestCase):
+    minimal_challenge = BASE_DIR / "fixtures" / "challenges" / "test-challenge-minimal" / "challenge.yml"
+
+    def setUp(self):
+        self.project_path = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.project_path)
+        (self.project_path / ".ctf").mkdir()
+
+        self.challenges: list[Challenge] = []
+        self.output: list[str] = []
+
+        # names of challenges failing the respective stage
+        self.failing_builds: set[str] = set()
+        self.failing_deployments: set[str] = set()
+        self.failing_syncs: set[str] = set()
+
+        mock_config = MagicMock(project_path=self.project_path)
+        mock_config.config.get.return_value = "https://example.com/"
+
+        self.mock_handler_class = MagicMock(side_effect=self.mock_deployment_handler)
+
+        patchers = [
+            mock.patch("ctfcli.cli.challenges.Config", return_value=mock_config),
+            mock.patch("ctfcli.cli.challenges.API"),
+            mock.patch("ctfcli.cli.challenges.RemoteState"),
+            mock.patch.object(ChallengeCommand, "_resolve_all_challenges", side_effect=lambda **_: self.challenges),
+            mock.patch.object(Challenge, "resolve_images", return_value=[]),
+            mock.patch.object(Challenge, "save"),
+            mock.patch.object(Challenge, "sync", autospec=True, side_effect=self.mock_sync),
+            mock.patch("ctfcli.cli.challenges.get_deployment_handler", return_value=self.mock_handler_class),
+            mock.patch(
+                "ctfcli.cli.challenges.click.secho", side_effect=lambda message, **_: self.output.append(message)
+            ),
+            mock.patch(
+                "ctfcli.cli.challenges.click.echo", side_effect=lambda message="", **_: self.output.append(message)
+            ),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        build_images_patcher = mock.patch("ctfcli.cli.challenges.build_images", side_effect=self.mock_build_images)
+        self.mock_build_images_function = build_images_patcher.start()
+        self.addCleanup(build_images_patcher.stop)
+
+        bake_patcher = mock.patch("ctfcli.cli.challenges.is_bake_available", return_value=True)
+        self.mock_is_bake_available = bake_patcher.start()
+        self.addCleanup(bake_patcher.stop)
+
+    def add_challenge(self, name: str) -> Challenge:
+        challenge_path = self.project_path / name.lower().replace(" ", "-") / "challenge.yml"
+        challenge_path.parent.mkdir()
+        shutil.copy(self.minimal_challenge, challenge_path)
+
+        challenge = Challenge(challenge_path, {"name": name, "image": "."})
+        challenge.image = MagicMock(built=False, build_path=challenge_path.parent)
+        challenge.image.build.side_effect = lambda: None if name in self.failing_builds else "built"
+        challenge.image.get_digest.return_value = f"sha256:{name}"
+
+        self.challenges.append(challenge)
+        return challenge
+
+    def mock_build_images(self, images):
+        results = []
+        for image in images:
+            challenge = next(c for c in self.challenges if c.image is image)
+            image.built = challenge["name"] not in self.failing_builds
+            results.append(image.built)
+
+        return results
+
+    def mock_deployment_handler(self, challenge_instance: Challenge, **kwargs):
+        success = challenge_instance["name"] not in self.failing_deployments
+        return MagicMock(
+            deploy=MagicMock(return_value=DeploymentResult(success, connection_info="nc example.com 1337"))
+        )
+
+    def mock_sync(self, challenge_instance: Challenge, **kwargs):
+        if challenge_instance["name"] in self.failing_syncs:
+            raise ChallengeException("sync failed")
+
+    def deploy(self, **kwargs) -> int:
+        with contextlib.redirect_stdout(io.StringIO()):
+            return ChallengeCommand().deploy(**kwargs)
+
+    def get_deployed_names(self) -> list[str]:
+        return [c.args[0]["name"] for c in self.mock_handler_class.call_args_list]
+
+    def get_synced_names(self) -> list[str]:
+        return [c.args[0]["name"] for c in Challenge.sync.call_args_list]  # type: ignore
+
+    def assert_reports_failures_per_stage(self):
+        for name in ["Build Failure", "Deploy Failure", "Sync Failure", "Success"]:
+            self.add_challenge(name)
+
+        self.failing_builds = {"Build Failure"}
+        self.failing_deployments = {"Deploy Failure"}
+        self.failing_syncs = {"Sync Failure"}
+
+        self.assertEqual(self.deploy(jobs=2), 1)
+
+        # a failing stage only stops the later stages of the same challenge
+        self.assertEqual(sorted(self.get_deployed_names()), ["Deploy Failure", "Success", "Sync Failure"])
+        self.assertEqual(sorted(self.get_synced_names()), ["Success", "Sync Failure"])
+
+        self.assertIn("Could not build the image of challenge 'Build Failure'", self.output)
+        self.assertIn("An error occurred during service deployment of 'Deploy Failure'!", self.output)
+        self.assertEqual(
+            self.output[-5:],
+            [
+                "Deployment failed for:",
+                " - Build Failure",
+                " - Deploy Failure",
+                "Install / Sync failed for:",
+                " - Sync Failure",
+            ],
+        )
+
+    def test_reports_failures_per_stage_with_bake(self):
+        self.assert_reports_failures_per_stage()
+
+        # all images are built in a single bake, before the pipeline
+        self.mock_build_images_function.assert_called_once_with([c.image for c in self.challenges])
+        for challenge in self.challenges:
+            challenge.image.build.assert_not_called()
+
+    def test_reports_failures_per_stage_without_bake(self):
+        self.mock_is_bake_available.return_value = False
+        self.assert_reports_failures_per_stage()
+
+        # images are built by the build stage of the pipeline
+        self.mock_build_images_function.assert_not_called()
+        for challenge in self.challenges:
+            challenge.image.build.assert_called_once_with()
+
+    def get_deployment(self, challenge: Challenge, target: str) -> dict | None:
+        store = Store(self.project_path)
+        return store.get_deployment(store.get_challenge_key(challenge.challenge_file_path), target)
+
+    def test_skips_unchanged_deployments(self):
+        challenge = self.add_challenge("Test Challenge")
+
+        self.assertEqual(self.deploy(changed_only=True), 0)
+        self.assertEqual(self.get_deployment(challenge, "https://example.com")["image_digest"], "sha256:Test Challenge")
+
+        self.mock_handler_class.reset_mock()
+        Challenge.sync.reset_mock()  # type: ignore
+
+        self.assertEqual(self.deploy(changed_only=True), 0)
+        self.assertIn("Skipping 'Test Challenge' - its image is unchanged since it was last deployed", self.output)
+        self.mock_handler_class.assert_not_called()
+
+        # the challenge is still synced
+        self.assertEqual(self.get_synced_names(), ["Test Challenge"])
+
+        # the image changed
+        challenge.image.get_digest.return_value = "sha256:changed"
+        self.assertEqual(self.deploy(changed_only=True), 0)
+        self.assertEqual(self.get_deployed_names(), ["Test Challenge"])
+        self.assertEqual(self.get_deployment(challenge, "https://example.com")["image_digest"], "sha256:changed")
+
+    def test_deploys_unchanged_image_to_new_host(self):
+        challenge = self.add_challenge("Test Challenge")
+
+        self.assertEqual(self.deploy(host="ssh://root@first.example.com", changed_only=True), 0)
+        self.assertEqual(self.deploy(host="ssh://root@second.example.com", changed_only=True), 0)
+
+        self.assertEqual(self.get_deployed_names(), ["Test Challenge", "Test Challenge"])
+        self.assertIsNotNone(self.get_deployment(challenge, "ssh://root@first.example.com"))
+        self.assertIsNotNone(self.get_deployment(challenge, "ssh://root@second.example.com"))
+
+    def test_does_not_record_failed_deployments(self):
+        challenge = self.add_challenge("Test Challenge")
+
+        for failing_stage in [self.failing_deployments, self.failing_syncs]:
+            failing_stage.add("Test Challenge")
+            self.mock_handler_class.reset_mock()
+
+            self.assertEqual(self.deploy(changed_only=True), 1)
+            self.assertEqual(self.get_deployed_names(), ["Test Challenge"])
+            self.assertIsNone(self.get_deployment(challenge, "https://example.com"))
+
+            failing_stage.clear()
+
+        # the challenge is deployed again, as no deployment has been recorded
+        self.mock_handler_class.reset_mock()
+        self.assertEqual(self.deploy(changed_only=True), 0)
+        self.assertEqual(self.get_deployed_names(), ["Test Challenge"])
+        self.assertIsNotNone(self.get_deployment(challenge, "https://example.com"))
+
+
+class MockCTFd:
+    """Minimal in-memory CTFd challenges API"""
+
+    def __init__(self):
+        self.challenges: dict[int, dict] = {}
+
+    @staticmethod
+    def respond(data=None, ok=True) -> MagicMock:
+        mock_response = MagicMock(ok=ok, status_code=200 if ok else 404)
+        mock_response.json.return_value = {"success": ok, "data": data}
+        return mock_response
+
+    def get(self, path: str, *args, **kwargs) -> MagicMock:
+        path = path.split("?")[0]
+        if path == "/api/v1/challenges":
+            return self.respond(list(self.challenges.values()))
+
+        if path.startswith("/api/v1/challenges/") and path.split("/")[-1].isdigit():
+            challenge_id = int(path.split("/")[-1])
+            if challenge_id not in self.challenges:
+                return self.respond(ok=False)
+
+            return self.respond(self.challenges[challenge_id])
+
+        return self.respond([])
+
+    def post(self, path: str, *args, **kwargs) -> MagicMock:
+        if path == "/api/v1/challenges":
+            challenge_id = len(self.challenges) + 1
+            self.challenges[challenge_id] = {**kwargs["json"], "id": challenge_id}
+            return self.respond(self.challenges[challenge_id])
+
+        if path == "/api/v1/solutions":
+            return self.respond({"id": 1})
+
+        if path == "/api/v1/files" and kwargs.get("data", {}).get("type") == "solution":
+            return self.respond([{"location": f"solution/{kwargs['files']['file'][0]}"}])
+
+        return self.respond({})
+
+    def patch(self, path: str, *args, **kwargs) -> MagicMock:
+        if path.startswith("/api/v1/challenges/"):
+            self.challenges[int(path.split("/")[-1])].update(kwargs["json"])
+
+        return self.respond({})
+
+    def delete(self, *args, **kwargs) -> MagicMock:
+        return self.respond({})
+
+
+class TestInstallAndSyncChallenges(unittest.TestCase):
+    def setUp(self):
+        self.project_path = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.project_path)
+        (self.project_path / ".ctf").mkdir()
+
+        self.challenge_path = self.project_path / "test-challenge" / "challenge.yml"
+        (self.challenge_path.parent / "dist").mkdir(parents=True)
+        (self.challenge_path.parent / "dist" / "file.txt").write_text("first")
+        self.write_challenge(name="Test Challenge")
+
+        self.ctfd = MockCTFd()
+        self.mock_api = MagicMock(wraps=self.ctfd)
+        self.output: list[str] = []
+
+        mock_config = MagicMock(project_path=self.project_path)
+        mock_config.config.get.return_value = "https://example.com/"
+
+        patchers = [
+            mock.patch("ctfcli.cli.challenges.Config", return_value=mock_config),
+            mock.patch("ctfcli.cli.challenges.API"),
+            mock.patch("ctfcli.core.remote.API.shared", return_value=self.mock_api),
+            mock.patch.object(
+                ChallengeCommand,
+                "_resolve_all_challenges",
+                side_effect=lambda remote_state=None: [Challenge(self.challenge_path, remote_state=remote_state)],
+            ),
+            mock.patch(
+                "ctfcli.cli.challenges.click.secho", side_effect=lambda message, **_: self.output.append(message)
+            ),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def write_challenge(self, name: str):
+        self.challenge_path.write_text(
+            f"name: {name}\ncategory: Test\ndescription: Test\nvalue: 100\ntype: standard\n"
+            "files:\n  - dist/file.txt\nstate: visible\n"
+        )
+
+    def run_command(self, command: str, **kwargs) -> int:
+        self.output.clear()
+        self.mock_api.reset_mock()
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            return getattr(ChallengeCommand(), command)(**kwargs)
+
+    def was_processed(self) -> bool:
+        return any(c.args[0].startswith("/api/v1/challenges") for c in self.mock_api.patch.call_args_list)
+
+    def test_skips_unchanged_challenges(self):
+        self.assertEqual(self.run_command("install"), 0)
+        self.assertEqual(list(self.ctfd.challenges), [1])
+
+        self.assertEqual(self.run_command("install"), 0)
+        self.assertIn("Skipping 'Test Challenge' - no changes since it was last installed", self.output)
+        self.mock_api.post.assert_not_called()
+
+        self.assertEqual(self.run_command("sync"), 0)
+        self.assertIn("Skipping 'Test Challenge' - no changes since it was last synced", self.output)
+        self.assertFalse(self.was_processed())
+
+        # changes to the challenge are synced
+        (self.challenge_path.parent / "dist" / "file.txt").write_text("changed")
+        self.assertEqual(self.run_command("sync"), 0)
+        self.assertTrue(self.was_processed())
+
+    def test_full_processes_unchanged_challenges(self):
+        self.assertEqual(self.run_command("install"), 0)
+
+        self.assertEqual(self.run_command("sync", full=True), 0)
+        self.assertTrue(self.was_processed())
+
+        # installing again finds the existing challenge
+        self.assertEqual(self.run_command("install", full=True), 1)
+        self.assertEqual(self.run_command("install", full=True, force=True), 0)
+        self.assertTrue(self.was_processed())
+        self.assertEqual(list(self.ctfd.challenges), [1])
+
+    def test_rehash_detects_changes_with_unchanged_file_metadata(self):
+        self.assertEqual(self.run_command("install"), 0)
+
+        # change the file, without changing its size or modification time
+        file_path = self.challenge_path.parent / "dist" / "file.txt"
+        file_stat = file_path.stat()
+        file_path.write_text("other")
+        os.utime(file_path, ns=(file_stat.st_atime_ns, file_stat.st_mtime_ns))
+
+        self.assertEqual(self.run_command("sync"), 0)
+        self.assertFalse(self.was_processed())
+
+        self.assertEqual(self.run_command("sync", rehash=True), 0)
+        self.assertTrue(self.was_processed())
+
+    def test_syncs_challenges_when_only_a_solution_image_changes(self):
+        challenge_directory = self.challenge_path.parent
+        (challenge_directory / "writeup").mkdir()
+        (challenge_directory / "writeup" / "solution.md").write_text("Solved it:\n\n![flag](images/flag.png)\n")
+        (challenge_directory / "writeup" / "images").mkdir()
+        (challenge_directory / "writeup" / "images" / "flag.png").write_bytes(b"first")
+        with self.challenge_path.open("a") as challenge_file:
+            challenge_file.write("solution: writeup/solution.md\n")
+
+        self.assertEqual(self.run_command("install"), 0)
+
+        self.assertEqual(self.run_command("sync"), 0)
+        self.assertIn("Skipping 'Test Challenge' - no changes since it was last synced", self.output)
+
+        (challenge_directory / "writeup" / "images" / "flag.png").write_bytes(b"changed")
+        self.assertEqual(self.run_command("sync"), 0)
+        self.assertTrue(self.was_processed())
+
+    def test_updates_renamed_challenge_in_place(self):
+        self.assertEqual(self.run_command("install"), 0)
+
+        self.write_challenge(name="Renamed Challenge")
+        self.assertEqual(self.run_command("sync"), 0)
+
+        self.assertEqual(list(self.ctfd.challenges), [1])
+        self.assertEqual(self.ctfd.challenges[1]["name"], "Renamed Challenge")
+        self.assertNotIn(call("/api/v1/challenges", json=mock.ANY), self.mock_api.post.call_args_list)
+
+        # the renamed challenge is remembered as well
+        self.write_challenge(name="Test Challenge")
+        self.assertEqual(self.run_command("install", force=True), 0)
+        self.assertEqual(list(self.ctfd.challenges), [1])
+        self.assertEqual(self.ctfd.challenges[1]["name"], "Test Challenge")
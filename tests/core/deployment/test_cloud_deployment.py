@@ -3,9 +3,11 @@ from pathlib import Path
 from unittest import mock
 from unittest.mock import MagicMock, call
 
+from ctfcli.core.api import API
 from ctfcli.core.challenge import Challenge
 from ctfcli.core.deployment import CloudDeploymentHandler
 from ctfcli.core.deployment.base import DeploymentResult
+from ctfcli.utils.registry import RegistryLogins
 
 BASE_DIR = Path(__file__).parent.parent.parent
 
@@ -32,8 +34,32 @@ class TestCloudDeployment(unittest.TestCase):
         },
     }
 
+    def sleep(self, seconds: float):
+        self.now += seconds
+
+    def setUp(self):
+        # tests which do not mock the API use a client for the project of their challenge
+        shared_api_patcher = mock.patch.object(API, "_shared", None)
+        shared_api_patcher.start()
+        self.addCleanup(shared_api_patcher.stop)
+
+        # time only passes while sleeping, unless a test advances it
+        self.now = 0.0
+        monotonic_patcher = mock.patch("ctfcli.core.deployment.cloud.time.monotonic", side_effect=lambda: self.now)
+        monotonic_patcher.start()
+        self.addCleanup(monotonic_patcher.stop)
+
+        # every test logs in on its own, and docker does not store any credentials
+        logins_patcher = mock.patch.object(CloudDeploymentHandler, "logins", RegistryLogins())
+        logins_patcher.start()
+        self.addCleanup(logins_patcher.stop)
+
+        docker_config_patcher = mock.patch("ctfcli.utils.registry.get_docker_config", return_value={})
+        docker_config_patcher.start()
+        self.addCleanup(docker_config_patcher.stop)
+
     @mock.patch("ctfcli.core.config.Path.cwd", return_value=challenge_directory)
-    @mock.patch("ctfcli.core.deployment.cloud.API")
+    @mock.patch("ctfcli.core.deployment.cloud.API.shared")
     @mock.patch("ctfcli.core.deployment.cloud.click.secho")
     def test_fails_deployment_if_challenge_does_not_provide_image(self, mock_secho: MagicMock, *args, **kwargs):
         challenge = Challenge(self.challenge_path, {"image": None})
@@ -46,7 +72,7 @@ class TestCloudDeployment(unittest.TestCase):
         mock_secho.assert_called_once_with("Challenge does not define an image to deploy", fg="red")
 
     @mock.patch("ctfcli.core.config.Path.cwd", return_value=challenge_directory)
-    @mock.patch("ctfcli.core.deployment.cloud.API")
+    @mock.patch("ctfcli.core.deployment.cloud.API.shared")
     @mock.patch("ctfcli.core.deployment.cloud.click.secho")
     def test_fails_deployment_if_instance_does_not_support_deployments(
         self, mock_secho: MagicMock, mock_api_constructor: MagicMock, *args, **kwargs
@@ -70,7 +96,7 @@ class TestCloudDeployment(unittest.TestCase):
     @mock.patch("ctfcli.core.config.Path.cwd", return_value=challenge_directory)
     @mock.patch("ctfcli.core.deployment.cloud.click.secho")
     @mock.patch("ctfcli.core.challenge.Image")
-    @mock.patch("ctfcli.core.deployment.cloud.API")
+    @mock.patch("ctfcli.core.deployment.cloud.API.shared")
     def test_fails_deployment_if_image_build_failed(
         self,
         mock_api_constructor: MagicMock,
@@ -110,8 +136,7 @@ class TestCloudDeployment(unittest.TestCase):
 
         mock_api.get.assert_has_calls(
             [
-                call("/api/v1/images"),  # check if deployments are supported
-                call("/api/v1/images"),  # get image information
+                call("/api/v1/images"),  # check if deployments are supported & get existing images
             ]
         )
 
@@ -123,7 +148,7 @@ class TestCloudDeployment(unittest.TestCase):
     @mock.patch("ctfcli.core.config.Path.cwd", return_value=challenge_directory)
     @mock.patch("ctfcli.core.deployment.cloud.click.secho")
     @mock.patch("ctfcli.core.challenge.Image")
-    @mock.patch("ctfcli.core.deployment.cloud.API")
+    @mock.patch("ctfcli.core.deployment.cloud.API.shared")
     def test_fails_deployment_if_image_push_failed(
         self,
         mock_api_constructor: MagicMock,
@@ -161,8 +186,7 @@ class TestCloudDeployment(unittest.TestCase):
 
         mock_api.get.assert_has_calls(
             [
-                call("/api/v1/images"),  # check if deployments are supported
-                call("/api/v1/images"),  # get image information
+                call("/api/v1/images"),  # check if deployments are supported & get existing images
             ]
         )
 
@@ -190,7 +214,7 @@ class TestCloudDeployment(unittest.TestCase):
     )
     @mock.patch("ctfcli.core.deployment.cloud.click.secho")
     @mock.patch("ctfcli.core.challenge.Image")
-    @mock.patch("ctfcli.core.deployment.cloud.API")
+    @mock.patch("ctfcli.core.deployment.cloud.API.shared")
     def test_fails_deployment_if_registry_login_unsuccessful(
         self,
         mock_api_constructor: MagicMock,
@@ -248,8 +272,7 @@ class TestCloudDeployment(unittest.TestCase):
 
         mock_api.get.assert_has_calls(
             [
-                call("/api/v1/images"),  # check if deployments are supported
-                call("/api/v1/images"),  # get image information
+                call("/api/v1/images"),  # check if deployments are supported & get existing images
                 call("/api/v1/users/me"),  # get username for registry login
             ]
         )
@@ -272,7 +295,7 @@ class TestCloudDeployment(unittest.TestCase):
     @mock.patch("ctfcli.core.deployment.cloud.subprocess.check_output")
     @mock.patch("ctfcli.core.deployment.cloud.click.secho")
     @mock.patch("ctfcli.core.challenge.Image")
-    @mock.patch("ctfcli.core.deployment.cloud.API")
+    @mock.patch("ctfcli.core.deployment.cloud.API.shared")
     def test_fails_deployment_if_instance_url_is_not_ctfd_assigned(
         self,
         mock_api_constructor: MagicMock,
@@ -329,8 +352,7 @@ class TestCloudDeployment(unittest.TestCase):
 
         mock_api.get.assert_has_calls(
             [
-                call("/api/v1/images"),  # check if deployments are supported
-                call("/api/v1/images"),  # get image information
+                call("/api/v1/images"),  # check if deployments are supported & get existing images
                 call("/api/v1/users/me"),  # get username for registry login
             ]
         )
@@ -356,7 +378,7 @@ class TestCloudDeployment(unittest.TestCase):
     @mock.patch("ctfcli.core.deployment.cloud.subprocess.check_output")
     @mock.patch("ctfcli.core.deployment.cloud.click.secho")
     @mock.patch("ctfcli.core.challenge.Image")
-    @mock.patch("ctfcli.core.deployment.cloud.API")
+    @mock.patch("ctfcli.core.deployment.cloud.API.shared")
     def test_allows_skipping_registry_login(
         self,
         mock_api_constructor: MagicMock,
@@ -460,8 +482,7 @@ class TestCloudDeployment(unittest.TestCase):
 
         mock_api.get.assert_has_calls(
             [
-                call("/api/v1/images"),  # check if deployments are supported
-                call("/api/v1/images"),  # get image information
+                call("/api/v1/images"),  # check if deployments are supported & get existing images
                 call("/api/v1/services"),  # get existing services
                 call("/api/v1/services/1"),  # get service information & check deployment status
             ]
@@ -487,7 +508,7 @@ class TestCloudDeployment(unittest.TestCase):
     @mock.patch("ctfcli.core.deployment.cloud.subprocess.check_output", return_value=b"Login Succeeded")
     @mock.patch("ctfcli.core.deployment.cloud.click.secho")
     @mock.patch("ctfcli.core.challenge.Image")
-    @mock.patch("ctfcli.core.deployment.cloud.API")
+    @mock.patch("ctfcli.core.deployment.cloud.API.shared")
     def test_deploys_challenge_with_existing_image_service(
         self,
         mock_api_constructor: MagicMock,
@@ -599,8 +620,7 @@ class TestCloudDeployment(unittest.TestCase):
 
         mock_api.get.assert_has_calls(
             [
-                call("/api/v1/images"),  # check if deployments are supported
-                call("/api/v1/images"),  # get image information
+                call("/api/v1/images"),  # check if deployments are supported & get existing images
                 call("/api/v1/users/me"),  # get username for registry login
                 call("/api/v1/services"),  # get existing services
                 call("/api/v1/services/1"),  # get service information & check deployment status
@@ -629,7 +649,7 @@ class TestCloudDeployment(unittest.TestCase):
     @mock.patch("ctfcli.core.deployment.cloud.time.sleep")
     @mock.patch("ctfcli.core.deployment.cloud.click.secho")
     @mock.patch("ctfcli.core.challenge.Image")
-    @mock.patch("ctfcli.core.deployment.cloud.API")
+    @mock.patch("ctfcli.core.deployment.cloud.API.shared")
     def test_deploys_challenge_with_new_image_service(
         self,
         mock_api_constructor: MagicMock,
@@ -640,6 +660,7 @@ class TestCloudDeployment(unittest.TestCase):
         *args,
         **kwargs,
     ):
+        mock_sleep.side_effect = self.sleep
         challenge = Challenge(self.challenge_path)
 
         mock_image: MagicMock = mock_image_constructor.return_value
@@ -777,8 +798,7 @@ class TestCloudDeployment(unittest.TestCase):
 
         mock_api.get.assert_has_calls(
             [
-                call("/api/v1/images"),  # check if deployments are supported
-                call("/api/v1/images"),  # get existing images
+                call("/api/v1/images"),  # check if deployments are supported & get existing images
                 call("/api/v1/users/me"),  # get user data for registry login
                 call("/api/v1/services"),  # get existing services
                 call("/api/v1/services/1"),  # get service information & check deployment status (1st)
@@ -800,14 +820,17 @@ class TestCloudDeployment(unittest.TestCase):
         mock_secho.assert_has_calls(
             [
                 call("Awaiting service deployment [0/180s]", fg="yellow"),
-                call("Awaiting service deployment [10/180s]", fg="yellow"),
+                call("Awaiting service deployment [0.5/180s]", fg="yellow"),
+                call("Awaiting service deployment [1.5/180s]", fg="yellow"),
             ]
         )
 
+        # polls with exponential backoff
         mock_sleep.assert_has_calls(
             [
-                call(10),
-                call(10),
+                call(0.5),
+                call(1),
+                call(2),
             ]
         )
 
@@ -823,7 +846,7 @@ class TestCloudDeployment(unittest.TestCase):
     @mock.patch("ctfcli.core.deployment.cloud.time.sleep")
     @mock.patch("ctfcli.core.deployment.cloud.click.secho")
     @mock.patch("ctfcli.core.challenge.Image")
-    @mock.patch("ctfcli.core.deployment.cloud.API")
+    @mock.patch("ctfcli.core.deployment.cloud.API.shared")
     def test_fails_deployment_after_timeout(
         self,
         mock_api_constructor: MagicMock,
@@ -834,6 +857,7 @@ class TestCloudDeployment(unittest.TestCase):
         *args,
         **kwargs,
     ):
+        mock_sleep.side_effect = self.sleep
         challenge = Challenge(self.challenge_path)
 
         mock_image = mock_image_constructor.return_value
@@ -936,8 +960,7 @@ class TestCloudDeployment(unittest.TestCase):
 
         mock_api.get.assert_has_calls(
             [
-                call("/api/v1/images"),  # check if deployments are supported
-                call("/api/v1/images"),  # get existing images
+                call("/api/v1/images"),  # check if deployments are supported & get existing images
                 call("/api/v1/users/me"),  # get user data
                 call("/api/v1/services"),  # get existing services
                 call("/api/v1/services/1"),  # get service information & check deployment status
@@ -959,29 +982,39 @@ class TestCloudDeployment(unittest.TestCase):
         mock_secho.assert_has_calls(
             [
                 call("Awaiting service deployment [0/180s]", fg="yellow"),
-                call("Awaiting service deployment [10/180s]", fg="yellow"),
-                call("Awaiting service deployment [20/180s]", fg="yellow"),
-                call("Awaiting service deployment [30/180s]", fg="yellow"),
-                call("Awaiting service deployment [40/180s]", fg="yellow"),
-                call("Awaiting service deployment [50/180s]", fg="yellow"),
-                call("Awaiting service deployment [60/180s]", fg="yellow"),
-                call("Awaiting service deployment [70/180s]", fg="yellow"),
-                call("Awaiting service deployment [80/180s]", fg="yellow"),
-                call("Awaiting service deployment [90/180s]", fg="yellow"),
-                call("Awaiting service deployment [100/180s]", fg="yellow"),
-                call("Awaiting service deployment [110/180s]", fg="yellow"),
-                call("Awaiting service deployment [120/180s]", fg="yellow"),
-                call("Awaiting service deployment [130/180s]", fg="yellow"),
-                call("Awaiting service deployment [140/180s]", fg="yellow"),
-                call("Awaiting service deployment [150/180s]", fg="yellow"),
-                call("Awaiting service deployment [160/180s]", fg="yellow"),
-                call("Awaiting service deployment [170/180s]", fg="yellow"),
+                call("Awaiting service deployment [0.5/180s]", fg="yellow"),
+                call("Awaiting service deployment [1.5/180s]", fg="yellow"),
+                call("Awaiting service deployment [3.5/180s]", fg="yellow"),
+                call("Awaiting service deployment [7.5/180s]", fg="yellow"),
+                call("Awaiting service deployment [15.5/180s]", fg="yellow"),
+                call("Awaiting service deployment [25.5/180s]", fg="yellow"),
+                call("Awaiting service deployment [35.5/180s]", fg="yellow"),
+                call("Awaiting service deployment [45.5/180s]", fg="yellow"),
+                call("Awaiting service deployment [55.5/180s]", fg="yellow"),
+                call("Awaiting service deployment [65.5/180s]", fg="yellow"),
+                call("Awaiting service deployment [75.5/180s]", fg="yellow"),
+                call("Awaiting service deployment [85.5/180s]", fg="yellow"),
+                call("Awaiting service deployment [95.5/180s]", fg="yellow"),
+                call("Awaiting service deployment [105.5/180s]", fg="yellow"),
+                call("Awaiting service deployment [115.5/180s]", fg="yellow"),
+                call("Awaiting service deployment [125.5/180s]", fg="yellow"),
+                call("Awaiting service deployment [135.5/180s]", fg="yellow"),
+                call("Awaiting service deployment [145.5/180s]", fg="yellow"),
+                call("Awaiting service deployment [155.5/180s]", fg="yellow"),
+                call("Awaiting service deployment [165.5/180s]", fg="yellow"),
+                call("Awaiting service deployment [175.5/180s]", fg="yellow"),
                 call("Timeout awaiting challenge deployment", fg="red"),
             ]
         )
 
+        # the interval doubles up to 10s, and the last one is cut short by the timeout
         mock_sleep.assert_has_calls(
             [
+                call(0.5),
+                call(1),
+                call(2),
+                call(4),
+                call(8),
                 call(10),
                 call(10),
                 call(10),
@@ -998,10 +1031,10 @@ class TestCloudDeployment(unittest.TestCase):
                 call(10),
                 call(10),
                 call(10),
-                call(10),
-                call(10),
+                call(4.5),
             ]
         )
+        self.assertEqual(sum(sleep_call.args[0] for sleep_call in mock_sleep.call_args_list), 180)
 
         # check docker registry login
         mock_subprocess.assert_called_once_with(
@@ -1014,7 +1047,7 @@ class TestCloudDeployment(unittest.TestCase):
     @mock.patch("ctfcli.core.deployment.cloud.subprocess.check_output", return_value=b"Login Succeeded")
     @mock.patch("ctfcli.core.deployment.cloud.click.secho")
     @mock.patch("ctfcli.core.challenge.Image")
-    @mock.patch("ctfcli.core.deployment.cloud.API")
+    @mock.patch("ctfcli.core.deployment.cloud.API.shared")
     def test_exposes_tcp_port(
         self,
         mock_api_constructor: MagicMock,
@@ -1145,8 +1178,7 @@ class TestCloudDeployment(unittest.TestCase):
 
         mock_api.get.assert_has_calls(
             [
-                call("/api/v1/images"),  # check if deployments are supported
-                call("/api/v1/images"),  # get image information
+                call("/api/v1/images"),  # check if deployments are supported & get existing images
                 call("/api/v1/users/me"),  # get user data
                 call("/api/v1/services"),  # get existing services
                 call("/api/v1/services/1"),  # get service information & check deployment status
@@ -1172,6 +1204,87 @@ class TestCloudDeployment(unittest.TestCase):
             stderr=-1,
         )
 
+    @mock.patch("ctfcli.core.config.Path.cwd", return_value=challenge_directory)
+    @mock.patch("ctfcli.core.deployment.cloud.API.shared")
+    def test_lists_images_and_services_once(self, mock_api_constructor: MagicMock, *args, **kwargs):
+        mock_api: MagicMock = mock_api_constructor.return_value
+
+        def mock_get(*args, **kwargs):
+            mock_response = MagicMock()
+            mock_response.ok = True
+            mock_response.json.return_value = {"success": True, "data": []}
+            return mock_response
+
+        def mock_post(path, json):
+            mock_response = MagicMock()
+            if path == "/api/v1/images":
+                mock_response.json.return_value = {
+                    "success": True,
+                    "data": {"id": 1, "name": json["name"], "location": f"registry.ctfd.io/example/{json['name']}"},
+                }
+            else:
+                mock_response.json.return_value = {"success": True, "data": {"id": 1, **json}}
+
+            return mock_response
+
+        mock_api.get.side_effect = mock_get
+        mock_api.post.side_effect = mock_post
+
+        challenge = Challenge(self.challenge_path)
+        for _ in range(2):
+            handler = CloudDeploymentHandler(challenge)
+            image_data = handler._get_or_create_image()
+            handler._get_or_create_service(image_data["location"])
+
+        # the listings are shared between handlers, including the image and service created by the first one
+        self.assertEqual(
+            mock_api.get.call_args_list,
+            [call("/api/v1/images"), call("/api/v1/services"), call("/api/v1/services/1")],
+        )
+        self.assertEqual(mock_api.post.call_count, 2)
+        mock_api.patch.assert_called_once_with(
+            "/api/v1/services/1", json={"image": "registry.ctfd.io/example/test-challenge"}
+        )
+
+        # the listings are not shared with other runs
+        mock_api.get.reset_mock()
+        CloudDeploymentHandler(Challenge(self.challenge_path))._get_or_create_image()
+        mock_api.get.assert_called_once_with("/api/v1/images")
+
+    @mock.patch("ctfcli.core.config.Path.cwd", return_value=challenge_directory)
+    @mock.patch("ctfcli.core.deployment.cloud.time.sleep")
+    @mock.patch("ctfcli.core.deployment.cloud.click.secho")
+    @mock.patch("ctfcli.core.deployment.cloud.API.shared")
+    def test_await_timeout_includes_request_time(
+        self, mock_api_constructor: MagicMock, mock_secho: MagicMock, mock_sleep: MagicMock, *args, **kwargs
+    ):
+        mock_sleep.side_effect = self.sleep
+
+        def mock_get(*args, **kwargs):
+            # every request takes 50s
+            self.sleep(50)
+            mock_response = MagicMock()
+            mock_response.json.return_value = {"success": True, "data": {"id": 1, "hostname": None}}
+            return mock_response
+
+        mock_api: MagicMock = mock_api_constructor.return_value
+        mock_api.get.side_effect = mock_get
+
+        handler = CloudDeploymentHandler(Challenge(self.challenge_path))
+        self.assertIsNone(handler._await_service_deployment({"id": 1, "hostname": None}))
+
+        self.assertEqual(mock_sleep.call_args_list, [call(0.5), call(1), call(2), call(4)])
+        self.assertEqual(mock_api.get.call_count, 4)
+        mock_secho.assert_has_calls(
+            [
+                call("Awaiting service deployment [0/180s]", fg="yellow"),
+                call("Awaiting service deployment [50.5/180s]", fg="yellow"),
+                call("Awaiting service deployment [101.5/180s]", fg="yellow"),
+                call("Awaiting service deployment [153.5/180s]", fg="yellow"),
+                call("Timeout awaiting challenge deployment", fg="red"),
+            ]
+        )
+
     @mock.patch("ctfcli.core.config.Path.cwd", return_value=challenge_directory)
     def test_get_connection_info(self, *args, **kwargs):
         challenge = Challenge(self.challenge_path)
@@ -7,6 +7,7 @@ from unittest.mock import MagicMock, call
 from ctfcli.core.challenge import Challenge
 from ctfcli.core.deployment import RegistryDeploymentHandler
 from ctfcli.core.deployment.base import DeploymentResult
+from ctfcli.utils.registry import RegistryLogins
 
 BASE_DIR = Path(__file__).parent.parent.parent
 
@@ -15,6 +16,16 @@ class TestRegistryDeployment(unittest.TestCase):
     challenge_directory = BASE_DIR / "fixtures" / "challenges" / "test-challenge-dockerfile"
     challenge_path = challenge_directory / "challenge.yml"
 
+    def setUp(self):
+        # every test logs in on its own, and docker does not store any credentials
+        logins_patcher = mock.patch.object(RegistryDeploymentHandler, "logins", RegistryLogins())
+        logins_patcher.start()
+        self.addCleanup(logins_patcher.stop)
+
+        docker_config_patcher = mock.patch("ctfcli.utils.registry.get_docker_config", return_value={})
+        docker_config_patcher.start()
+        self.addCleanup(docker_config_patcher.stop)
+
     @mock.patch("ctfcli.core.config.Path.cwd", return_value=challenge_directory)
     @mock.patch("ctfcli.core.deployment.registry.subprocess.run")
     @mock.patch("ctfcli.core.deployment.registry.Config")
@@ -42,6 +53,46 @@ class TestRegistryDeployment(unittest.TestCase):
         self.assertIsInstance(result, DeploymentResult)
         self.assertTrue(result.success)
 
+    @mock.patch("ctfcli.core.config.Path.cwd", return_value=challenge_directory)
+    @mock.patch("ctfcli.utils.registry.get_stored_username", return_value="test")
+    @mock.patch("ctfcli.core.deployment.registry.subprocess.run")
+    @mock.patch("ctfcli.core.deployment.registry.Config")
+    @mock.patch("ctfcli.core.challenge.Image")
+    def test_logs_in_once_unless_credentials_are_stored(
+        self,
+        mock_image_constructor: MagicMock,
+        mock_config_constructor: MagicMock,
+        mock_subprocess: MagicMock,
+        mock_get_stored_username: MagicMock,
+        *args,
+        **kwargs,
+    ):
+        challenge = Challenge(self.challenge_path)
+
+        mock_image: MagicMock = mock_image_constructor.return_value
+        mock_image.basename = "test-challenge"
+        mock_image.push.return_value = "registry.example.com/example-project/test-challenge"
+
+        # docker stores credentials of the configured user
+        mock_config_constructor.return_value = {"registry": {"username": "test", "password": "test"}}
+        handler = RegistryDeploymentHandler(challenge, host="registry://registry.example.com/example-project")
+        self.assertTrue(handler.deploy().success)
+        mock_subprocess.assert_not_called()
+
+        # docker stores credentials of another user
+        mock_config_constructor.return_value = {"registry": {"username": "other", "password": "test"}}
+        for _ in range(2):
+            handler = RegistryDeploymentHandler(challenge, host="registry://other.example.com/example-project")
+            self.assertTrue(handler.deploy().success)
+
+        mock_subprocess.assert_called_once_with(
+            ["docker", "login", "-u", "other", "--password-stdin", "other.example.com"],
+            input=b"test",
+            stdout=-3,
+            stderr=-3,
+            check=True,
+        )
+
     @mock.patch("ctfcli.core.config.Path.cwd", return_value=challenge_directory)
     @mock.patch("ctfcli.core.deployment.registry.click.secho")
     def test_fails_deployment_if_challenge_does_not_provide_image(self, mock_secho: MagicMock, *args, **kwargs):
@@ -1,3 +1,7 @@
+import hashlib
+import io
+import json
+import tarfile
 import unittest
 from pathlib import Path
 from subprocess import CalledProcessError
@@ -11,10 +15,25 @@ from ctfcli.core.deployment.base import DeploymentResult
 BASE_DIR = Path(__file__).parent.parent.parent
 
 
+class ReceivedStream(io.BytesIO):
+    # Keeps the data written to the stdin of a process after it's closed
+    def close(self):
+        self.received = self.getvalue()
+        super().close()
+
+
 class TestSSHDeployment(unittest.TestCase):
     challenge_directory = BASE_DIR / "fixtures" / "challenges" / "test-challenge-dockerfile"
     challenge_path = challenge_directory / "challenge.yml"
 
+    def setUp(self):
+        # connections are not multiplexed, unless a test provides options for them
+        connections_patcher = mock.patch.object(SSHDeploymentHandler, "connections")
+        self.mock_connections = connections_patcher.start()
+        self.mock_connections.get_options.return_value = []
+        self.addCleanup(connections_patcher.stop)
+
+    @mock.patch("ctfcli.core.deployment.ssh.Config", return_value={"config": {"ssh_transfer": "copy"}})
     @mock.patch("ctfcli.core.config.Path.cwd", return_value=challenge_directory)
     @mock.patch.object(Path, "unlink")
     @mock.patch("ctfcli.core.deployment.ssh.subprocess.run")
@@ -116,6 +135,7 @@ class TestSSHDeployment(unittest.TestCase):
         self.assertFalse(result.success)
         mock_secho.assert_called_once_with("Could not build the image. Please check docker output above.", fg="red")
 
+    @mock.patch("ctfcli.core.deployment.ssh.Config", return_value={"config": {"ssh_transfer": "copy"}})
     @mock.patch("ctfcli.core.config.Path.cwd", return_value=challenge_directory)
     @mock.patch("ctfcli.core.deployment.ssh.click.secho")
     @mock.patch("ctfcli.core.challenge.Image")
@@ -169,6 +189,7 @@ class TestSSHDeployment(unittest.TestCase):
             "Could not resolve a port to expose. Make sure your Dockerfile EXPOSE's a port.", fg="red"
         )
 
+    @mock.patch("ctfcli.core.deployment.ssh.Config", return_value={"config": {"ssh_transfer": "copy"}})
     @mock.patch("ctfcli.core.config.Path.cwd", return_value=challenge_directory)
     @mock.patch("ctfcli.core.deployment.ssh.subprocess.run")
     @mock.patch("ctfcli.core.deployment.ssh.click.secho")
@@ -204,6 +225,248 @@ class TestSSHDeployment(unittest.TestCase):
             ]
         )
 
+    def mock_image(self, mock_image_constructor: MagicMock) -> MagicMock:
+        mock_image: MagicMock = mock_image_constructor.return_value
+        mock_image.name = "test-challenge"
+        mock_image.basename = "test-challenge"
+        mock_image.build.return_value = "test-challenge"
+        mock_image.get_exposed_port.return_value = 80
+        return mock_image
+
+    def mock_processes(self, mock_popen: MagicMock, load_return_code: int = 0) -> ReceivedStream:
+        received = ReceivedStream()
+
+        def popen(command, stdin=None, stdout=None):
+            process = MagicMock()
+            process.wait.return_value = 0
+            if command[0] == "ssh":
+                process.stdin = received
+                process.wait.return_value = load_return_code
+            elif command[0] == "docker":
+                process.stdout = io.BytesIO(b"image layers" * 1000)
+            else:
+                # compressor reads the output of docker save
+                process.stdout = io.BytesIO(b"compressed:" + stdin.getvalue())
+            return process
+
+        mock_popen.side_effect = popen
+        return received
+
+    @mock.patch("ctfcli.core.config.Path.cwd", return_value=challenge_directory)
+    @mock.patch("ctfcli.core.deployment.ssh.subprocess.run")
+    @mock.patch("ctfcli.core.deployment.ssh.subprocess.Popen")
+    @mock.patch("ctfcli.core.deployment.ssh.click.secho")
+    @mock.patch("ctfcli.core.challenge.Image")
+    def test_streams_image_to_host(
+        self,
+        mock_image_constructor: MagicMock,
+        mock_secho: MagicMock,
+        mock_popen: MagicMock,
+        mock_run: MagicMock,
+        *args,
+        **kwargs,
+    ):
+        mock_image = self.mock_image(mock_image_constructor)
+        received = self.mock_processes(mock_popen)
+        challenge = Challenge(self.challenge_path)
+
+        handler = SSHDeploymentHandler(challenge, host="ssh://root@127.0.0.1")
+        result = handler.deploy()
+
+        self.assertTrue(result.success)
+        mock_secho.assert_not_called()
+        mock_image.export.assert_not_called()
+
+        self.assertEqual(received.received, b"image layers" * 1000)
+        self.assertEqual(
+            [c.args[0] for c in mock_popen.call_args_list],
+            [["docker", "save", "test-challenge"], ["ssh", "root@127.0.0.1", "docker load"]],
+        )
+        mock_run.assert_has_calls(
+            [
+                call(
+                    [
+                        "ssh",
+                        "root@127.0.0.1",
+                        "docker stop test-challenge 2>/dev/null; docker rm test-challenge 2>/dev/null",
+                    ]
+                ),
+                call(
+                    [
+                        "ssh",
+                        "root@127.0.0.1",
+                        "docker run -d -p80:80 --name test-challenge --restart always test-challenge",
+                    ]
+                ),
+            ]
+        )
+
+    @mock.patch("ctfcli.core.deployment.ssh.shutil.which", side_effect=lambda command: f"/usr/bin/{command}")
+    @mock.patch("ctfcli.core.deployment.ssh.Config", return_value={"config": {"ssh_compression": "zstd"}})
+    @mock.patch("ctfcli.core.config.Path.cwd", return_value=challenge_directory)
+    @mock.patch("ctfcli.core.deployment.ssh.subprocess.run")
+    @mock.patch("ctfcli.core.deployment.ssh.subprocess.Popen")
+    @mock.patch("ctfcli.core.challenge.Image")
+    def test_streams_compressed_image_to_host(
+        self, mock_image_constructor: MagicMock, mock_popen: MagicMock, *args, **kwargs
+    ):
+        self.mock_image(mock_image_constructor)
+        received = self.mock_processes(mock_popen)
+        challenge = Challenge(self.challenge_path)
+
+        handler = SSHDeploymentHandler(challenge, host="ssh://root@127.0.0.1")
+        self.assertTrue(handler.deploy().success)
+
+        self.assertEqual(received.received, b"compressed:" + b"image layers" * 1000)
+        self.assertEqual(
+            [c.args[0] for c in mock_popen.call_args_list],
+            [
+                ["docker", "save", "test-challenge"],
+                ["zstd", "-T0", "-q", "-c"],
+                ["ssh", "root@127.0.0.1", "docker load"],
+            ],
+        )
+
+    @mock.patch("ctfcli.core.deployment.ssh.shutil.which", return_value=None)
+    @mock.patch("ctfcli.core.deployment.ssh.Config", return_value={"config": {"ssh_compression": "gzip"}})
+    @mock.patch("ctfcli.core.config.Path.cwd", return_value=challenge_directory)
+    @mock.patch("ctfcli.core.deployment.ssh.subprocess.run")
+    @mock.patch("ctfcli.core.deployment.ssh.subprocess.Popen")
+    @mock.patch("ctfcli.core.deployment.ssh.click.secho")
+    @mock.patch("ctfcli.core.challenge.Image")
+    def test_fails_deployment_if_streaming_failed(
+        self,
+        mock_image_constructor: MagicMock,
+        mock_secho: MagicMock,
+        mock_popen: MagicMock,
+        mock_run: MagicMock,
+        *args,
+        **kwargs,
+    ):
+        self.mock_image(mock_image_constructor)
+        self.mock_processes(mock_popen, load_return_code=1)
+        challenge = Challenge(self.challenge_path)
+
+        handler = SSHDeploymentHandler(challenge, host="ssh://root@127.0.0.1")
+        self.assertFalse(handler.deploy().success)
+
+        self.assertEqual(len(mock_popen.call_args_list), 2)
+        mock_run.assert_not_called()
+        mock_secho.assert_has_calls(
+            [
+                call("gzip is not installed, transferring the image uncompressed", fg="yellow"),
+                call("Failed to transfer the image. Please check docker output above.", fg="red"),
+            ]
+        )
+
+    @mock.patch("ctfcli.core.config.Path.cwd", return_value=challenge_directory)
+    @mock.patch("ctfcli.core.deployment.ssh.subprocess.run")
+    @mock.patch("ctfcli.core.deployment.ssh.subprocess.Popen")
+    @mock.patch("ctfcli.core.challenge.Image")
+    def test_reuses_connection_for_all_commands(
+        self, mock_image_constructor: MagicMock, mock_popen: MagicMock, mock_run: MagicMock, *args, **kwargs
+    ):
+        self.mock_connections.get_options.return_value = ["-o", "ControlPath=/tmp/ctfcli-ssh/host"]
+        self.mock_image(mock_image_constructor)
+        self.mock_processes(mock_popen)
+        challenge = Challenge(self.challenge_path)
+
+        handler = SSHDeploymentHandler(challenge, host="ssh://root@127.0.0.1")
+        self.assertTrue(handler.deploy().success)
+
+        self.mock_connections.get_options.assert_called_once_with("root@127.0.0.1")
+        ssh_commands = [mock_popen.call_args_list[-1].args[0]] + [c.args[0] for c in mock_run.call_args_list]
+        self.assertEqual(len(ssh_commands), 3)
+        for command in ssh_commands:
+            self.assertEqual(command[:4], ["ssh", "-o", "ControlPath=/tmp/ctfcli-ssh/host", "root@127.0.0.1"])
+
+    @mock.patch("ctfcli.core.deployment.ssh.Config", return_value={"config": {"ssh_multiplex": "false"}})
+    @mock.patch("ctfcli.core.config.Path.cwd", return_value=challenge_directory)
+    @mock.patch("ctfcli.core.deployment.ssh.subprocess.run")
+    @mock.patch("ctfcli.core.deployment.ssh.subprocess.Popen")
+    @mock.patch("ctfcli.core.challenge.Image")
+    def test_allows_disabling_connection_reuse(
+        self, mock_image_constructor: MagicMock, mock_popen: MagicMock, *args, **kwargs
+    ):
+        self.mock_image(mock_image_constructor)
+        self.mock_processes(mock_popen)
+        challenge = Challenge(self.challenge_path)
+
+        handler = SSHDeploymentHandler(challenge, host="ssh://root@127.0.0.1")
+        self.assertTrue(handler.deploy().success)
+        self.mock_connections.get_options.assert_not_called()
+
+    def get_image_archive(self) -> tuple[bytes, list[str]]:
+        # docker save output with a base layer as a blob, and a legacy <id>/layer.tar application layer
+        base_layer, app_layer = b"base layer" * 1000, b"app layer" * 10
+        diff_ids = [f"sha256:{hashlib.sha256(layer).hexdigest()}" for layer in [base_layer, app_layer]]
+        files = {
+            "manifest.json": json.dumps([{"Config": "config.json", "Layers": ["base", "app/layer.tar"]}]).encode(),
+            "config.json": json.dumps({"rootfs": {"type": "layers", "diff_ids": diff_ids}}).encode(),
+            f"blobs/sha256/{diff_ids[0].split(':')[1]}": base_layer,
+            "app/layer.tar": app_layer,
+        }
+
+        archive = io.BytesIO()
+        with tarfile.open(fileobj=archive, mode="w") as tar:
+            for name, contents in files.items():
+                info = tarfile.TarInfo(name)
+                info.size = len(contents)
+                tar.addfile(info, io.BytesIO(contents))
+
+        return archive.getvalue(), diff_ids
+
+    @mock.patch("ctfcli.core.deployment.ssh.Config", return_value={"config": {"ssh_transfer": "layers"}})
+    @mock.patch("ctfcli.core.config.Path.cwd", return_value=challenge_directory)
+    @mock.patch("ctfcli.core.deployment.ssh.subprocess.run")
+    @mock.patch("ctfcli.core.deployment.ssh.subprocess.Popen")
+    @mock.patch("ctfcli.core.challenge.Image")
+    def test_transfers_only_missing_layers(
+        self, mock_image_constructor: MagicMock, mock_popen: MagicMock, mock_run: MagicMock, *args, **kwargs
+    ):
+        image_archive, diff_ids = self.get_image_archive()
+        mock_image = self.mock_image(mock_image_constructor)
+        mock_image.get_layers.return_value = diff_ids
+
+        # the host has an image with the same base layer, and one with an unrelated layer
+        mock_run.return_value = MagicMock(
+            returncode=0, stdout=f'["{diff_ids[0]}"]\n["sha256:{"0" * 64}", "{diff_ids[1]}"]\n'
+        )
+
+        received = ReceivedStream()
+        mock_save, mock_load = MagicMock(stdout=io.BytesIO(image_archive)), MagicMock(stdin=received)
+        mock_save.wait.return_value = mock_load.wait.return_value = 0
+        mock_popen.side_effect = [mock_save, mock_load]
+
+        challenge = Challenge(self.challenge_path)
+        handler = SSHDeploymentHandler(challenge, host="ssh://root@127.0.0.1")
+        self.assertTrue(handler.deploy().success)
+
+        self.assertEqual(mock_run.call_args_list[0].args[0][:2], ["ssh", "root@127.0.0.1"])
+        with tarfile.open(fileobj=io.BytesIO(received.received)) as tar:
+            self.assertEqual(tar.getnames(), ["manifest.json", "config.json", "app/layer.tar"])
+            self.assertEqual(tar.extractfile("app/layer.tar").read(), b"app layer" * 10)
+
+    @mock.patch("ctfcli.core.deployment.ssh.Config", return_value={"config": {"ssh_transfer": "layers"}})
+    @mock.patch("ctfcli.core.config.Path.cwd", return_value=challenge_directory)
+    @mock.patch("ctfcli.core.deployment.ssh.subprocess.run")
+    @mock.patch("ctfcli.core.deployment.ssh.subprocess.Popen")
+    @mock.patch("ctfcli.core.challenge.Image")
+    def test_transfers_full_image_if_host_has_no_layers(
+        self, mock_image_constructor: MagicMock, mock_popen: MagicMock, mock_run: MagicMock, *args, **kwargs
+    ):
+        _, diff_ids = self.get_image_archive()
+        mock_image = self.mock_image(mock_image_constructor)
+        mock_image.get_layers.return_value = diff_ids
+        mock_run.return_value = MagicMock(returncode=1, stdout="")
+        received = self.mock_processes(mock_popen)
+
+        challenge = Challenge(self.challenge_path)
+        handler = SSHDeploymentHandler(challenge, host="ssh://root@127.0.0.1")
+        self.assertTrue(handler.deploy().success)
+
+        self.assertEqual(received.received, b"image layers" * 1000)
+
     @mock.patch("ctfcli.core.config.Path.cwd", return_value=challenge_directory)
     def test_get_connection_info_http_s(self, *args, **kwargs):
         challenge = Challenge(self.challenge_path)
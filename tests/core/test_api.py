@@ -1,8 +1,12 @@
+import io
 import unittest
 from unittest import mock
 from unittest.mock import MagicMock, call
 
-from ctfcli.core.api import API
+from requests import ConnectionError
+from requests.adapters import DEFAULT_POOLSIZE
+
+from ctfcli.core.api import API, RetryBudget
 
 
 class MockConfigSection(dict):
@@ -18,6 +22,11 @@ class MockConfigSection(dict):
 
 
 class TestAPI(unittest.TestCase):
+    def setUp(self):
+        # retry budget and rate limits are shared by the whole process
+        API.reset_limits()
+        self.addCleanup(API.reset_limits)
+
     def test_api_object_ensures_trailing_slash_on_prefix_url(self):
         test_urls = [
             "https://example.com/test/",
@@ -44,7 +53,8 @@ class TestAPI(unittest.TestCase):
         api.request("GET", "/path")
         api.request("GET", "path")
 
-        mock_request.assert_has_calls(
+        self.assertEqual(
+            mock_request.call_args_list,
             [
                 call(
                     "GET",
@@ -60,7 +70,7 @@ class TestAPI(unittest.TestCase):
                     data=None,
                     files=None,
                 ),
-            ]
+            ],
         )
 
     @mock.patch(
@@ -126,7 +136,9 @@ class TestAPI(unittest.TestCase):
         mock_config_constructor.return_value = {
             "config": MagicMock(
                 getboolean=MagicMock(side_effect=ValueError("Invalid boolean value")),
-                get=MagicMock(return_value="/tmp/certificate"),
+                get=MagicMock(
+                    side_effect=lambda key, default=None: "/tmp/certificate" if key == "ssl_verify" else default
+                ),
             )
         }
 
@@ -183,3 +195,202 @@ class TestAPI(unittest.TestCase):
         api = API()
         api.request("GET", "/test", data="some-file")
         mock_request.assert_called_once_with("GET", "https://example.com/test", data="some-file", files=None)
+
+    @mock.patch(
+        "ctfcli.core.api.Config",
+        return_value={"config": MockConfigSection({"url": "https://example.com/", "access_token": "test"})},
+    )
+    def test_api_objects_share_connection_pool(self, *args, **kwargs):
+        first_api, second_api = API(), API()
+
+        self.assertIs(first_api.get_adapter("https://example.com/"), API._adapter)
+        self.assertIs(second_api.get_adapter("https://example.com/"), API._adapter)
+
+        # closing a single session keeps the shared pool open
+        first_api.close()
+        self.assertIs(second_api.get_adapter("https://example.com/"), API._adapter)
+
+    @mock.patch(
+        "ctfcli.core.api.Config",
+        return_value={"config": MockConfigSection({"url": "https://example.com/", "access_token": "test"})},
+    )
+    def test_api_pool_size_follows_concurrency(self, *args, **kwargs):
+        self.addCleanup(API.set_pool_size, DEFAULT_POOLSIZE)
+
+        API.set_pool_size(32)
+        self.assertEqual(API().get_adapter("https://example.com/")._pool_maxsize, 32)
+
+        # the pool never shrinks below the requests default
+        API.set_pool_size(1)
+        self.assertEqual(API().get_adapter("https://example.com/")._pool_maxsize, DEFAULT_POOLSIZE)
+
+    @mock.patch(
+        "ctfcli.core.api.Config",
+        return_value={"config": MockConfigSection({"url": "https://example.com/", "access_token": "test"})},
+    )
+    @mock.patch.object(API, "_shared", None)
+    def test_shares_a_single_client(self, mock_config_constructor: MagicMock, *args, **kwargs):
+        self.addCleanup(API.set_pool_size, DEFAULT_POOLSIZE)
+
+        api = API.shared()
+        self.assertIs(API.shared(), api)
+        mock_config_constructor.assert_called_once_with()
+
+        # resizing the pool creates a new client using it
+        API.set_pool_size(32)
+        self.assertIsNot(API.shared(), api)
+        self.assertEqual(API.shared().get_adapter("https://example.com/")._pool_maxsize, 32)
+
+
+@mock.patch(
+    "ctfcli.core.api.Config",
+    return_value={"config": MockConfigSection({"url": "https://example.com/", "access_token": "test"})},
+)
+@mock.patch("ctfcli.core.api.time.sleep")
+class TestAPIRetries(unittest.TestCase):
+    def setUp(self):
+        API.reset_limits()
+        self.addCleanup(API.reset_limits)
+
+    @staticmethod
+    def mock_response(status_code: int, headers: dict | None = None) -> MagicMock:
+        return MagicMock(status_code=status_code, headers=headers or {})
+
+    @mock.patch("ctfcli.core.api.Session.request")
+    def test_retries_idempotent_requests(self, mock_request: MagicMock, mock_sleep: MagicMock, *args, **kwargs):
+        mock_request.side_effect = [self.mock_response(502), self.mock_response(504), self.mock_response(200)]
+
+        response = API().get("/api/v1/challenges")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(mock_request.call_count, 3)
+        self.assertEqual(mock_sleep.call_count, 2)
+
+        # exponential backoff with jitter
+        self.assertLessEqual(mock_sleep.call_args_list[0].args[0], 0.5)
+        self.assertLessEqual(mock_sleep.call_args_list[1].args[0], 1.0)
+
+    @mock.patch("ctfcli.core.api.Session.request")
+    def test_does_not_retry_non_idempotent_requests_which_may_have_been_processed(
+        self, mock_request: MagicMock, mock_sleep: MagicMock, *args, **kwargs
+    ):
+        mock_request.side_effect = [self.mock_response(502)]
+
+        response = API().post("/api/v1/flags", json={"content": "flag{test}"})
+
+        self.assertEqual(response.status_code, 502)
+        mock_sleep.assert_not_called()
+
+        mock_request.side_effect = ConnectionError()
+        with self.assertRaises(ConnectionError):
+            API().post("/api/v1/flags", json={"content": "flag{test}"})
+
+        mock_sleep.assert_not_called()
+
+    @mock.patch("ctfcli.core.api.Session.request")
+    def test_respects_retry_after(self, mock_request: MagicMock, mock_sleep: MagicMock, *args, **kwargs):
+        mock_request.side_effect = [self.mock_response(429, {"Retry-After": "2"}), self.mock_response(200)]
+
+        response = API().post("/api/v1/flags", json={"content": "flag{test}"})
+
+        self.assertEqual(response.status_code, 200)
+        mock_sleep.assert_called_once_with(2.0)
+
+        # do not wait for unreasonably long
+        mock_request.side_effect = [self.mock_response(503, {"Retry-After": "3600"})]
+        response = API().get("/api/v1/challenges")
+        self.assertEqual(response.status_code, 503)
+        mock_sleep.assert_called_once()
+
+    @mock.patch("ctfcli.core.api.Session.request")
+    def test_retries_connection_errors(self, mock_request: MagicMock, mock_sleep: MagicMock, *args, **kwargs):
+        mock_request.side_effect = [ConnectionError(), self.mock_response(200)]
+
+        response = API().delete("/api/v1/flags/1")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(mock_request.call_count, 2)
+
+    @mock.patch("ctfcli.core.api.Session.request")
+    def test_stops_retrying_when_budget_is_exhausted(
+        self, mock_request: MagicMock, mock_sleep: MagicMock, *args, **kwargs
+    ):
+        API._retry_budget = RetryBudget(2)
+        mock_request.return_value = self.mock_response(503)
+
+        API().get("/api/v1/challenges")
+        API().get("/api/v1/challenges")
+
+        # first request uses the whole budget
+        self.assertEqual(mock_request.call_count, 4)
+        self.assertEqual(mock_sleep.call_count, 2)
+
+    @mock.patch("ctfcli.core.api.Session.request")
+    def test_resends_multipart_uploads(self, mock_request: MagicMock, mock_sleep: MagicMock, *args, **kwargs):
+        bodies = []
+
+        def mock_send(method, url, data=None, *args, **kwargs):
+            bodies.append(data.to_string())
+            return self.mock_response(503 if len(bodies) == 1 else 200)
+
+        mock_request.side_effect = mock_send
+
+        file_payload = ("test.txt", io.BytesIO(b"file contents"))
+        response = API().post("/api/v1/files", files={"file": file_payload}, data={"challenge_id": 1})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(bodies), 2)
+        self.assertIn(b"file contents", bodies[1])
+        self.assertEqual(len(bodies[0]), len(bodies[1]))
+
+
+@mock.patch("ctfcli.core.api.Session.request")
+class TestAPIRateLimits(unittest.TestCase):
+    def setUp(self):
+        API.reset_limits()
+        self.addCleanup(API.reset_limits)
+
+    @staticmethod
+    def mock_config(**limits) -> dict:
+        return {"config": MockConfigSection({"url": "https://example.com/", "access_token": "test", **limits})}
+
+    def test_does_not_limit_requests_by_default(self, mock_request: MagicMock):
+        mock_request.return_value = MagicMock(status_code=200)
+
+        with mock.patch("ctfcli.core.api.Config", return_value=self.mock_config()):
+            api = API()
+
+        self.assertEqual(API._rate_limiters, {})
+        self.assertIsNone(API._request_slots)
+        self.assertIsNone(api.get_rate_limiter("GET", None))
+
+    def test_limits_requests_by_category(self, mock_request: MagicMock):
+        mock_request.return_value = MagicMock(status_code=200)
+        mock_config = self.mock_config(rate_limit_read="10", rate_limit_write="2", rate_limit_upload="0.5")
+
+        with mock.patch("ctfcli.core.api.Config", return_value=mock_config):
+            api = API()
+
+        self.assertEqual(api.get_rate_limiter("GET", None).rate, 10)
+        self.assertEqual(api.get_rate_limiter("PATCH", None).rate, 2)
+        self.assertEqual(api.get_rate_limiter("POST", {"file": ("test.txt", io.BytesIO())}).rate, 0.5)
+
+        with mock.patch.object(API._rate_limiters["write"], "acquire", return_value=0) as mock_acquire:
+            api.post("/api/v1/flags", json={"content": "flag{test}"})
+            api.get("/api/v1/challenges")
+
+        mock_acquire.assert_called_once_with()
+
+    def test_shares_limits_between_clients(self, mock_request: MagicMock):
+        with mock.patch(
+            "ctfcli.core.api.Config", return_value=self.mock_config(rate_limit_read="5", max_concurrent_requests="4")
+        ):
+            first_limiter = API().get_rate_limiter("GET", None)
+            request_slots = API._request_slots
+
+        # configuration is only read once per process
+        with mock.patch("ctfcli.core.api.Config", return_value=self.mock_config(rate_limit_read="1")):
+            self.assertIs(API().get_rate_limiter("GET", None), first_limiter)
+
+        self.assertIsNotNone(request_slots)
+        self.assertIs(API._request_slots, request_slots)
@@ -0,0 +1,169 @@
+import io
+import unittest
+from unittest import mock
+
+from ctfcli.core.api import API
+from ctfcli.core.exceptions import MissingAsyncDependency
+
+try:
+    from aiohttp import web
+    from aiohttp.test_utils import TestServer
+
+    from ctfcli.core.async_api import AsyncAPI
+except ImportError:
+    web = None
+
+
+class MockConfigSection(dict):
+    # this is a wrong implementation but all that's necessary for this test
+    def getboolean(self, key, default=None):
+        if key not in self:
+            return default
+
+        return self[key]
+
+
+@unittest.skipIf(web is None, "aiohttp is not installed")
+class TestAsyncAPI(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        API.reset_limits()
+        self.addCleanup(API.reset_limits)
+
+        self.requests = []
+        self.responses = []
+
+        app = web.Application()
+        app.router.add_route("*", "/{path:.*}", self.handle)
+        self.server = TestServer(app)
+        await self.server.start_server()
+        self.addAsyncCleanup(self.server.close)
+
+    async def handle(self, request: "web.Request") -> "web.Response":
+        if request.content_type == "multipart/form-data":
+            body = {}
+            async for part in await request.multipart():
+                body[part.name] = (part.filename, (await part.read()).decode())
+        else:
+            body = await request.text()
+
+        self.requests.append(
+            {
+                "method": request.method,
+                "path": request.path_qs,
+                "headers": dict(request.headers),
+                "cookies": dict(request.cookies),
+                "body": body,
+            }
+        )
+
+        if self.responses:
+            return self.responses.pop(0)
+
+        return web.json_response({"success": True, "data": {"path": request.path}})
+
+    def get_config(self, path: str = "/", **options) -> dict:
+        config = {"config": MockConfigSection({"url": str(self.server.make_url(path)), "access_token": "test"})}
+        config["config"].update(options)
+        return config
+
+    async def test_prefixes_urls_and_authorizes_requests(self):
+        for url in ["/ctfd", "/ctfd/", "/ctfd////"]:
+            with mock.patch("ctfcli.core.async_api.Config", return_value=self.get_config(url)):
+                async with AsyncAPI() as api:
+                    self.assertEqual(api.prefix_url, str(self.server.make_url("/ctfd/")))
+
+                    response = await api.get("/api/v1/challenges")
+                    self.assertEqual(response.status, 200)
+                    self.assertEqual((await response.json())["data"], {"path": "/ctfd/api/v1/challenges"})
+
+        for request in self.requests:
+            self.assertEqual(request["headers"]["Authorization"], "Token test")
+            self.assertEqual(request["headers"]["Content-Type"], "application/json")
+
+    async def test_sends_cookies(self):
+        config = self.get_config()
+        config["cookies"] = {"session": "abc"}
+
+        with mock.patch("ctfcli.core.async_api.Config", return_value=config):
+            async with AsyncAPI() as api:
+                await api.get("/api/v1/challenges")
+
+        self.assertEqual(self.requests[0]["cookies"], {"session": "abc"})
+
+    async def test_sends_json(self):
+        with mock.patch("ctfcli.core.async_api.Config", return_value=self.get_config()):
+            async with AsyncAPI() as api:
+                await api.post("/api/v1/flags", json={"challenge_id": 1, "content": "flag{test}"})
+
+        self.assertEqual(self.requests[0]["method"], "POST")
+        self.assertEqual(self.requests[0]["body"], '{"challenge_id": 1, "content": "flag{test}"}')
+
+    async def test_sends_multipart_uploads(self):
+        with mock.patch("ctfcli.core.async_api.Config", return_value=self.get_config()):
+            async with AsyncAPI() as api:
+                await api.post(
+                    "/api/v1/files",
+                    files=[("file", ("test.txt", io.BytesIO(b"file contents")))],
+                    data={"challenge_id": 1, "type": "challenge"},
+                )
+
+        self.assertEqual(
+            self.requests[0]["body"],
+            {
+                "challenge_id": (None, "1"),
+                "type": (None, "challenge"),
+                "file": ("test.txt", "file contents"),
+            },
+        )
+
+    @mock.patch("ctfcli.core.async_api.asyncio.sleep")
+    async def test_retries_and_resends_uploads(self, mock_sleep: mock.AsyncMock):
+        self.responses = [web.Response(status=503, headers={"Retry-After": "1"})]
+
+        with mock.patch("ctfcli.core.async_api.Config", return_value=self.get_config()):
+            async with AsyncAPI() as api:
+                response = await api.post("/api/v1/files", files={"file": ("test.txt", io.BytesIO(b"file contents"))})
+
+        self.assertEqual(response.status, 200)
+        mock_sleep.assert_awaited_once_with(1.0)
+
+        self.assertEqual(len(self.requests), 2)
+        self.assertEqual(self.requests[1]["body"], {"file": ("test.txt", "file contents")})
+
+    async def test_does_not_retry_non_idempotent_requests(self):
+        self.responses = [web.Response(status=502)]
+
+        with mock.patch("ctfcli.core.async_api.Config", return_value=self.get_config()):
+            async with AsyncAPI() as api:
+                response = await api.post("/api/v1/flags", json={})
+
+        self.assertEqual(response.status, 502)
+        self.assertEqual(len(self.requests), 1)
+
+    async def test_shares_rate_limits_with_api(self):
+        with mock.patch("ctfcli.core.async_api.Config", return_value=self.get_config(rate_limit_read="1000")):
+            async with AsyncAPI() as api:
+                limiter = API.get_rate_limiter("GET", None)
+
+                with mock.patch.object(limiter, "reserve", return_value=0) as mock_reserve:
+                    await api.get("/api/v1/challenges")
+
+        mock_reserve.assert_called_once_with()
+
+    def test_handles_ssl_verify(self):
+        self.assertIs(AsyncAPI.get_ssl_context(True), True)
+        self.assertIs(AsyncAPI.get_ssl_context(False), False)
+
+        with mock.patch("ctfcli.core.async_api.ssl.create_default_context") as mock_create_context:
+            self.assertEqual(AsyncAPI.get_ssl_context("/tmp/certificate"), mock_create_context.return_value)
+
+        mock_create_context.assert_called_once_with(cafile="/tmp/certificate")
+
+
+class TestAsyncAPIDependency(unittest.TestCase):
+    @mock.patch("ctfcli.core.async_api.aiohttp", None, create=True)
+    def test_requires_aiohttp(self):
+        import ctfcli.core.async_api
+
+        with self.assertRaises(MissingAsyncDependency):
+            ctfcli.core.async_api.AsyncAPI()
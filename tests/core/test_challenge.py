@@ -1,4 +1,7 @@
+import hashlib
 import re
+import shutil
+import tempfile
 import unittest
 from datetime import datetime, timezone
 from pathlib import Path
@@ -14,6 +17,8 @@ from ctfcli.core.exceptions import (
     RemoteChallengeNotFound,
 )
 from ctfcli.core.image import Image
+from ctfcli.core.store import Store
+from ctfcli.utils.hashing import hash_file_digests
 
 BASE_DIR = Path(__file__).parent.parent
 
@@ -58,13 +63,17 @@ class TestLocalChallengeLoading(unittest.TestCase):
 
         self.assertEqual(challenge["name"], "Test Challenge")
 
-    @mock.patch("ctfcli.core.challenge.subprocess.call")
-    def test_raises_if_image_defined_but_not_resolved(self, mock_call: MagicMock):
-        mock_call.return_value = 1
+    @mock.patch("ctfcli.core.image.subprocess.run")
+    def test_raises_if_image_defined_but_not_resolved(self, mock_run: MagicMock):
+        mock_run.return_value = MagicMock(returncode=1, stderr="Error: No such image: test-challenge:latest")
         challenge_path = BASE_DIR / "fixtures" / "challenges" / "test-challenge-minimal" / "challenge.yml"
 
+        # image is only resolved when it is used
+        challenge = Challenge(challenge_path, {"image": "test-challenge:latest"})
+        mock_run.assert_not_called()
+
         with self.assertRaises(InvalidChallengeFile):
-            Challenge(challenge_path, {"image": "test-challenge:latest"})
+            _ = challenge.image
 
     def test_recognizes_image_registry_prefix(self):
         challenge_path = BASE_DIR / "fixtures" / "challenges" / "test-challenge-minimal" / "challenge.yml"
@@ -107,9 +116,9 @@ class TestLocalChallengeLoading(unittest.TestCase):
         self.assertEqual(challenge.image.basename, "test-challenge")
         self.assertTrue(challenge.image.built)
 
-    @mock.patch("ctfcli.core.challenge.subprocess.call")
-    def test_recognizes_local_prebuilt_images(self, mock_call: MagicMock):
-        mock_call.return_value = 0
+    @mock.patch("ctfcli.core.image.subprocess.run")
+    def test_recognizes_local_prebuilt_images(self, mock_run: MagicMock):
+        mock_run.return_value = MagicMock(returncode=0)
         challenge_path = BASE_DIR / "fixtures" / "challenges" / "test-challenge-minimal" / "challenge.yml"
         challenge = Challenge(challenge_path, {"image": "test-challenge:latest"})
 
@@ -118,16 +127,102 @@ class TestLocalChallengeLoading(unittest.TestCase):
         self.assertEqual(challenge.image.basename, "test-challenge")
         self.assertTrue(challenge.image.built)
 
+        mock_run.assert_called_once_with(
+            ["docker", "image", "inspect", "--format={{.Id}}", "test-challenge:latest"], capture_output=True, text=True
+        )
+
+    @mock.patch("ctfcli.core.image.subprocess.run")
+    def test_resolves_images_of_many_challenges_at_once(self, mock_run: MagicMock):
+        mock_run.return_value = MagicMock(
+            returncode=1, stderr="Error response from daemon: No such image: missing:1.0\n"
+        )
+        challenge_path = BASE_DIR / "fixtures" / "challenges" / "test-challenge-minimal" / "challenge.yml"
+        challenges = [
+            Challenge(challenge_path, {"image": "local:1.0"}),
+            Challenge(challenge_path, {"image": "missing:1.0"}),
+            Challenge(challenge_path, {"image": "local:1.0"}),
+            Challenge(challenge_path, {"image": "ghcr.io/ctfcli/test-challenge:latest"}),
+            Challenge(challenge_path),
+        ]
+
+        unresolved = Challenge.resolve_images(challenges)
+
+        mock_run.assert_called_once_with(
+            ["docker", "image", "inspect", "--format={{.Id}}", "local:1.0", "missing:1.0"],
+            capture_output=True,
+            text=True,
+        )
+        self.assertEqual(unresolved, [challenges[1]])
+        self.assertEqual(challenges[0].image.name, "local:1.0")
+        self.assertEqual(challenges[2].image.name, "local:1.0")
+        self.assertEqual(challenges[3].image.name, "ghcr.io/ctfcli/test-challenge:latest")
+        self.assertIsNone(challenges[4].image)
+
+        # resolved images are not checked again
+        mock_run.assert_called_once()
+
+    def test_returns_dependency_names(self):
+        challenge_path = BASE_DIR / "fixtures" / "challenges" / "test-challenge-minimal" / "challenge.yml"
+
+        challenge = Challenge(challenge_path, {"requirements": ["First Challenge", 3, "Test Challenge"], "next": 4})
+        self.assertEqual(challenge.get_dependency_names(), {"First Challenge"})
+
+        challenge = Challenge(
+            challenge_path,
+            {"requirements": {"prerequisites": ["First Challenge"], "anonymize": True}, "next": "Next Challenge"},
+        )
+        # next is set once all challenges exist, so it does not order challenges
+        self.assertEqual(challenge.get_dependency_names(), {"First Challenge"})
+
+    def test_fingerprint_changes_with_definition_files_and_ignore(self):
+        challenge_directory = Path(tempfile.mkdtemp())
+        shutil.copytree(BASE_DIR / "fixtures" / "challenges" / "test-challenge-files", challenge_directory / "test")
+        challenge_path = challenge_directory / "test" / "challenge.yml"
+
+        fingerprint = Challenge(challenge_path).get_fingerprint()
+        self.assertEqual(Challenge(challenge_path).get_fingerprint(), fingerprint)
+
+        self.assertNotEqual(Challenge(challenge_path, {"value": 200}).get_fingerprint(), fingerprint)
+        self.assertNotEqual(Challenge(challenge_path).get_fingerprint(ignore=("flags",)), fingerprint)
+
+        with open(challenge_directory / "test" / "files" / "test.pdf", "ab") as f:
+            f.write(b"changed")
+
+        self.assertNotEqual(Challenge(challenge_path).get_fingerprint(), fingerprint)
+
+    def test_rehash_hashes_every_file_once(self):
+        project_path = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, project_path)
+        (project_path / ".ctf").mkdir()
+        shutil.copytree(BASE_DIR / "fixtures" / "challenges" / "test-challenge-files", project_path / "test")
+
+        challenge = Challenge(project_path / "test" / "challenge.yml")
+        challenge.file_digest_store = Store(project_path)
+        challenge.rehash = True
+
+        with mock.patch("ctfcli.utils.hashing.hash_file_digests", wraps=hash_file_digests) as mock_hash:
+            challenge.get_fingerprint()
+            self.assertEqual(mock_hash.call_count, len(challenge["files"]))
+
+            # sync reuses the sha1 digests computed for the fingerprint
+            local_sha1sums = challenge._hash_local_files(challenge["files"])
+            self.assertEqual(mock_hash.call_count, len(challenge["files"]))
+
+        self.assertEqual(
+            local_sha1sums,
+            [hashlib.sha1((challenge.challenge_directory / f).read_bytes()).hexdigest() for f in challenge["files"]],
+        )
+
 
 class TestRemoteChallengeLoading(unittest.TestCase):
-    @mock.patch("ctfcli.core.challenge.API")
+    @mock.patch("ctfcli.core.challenge.API.shared")
     def test_load_installed_challenge(self, mock_api: MagicMock):
         Challenge.load_installed_challenge(1)
 
         mock_get = mock_api.return_value.get
         mock_get.assert_called_once_with("/api/v1/challenges/1?view=admin")
 
-    @mock.patch("ctfcli.core.challenge.API")
+    @mock.patch("ctfcli.core.challenge.API.shared")
     def test_load_installed_challenges(self, mock_api: MagicMock):
         Challenge.load_installed_challenges()
 
@@ -187,7 +282,7 @@ class TestChallengeSolutions(unittest.TestCase):
             fg="red",
         )
 
-    @mock.patch("ctfcli.core.challenge.API")
+    @mock.patch("ctfcli.core.challenge.API.shared")
     def test_creates_solution_from_specified_path(self, mock_api_constructor: MagicMock):
         challenge = Challenge(self.minimal_challenge, {"solution": "challenge.yml"})
         challenge.challenge_id = 1
@@ -221,7 +316,7 @@ class TestChallengeSolutions(unittest.TestCase):
         )
         mock_api.patch.assert_has_calls([call("/api/v1/solutions/5", json={"content": ANY})])
 
-    @mock.patch("ctfcli.core.challenge.API")
+    @mock.patch("ctfcli.core.challenge.API.shared")
     def test_creates_solution_from_object_with_state(self, mock_api_constructor: MagicMock):
         challenge = Challenge(self.minimal_challenge, {"solution": {"path": "challenge.yml", "state": "visible"}})
         challenge.challenge_id = 1
@@ -254,7 +349,7 @@ class TestChallengeSolutions(unittest.TestCase):
             [call("/api/v1/solutions", json={"challenge_id": 1, "state": "visible", "content": ""})]
         )
 
-    @mock.patch("ctfcli.core.challenge.API")
+    @mock.patch("ctfcli.core.challenge.API.shared")
     def test_updates_existing_solution_instead_of_creating_duplicate(self, mock_api_constructor: MagicMock):
         challenge = Challenge(self.minimal_challenge, {"solution": {"path": "challenge.yml", "state": "solved"}})
         challenge.challenge_id = 1
@@ -305,7 +400,7 @@ class TestChallengeSolutions(unittest.TestCase):
             any_order=True,
         )
 
-    @mock.patch("ctfcli.core.challenge.API")
+    @mock.patch("ctfcli.core.challenge.API.shared")
     def test_delete_solution_files_removes_referenced_files(self, mock_api_constructor: MagicMock):
         challenge = Challenge(self.minimal_challenge)
         challenge.challenge_id = 1
@@ -336,7 +431,7 @@ class TestChallengeSolutions(unittest.TestCase):
         )
         self.assertEqual(mock_api.delete.call_count, 2)
 
-    @mock.patch("ctfcli.core.challenge.API")
+    @mock.patch("ctfcli.core.challenge.API.shared")
     def test_delete_solution_files_deduplicates_repeated_references(self, mock_api_constructor: MagicMock):
         challenge = Challenge(self.minimal_challenge)
         challenge.challenge_id = 1
@@ -359,7 +454,7 @@ class TestChallengeSolutions(unittest.TestCase):
         # A file referenced twice must only be deleted once - a second DELETE would 404
         mock_api.delete.assert_called_once_with("/api/v1/files/7")
 
-    @mock.patch("ctfcli.core.challenge.API")
+    @mock.patch("ctfcli.core.challenge.API.shared")
     def test_creates_solution_uploads_repeated_image_only_once(self, mock_api_constructor: MagicMock):
         challenge = Challenge(
             self.solution_challenge,
@@ -405,7 +500,7 @@ class TestChallengeSolutions(unittest.TestCase):
         self.assertEqual(patched_content.count("/files/uploaded-location/test.png"), 2)
         self.assertNotIn("](images/test.png)", patched_content)
 
-    @mock.patch("ctfcli.core.challenge.API")
+    @mock.patch("ctfcli.core.challenge.API.shared")
     def test_delete_solution_files_noop_without_references(self, mock_api_constructor: MagicMock):
         challenge = Challenge(self.minimal_challenge)
         challenge.challenge_id = 1
@@ -416,7 +511,7 @@ class TestChallengeSolutions(unittest.TestCase):
         mock_api.get.assert_not_called()
         mock_api.delete.assert_not_called()
 
-    @mock.patch("ctfcli.core.challenge.API")
+    @mock.patch("ctfcli.core.challenge.API.shared")
     def test_does_not_create_solution_if_not_specified(self, mock_api_constructor: MagicMock):
         challenge = Challenge(self.minimal_challenge)
         challenge.challenge_id = 1
@@ -427,7 +522,7 @@ class TestChallengeSolutions(unittest.TestCase):
         mock_api.post.assert_not_called()
         mock_api.patch.assert_not_called()
 
-    @mock.patch("ctfcli.core.challenge.API")
+    @mock.patch("ctfcli.core.challenge.API.shared")
     def test_solution_uploads_markdown_images_and_inlines_snippets(self, mock_api_constructor: MagicMock):
         challenge = Challenge(self.solution_challenge)
         challenge.challenge_id = 1
@@ -525,8 +620,75 @@ class TestSyncChallenge(unittest.TestCase):
     minimal_challenge = BASE_DIR / "fixtures" / "challenges" / "test-challenge-minimal" / "challenge.yml"
     files_challenge = BASE_DIR / "fixtures" / "challenges" / "test-challenge-files" / "challenge.yml"
 
-    @mock.patch("ctfcli.core.challenge.Challenge.load_installed_challenges", return_value=installed_challenges)
-    @mock.patch("ctfcli.core.challenge.API")
+    @staticmethod
+    def mock_remote_resources(mock_api: MagicMock, resources: dict[str, list]) -> None:
+        # route listings to the given data, and fall back to the default mock response for other requests
+        default_response = mock_api.get.return_value
+
+        def mock_get(*args, **kwargs):
+            if args[0] not in resources:
+                return default_response
+
+            mock_response = MagicMock()
+            mock_response.json.return_value = {"success": True, "data": resources[args[0]]}
+            return mock_response
+
+        mock_api.get.side_effect = mock_get
+
+    @mock.patch("ctfcli.core.remote.RemoteState.load_challenges", return_value=installed_challenges)
+    @mock.patch("ctfcli.core.challenge.API.shared")
+    def test_syncs_known_remote_challenge_by_id(
+        self, mock_api_constructor: MagicMock, mock_load_challenges: MagicMock, *args, **kwargs
+    ):
+        # the challenge has been renamed locally since it was last synced as "Other Test Challenge"
+        challenge = Challenge(self.minimal_challenge, {"name": "Renamed Challenge"})
+        challenge.known_remote = (2, "Other Test Challenge")
+
+        mock_api: MagicMock = mock_api_constructor.return_value
+        mock_api.get.return_value.json.return_value = {"success": True, "data": self.installed_challenges[1]}
+        self.mock_remote_resources(
+            mock_api,
+            {
+                "/api/v1/flags": [],
+                "/api/v1/tags": [],
+                "/api/v1/challenges/2/topics": [],
+                "/api/v1/challenges/2/hints": [],
+                "/api/v1/solutions": [],
+            },
+        )
+
+        challenge.sync(ignore=["files"])
+
+        self.assertEqual(challenge.challenge_id, 2)
+        mock_load_challenges.assert_not_called()
+        mock_api.get.assert_any_call("/api/v1/challenges/2?view=admin")
+
+        # the remote challenge is renamed in place
+        self.assertEqual(mock_api.patch.call_args_list[0].args, ("/api/v1/challenges/2",))
+        self.assertEqual(mock_api.patch.call_args_list[0].kwargs["json"]["name"], "Renamed Challenge")
+
+    @mock.patch("ctfcli.core.remote.RemoteState.load_challenges", return_value=installed_challenges)
+    @mock.patch("ctfcli.core.challenge.API.shared")
+    def test_falls_back_to_name_if_known_remote_challenge_is_invalid(
+        self, mock_api_constructor: MagicMock, mock_load_challenges: MagicMock, *args, **kwargs
+    ):
+        challenge = Challenge(self.minimal_challenge)
+
+        # the id now belongs to a different challenge, e.g. after the instance has been reset
+        challenge.known_remote = (2, "Previous Challenge")
+
+        mock_api: MagicMock = mock_api_constructor.return_value
+        mock_api.get.return_value.json.return_value = {"success": True, "data": self.installed_challenges[1]}
+
+        self.assertIsNone(challenge.load_known_remote_challenge())
+        self.assertIsNone(challenge.known_remote)
+
+        challenge._load_challenge_id()
+        self.assertEqual(challenge.challenge_id, 1)
+        mock_load_challenges.assert_called_once()
+
+    @mock.patch("ctfcli.core.remote.RemoteState.load_challenges", return_value=installed_challenges)
+    @mock.patch("ctfcli.core.challenge.API.shared")
     def test_updates_simple_properties(self, mock_api_constructor: MagicMock, *args, **kwargs):
         challenge = Challenge(
             self.minimal_challenge,
@@ -559,7 +721,7 @@ class TestSyncChallenge(unittest.TestCase):
                 call("/api/v1/flags"),
                 call("/api/v1/challenges/1/topics"),
                 call("/api/v1/tags"),
-                call("/api/v1/hints"),
+                call("/api/v1/challenges/1/hints"),
             ],
             any_order=True,
         )
@@ -577,8 +739,8 @@ class TestSyncChallenge(unittest.TestCase):
         mock_api.post.assert_not_called()
         mock_api.delete.assert_not_called()
 
-    @mock.patch("ctfcli.core.challenge.Challenge.load_installed_challenges", return_value=installed_challenges)
-    @mock.patch("ctfcli.core.challenge.API")
+    @mock.patch("ctfcli.core.remote.RemoteState.load_challenges", return_value=installed_challenges)
+    @mock.patch("ctfcli.core.challenge.API.shared")
     def test_updates_attempts(self, mock_api_constructor: MagicMock, *args, **kwargs):
         challenge = Challenge(self.minimal_challenge, {"attempts": 5})
 
@@ -604,7 +766,7 @@ class TestSyncChallenge(unittest.TestCase):
                 call("/api/v1/flags"),
                 call("/api/v1/challenges/1/topics"),
                 call("/api/v1/tags"),
-                call("/api/v1/hints"),
+                call("/api/v1/challenges/1/hints"),
             ],
             any_order=True,
         )
@@ -618,8 +780,8 @@ class TestSyncChallenge(unittest.TestCase):
         mock_api.post.assert_not_called()
         mock_api.delete.assert_not_called()
 
-    @mock.patch("ctfcli.core.challenge.Challenge.load_installed_challenges", return_value=installed_challenges)
-    @mock.patch("ctfcli.core.challenge.API")
+    @mock.patch("ctfcli.core.remote.RemoteState.load_challenges", return_value=installed_challenges)
+    @mock.patch("ctfcli.core.challenge.API.shared")
     def test_updates_extra_properties(self, mock_api_constructor: MagicMock, *args, **kwargs):
         challenge = Challenge(
             self.minimal_challenge,
@@ -653,7 +815,7 @@ class TestSyncChallenge(unittest.TestCase):
                 call("/api/v1/flags"),
                 call("/api/v1/challenges/1/topics"),
                 call("/api/v1/tags"),
-                call("/api/v1/hints"),
+                call("/api/v1/challenges/1/hints"),
             ],
             any_order=True,
         )
@@ -667,8 +829,8 @@ class TestSyncChallenge(unittest.TestCase):
         mock_api.post.assert_not_called()
         mock_api.delete.assert_not_called()
 
-    @mock.patch("ctfcli.core.challenge.Challenge.load_installed_challenges", return_value=installed_challenges)
-    @mock.patch("ctfcli.core.challenge.API")
+    @mock.patch("ctfcli.core.remote.RemoteState.load_challenges", return_value=installed_challenges)
+    @mock.patch("ctfcli.core.challenge.API.shared")
     def test_updates_flags(self, mock_api_constructor: MagicMock, *args, **kwargs):
         challenge = Challenge(
             self.minimal_challenge,
@@ -703,20 +865,23 @@ class TestSyncChallenge(unittest.TestCase):
         }
 
         mock_api: MagicMock = mock_api_constructor.return_value
-        mock_api.get.return_value.json.return_value = {
-            "success": True,
-            "data": [
-                {"challenge_id": 1, "id": 1, "type": "static", "content": "flag{old-flag}", "data": "", "challenge": 1},
-                {
-                    "challenge_id": 1,
-                    "id": 2,
-                    "type": "regex",
-                    "content": "flag{.*}",
-                    "data": "case_insensitive",
-                    "challenge": 1,
-                },
-            ],
-        }
+        self.mock_remote_resources(
+            mock_api,
+            {
+                "/api/v1/flags": [
+                    {"challenge_id": 1, "id": 1, "type": "static", "content": "flag{old-flag}", "data": ""},
+                    {
+                        "challenge_id": 1,
+                        "id": 2,
+                        "type": "regex",
+                        "content": "flag{test-regex-.*}",
+                        "data": "case_insensitive",
+                    },
+                    {"challenge_id": 1, "id": 3, "type": "static", "content": "flag{removed-flag}", "data": ""},
+                    {"challenge_id": 2, "id": 4, "type": "static", "content": "flag{other-flag}", "data": ""},
+                ]
+            },
+        )
 
         challenge.sync(ignore=["files"])
 
@@ -726,7 +891,7 @@ class TestSyncChallenge(unittest.TestCase):
                 call("/api/v1/flags"),
                 call("/api/v1/challenges/1/topics"),
                 call("/api/v1/tags"),
-                call("/api/v1/hints"),
+                call("/api/v1/challenges/1/hints"),
             ],
             any_order=True,
         )
@@ -738,12 +903,13 @@ class TestSyncChallenge(unittest.TestCase):
             ]
         )
 
-        mock_api.post.assert_has_calls(
+        # the regex flag is unchanged, while the remaining remote flags are updated in place
+        self.assertEqual(
+            mock_api.patch.call_args_list[1:3],
             [
-                call("/api/v1/flags", json={"content": "flag{test-flag}", "type": "static", "challenge_id": 1}),
-                call().raise_for_status(),
+                call("/api/v1/flags/1", json={"content": "flag{test-flag}", "type": "static", "challenge_id": 1}),
                 call(
-                    "/api/v1/flags",
+                    "/api/v1/flags/3",
                     json={
                         "content": "flag{test-static}",
                         "type": "static",
@@ -751,31 +917,14 @@ class TestSyncChallenge(unittest.TestCase):
                         "challenge_id": 1,
                     },
                 ),
-                call().raise_for_status(),
-                call(
-                    "/api/v1/flags",
-                    json={
-                        "content": "flag{test-regex-.*}",
-                        "type": "regex",
-                        "data": "case_insensitive",
-                        "challenge_id": 1,
-                    },
-                ),
-                call().raise_for_status(),
-            ]
+            ],
         )
 
-        mock_api.delete.assert_has_calls(
-            [
-                call("/api/v1/flags/1"),
-                call().raise_for_status(),
-                call("/api/v1/flags/2"),
-                call().raise_for_status(),
-            ]
-        )
+        mock_api.post.assert_not_called()
+        mock_api.delete.assert_not_called()
 
-    @mock.patch("ctfcli.core.challenge.Challenge.load_installed_challenges", return_value=installed_challenges)
-    @mock.patch("ctfcli.core.challenge.API")
+    @mock.patch("ctfcli.core.remote.RemoteState.load_challenges", return_value=installed_challenges)
+    @mock.patch("ctfcli.core.challenge.API.shared")
     def test_updates_topics(self, mock_api_constructor: MagicMock, *args, **kwargs):
         challenge = Challenge(self.minimal_challenge, {"topics": ["new-topic-1", "new-topic-2"]})
 
@@ -793,13 +942,15 @@ class TestSyncChallenge(unittest.TestCase):
         }
 
         mock_api: MagicMock = mock_api_constructor.return_value
-        mock_api.get.return_value.json.return_value = {
-            "success": True,
-            "data": [
-                {"id": 1, "challenge_id": 1, "topic_id": 1, "value": "topic-1"},
-                {"id": 2, "challenge_id": 1, "topic_id": 2, "value": "topic-2"},
-            ],
-        }
+        self.mock_remote_resources(
+            mock_api,
+            {
+                "/api/v1/challenges/1/topics": [
+                    {"id": 1, "challenge_id": 1, "topic_id": 1, "value": "topic-1"},
+                    {"id": 2, "challenge_id": 1, "topic_id": 2, "value": "new-topic-2"},
+                ]
+            },
+        )
 
         challenge.sync(ignore=["files"])
 
@@ -809,7 +960,7 @@ class TestSyncChallenge(unittest.TestCase):
                 call("/api/v1/flags"),
                 call("/api/v1/challenges/1/topics"),
                 call("/api/v1/tags"),
-                call("/api/v1/hints"),
+                call("/api/v1/challenges/1/hints"),
             ],
             any_order=True,
         )
@@ -818,26 +969,15 @@ class TestSyncChallenge(unittest.TestCase):
             [call("/api/v1/challenges/1", json=expected_challenge_payload), call().raise_for_status()]
         )
 
-        mock_api.post.assert_has_calls(
-            [
-                call("/api/v1/topics", json={"value": "new-topic-1", "type": "challenge", "challenge_id": 1}),
-                call().raise_for_status(),
-                call("/api/v1/topics", json={"value": "new-topic-2", "type": "challenge", "challenge_id": 1}),
-                call().raise_for_status(),
-            ]
-        )
-
-        mock_api.delete.assert_has_calls(
-            [
-                call("/api/v1/topics?type=challenge&target_id=1"),
-                call().raise_for_status(),
-                call("/api/v1/topics?type=challenge&target_id=2"),
-                call().raise_for_status(),
-            ]
+        # topics cannot be updated in place - only the changed one is replaced
+        self.assertEqual(
+            mock_api.post.call_args_list,
+            [call("/api/v1/topics", json={"value": "new-topic-1", "type": "challenge", "challenge_id": 1})],
         )
+        self.assertEqual(mock_api.delete.call_args_list, [call("/api/v1/topics?type=challenge&target_id=1")])
 
-    @mock.patch("ctfcli.core.challenge.Challenge.load_installed_challenges", return_value=installed_challenges)
-    @mock.patch("ctfcli.core.challenge.API")
+    @mock.patch("ctfcli.core.remote.RemoteState.load_challenges", return_value=installed_challenges)
+    @mock.patch("ctfcli.core.challenge.API.shared")
     def test_updates_tags(self, mock_api_constructor: MagicMock, *args, **kwargs):
         challenge = Challenge(self.minimal_challenge, {"tags": ["new-tag-1", "new-tag-2"]})
 
@@ -855,13 +995,16 @@ class TestSyncChallenge(unittest.TestCase):
         }
 
         mock_api: MagicMock = mock_api_constructor.return_value
-        mock_api.get.return_value.json.return_value = {
-            "success": True,
-            "data": [
-                {"id": 1, "challenge_id": 1, "tag_id": 1, "value": "tag-1"},
-                {"id": 2, "challenge_id": 1, "tag_id": 2, "value": "tag-2"},
-            ],
-        }
+        self.mock_remote_resources(
+            mock_api,
+            {
+                "/api/v1/tags": [
+                    {"id": 1, "challenge_id": 1, "value": "new-tag-2"},
+                    {"id": 2, "challenge_id": 1, "value": "tag-2"},
+                    {"id": 3, "challenge_id": 1, "value": "tag-3"},
+                ]
+            },
+        )
 
         challenge.sync(ignore=["files"])
 
@@ -871,7 +1014,7 @@ class TestSyncChallenge(unittest.TestCase):
                 call("/api/v1/flags"),
                 call("/api/v1/challenges/1/topics"),
                 call("/api/v1/tags"),
-                call("/api/v1/hints"),
+                call("/api/v1/challenges/1/hints"),
             ],
             any_order=True,
         )
@@ -883,26 +1026,12 @@ class TestSyncChallenge(unittest.TestCase):
             ]
         )
 
-        mock_api.post.assert_has_calls(
-            [
-                call("/api/v1/tags", json={"value": "new-tag-1", "challenge_id": 1}),
-                call().raise_for_status(),
-                call("/api/v1/tags", json={"value": "new-tag-2", "challenge_id": 1}),
-                call().raise_for_status(),
-            ]
-        )
-
-        mock_api.delete.assert_has_calls(
-            [
-                call("/api/v1/tags/1"),
-                call().raise_for_status(),
-                call("/api/v1/tags/2"),
-                call().raise_for_status(),
-            ]
-        )
+        self.assertEqual(mock_api.patch.call_args_list[1], call("/api/v1/tags/2", json={"value": "new-tag-1"}))
+        mock_api.post.assert_not_called()
+        self.assertEqual(mock_api.delete.call_args_list, [call("/api/v1/tags/3")])
 
-    @mock.patch("ctfcli.core.challenge.Challenge.load_installed_challenges", return_value=installed_challenges)
-    @mock.patch("ctfcli.core.challenge.API")
+    @mock.patch("ctfcli.core.remote.RemoteState.load_challenges", return_value=installed_challenges)
+    @mock.patch("ctfcli.core.challenge.API.shared")
     def test_updates_files(self, mock_api_constructor: MagicMock, *args, **kwargs):
         challenge = Challenge(self.files_challenge)
 
@@ -952,7 +1081,7 @@ class TestSyncChallenge(unittest.TestCase):
                 call("/api/v1/challenges/1/topics"),
                 call("/api/v1/tags"),
                 call("/api/v1/files?type=challenge"),
-                call("/api/v1/hints"),
+                call("/api/v1/challenges/1/hints"),
             ],
             any_order=True,
         )
@@ -977,71 +1106,72 @@ class TestSyncChallenge(unittest.TestCase):
             ]
         )
 
-    @mock.patch("ctfcli.core.challenge.Challenge.load_installed_challenges", return_value=installed_challenges)
-    @mock.patch("ctfcli.core.challenge.API")
-    def test_exits_if_updated_files_do_not_exist(self, mock_api_constructor: MagicMock, *args, **kwargs):
-        challenge = Challenge(self.minimal_challenge, {"files": ["files/nonexistent.png"]})
+    @mock.patch("ctfcli.core.remote.RemoteState.load_challenges", return_value=installed_challenges)
+    @mock.patch("ctfcli.core.challenge.API.shared")
+    def test_does_not_reupload_files_with_matching_sha1sums(self, mock_api_constructor: MagicMock, *args, **kwargs):
+        challenge = Challenge(self.files_challenge)
+        files_directory = challenge.challenge_directory / "files"
 
         mock_api: MagicMock = mock_api_constructor.return_value
-
-        with self.assertRaises(InvalidChallengeFile) as e:
-            challenge.sync()
-            self.assertEqual(e.exception.message, "File files/nonexistent.png could not be loaded")
-
-        mock_api.get.assert_not_called()
-        mock_api.patch.assert_not_called()
-        mock_api.post.assert_not_called()
-        mock_api.delete.assert_not_called()
-
-    @mock.patch("ctfcli.core.challenge.API")
-    def test_updates_hints(self, mock_api_constructor: MagicMock):
-        challenge = Challenge(
-            self.minimal_challenge,
+        self.mock_remote_resources(
+            mock_api,
             {
-                "hints": [
-                    "free hint",
+                "/api/v1/challenges/1?view=admin": {
+                    **self.installed_challenges[0],
+                    "files": [
+                        "/files/e3a267d9cc21ae3051b6d7ea09e5c6cc/test.png",
+                        "/files/37b9992954f1e6e64e46af6600fb2c0b/test.pdf",
+                    ],
+                },
+                "/api/v1/files?type=challenge": [
                     {
-                        "content": "paid hint",
-                        "cost": 100,
+                        "id": 1,
+                        "type": "challenge",
+                        "location": "e3a267d9cc21ae3051b6d7ea09e5c6cc/test.png",
+                        "sha1sum": hashlib.sha1((files_directory / "test.png").read_bytes()).hexdigest(),
                     },
-                ]
+                    {
+                        "id": 2,
+                        "type": "challenge",
+                        "location": "37b9992954f1e6e64e46af6600fb2c0b/test.pdf",
+                        "sha1sum": "outdated",
+                    },
+                ],
+                "/api/v1/flags": [],
+                "/api/v1/challenges/1/topics": [],
+                "/api/v1/tags": [],
+                "/api/v1/challenges/1/hints": [],
             },
         )
-        challenge.challenge_id = 1
 
-        mock_api: MagicMock = mock_api_constructor.return_value
-        mock_api.get.return_value.json.return_value = {
-            "success": True,
-            "data": [
-                {"challenge_id": 1, "id": 1, "content": "old free hint", "cost": 0, "challenge": 1},
-                {"challenge_id": 1, "id": 2, "content": "old paid hint", "cost": 50, "challenge": 1},
-            ],
-        }
-        mock_api.post.return_value.json.return_value = {"success": True, "data": {"id": 10}}
-
-        challenge._delete_existing_hints()
-        challenge._create_hints()
+        challenge.sync()
 
+        # only the changed file is replaced
+        mock_api.delete.assert_has_calls([call("/api/v1/files/2"), call().raise_for_status()])
+        self.assertNotIn(call("/api/v1/files/1"), mock_api.delete.call_args_list)
         self.assertEqual(
-            mock_api.delete.call_args_list,
-            [call("/api/v1/hints/1"), call("/api/v1/hints/2")],
+            [c for c in mock_api.post.call_args_list if c.args == ("/api/v1/files",)],
+            [call("/api/v1/files", files=ANY, data={"challenge_id": 1, "type": "challenge"})],
         )
-        self.assertEqual(mock_api.delete.return_value.raise_for_status.call_count, 2)
 
-        self.assertEqual(
-            mock_api.post.call_args_list,
-            [
-                call("/api/v1/hints", json={"content": "free hint", "title": "", "cost": 0, "challenge_id": 1}),
-                call("/api/v1/hints", json={"content": "paid hint", "title": "", "cost": 100, "challenge_id": 1}),
-            ],
-        )
-        self.assertEqual(mock_api.post.return_value.raise_for_status.call_count, 2)
+    @mock.patch("ctfcli.core.remote.RemoteState.load_challenges", return_value=installed_challenges)
+    @mock.patch("ctfcli.core.challenge.API.shared")
+    def test_exits_if_updated_files_do_not_exist(self, mock_api_constructor: MagicMock, *args, **kwargs):
+        challenge = Challenge(self.minimal_challenge, {"files": ["files/nonexistent.png"]})
+
+        mock_api: MagicMock = mock_api_constructor.return_value
+
+        with self.assertRaises(InvalidChallengeFile) as e:
+            challenge.sync()
+            self.assertEqual(e.exception.message, "File files/nonexistent.png could not be loaded")
 
-        # no requirements — no PATCH calls expected
+        mock_api.get.assert_not_called()
         mock_api.patch.assert_not_called()
+        mock_api.post.assert_not_called()
+        mock_api.delete.assert_not_called()
 
-    @mock.patch("ctfcli.core.challenge.Challenge.load_installed_challenges", return_value=installed_challenges)
-    @mock.patch("ctfcli.core.challenge.API")
+    @mock.patch("ctfcli.core.remote.RemoteState.load_challenges", return_value=installed_challenges)
+    @mock.patch("ctfcli.core.challenge.API.shared")
     def test_updates_hints_with_requirements(self, mock_api_constructor: MagicMock, *args, **kwargs):
         challenge = Challenge(
             self.minimal_challenge,
@@ -1076,12 +1206,64 @@ class TestSyncChallenge(unittest.TestCase):
         }
 
         mock_api: MagicMock = mock_api_constructor.return_value
-        mock_api.get.return_value.json.return_value = {
-            "success": True,
-            "data": [
-                {"challenge_id": 1, "id": 5, "content": "old hint", "cost": 0, "challenge": 1},
-            ],
-        }
+        self.mock_remote_resources(
+            mock_api,
+            {
+                "/api/v1/challenges/1/hints": [
+                    {"challenge_id": 1, "id": 5, "title": "", "content": "first hint", "cost": 0},
+                    {"challenge_id": 1, "id": 6, "title": "", "content": "removed hint", "cost": 0},
+                    {
+                        "challenge_id": 1,
+                        "id": 7,
+                        "title": "",
+                        "content": "removed hint with requirements",
+                        "cost": 0,
+                        "requirements": {"prerequisites": [6]},
+                    },
+                ]
+            },
+        )
+
+        post_hint_response = MagicMock()
+        post_hint_response.json.return_value = {"success": True, "data": {"id": 10}}
+        mock_api.post.return_value = post_hint_response
+
+        challenge.sync(ignore=["files"])
+
+        # hint-1 is unchanged, hint-2 reuses a stale remote hint
+        mock_api.post.assert_not_called()
+
+        # hint-2 requirements set first, then real content applied
+        mock_api.patch.assert_has_calls(
+            [
+                call("/api/v1/challenges/1", json=expected_challenge_payload),
+                call().raise_for_status(),
+                call("/api/v1/hints/6", json={"requirements": {"prerequisites": [5]}}),
+                call().raise_for_status(),
+                call("/api/v1/hints/6", json={"content": "second hint", "title": "Going deeper", "cost": 10}),
+                call().raise_for_status(),
+            ]
+        )
+
+        self.assertEqual(mock_api.delete.call_args_list, [call("/api/v1/hints/7")])
+
+    @mock.patch("ctfcli.core.remote.RemoteState.load_challenges", return_value=installed_challenges)
+    @mock.patch("ctfcli.core.challenge.API.shared")
+    def test_creates_hints_with_requirements_before_setting_content(
+        self, mock_api_constructor: MagicMock, *args, **kwargs
+    ):
+        challenge = Challenge(
+            self.minimal_challenge,
+            {
+                "hints": [
+                    {"key": "hint-1", "content": "first hint"},
+                    {"key": "hint-2", "content": "second hint", "cost": 10, "requirements": ["hint-1"]},
+                ]
+            },
+        )
+
+        mock_api: MagicMock = mock_api_constructor.return_value
+        self.mock_remote_resources(mock_api, {"/api/v1/challenges/1/hints": []})
 
         # POST responses return different hint IDs per call
         post_hint_1_response = MagicMock()
@@ -1092,36 +1274,26 @@ class TestSyncChallenge(unittest.TestCase):
 
         challenge.sync(ignore=["files"])
 
-        # hint-1: created with real content (no requirements)
-        # hint-2: created with blank content (has requirements, to prevent premature exposure)
-        mock_api.post.assert_has_calls(
+        # hint-2 is created with blank content (has requirements, to prevent premature exposure)
+        self.assertEqual(
+            mock_api.post.call_args_list,
             [
                 call("/api/v1/hints", json={"content": "first hint", "title": "", "cost": 0, "challenge_id": 1}),
-                call("/api/v1/hints", json={"content": "", "title": "Going deeper", "cost": 10, "challenge_id": 1}),
-            ]
+                call("/api/v1/hints", json={"content": "", "title": "", "cost": 10, "challenge_id": 1}),
+            ],
         )
 
-        # hint-2 requirements set first, then real content applied
-        mock_api.patch.assert_has_calls(
+        self.assertEqual(
+            mock_api.patch.call_args_list[1:3],
             [
-                call("/api/v1/challenges/1", json=expected_challenge_payload),
-                call().raise_for_status(),
                 call("/api/v1/hints/11", json={"requirements": {"prerequisites": [10]}}),
-                call().raise_for_status(),
                 call("/api/v1/hints/11", json={"content": "second hint"}),
-                call().raise_for_status(),
-            ]
-        )
-
-        mock_api.delete.assert_has_calls(
-            [
-                call("/api/v1/hints/5"),
-                call().raise_for_status(),
-            ]
+            ],
         )
+        mock_api.delete.assert_not_called()
 
-    @mock.patch("ctfcli.core.challenge.Challenge.load_installed_challenges", return_value=installed_challenges)
-    @mock.patch("ctfcli.core.challenge.API")
+    @mock.patch("ctfcli.core.remote.RemoteState.load_challenges", return_value=installed_challenges)
+    @mock.patch("ctfcli.core.challenge.API.shared")
     def test_updates_hints_with_unknown_requirement_key(self, mock_api_constructor: MagicMock, *args, **kwargs):
         challenge = Challenge(
             self.minimal_challenge,
@@ -1137,12 +1309,7 @@ class TestSyncChallenge(unittest.TestCase):
         )
 
         mock_api: MagicMock = mock_api_constructor.return_value
-        mock_api.get.return_value.json.return_value = {
-            "success": True,
-            "data": [
-                {"challenge_id": 1, "id": 5, "content": "old hint", "cost": 0, "challenge": 1},
-            ],
-        }
+        self.mock_remote_resources(mock_api, {"/api/v1/challenges/1/hints": []})
 
         post_hint_1_response = MagicMock()
         post_hint_1_response.json.return_value = {"success": True, "data": {"id": 10}}
@@ -1165,8 +1332,58 @@ class TestSyncChallenge(unittest.TestCase):
         # content PATCH still happens after the (skipped) requirements step
         mock_api.patch.assert_any_call("/api/v1/hints/10", json={"content": "first hint"})
 
-    @mock.patch("ctfcli.core.challenge.Challenge.load_installed_challenges", return_value=installed_challenges)
-    @mock.patch("ctfcli.core.challenge.API")
+    @mock.patch("ctfcli.core.remote.RemoteState.load_challenges", return_value=installed_challenges)
+    @mock.patch("ctfcli.core.challenge.API.shared")
+    def test_does_not_write_unchanged_resources(self, mock_api_constructor: MagicMock, *args, **kwargs):
+        challenge = Challenge(
+            self.minimal_challenge,
+            {
+                "flags": ["flag{test-flag}", {"type": "regex", "content": "flag{.*}", "data": "case_insensitive"}],
+                "topics": ["topic-1"],
+                "tags": ["tag-1", "tag-2"],
+                "hints": [
+                    {"key": "hint-1", "content": "first hint"},
+                    {"key": "hint-2", "content": "second hint", "cost": 10, "requirements": ["hint-1"]},
+                ],
+            },
+        )
+
+        mock_api: MagicMock = mock_api_constructor.return_value
+        self.mock_remote_resources(
+            mock_api,
+            {
+                "/api/v1/flags": [
+                    {"id": 2, "challenge_id": 1, "type": "regex", "content": "flag{.*}", "data": "case_insensitive"},
+                    {"id": 1, "challenge_id": 1, "type": "static", "content": "flag{test-flag}", "data": ""},
+                ],
+                "/api/v1/challenges/1/topics": [{"id": 1, "challenge_id": 1, "topic_id": 1, "value": "topic-1"}],
+                "/api/v1/tags": [
+                    {"id": 1, "challenge_id": 1, "value": "tag-1"},
+                    {"id": 2, "challenge_id": 1, "value": "tag-2"},
+                ],
+                "/api/v1/challenges/1/hints": [
+                    {"id": 1, "challenge_id": 1, "title": "", "content": "first hint", "cost": 0, "requirements": None},
+                    {
+                        "id": 2,
+                        "challenge_id": 1,
+                        "title": "",
+                        "content": "second hint",
+                        "cost": 10,
+                        "requirements": {"prerequisites": [1]},
+                    },
+                ],
+            },
+        )
+
+        challenge.sync(ignore=["files", "next", "solution", "state"])
+
+        # only the challenge itself is patched
+        self.assertEqual(len(mock_api.patch.call_args_list), 1)
+        mock_api.post.assert_not_called()
+        mock_api.delete.assert_not_called()
+
+    @mock.patch("ctfcli.core.remote.RemoteState.load_challenges", return_value=installed_challenges)
+    @mock.patch("ctfcli.core.challenge.API.shared")
     def test_updates_requirements(self, mock_api_constructor: MagicMock, *args, **kwargs):
         challenge = Challenge(self.minimal_challenge, {"requirements": ["Other Test Challenge", 3]})
 
@@ -1208,8 +1425,38 @@ class TestSyncChallenge(unittest.TestCase):
         mock_api.post.assert_not_called()
         mock_api.delete.assert_not_called()
 
-    @mock.patch("ctfcli.core.challenge.Challenge.load_installed_challenges", return_value=installed_challenges)
-    @mock.patch("ctfcli.core.challenge.API")
+    @mock.patch("ctfcli.core.remote.RemoteState.load_challenges", return_value=installed_challenges)
+    @mock.patch("ctfcli.core.challenge.API.shared")
+    def test_updates_next_by_name_and_id(self, mock_api_constructor: MagicMock, *args, **kwargs):
+        mock_api: MagicMock = mock_api_constructor.return_value
+
+        for _next, expected_next_id in [("Other Test Challenge", 2), (3, 3)]:
+            mock_api.patch.reset_mock()
+
+            challenge = Challenge(self.minimal_challenge, {"next": _next})
+            challenge.sync(ignore=["flags", "topics", "tags", "files", "hints", "solution", "state"])
+
+            mock_api.patch.assert_any_call("/api/v1/challenges/1", json={"next_id": expected_next_id})
+
+    @mock.patch("ctfcli.core.remote.RemoteState.load_challenges", return_value=installed_challenges)
+    @mock.patch("ctfcli.core.challenge.API.shared")
+    def test_defers_next(self, mock_api_constructor: MagicMock, *args, **kwargs):
+        mock_api: MagicMock = mock_api_constructor.return_value
+
+        challenge = Challenge(self.minimal_challenge, {"next": "Other Test Challenge"})
+        challenge.defer_next = True
+        challenge.sync(ignore=["flags", "topics", "tags", "files", "hints", "solution", "state"])
+
+        self.assertTrue(challenge.next_pending)
+        self.assertNotIn(call("/api/v1/challenges/1", json={"next_id": 2}), mock_api.patch.call_args_list)
+
+        challenge.set_next()
+
+        self.assertFalse(challenge.next_pending)
+        mock_api.patch.assert_called_with("/api/v1/challenges/1", json={"next_id": 2})
+
+    @mock.patch("ctfcli.core.remote.RemoteState.load_challenges", return_value=installed_challenges)
+    @mock.patch("ctfcli.core.challenge.API.shared")
     def test_updates_module_by_name(self, mock_api_constructor: MagicMock, *args, **kwargs):
         challenge = Challenge(self.minimal_challenge, {"module": "Test Module"})
 
@@ -1245,9 +1492,9 @@ class TestSyncChallenge(unittest.TestCase):
         # the module already exists, so it should not be created
         mock_api.post.assert_not_called()
 
-    @mock.patch("ctfcli.core.challenge.Challenge.load_installed_challenges", return_value=installed_challenges)
+    @mock.patch("ctfcli.core.remote.RemoteState.load_challenges", return_value=installed_challenges)
     @mock.patch("ctfcli.core.challenge.click.secho")
-    @mock.patch("ctfcli.core.challenge.API")
+    @mock.patch("ctfcli.core.challenge.API.shared")
     def test_creates_module_if_missing(self, mock_api_constructor: MagicMock, *args, **kwargs):
         challenge = Challenge(self.minimal_challenge, {"module": "New Module"})
 
@@ -1289,8 +1536,8 @@ class TestSyncChallenge(unittest.TestCase):
             ]
         )
 
-    @mock.patch("ctfcli.core.challenge.Challenge.load_installed_challenges", return_value=installed_challenges)
-    @mock.patch("ctfcli.core.challenge.API")
+    @mock.patch("ctfcli.core.remote.RemoteState.load_challenges", return_value=installed_challenges)
+    @mock.patch("ctfcli.core.challenge.API.shared")
     def test_numeric_module_treated_as_name(self, mock_api_constructor: MagicMock, *args, **kwargs):
         # a numeric module (YAML loads "42" as an int) is always treated as a name,
         # not a module id - it is resolved (and created if missing) by name
@@ -1335,8 +1582,8 @@ class TestSyncChallenge(unittest.TestCase):
             ]
         )
 
-    @mock.patch("ctfcli.core.challenge.Challenge.load_installed_challenges", return_value=installed_challenges)
-    @mock.patch("ctfcli.core.challenge.API")
+    @mock.patch("ctfcli.core.remote.RemoteState.load_challenges", return_value=installed_challenges)
+    @mock.patch("ctfcli.core.challenge.API.shared")
     def test_removes_module_with_explicit_null(self, mock_api_constructor: MagicMock, *args, **kwargs):
         challenge = Challenge(self.minimal_challenge, {"module": None})
 
@@ -1351,8 +1598,8 @@ class TestSyncChallenge(unittest.TestCase):
         )
         mock_api.post.assert_not_called()
 
-    @mock.patch("ctfcli.core.challenge.Challenge.load_installed_challenges", return_value=installed_challenges)
-    @mock.patch("ctfcli.core.challenge.API")
+    @mock.patch("ctfcli.core.remote.RemoteState.load_challenges", return_value=installed_challenges)
+    @mock.patch("ctfcli.core.challenge.API.shared")
     def test_does_not_touch_module_if_absent(self, mock_api_constructor: MagicMock, *args, **kwargs):
         challenge = Challenge(self.minimal_challenge)
 
@@ -1364,9 +1611,9 @@ class TestSyncChallenge(unittest.TestCase):
         for patch_call in mock_api.patch.call_args_list:
             self.assertNotIn("module_id", patch_call.kwargs.get("json", {}))
 
-    @mock.patch("ctfcli.core.challenge.Challenge.load_installed_challenges", return_value=installed_challenges)
+    @mock.patch("ctfcli.core.remote.RemoteState.load_challenges", return_value=installed_challenges)
     @mock.patch("ctfcli.core.challenge.click.secho")
-    @mock.patch("ctfcli.core.challenge.API")
+    @mock.patch("ctfcli.core.challenge.API.shared")
     def test_challenge_cannot_require_itself(
         self, mock_api_constructor: MagicMock, mock_secho: MagicMock, *args, **kwargs
     ):
@@ -1428,8 +1675,8 @@ class TestSyncChallenge(unittest.TestCase):
         mock_api.post.assert_not_called()
         mock_api.delete.assert_not_called()
 
-    @mock.patch("ctfcli.core.challenge.Challenge.load_installed_challenges", return_value=installed_challenges)
-    @mock.patch("ctfcli.core.challenge.API")
+    @mock.patch("ctfcli.core.remote.RemoteState.load_challenges", return_value=installed_challenges)
+    @mock.patch("ctfcli.core.challenge.API.shared")
     def test_defaults_to_standard_challenge_type(self, mock_api_constructor: MagicMock, *args, **kwargs):
         challenge = Challenge(self.minimal_challenge)
         del challenge["type"]
@@ -1457,7 +1704,7 @@ class TestSyncChallenge(unittest.TestCase):
                 call("/api/v1/flags"),
                 call("/api/v1/challenges/1/topics"),
                 call("/api/v1/tags"),
-                call("/api/v1/hints"),
+                call("/api/v1/challenges/1/hints"),
             ],
             any_order=True,
         )
@@ -1468,8 +1715,8 @@ class TestSyncChallenge(unittest.TestCase):
         mock_api.post.assert_not_called()
         mock_api.delete.assert_not_called()
 
-    @mock.patch("ctfcli.core.challenge.Challenge.load_installed_challenges", return_value=installed_challenges)
-    @mock.patch("ctfcli.core.challenge.API")
+    @mock.patch("ctfcli.core.remote.RemoteState.load_challenges", return_value=installed_challenges)
+    @mock.patch("ctfcli.core.challenge.API.shared")
     def test_defaults_to_visible_state(self, mock_api_constructor: MagicMock, *args, **kwargs):
         challenge = Challenge(self.minimal_challenge)
         del challenge["state"]
@@ -1498,7 +1745,7 @@ class TestSyncChallenge(unittest.TestCase):
                 call("/api/v1/flags"),
                 call("/api/v1/challenges/1/topics"),
                 call("/api/v1/tags"),
-                call("/api/v1/hints"),
+                call("/api/v1/challenges/1/hints"),
             ],
             any_order=True,
         )
@@ -1517,8 +1764,8 @@ class TestSyncChallenge(unittest.TestCase):
         mock_api.post.assert_not_called()
         mock_api.delete.assert_not_called()
 
-    @mock.patch("ctfcli.core.challenge.Challenge.load_installed_challenges", return_value=installed_challenges)
-    @mock.patch("ctfcli.core.challenge.API")
+    @mock.patch("ctfcli.core.remote.RemoteState.load_challenges", return_value=installed_challenges)
+    @mock.patch("ctfcli.core.challenge.API.shared")
     def test_does_not_update_dynamic_value(self, mock_api_constructor: MagicMock, *args, **kwargs):
         challenge = Challenge(
             self.minimal_challenge,
@@ -1548,8 +1795,8 @@ class TestSyncChallenge(unittest.TestCase):
             [call("/api/v1/challenges/1", json=expected_challenge_payload), call().raise_for_status()]
         )
 
-    @mock.patch("ctfcli.core.challenge.Challenge.load_installed_challenges", return_value=[])
-    @mock.patch("ctfcli.core.challenge.API")
+    @mock.patch("ctfcli.core.remote.RemoteState.load_challenges", return_value=[])
+    @mock.patch("ctfcli.core.challenge.API.shared")
     def test_exits_if_challenges_do_not_exist(self, *args, **kwargs):
         challenge = Challenge(self.minimal_challenge)
 
@@ -1558,18 +1805,18 @@ class TestSyncChallenge(unittest.TestCase):
             self.assertEqual(e.exception.message, "Could not load any remote challenges")
 
     @mock.patch(
-        "ctfcli.core.challenge.Challenge.load_installed_challenges",
+        "ctfcli.core.remote.RemoteState.load_challenges",
         return_value=[{"id": 1337, "name": "Dummy Challenge"}],
     )
-    @mock.patch("ctfcli.core.challenge.API")
+    @mock.patch("ctfcli.core.challenge.API.shared")
     def test_exits_if_challenge_does_not_exist(self, *args, **kwargs):
         challenge = Challenge(self.minimal_challenge)
         with self.assertRaises(RemoteChallengeNotFound) as e:
             challenge.sync()
             self.assertEqual(e.exception.message, "Could not load remote challenge with name 'Test Challenge'")
 
-    @mock.patch("ctfcli.core.challenge.Challenge.load_installed_challenges", return_value=installed_challenges)
-    @mock.patch("ctfcli.core.challenge.API")
+    @mock.patch("ctfcli.core.remote.RemoteState.load_challenges", return_value=installed_challenges)
+    @mock.patch("ctfcli.core.challenge.API.shared")
     def test_updates_multiple_attributes_at_once(self, mock_api_constructor: MagicMock, *args, **kwargs):
         challenge = Challenge(
             self.files_challenge,
@@ -1611,7 +1858,7 @@ class TestSyncChallenge(unittest.TestCase):
                 call("/api/v1/challenges/1/topics"),
                 call("/api/v1/tags"),
                 call("/api/v1/files?type=challenge"),
-                call("/api/v1/hints"),
+                call("/api/v1/challenges/1/hints"),
             ],
             any_order=True,
         )
@@ -1690,12 +1937,12 @@ class TestSyncChallenge(unittest.TestCase):
         # This nightmare is necessary because on python 3.8 for whatever reason "with" with multiple context managers
         # doesn't work
         for p in properties:
-            with mock.patch("ctfcli.core.challenge.API") as mock_api_constructor:
+            with mock.patch("ctfcli.core.challenge.API.shared") as mock_api_constructor:
                 with mock.patch(
                     "ctfcli.core.challenge.Challenge.load_installed_challenge", return_value=remote_installed_challenge
                 ) as mock_load_installed_challenge:
                     with mock.patch(
-                        "ctfcli.core.challenge.Challenge.load_installed_challenges",
+                        "ctfcli.core.remote.RemoteState.load_challenges",
                         return_value=self.installed_challenges,
                     ) as mock_load_installed_challenges:
                         challenge = Challenge(
@@ -1764,7 +2011,7 @@ class TestSyncChallenge(unittest.TestCase):
                         challenge.sync(ignore=[p])
 
                         mock_api: MagicMock = mock_api_constructor.return_value
-                        mock_load_installed_challenge.assert_has_calls([call(1)])
+                        mock_load_installed_challenge.assert_has_calls([call(1, api=mock_api)])
                         mock_load_installed_challenges.assert_called_once_with()
                         mock_api.patch.assert_has_calls(
                             [
@@ -1811,8 +2058,8 @@ class TestCreateChallenge(unittest.TestCase):
     minimal_challenge = BASE_DIR / "fixtures" / "challenges" / "test-challenge-minimal" / "challenge.yml"
     full_challenge = BASE_DIR / "fixtures" / "challenges" / "test-challenge-full" / "challenge.yml"
 
-    @mock.patch("ctfcli.core.challenge.Challenge.load_installed_challenges", return_value=installed_challenges)
-    @mock.patch("ctfcli.core.challenge.API")
+    @mock.patch("ctfcli.core.remote.RemoteState.load_challenges", return_value=installed_challenges)
+    @mock.patch("ctfcli.core.challenge.API.shared")
     def test_creates_standard_challenge(self, mock_api_constructor: MagicMock, *args, **kwargs):
         challenge = Challenge(self.full_challenge)
 
@@ -1896,8 +2143,8 @@ class TestCreateChallenge(unittest.TestCase):
 
         mock_api.delete.assert_not_called()
 
-    @mock.patch("ctfcli.core.challenge.Challenge.load_installed_challenges", return_value=installed_challenges)
-    @mock.patch("ctfcli.core.challenge.API")
+    @mock.patch("ctfcli.core.remote.RemoteState.load_challenges", return_value=installed_challenges)
+    @mock.patch("ctfcli.core.challenge.API.shared")
     def test_creates_solution_on_create(self, mock_api_constructor: MagicMock, *args, **kwargs):
         challenge = Challenge(self.minimal_challenge, {"solution": "challenge.yml"})
 
@@ -1935,9 +2182,9 @@ class TestCreateChallenge(unittest.TestCase):
             any_order=True,
         )
 
-    @mock.patch("ctfcli.core.challenge.Challenge.load_installed_challenges", return_value=installed_challenges)
+    @mock.patch("ctfcli.core.remote.RemoteState.load_challenges", return_value=installed_challenges)
     @mock.patch("ctfcli.core.challenge.click.secho")
-    @mock.patch("ctfcli.core.challenge.API")
+    @mock.patch("ctfcli.core.challenge.API.shared")
     def test_creates_challenge_with_module(self, mock_api_constructor: MagicMock, *args, **kwargs):
         challenge = Challenge(self.minimal_challenge, {"module": "New Module"})
 
@@ -1988,8 +2235,8 @@ class TestCreateChallenge(unittest.TestCase):
             ]
         )
 
-    @mock.patch("ctfcli.core.challenge.Challenge.load_installed_challenges", return_value=installed_challenges)
-    @mock.patch("ctfcli.core.challenge.API")
+    @mock.patch("ctfcli.core.remote.RemoteState.load_challenges", return_value=installed_challenges)
+    @mock.patch("ctfcli.core.challenge.API.shared")
     def test_exits_if_files_do_not_exist(self, mock_api_constructor: MagicMock, *args, **kwargs):
         challenge = Challenge(self.minimal_challenge, {"files": ["files/nonexistent.png"]})
         mock_api: MagicMock = mock_api_constructor.return_value
@@ -2012,10 +2259,10 @@ class TestCreateChallenge(unittest.TestCase):
         # fmt:on
 
         for p in properties:
-            with mock.patch("ctfcli.core.challenge.API") as mock_api_constructor:
+            with mock.patch("ctfcli.core.challenge.API.shared") as mock_api_constructor:
                 with mock.patch("ctfcli.core.challenge.click.secho") as mock_secho:
                     with mock.patch(
-                        "ctfcli.core.challenge.Challenge.load_installed_challenges",
+                        "ctfcli.core.remote.RemoteState.load_challenges",
                         return_value=self.installed_challenges,
                     ):
                         challenge = Challenge(self.minimal_challenge, {"state": "visible"})
@@ -2165,21 +2412,27 @@ class TestLintChallenge(unittest.TestCase):
         mock_secho.assert_called_once_with("Skipping Hadolint", fg="yellow")
         self.assertDictEqual(expected_lint_issues, e.exception.issues)
 
-    @mock.patch("ctfcli.core.challenge.subprocess.run")
+    @mock.patch("ctfcli.core.hadolint.subprocess.run")
     def test_runs_hadolint(self, mock_run: MagicMock):
         class RunResult:
             def __init__(self, return_code):
                 self.returncode = return_code
-                self.stdout = b"-:1 DL3006 warning: Always tag the version of an image explicitly"
+                self.stdout = (
+                    b'[{"code": "DL3006", "column": 1, "file": "0/Dockerfile", "level": "warning", "line": 1, '
+                    b'"message": "Always tag the version of an image explicitly"}]'
+                )
+                self.stderr = b""
 
-        mock_run.return_value = RunResult(1)
+        mock_run.return_value = RunResult(0)
         challenge = Challenge(self.dockerfile_challenge)
 
         with self.assertRaises(LintException) as e:
             challenge.lint()
 
         mock_run.assert_called_once_with(
-            ["docker", "run", "--rm", "-i", "hadolint/hadolint"], capture_output=True, input=ANY
+            ["docker", "run", "--rm", "-i", "--entrypoint", "sh", "hadolint/hadolint:latest-alpine", "-c", ANY],
+            capture_output=True,
+            input=ANY,
         )
 
         expected_lint_issues = {
@@ -2190,7 +2443,7 @@ class TestLintChallenge(unittest.TestCase):
         }
         self.assertDictEqual(expected_lint_issues, e.exception.issues)
 
-    @mock.patch("ctfcli.core.challenge.subprocess.run")
+    @mock.patch("ctfcli.core.hadolint.subprocess.run")
     @mock.patch("ctfcli.core.challenge.click.secho")
     def test_allows_for_skipping_hadolint(self, mock_secho: MagicMock, mock_run: MagicMock, *args, **kwargs):
         challenge = Challenge(self.dockerfile_challenge)
@@ -2233,6 +2486,20 @@ class TestLintChallenge(unittest.TestCase):
 
         self.assertDictEqual(expected_lint_issues, e.exception.issues)
 
+    def test_looks_for_flags_in_several_formats(self, *args, **kwargs):
+        challenge = Challenge(self.files_challenge, {"files": ["files/flag.txt"]})
+
+        # no issues without a matching format
+        self.assertTrue(challenge.lint(skip_hadolint=True, flag_format=["CTF{"], flag_regex=[r"ctf\{\w+\}"]))
+
+        with self.assertRaises(LintException) as e:
+            challenge.lint(skip_hadolint=True, flag_format=["CTF{"], flag_regex=[r"\w+\{test-\w+\}"])
+
+        self.assertEqual(
+            e.exception.issues["files"],
+            ["Potential flag found in distributed file 'files/flag.txt':\n Whoopsie: flag{test-flag}"],
+        )
+
     def test_validates_solution_file_exists(self):
         challenge = Challenge(self.minimal_challenge, {"solution": "writeup/WRITEUP.md"})
 
@@ -2474,7 +2741,7 @@ class TestVerifyMirrorChallenge(unittest.TestCase):
 
     maxDiff = 1000
 
-    @mock.patch("ctfcli.core.challenge.API")
+    @mock.patch("ctfcli.core.challenge.API.shared")
     def test_normalize_fetches_and_normalizes_challenge(self, mock_api_constructor: MagicMock):
         mock_api: MagicMock = mock_api_constructor.return_value
         mock_api.get.side_effect = self.mock_get
@@ -2533,7 +2800,7 @@ class TestVerifyMirrorChallenge(unittest.TestCase):
             normalized_data,
         )
 
-    @mock.patch("ctfcli.core.challenge.API")
+    @mock.patch("ctfcli.core.challenge.API.shared")
     def test_normalize_resolves_module_name(self, mock_api_constructor: MagicMock):
         mock_api: MagicMock = mock_api_constructor.return_value
 
@@ -2566,7 +2833,7 @@ class TestVerifyMirrorChallenge(unittest.TestCase):
 
         self.assertEqual("Test Module", normalized_data["module"])
 
-    @mock.patch("ctfcli.core.challenge.API")
+    @mock.patch("ctfcli.core.challenge.API.shared")
     def test_compare_challenge_module(self, mock_api_constructor: MagicMock):
         challenge = Challenge(self.full_challenge)
         challenge.challenge_id = 3
@@ -2580,7 +2847,7 @@ class TestVerifyMirrorChallenge(unittest.TestCase):
         self.assertTrue(challenge._compare_challenge_module(42, "42"))
         self.assertFalse(challenge._compare_challenge_module(42, "Test Module"))
 
-    @mock.patch("ctfcli.core.challenge.API")
+    @mock.patch("ctfcli.core.challenge.API.shared")
     def test_verify_checks_if_challenge_is_the_same(self, mock_api_constructor: MagicMock):
         mock_api: MagicMock = mock_api_constructor.return_value
         mock_api.get.side_effect = self.mock_get
@@ -2594,7 +2861,7 @@ class TestVerifyMirrorChallenge(unittest.TestCase):
         challenge.challenge_id = 3
         self.assertTrue(challenge.verify(ignore=["files"]))
 
-    @mock.patch("ctfcli.core.challenge.API")
+    @mock.patch("ctfcli.core.challenge.API.shared")
     def test_verify_checks_if_challenge_differs(self, mock_api_constructor: MagicMock):
         mock_api: MagicMock = mock_api_constructor.return_value
         mock_api.get.side_effect = self.mock_get
@@ -2603,7 +2870,7 @@ class TestVerifyMirrorChallenge(unittest.TestCase):
         challenge.challenge_id = 3
         self.assertFalse(challenge.verify(ignore=["files"]))
 
-    @mock.patch("ctfcli.core.challenge.API")
+    @mock.patch("ctfcli.core.challenge.API.shared")
     def test_mirror_challenge(self, mock_api_constructor: MagicMock):
         mock_api: MagicMock = mock_api_constructor.return_value
         mock_api.get.side_effect = self.mock_get
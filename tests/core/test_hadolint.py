@@ -0,0 +1,159 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from ctfcli.core.hadolint import Hadolint
+from ctfcli.core.store import Store
+
+
+class TestHadolint(unittest.TestCase):
+    def setUp(self):
+        self.project_path = Path(tempfile.mkdtemp())
+        (self.project_path / ".ctf").mkdir()
+        self.dockerfiles = []
+        for name, contents in [("web", "FROM python\nEXPOSE 80\n"), ("pwn", "FROM ubuntu\nEXPOSE 1337\n")]:
+            (self.project_path / name).mkdir()
+            dockerfile_path = self.project_path / name / "Dockerfile"
+            dockerfile_path.write_text(contents)
+            self.dockerfiles.append(dockerfile_path)
+
+        # the hadolint image is resolved without calling docker, unless a test checks how it's resolved
+        self.image_id_patcher = mock.patch.object(Hadolint, "get_image_id", return_value="sha256:hadolint")
+        self.mock_get_image_id = self.image_id_patcher.start()
+        self.addCleanup(self.image_id_patcher.stop)
+
+    def mock_hadolint_run(self, findings: list[dict], returncode: int = 0, stderr: bytes = b""):
+        return mock.MagicMock(stdout=json.dumps(findings).encode(), stderr=stderr, returncode=returncode)
+
+    @mock.patch("ctfcli.core.hadolint.subprocess.run")
+    def test_checks_all_dockerfiles_in_one_container(self, mock_run: mock.MagicMock):
+        mock_run.return_value = self.mock_hadolint_run(
+            [{"file": "1/Dockerfile", "line": 1, "code": "DL3007", "level": "warning", "message": "Using latest"}]
+        )
+
+        results = Hadolint().check(self.dockerfiles)
+
+        mock_run.assert_called_once()
+        command = mock_run.call_args.args[0]
+        self.assertEqual(command[:8], ["docker", "run", "--rm", "-i", "--entrypoint", "sh", Hadolint.image, "-c"])
+        self.assertTrue(command[8].endswith("hadolint --format json --no-fail 0/Dockerfile 1/Dockerfile"))
+
+        self.assertEqual(
+            results,
+            {self.dockerfiles[0]: None, self.dockerfiles[1]: "-:1 DL3007 warning: Using latest"},
+        )
+
+    @mock.patch("ctfcli.core.hadolint.subprocess.run")
+    def test_checks_identical_dockerfiles_once(self, mock_run: mock.MagicMock):
+        mock_run.return_value = self.mock_hadolint_run([])
+        self.dockerfiles[1].write_text(self.dockerfiles[0].read_text())
+
+        results = Hadolint().check(self.dockerfiles)
+
+        self.assertTrue(mock_run.call_args.args[0][8].endswith("--no-fail 0/Dockerfile"))
+        self.assertEqual(results, {self.dockerfiles[0]: None, self.dockerfiles[1]: None})
+
+    @mock.patch("ctfcli.core.hadolint.subprocess.run")
+    def test_caches_results(self, mock_run: mock.MagicMock):
+        mock_run.return_value = self.mock_hadolint_run(
+            [{"file": "0/Dockerfile", "line": 2, "code": "DL3000", "level": "error", "message": "Use absolute WORKDIR"}]
+        )
+
+        store = Store(self.project_path)
+        expected_results = {self.dockerfiles[0]: "-:2 DL3000 error: Use absolute WORKDIR", self.dockerfiles[1]: None}
+        self.assertEqual(Hadolint(store=store).check(self.dockerfiles), expected_results)
+        self.assertEqual(Hadolint(store=store).check(self.dockerfiles), expected_results)
+        mock_run.assert_called_once()
+
+        # changing a Dockerfile only checks that Dockerfile again
+        self.dockerfiles[1].write_text("FROM alpine\nEXPOSE 1337\n")
+        mock_run.return_value = self.mock_hadolint_run([])
+        Hadolint(store=store).check(self.dockerfiles)
+
+        self.assertEqual(mock_run.call_count, 2)
+        self.assertTrue(mock_run.call_args.args[0][8].endswith("--no-fail 0/Dockerfile"))
+
+    @mock.patch("ctfcli.core.hadolint.subprocess.run")
+    def test_does_not_cache_failures_to_run_hadolint(self, mock_run: mock.MagicMock):
+        mock_run.return_value = mock.MagicMock(
+            stdout=b"", stderr=b"Cannot connect to the Docker daemon", returncode=125
+        )
+
+        store = Store(self.project_path)
+        results = Hadolint(store=store).check(self.dockerfiles[:1])
+        self.assertEqual(results, {self.dockerfiles[0]: "Failed to run hadolint: Cannot connect to the Docker daemon"})
+
+        mock_run.return_value = self.mock_hadolint_run([])
+        self.assertEqual(Hadolint(store=store).check(self.dockerfiles[:1]), {self.dockerfiles[0]: None})
+        self.assertEqual(mock_run.call_count, 2)
+
+    @mock.patch("ctfcli.core.hadolint.subprocess.run", side_effect=FileNotFoundError)
+    def test_reports_missing_docker(self, *args, **kwargs):
+        results = Hadolint(store=Store(self.project_path)).check(self.dockerfiles)
+        self.assertEqual(
+            results,
+            {dockerfile: "Failed to run hadolint: docker is not installed" for dockerfile in self.dockerfiles},
+        )
+
+    @mock.patch("ctfcli.core.hadolint.subprocess.run")
+    def test_uses_project_config(self, mock_run: mock.MagicMock):
+        (self.project_path / ".hadolint.yaml").write_text("failure-threshold: error\n")
+        mock_run.return_value = self.mock_hadolint_run(
+            [{"file": "0/Dockerfile", "line": 1, "code": "DL3007", "level": "warning", "message": "Using latest"}]
+        )
+
+        hadolint = Hadolint.for_project(self.project_path)
+        self.assertEqual(hadolint.check(self.dockerfiles[:1]), {self.dockerfiles[0]: None})
+        self.assertIn("--config hadolint.yaml", mock_run.call_args.args[0][8])
+
+        # results are cached per config
+        self.assertNotEqual(hadolint.get_cache_key(), Hadolint().get_cache_key())
+
+    @mock.patch("ctfcli.core.hadolint.subprocess.run")
+    def test_caches_results_per_hadolint_image(self, mock_run: mock.MagicMock):
+        mock_run.return_value = self.mock_hadolint_run([])
+        store = Store(self.project_path)
+
+        Hadolint(store=store).check(self.dockerfiles[:1])
+        Hadolint(store=store).check(self.dockerfiles[:1])
+        mock_run.assert_called_once()
+
+        # an updated hadolint image misses the cache, even though its tag is the same
+        self.mock_get_image_id.return_value = "sha256:updated"
+        Hadolint(store=store).check(self.dockerfiles[:1])
+        self.assertEqual(mock_run.call_count, 2)
+
+        # results are not cached if the image cannot be resolved
+        self.mock_get_image_id.return_value = None
+        Hadolint(store=store).check(self.dockerfiles[:1])
+        Hadolint(store=store).check(self.dockerfiles[:1])
+        self.assertEqual(mock_run.call_count, 4)
+
+    @mock.patch("ctfcli.core.hadolint.subprocess.run")
+    def test_resolves_image_id(self, mock_run: mock.MagicMock):
+        self.image_id_patcher.stop()
+        inspect_command = ["docker", "image", "inspect", "--format={{.Id}}", Hadolint.image]
+
+        # the image is pulled if it's missing
+        mock_run.side_effect = [
+            mock.MagicMock(returncode=1, stdout=""),
+            mock.MagicMock(returncode=0),
+            mock.MagicMock(returncode=0, stdout="sha256:abcd\n"),
+        ]
+        hadolint = Hadolint()
+        self.assertEqual(hadolint.get_image_id(), "sha256:abcd")
+        self.assertEqual(hadolint.get_image_id(), "sha256:abcd")
+        self.assertEqual(
+            mock_run.call_args_list,
+            [
+                mock.call(inspect_command, capture_output=True, text=True),
+                mock.call(["docker", "pull", Hadolint.image], capture_output=True),
+                mock.call(inspect_command, capture_output=True, text=True),
+            ],
+        )
+
+        # without docker, the image cannot be resolved
+        mock_run.side_effect = FileNotFoundError
+        self.assertIsNone(Hadolint().get_image_id())
@@ -1,14 +1,39 @@
+import hashlib
+import json
 import unittest
 from pathlib import Path
 from unittest import mock
-from unittest.mock import MagicMock, call
+from unittest.mock import ANY, MagicMock, call
 
-from ctfcli.core.image import Image
+from ctfcli.core.image import Image, build_images, get_chain_ids, get_local_images
+from ctfcli.utils.build_context import get_context_digest
 
 BASE_DIR = Path(__file__).parent.parent
+CONTEXT_LABEL = "io.ctfd.ctfcli.context-digest"
 
 
 class TestImage(unittest.TestCase):
+    def setUp(self):
+        # images are never found locally or in a registry
+        run_patcher = mock.patch(
+            "ctfcli.core.image.subprocess.run", return_value=MagicMock(returncode=1, stdout="", stderr="")
+        )
+        self.mock_run = run_patcher.start()
+        self.addCleanup(run_patcher.stop)
+
+    def get_build_command(self, build_path: Path) -> list[str]:
+        context_digest = get_context_digest(build_path)
+        return [
+            "docker",
+            "build",
+            "--load",
+            "-t",
+            "test-challenge",
+            "--label",
+            f"{CONTEXT_LABEL}={context_digest}",
+            ".",
+        ]
+
     def test_assigns_attributes(self):
         build_path = BASE_DIR / "fixtures" / "challenges" / "test-challenge-dockerfile"
         image = Image("test-challenge", build_path)
@@ -56,9 +81,7 @@ class TestImage(unittest.TestCase):
 
         self.assertTrue(image.built)
         self.assertEqual(image_name, "test-challenge")
-        mock_call.assert_called_once_with(
-            ["docker", "build", "--load", "-t", "test-challenge", "."], cwd=build_path.absolute()
-        )
+        mock_call.assert_called_once_with(self.get_build_command(build_path), cwd=build_path.absolute())
 
     @mock.patch("ctfcli.core.image.subprocess.call", return_value=1)
     def test_build_returns_none_if_failed(self, mock_call: MagicMock):
@@ -70,9 +93,7 @@ class TestImage(unittest.TestCase):
 
         self.assertFalse(image.built)
         self.assertIsNone(image_name)
-        mock_call.assert_called_once_with(
-            ["docker", "build", "--load", "-t", "test-challenge", "."], cwd=build_path.absolute()
-        )
+        mock_call.assert_called_once_with(self.get_build_command(build_path), cwd=build_path.absolute())
 
     @mock.patch("ctfcli.core.image.subprocess.call", return_value=0)
     def test_push_built_image(self, mock_call: MagicMock):
@@ -154,7 +175,7 @@ class TestImage(unittest.TestCase):
         mock_call.assert_has_calls(
             [
                 call(
-                    ["docker", "build", "--load", "-t", "test-challenge", "."],
+                    self.get_build_command(build_path),
                     cwd=build_path.absolute(),
                 ),
                 call(
@@ -228,7 +249,7 @@ class TestImage(unittest.TestCase):
         mock_call.assert_has_calls(
             [
                 call(
-                    ["docker", "build", "--load", "-t", "test-challenge", "."],
+                    self.get_build_command(build_path),
                     cwd=build_path.absolute(),
                 ),
                 call(
@@ -332,3 +353,203 @@ class TestImage(unittest.TestCase):
             image.pull()
             self.assertEqual(image_name, image.name)
             mock_call.assert_called_with(["docker", "pull", image_name])
+
+    @mock.patch("ctfcli.core.image.subprocess.call", return_value=0)
+    def test_skips_build_if_context_is_unchanged(self, mock_call: MagicMock):
+        build_path = BASE_DIR / "fixtures" / "challenges" / "test-challenge-dockerfile"
+        image = Image("test-challenge", build_path)
+        self.mock_run.return_value = MagicMock(
+            returncode=0, stdout=json.dumps({CONTEXT_LABEL: get_context_digest(build_path)})
+        )
+
+        self.assertEqual(image.build(), "test-challenge")
+        self.assertTrue(image.built)
+        mock_call.assert_not_called()
+        self.mock_run.assert_called_once_with(
+            ["docker", "image", "inspect", "--format={{json .Config.Labels}}", "test-challenge"],
+            capture_output=True,
+            text=True,
+        )
+
+        # rebuild always builds the image
+        image.rebuild = True
+        image.build()
+        mock_call.assert_called_once_with(self.get_build_command(build_path), cwd=build_path.absolute())
+
+    @mock.patch("ctfcli.core.image.subprocess.call", return_value=0)
+    def test_builds_image_if_context_changed(self, mock_call: MagicMock):
+        build_path = BASE_DIR / "fixtures" / "challenges" / "test-challenge-dockerfile"
+        image = Image("test-challenge", build_path)
+        self.mock_run.return_value = MagicMock(returncode=0, stdout=json.dumps({CONTEXT_LABEL: "sha256:outdated"}))
+
+        image.build()
+        mock_call.assert_called_once_with(self.get_build_command(build_path), cwd=build_path.absolute())
+
+    @mock.patch("ctfcli.core.image.subprocess.call", return_value=0)
+    def test_skips_push_if_image_is_in_registry(self, mock_call: MagicMock):
+        image = Image("registry.ctfd.io/example-project/test-challenge")
+        location = "registry.example.com/test-challenge"
+        self.mock_run.side_effect = [
+            MagicMock(returncode=0, stdout="sha256:abcd\n"),
+            MagicMock(returncode=0, stdout=json.dumps({"config": {"digest": "sha256:abcd"}})),
+        ]
+
+        self.assertEqual(image.push(location), location)
+        mock_call.assert_not_called()
+        self.mock_run.assert_has_calls(
+            [
+                call(
+                    [
+                        "docker",
+                        "image",
+                        "inspect",
+                        "--format={{.Id}}",
+                        "registry.ctfd.io/example-project/test-challenge",
+                    ],
+                    capture_output=True,
+                    text=True,
+                ),
+                call(["docker", "manifest", "inspect", location], capture_output=True, text=True),
+            ]
+        )
+
+        # a different image is pushed
+        self.mock_run.side_effect = [
+            MagicMock(returncode=0, stdout="sha256:abcd\n"),
+            MagicMock(returncode=0, stdout=json.dumps({"config": {"digest": "sha256:other"}})),
+        ]
+        self.assertEqual(image.push(location), location)
+        mock_call.assert_has_calls(
+            [
+                call(["docker", "tag", "registry.ctfd.io/example-project/test-challenge", location]),
+                call(["docker", "push", location]),
+            ]
+        )
+
+    def test_get_digest(self):
+        # images built by ctfcli are identified by their build context, without building them
+        build_path = BASE_DIR / "fixtures" / "challenges" / "test-challenge-dockerfile"
+        self.assertEqual(Image("test-challenge", build_path).get_digest(), get_context_digest(build_path))
+        self.mock_run.assert_not_called()
+
+        # pre-built images are identified by their local image id
+        image = Image("registry.ctfd.io/example-project/test-challenge")
+        self.assertIsNone(image.get_digest())
+
+        self.mock_run.return_value = MagicMock(returncode=0, stdout="sha256:abcd\n")
+        self.assertEqual(image.get_digest(), "sha256:abcd")
+        self.mock_run.assert_called_with(
+            ["docker", "image", "inspect", "--format={{.Id}}", "registry.ctfd.io/example-project/test-challenge"],
+            capture_output=True,
+            text=True,
+        )
+
+
+class TestBuildImages(unittest.TestCase):
+    build_path = BASE_DIR / "fixtures" / "challenges" / "test-challenge-dockerfile"
+
+    def setUp(self):
+        # images are not found locally
+        run_patcher = mock.patch(
+            "ctfcli.core.image.subprocess.run", return_value=MagicMock(returncode=1, stdout="", stderr="")
+        )
+        self.mock_run = run_patcher.start()
+        self.addCleanup(run_patcher.stop)
+
+        self.images = [Image("web", self.build_path), Image("pwn", self.build_path)]
+
+    @mock.patch("ctfcli.core.image.is_bake_available", return_value=True)
+    @mock.patch("ctfcli.core.image.subprocess.call")
+    def test_builds_images_in_one_bake(self, mock_call: MagicMock, *args, **kwargs):
+        bake_plans = []
+
+        def docker_bake(command):
+            bake_plans.append(json.loads(Path(command[-1]).read_text()))
+            return 0
+
+        mock_call.side_effect = docker_bake
+
+        self.assertEqual(build_images(self.images), [True, True])
+        self.assertTrue(all(image.built for image in self.images))
+
+        mock_call.assert_called_once_with(["docker", "buildx", "bake", "--file", ANY])
+        [bake_plan] = bake_plans
+        self.assertEqual(bake_plan["group"]["default"]["targets"], ["web-0", "pwn-1"])
+        self.assertEqual(
+            bake_plan["target"]["pwn-1"],
+            {
+                "context": str(self.build_path.absolute()),
+                "dockerfile": "Dockerfile",
+                "tags": ["pwn"],
+                "labels": {CONTEXT_LABEL: get_context_digest(self.build_path)},
+                "output": ["type=docker"],
+            },
+        )
+
+    @mock.patch("ctfcli.core.image.is_bake_available", return_value=True)
+    @mock.patch("ctfcli.core.image.subprocess.call", side_effect=[1, 0, 1])
+    def test_builds_images_one_by_one_if_bake_fails(self, mock_call: MagicMock, *args, **kwargs):
+        self.assertEqual(build_images(self.images), [True, False])
+        self.assertEqual(
+            [image.built for image in self.images],
+            [True, False],
+        )
+
+        self.assertEqual(mock_call.call_count, 3)
+        self.assertEqual(mock_call.call_args.args[0][:5], ["docker", "build", "--load", "-t", "pwn"])
+
+    @mock.patch("ctfcli.core.image.is_bake_available", return_value=False)
+    @mock.patch("ctfcli.core.image.subprocess.call", return_value=0)
+    def test_builds_images_one_by_one_without_buildx(self, mock_call: MagicMock, *args, **kwargs):
+        self.assertEqual(build_images(self.images), [True, True])
+        self.assertEqual(
+            [c.args[0][:5] for c in mock_call.call_args_list],
+            [["docker", "build", "--load", "-t", "web"], ["docker", "build", "--load", "-t", "pwn"]],
+        )
+
+    @mock.patch("ctfcli.core.image.subprocess.call")
+    def test_does_not_build_up_to_date_images(self, mock_call: MagicMock):
+        self.mock_run.return_value = MagicMock(
+            returncode=0, stdout=json.dumps({CONTEXT_LABEL: get_context_digest(self.build_path)})
+        )
+
+        self.assertEqual(build_images(self.images), [True, True])
+        mock_call.assert_not_called()
+
+
+class TestGetLocalImages(unittest.TestCase):
+    @mock.patch("ctfcli.core.image.subprocess.run")
+    def test_returns_images_which_exist(self, mock_run: MagicMock):
+        mock_run.return_value = MagicMock(
+            returncode=1, stderr="Error: No such image: missing\nError: No such image: other:1.0\n"
+        )
+
+        self.assertEqual(get_local_images(["existing", "missing", "other:1.0", "existing"]), {"existing"})
+        mock_run.assert_called_once_with(
+            ["docker", "image", "inspect", "--format={{.Id}}", "existing", "missing", "other:1.0"],
+            capture_output=True,
+            text=True,
+        )
+
+    @mock.patch("ctfcli.core.image.subprocess.run")
+    def test_returns_no_images_if_docker_fails(self, mock_run: MagicMock):
+        mock_run.return_value = MagicMock(returncode=1, stderr="Cannot connect to the Docker daemon")
+        self.assertEqual(get_local_images(["existing"]), set())
+
+        mock_run.side_effect = FileNotFoundError
+        self.assertEqual(get_local_images(["existing"]), set())
+
+        mock_run.reset_mock()
+        self.assertEqual(get_local_images([]), set())
+        mock_run.assert_not_called()
+
+
+class TestGetChainIds(unittest.TestCase):
+    def test_returns_chain_ids(self):
+        diff_ids = ["sha256:" + "a" * 64, "sha256:" + "b" * 64, "sha256:" + "c" * 64]
+        chain_ids = get_chain_ids(diff_ids)
+
+        self.assertEqual(chain_ids[0], diff_ids[0])
+        self.assertEqual(chain_ids[1], "sha256:" + hashlib.sha256(f"{diff_ids[0]} {diff_ids[1]}".encode()).hexdigest())
+        self.assertEqual(chain_ids[2], "sha256:" + hashlib.sha256(f"{chain_ids[1]} {diff_ids[2]}".encode()).hexdigest())
+        self.assertEqual(get_chain_ids([]), [])
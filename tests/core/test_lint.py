@@ -0,0 +1,135 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from ctfcli.core.lint import LintReport, LintResult, lint_challenge, lint_challenges
+
+BASE_DIR = Path(__file__).parent.parent
+CHALLENGES_DIR = BASE_DIR / "fixtures" / "challenges"
+
+
+class TestLintChallenges(unittest.TestCase):
+    minimal_challenge = str(CHALLENGES_DIR / "test-challenge-minimal" / "challenge.yml")
+    invalid_dockerfile_challenge = str(CHALLENGES_DIR / "test-challenge-invalid-dockerfile" / "challenge.yml")
+    invalid_challenge = str(CHALLENGES_DIR / "test-challenge-invalid" / "challenge-invalid.yml")
+
+    def test_lints_challenge(self):
+        result = lint_challenge(self.minimal_challenge, skip_hadolint=True)
+        self.assertTrue(result.passed)
+        self.assertEqual(result.name, "Test Challenge")
+
+        result = lint_challenge(self.invalid_dockerfile_challenge, skip_hadolint=True)
+        self.assertFalse(result.passed)
+        self.assertEqual(result.issues["dockerfile"], ["Dockerfile is missing EXPOSE"])
+
+    def test_reports_challenges_which_cannot_be_loaded(self):
+        result = lint_challenge(self.invalid_challenge)
+
+        self.assertFalse(result.passed)
+        self.assertIsNone(result.name)
+        self.assertIn("is either empty or not a dictionary", result.error)
+
+    def test_lints_all_challenges_in_processes(self):
+        challenge_paths = [self.invalid_dockerfile_challenge, self.minimal_challenge, self.invalid_challenge]
+
+        results = list(lint_challenges(challenge_paths, jobs=2, skip_hadolint=True))
+
+        # every challenge is linted, and the results are in order
+        self.assertEqual([result.challenge_path for result in results], challenge_paths)
+        self.assertEqual([result.passed for result in results], [False, True, False])
+        self.assertEqual(results[0].issues["dockerfile"], ["Dockerfile is missing EXPOSE"])
+
+    @mock.patch("ctfcli.core.hadolint.subprocess.run", side_effect=FileNotFoundError)
+    def test_lints_all_challenges_without_docker(self, *args, **kwargs):
+        project_path = Path(tempfile.mkdtemp())
+        (project_path / ".ctf").mkdir()
+        challenge_paths = [
+            str(CHALLENGES_DIR / "test-challenge-dockerfile" / "challenge.yml"),
+            self.invalid_dockerfile_challenge,
+        ]
+
+        # hadolint checks the Dockerfiles of all challenges up front
+        results = list(lint_challenges(challenge_paths, project_path=str(project_path)))
+
+        self.assertEqual([result.challenge_path for result in results], challenge_paths)
+        for result in results:
+            self.assertIsNone(result.error)
+            self.assertEqual(result.issues["hadolint"], ["Failed to run hadolint: docker is not installed"])
+
+
+class TestLintReport(unittest.TestCase):
+    def setUp(self):
+        self.project_path = Path(tempfile.mkdtemp())
+        self.report = LintReport(
+            [
+                LintResult(str(self.project_path / "web" / "challenge.yml"), name="Web"),
+                LintResult(
+                    str(self.project_path / "pwn" / "challenge.yml"),
+                    name="Pwn",
+                    issues={
+                        "fields": ["challenge.yml is missing required field: author"],
+                        "dockerfile": ["Dockerfile is missing EXPOSE"],
+                        "hadolint": [],
+                        "files": [],
+                    },
+                ),
+                LintResult(str(self.project_path / "broken" / "challenge.yml"), error="Invalid challenge.yml"),
+            ],
+            project_path=self.project_path,
+        )
+
+    def test_aggregates_results(self):
+        self.assertFalse(self.report.passed)
+        self.assertEqual([result.name for result in self.report.failed_results], ["Pwn", None])
+        self.assertTrue(LintReport([LintResult("challenge.yml", name="Test")]).passed)
+
+    def test_writes_json(self):
+        report_path = self.project_path / "lint.json"
+        self.report.write_json(report_path)
+
+        report = json.loads(report_path.read_text())
+        self.assertFalse(report["passed"])
+        self.assertEqual(
+            report["challenges"][1],
+            {
+                "challenge": "Pwn",
+                "path": str(self.project_path / "pwn" / "challenge.yml"),
+                "passed": False,
+                "error": None,
+                "issues": {
+                    "fields": ["challenge.yml is missing required field: author"],
+                    "dockerfile": ["Dockerfile is missing EXPOSE"],
+                },
+            },
+        )
+
+    def test_writes_sarif(self):
+        report_path = self.project_path / "lint.sarif"
+        self.report.write_sarif(report_path)
+
+        report = json.loads(report_path.read_text())
+        self.assertEqual(report["version"], "2.1.0")
+
+        [run] = report["runs"]
+        self.assertEqual(run["tool"]["driver"]["name"], "ctfcli")
+        self.assertEqual(
+            [
+                (
+                    result["ruleId"],
+                    result["message"]["text"],
+                    result["locations"][0]["physicalLocation"]["artifactLocation"]["uri"],
+                )
+                for result in run["results"]
+            ],
+            [
+                ("ctfcli/fields", "challenge.yml is missing required field: author", "pwn/challenge.yml"),
+                ("ctfcli/dockerfile", "Dockerfile is missing EXPOSE", "pwn/Dockerfile"),
+                ("ctfcli/error", "Invalid challenge.yml", "broken/challenge.yml"),
+            ],
+        )
+
+        # every reported rule is defined
+        rule_ids = {rule["id"] for rule in run["tool"]["driver"]["rules"]}
+        self.assertTrue({result["ruleId"] for result in run["results"]} <= rule_ids)
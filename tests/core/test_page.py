@@ -9,12 +9,35 @@ from ctfcli.core.exceptions import (
     IllegalPageOperation,
     InvalidPageConfiguration,
     InvalidPageFormat,
+    MissingAsyncDependency,
 )
 from ctfcli.core.page import Page
 
 BASE_DIR = Path(__file__).parent.parent
 
 
+class MockAsyncAPI:
+    # serves the given page data by id, recording the requested urls
+    def __init__(self, pages: dict[int, dict]):
+        self.pages = pages
+        self.requested_urls = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+    async def get(self, url: str):
+        self.requested_urls.append(url)
+        page_data = self.pages[int(url.rsplit("/", 1)[-1])]
+
+        response = MagicMock()
+        response.ok = True
+        response.json = mock.AsyncMock(return_value={"success": True, "data": page_data})
+        return response
+
+
 class TestPage(unittest.TestCase):
     # use a test challenge path as cwd to avoid mocking config
     minimal_challenge_cwd = BASE_DIR / "fixtures" / "challenges" / "test-challenge-minimal"
@@ -25,7 +48,7 @@ class TestPage(unittest.TestCase):
         Page._remote_page_ids = None
 
     @mock.patch("ctfcli.core.config.Path.cwd", return_value=minimal_challenge_cwd)
-    @mock.patch("ctfcli.core.page.API")
+    @mock.patch("ctfcli.core.page.API.shared")
     def test_loads_local_markdown_page(self, *args, **kwargs):
         page_path = BASE_DIR / "fixtures" / "challenges" / "pages" / "markdown-page.md"
         page = Page(page_path=page_path)
@@ -39,7 +62,7 @@ class TestPage(unittest.TestCase):
         self.assertTrue(page.is_auth_required)
 
     @mock.patch("ctfcli.core.config.Path.cwd", return_value=minimal_challenge_cwd)
-    @mock.patch("ctfcli.core.page.API")
+    @mock.patch("ctfcli.core.page.API.shared")
     def test_loads_local_html_page(self, *args, **kwargs):
         page_path = BASE_DIR / "fixtures" / "challenges" / "pages" / "html-page.html"
         page = Page(page_path=page_path)
@@ -53,7 +76,7 @@ class TestPage(unittest.TestCase):
         self.assertFalse(page.is_auth_required)
 
     @mock.patch("ctfcli.core.config.Path.cwd", return_value=minimal_challenge_cwd)
-    @mock.patch("ctfcli.core.page.API")
+    @mock.patch("ctfcli.core.page.API.shared")
     def test_loads_remote_markdown_page(self, mock_api_constructor: MagicMock, *args, **kwargs):
         mock_api = mock_api_constructor.return_value
 
@@ -83,7 +106,7 @@ class TestPage(unittest.TestCase):
         self.assertTrue(page.is_auth_required)
 
     @mock.patch("ctfcli.core.config.Path.cwd", return_value=minimal_challenge_cwd)
-    @mock.patch("ctfcli.core.page.API")
+    @mock.patch("ctfcli.core.page.API.shared")
     def test_loads_remote_html_page(self, mock_api_constructor: MagicMock, *args, **kwargs):
         mock_api = mock_api_constructor.return_value
 
@@ -124,7 +147,7 @@ class TestPage(unittest.TestCase):
             Page()
 
     @mock.patch("ctfcli.core.config.Path.cwd", return_value=minimal_challenge_cwd)
-    @mock.patch("ctfcli.core.page.API")
+    @mock.patch("ctfcli.core.page.API.shared")
     def test_as_dict(self, *args, **kwargs):
         page_path = BASE_DIR / "fixtures" / "challenges" / "pages" / "markdown-page.md"
         page = Page(page_path=page_path)
@@ -142,7 +165,7 @@ class TestPage(unittest.TestCase):
         self.assertDictEqual(expected_dict, page.as_dict())
 
     @mock.patch("ctfcli.core.config.Path.cwd", return_value=minimal_challenge_cwd)
-    @mock.patch("ctfcli.core.page.API")
+    @mock.patch("ctfcli.core.page.API.shared")
     def test_as_frontmatter_post(self, *args, **kwargs):
         page_path = BASE_DIR / "fixtures" / "challenges" / "pages" / "markdown-page.md"
         page = Page(page_path=page_path)
@@ -161,7 +184,7 @@ class TestPage(unittest.TestCase):
         self.assertDictEqual(page_as_post.metadata, expected_metadata)
 
     @mock.patch("ctfcli.core.config.Path.cwd", return_value=minimal_challenge_cwd)
-    @mock.patch("ctfcli.core.page.API")
+    @mock.patch("ctfcli.core.page.API.shared")
     def test_syncs_local_page(self, mock_api_constructor: MagicMock, *args, **kwargs):
         mock_api = mock_api_constructor.return_value
 
@@ -206,7 +229,7 @@ class TestPage(unittest.TestCase):
         mock_api.patch.assert_called_once_with("/api/v1/pages/1", json=expected_page_payload)
 
     @mock.patch("ctfcli.core.config.Path.cwd", return_value=minimal_challenge_cwd)
-    @mock.patch("ctfcli.core.page.API")
+    @mock.patch("ctfcli.core.page.API.shared")
     def test_cannot_sync_local_page_if_it_does_not_exist(self, mock_api_constructor: MagicMock, *args, **kwargs):
         mock_api = mock_api_constructor.return_value
 
@@ -238,7 +261,7 @@ class TestPage(unittest.TestCase):
         )
 
     @mock.patch("ctfcli.core.config.Path.cwd", return_value=minimal_challenge_cwd)
-    @mock.patch("ctfcli.core.page.API")
+    @mock.patch("ctfcli.core.page.API.shared")
     def test_cannot_sync_local_page_if_remote_does_not_exist(self, mock_api_constructor: MagicMock, *args, **kwargs):
         mock_api = mock_api_constructor.return_value
 
@@ -256,7 +279,7 @@ class TestPage(unittest.TestCase):
         )
 
     @mock.patch("ctfcli.core.config.Path.cwd", return_value=minimal_challenge_cwd)
-    @mock.patch("ctfcli.core.page.API")
+    @mock.patch("ctfcli.core.page.API.shared")
     def test_downloads_remote_page(self, mock_api_constructor: MagicMock, *args, **kwargs):
         mock_api = mock_api_constructor.return_value
 
@@ -284,7 +307,7 @@ class TestPage(unittest.TestCase):
         expected_path.unlink()
 
     @mock.patch("ctfcli.core.config.Path.cwd", return_value=minimal_challenge_cwd)
-    @mock.patch("ctfcli.core.page.API")
+    @mock.patch("ctfcli.core.page.API.shared")
     def test_downloads_remote_nested_page(self, mock_api_constructor: MagicMock, *args, **kwargs):
         mock_api = mock_api_constructor.return_value
 
@@ -313,7 +336,7 @@ class TestPage(unittest.TestCase):
         expected_path.parent.rmdir()
 
     @mock.patch("ctfcli.core.config.Path.cwd", return_value=minimal_challenge_cwd)
-    @mock.patch("ctfcli.core.page.API")
+    @mock.patch("ctfcli.core.page.API.shared")
     def test_cannot_download_remote_page_if_file_exists(self, mock_api_constructor: MagicMock, *args, **kwargs):
         mock_api = mock_api_constructor.return_value
 
@@ -342,7 +365,7 @@ class TestPage(unittest.TestCase):
 
     @mock.patch("ctfcli.core.config.Path.cwd", return_value=minimal_challenge_cwd)
     @mock.patch("ctfcli.core.page.click.secho")
-    @mock.patch("ctfcli.core.page.API")
+    @mock.patch("ctfcli.core.page.API.shared")
     def test_downloads_remote_page_with_overwrite(
         self, mock_api_constructor: MagicMock, mock_secho: MagicMock, *args, **kwargs
     ):
@@ -369,7 +392,7 @@ class TestPage(unittest.TestCase):
         mock_secho.assert_called_once_with("Overwriting page file 'html-page.html'", fg="yellow")
 
     @mock.patch("ctfcli.core.config.Path.cwd", return_value=minimal_challenge_cwd)
-    @mock.patch("ctfcli.core.page.API")
+    @mock.patch("ctfcli.core.page.API.shared")
     def test_cannot_download_remote_page_if_it_does_not_exist(self, mock_api_constructor: MagicMock, *args, **kwargs):
         mock_api = mock_api_constructor.return_value
         mock_api.get.return_value.json.return_value = {"success": True, "data": []}
@@ -383,7 +406,7 @@ class TestPage(unittest.TestCase):
         self.assertEqual("Cannot pull page 'html-page.html' - remote version does not exists.", str(e.exception))
 
     @mock.patch("ctfcli.core.config.Path.cwd", return_value=minimal_challenge_cwd)
-    @mock.patch("ctfcli.core.page.API")
+    @mock.patch("ctfcli.core.page.API.shared")
     def test_uploads_local_page(self, mock_api_constructor: MagicMock, *args, **kwargs):
         mock_api = mock_api_constructor.return_value
 
@@ -404,7 +427,7 @@ class TestPage(unittest.TestCase):
         mock_api.post.assert_called_once_with("/api/v1/pages", json=expected_page_payload)
 
     @mock.patch("ctfcli.core.config.Path.cwd", return_value=minimal_challenge_cwd)
-    @mock.patch("ctfcli.core.page.API")
+    @mock.patch("ctfcli.core.page.API.shared")
     def test_cannot_upload_local_page_if_remote_exists(self, mock_api_constructor: MagicMock, *args, **kwargs):
         mock_api = mock_api_constructor.return_value
 
@@ -439,7 +462,7 @@ class TestPage(unittest.TestCase):
 
     @mock.patch("ctfcli.core.config.Path.cwd", return_value=minimal_challenge_cwd)
     @mock.patch("ctfcli.core.page.click.secho")
-    @mock.patch("ctfcli.core.page.API")
+    @mock.patch("ctfcli.core.page.API.shared")
     def test_force_push_syncs_local_page_if_remote_exists(
         self, mock_api_constructor: MagicMock, mock_secho: MagicMock, *args, **kwargs
     ):
@@ -514,7 +537,7 @@ class TestPageLoading(unittest.TestCase):
         Page._remote_page_ids = None
 
     @mock.patch("ctfcli.core.config.Path.cwd", return_value=minimal_challenge_cwd)
-    @mock.patch("ctfcli.core.page.API")
+    @mock.patch("ctfcli.core.page.API.shared")
     def test_get_local_pages(self, *args, **kwargs):
         local_pages = Page.get_local_pages()
 
@@ -527,8 +550,9 @@ class TestPageLoading(unittest.TestCase):
         self.assertEqual(3, len(local_pages))
         self.assertEqual(0, len(expected_page_titles))
 
+    @mock.patch("ctfcli.core.page.AsyncAPI", side_effect=MissingAsyncDependency)
     @mock.patch("ctfcli.core.config.Path.cwd", return_value=minimal_challenge_cwd)
-    @mock.patch("ctfcli.core.page.API")
+    @mock.patch("ctfcli.core.page.API.shared")
     def test_get_remote_pages(self, mock_api_constructor: MagicMock, *args, **kwargs):
         mock_api = mock_api_constructor.return_value
         mock_api.get.return_value.json.side_effect = [
@@ -624,7 +648,36 @@ class TestPageLoading(unittest.TestCase):
         self.assertEqual(0, len(expected_page_titles))
 
     @mock.patch("ctfcli.core.config.Path.cwd", return_value=minimal_challenge_cwd)
-    @mock.patch("ctfcli.core.page.API")
+    @mock.patch("ctfcli.core.page.AsyncAPI")
+    @mock.patch("ctfcli.core.page.API.shared")
+    def test_get_remote_pages_fetches_pages_concurrently(
+        self, mock_api_constructor: MagicMock, mock_async_api_constructor: MagicMock, *args, **kwargs
+    ):
+        mock_api = mock_api_constructor.return_value
+        mock_api.get.return_value.json.return_value = {
+            "success": True,
+            "data": [{"id": 1, "route": "markdown-page"}, {"id": 2, "route": "html-page"}],
+        }
+
+        mock_async_api = MockAsyncAPI(
+            {
+                1: {"format": "markdown", "title": "Markdown Page", "content": "# Hello", "route": "markdown-page"},
+                2: {"format": "html", "title": "HTML Page", "content": "<h1>Hello</h1>", "route": "html-page"},
+            }
+        )
+        mock_async_api_constructor.return_value = mock_async_api
+
+        remote_pages = Page.get_remote_pages()
+
+        self.assertEqual([page.title for page in remote_pages], ["Markdown Page", "HTML Page"])
+        self.assertEqual([page.page_file_path for page in remote_pages], ["markdown-page.md", "html-page.html"])
+        self.assertEqual(mock_async_api.requested_urls, ["/api/v1/pages/1", "/api/v1/pages/2"])
+
+        # pages are not fetched again one by one
+        mock_api.get.assert_called_once_with("/api/v1/pages")
+
+    @mock.patch("ctfcli.core.config.Path.cwd", return_value=minimal_challenge_cwd)
+    @mock.patch("ctfcli.core.page.API.shared")
     def test_get_remote_page_id(self, mock_api_constructor: MagicMock, *args, **kwargs):
         mock_api = mock_api_constructor.return_value
         mock_api.get.return_value.json.return_value = {
@@ -669,7 +722,7 @@ class TestPageLoading(unittest.TestCase):
         mock_api.get.assert_called_once_with("/api/v1/pages")
 
     @mock.patch("ctfcli.core.config.Path.cwd", return_value=minimal_challenge_cwd)
-    @mock.patch("ctfcli.core.page.API")
+    @mock.patch("ctfcli.core.page.API.shared")
     def test_get_remote_page_id_saves_found_id(self, mock_api_constructor: MagicMock, *args, **kwargs):
         mock_api = mock_api_constructor.return_value
         mock_api.get.return_value.json.return_value = {
@@ -713,8 +766,9 @@ class TestPageLoading(unittest.TestCase):
         # expect to have only made one call
         self.assertEqual(1, mock_api.get.mock_calls.count(call("/api/v1/pages")))
 
+    @mock.patch("ctfcli.core.page.AsyncAPI", side_effect=MissingAsyncDependency)
     @mock.patch("ctfcli.core.config.Path.cwd", return_value=minimal_challenge_cwd)
-    @mock.patch("ctfcli.core.page.API")
+    @mock.patch("ctfcli.core.page.API.shared")
     def test_get_remote_pages_saves_pages(self, mock_api_constructor: MagicMock, *args, **kwargs):
         mock_api = mock_api_constructor.return_value
         mock_api.get.return_value.json.side_effect = [
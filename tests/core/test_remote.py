@@ -0,0 +1,158 @@
+import threading
+import time
+import unittest
+from unittest import mock
+from unittest.mock import MagicMock, call
+
+from ctfcli.core.remote import RemoteState
+
+
+class TestRemoteState(unittest.TestCase):
+    installed_challenges = [
+        {"id": 1, "name": "Test Challenge"},
+        {"id": 2, "name": "Other Test Challenge"},
+        {"id": 3, "name": "Test Challenge"},
+    ]
+
+    remote_data = {
+        "/api/v1/challenges?view=admin": installed_challenges,
+        "/api/v1/flags": [
+            {"id": 1, "challenge_id": 1, "type": "static", "content": "flag{1}", "data": ""},
+            {"id": 2, "challenge_id": 2, "type": "static", "content": "flag{2}", "data": ""},
+            {"id": 3, "challenge_id": 1, "type": "regex", "content": "flag{.*}", "data": ""},
+        ],
+        "/api/v1/files?type=challenge": [
+            {"id": 1, "type": "challenge", "location": "abc/test.png", "sha1sum": "aaa"},
+            {"id": 2, "type": "challenge", "location": "def/test.pdf", "sha1sum": "bbb"},
+        ],
+    }
+
+    def mock_get(self, *args, **kwargs):
+        mock_response = MagicMock()
+        mock_response.json.return_value = {"success": True, "data": self.remote_data.get(args[0], [])}
+        return mock_response
+
+    def test_indexes_challenges_by_id_and_name(self):
+        api = MagicMock()
+        api.get.side_effect = self.mock_get
+        remote_state = RemoteState(api)
+
+        self.assertEqual(remote_state.get_challenge(2), {"id": 2, "name": "Other Test Challenge"})
+        self.assertIsNone(remote_state.get_challenge(4))
+
+        # the first challenge with a matching name is returned
+        self.assertEqual(remote_state.get_challenge_by_name("Test Challenge")["id"], 1)
+        self.assertIsNone(remote_state.get_challenge_by_name("Nonexistent Challenge"))
+
+        self.assertEqual(len(remote_state.challenges), 3)
+        api.get.assert_called_once_with("/api/v1/challenges?view=admin")
+
+    def test_indexes_resources_by_challenge_id(self):
+        api = MagicMock()
+        api.get.side_effect = self.mock_get
+        remote_state = RemoteState(api)
+
+        self.assertEqual([f["id"] for f in remote_state.get_resources("flags", 1)], [1, 3])
+        self.assertEqual([f["id"] for f in remote_state.get_resources("flags", 2)], [2])
+        self.assertEqual(remote_state.get_resources("flags", 3), [])
+
+        api.get.assert_called_once_with("/api/v1/flags")
+
+    def test_raises_on_unsupported_resource(self):
+        remote_state = RemoteState(MagicMock())
+
+        with self.assertRaises(ValueError):
+            remote_state.get_resources("topics", 1)
+
+    def test_indexes_files_by_location(self):
+        api = MagicMock()
+        api.get.side_effect = self.mock_get
+        remote_state = RemoteState(api)
+
+        self.assertEqual(remote_state.get_file("def/test.pdf")["id"], 2)
+        self.assertIsNone(remote_state.get_file("xyz/test.txt"))
+        self.assertEqual(len(remote_state.get_files()), 2)
+
+        api.get.assert_called_once_with("/api/v1/files?type=challenge")
+
+    def test_removes_deleted_resources_and_files(self):
+        api = MagicMock()
+        api.get.side_effect = self.mock_get
+        remote_state = RemoteState(api)
+
+        remote_state.remove_resource("flags", 1, 1)
+        remote_state.remove_file("abc/test.png")
+
+        # removing before the collection is loaded should not trigger a load
+        api.get.assert_not_called()
+
+        self.assertEqual([f["id"] for f in remote_state.get_resources("flags", 1)], [1, 3])
+        remote_state.remove_resource("flags", 1, 1)
+        self.assertEqual([f["id"] for f in remote_state.get_resources("flags", 1)], [3])
+
+        self.assertIsNotNone(remote_state.get_file("abc/test.png"))
+        remote_state.remove_file("abc/test.png")
+        self.assertIsNone(remote_state.get_file("abc/test.png"))
+
+    def test_adds_created_challenges_once_loaded(self):
+        api = MagicMock()
+        api.get.side_effect = self.mock_get
+        remote_state = RemoteState(api)
+
+        # not loaded yet - the challenge will be a part of the listing
+        remote_state.add_challenge({"id": 4, "name": "New Challenge"})
+        api.get.assert_not_called()
+
+        self.assertIsNone(remote_state.get_challenge_by_name("New Challenge"))
+        remote_state.add_challenge({"id": 4, "name": "New Challenge"})
+        self.assertEqual(remote_state.get_challenge_by_name("New Challenge")["id"], 4)
+
+    def test_lists_other_collections_once(self):
+        api = MagicMock()
+        api.get.side_effect = lambda path: MagicMock(
+            ok=path == "/api/v1/images", json=MagicMock(return_value={"success": True, "data": [{"id": 1}]})
+        )
+        remote_state = RemoteState(api)
+
+        # not loaded yet - the entry will be a part of the listing
+        remote_state.add_to_listing("/api/v1/images", {"id": 2})
+
+        self.assertEqual(remote_state.get_listing("/api/v1/images"), [{"id": 1}])
+        remote_state.add_to_listing("/api/v1/images", {"id": 2})
+        self.assertEqual(remote_state.get_listing("/api/v1/images"), [{"id": 1}, {"id": 2}])
+
+        # unavailable collections are not cached
+        self.assertIsNone(remote_state.get_listing("/api/v1/services"))
+        self.assertIsNone(remote_state.get_listing("/api/v1/services"))
+
+        self.assertEqual(
+            api.get.call_args_list, [call("/api/v1/images"), call("/api/v1/services"), call("/api/v1/services")]
+        )
+
+    def test_loads_collections_once_across_threads(self):
+        def slow_get(*args, **kwargs):
+            time.sleep(0.05)
+            return self.mock_get(*args, **kwargs)
+
+        api = MagicMock()
+        api.get.side_effect = slow_get
+        remote_state = RemoteState(api)
+
+        threads = [
+            threading.Thread(target=remote_state.get_challenge_by_name, args=("Test Challenge",)) for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        api.get.assert_called_once_with("/api/v1/challenges?view=admin")
+
+    @mock.patch("ctfcli.core.remote.API.shared")
+    def test_creates_api_lazily(self, mock_api_constructor: MagicMock):
+        remote_state = RemoteState()
+        mock_api_constructor.assert_not_called()
+
+        remote_state.load_challenges()
+        mock_api_constructor.assert_called_once_with()
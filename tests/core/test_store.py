@@ -0,0 +1,92 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from ctfcli.core.store import Store
+
+
+class TestStore(unittest.TestCase):
+    def setUp(self):
+        self.project_path = Path(tempfile.mkdtemp())
+        (self.project_path / ".ctf").mkdir()
+
+    def test_stores_fingerprints_per_instance(self):
+        store = Store(self.project_path)
+        self.assertIsNone(store.get_fingerprint("https://example.com", "challenge/challenge.yml"))
+
+        store.set_fingerprint("https://example.com", "challenge/challenge.yml", "abc")
+        store.set_fingerprint("https://other.example.com", "challenge/challenge.yml", "def")
+        self.assertEqual(store.get_fingerprint("https://example.com", "challenge/challenge.yml"), "abc")
+        self.assertEqual(store.get_fingerprint("https://other.example.com", "challenge/challenge.yml"), "def")
+
+        store.set_fingerprint("https://example.com", "challenge/challenge.yml", "ghi")
+        self.assertEqual(store.get_fingerprint("https://example.com", "challenge/challenge.yml"), "ghi")
+
+        store.remove_fingerprint("https://example.com", "challenge/challenge.yml")
+        self.assertIsNone(store.get_fingerprint("https://example.com", "challenge/challenge.yml"))
+
+    def test_persists_between_instances(self):
+        store = Store(self.project_path)
+        store.set_fingerprint("https://example.com", "challenge/challenge.yml", "abc")
+        store.close()
+
+        self.assertTrue((self.project_path / ".ctf" / "ctfcli.db").is_file())
+        self.assertEqual(
+            Store(self.project_path).get_fingerprint("https://example.com", "challenge/challenge.yml"), "abc"
+        )
+
+    def test_gets_challenge_key_relative_to_project(self):
+        store = Store(self.project_path)
+
+        self.assertEqual(
+            store.get_challenge_key(self.project_path / "web" / "challenge" / "challenge.yml"),
+            "web/challenge/challenge.yml",
+        )
+        self.assertEqual(store.get_challenge_key("/elsewhere/challenge.yml"), "/elsewhere/challenge.yml")
+
+    def test_stores_remote_challenges_per_instance(self):
+        store = Store(self.project_path)
+        self.assertIsNone(store.get_remote_challenge("https://example.com", "challenge/challenge.yml"))
+
+        store.set_remote_challenge("https://example.com", "challenge/challenge.yml", 1, "Test Challenge")
+        self.assertEqual(
+            store.get_remote_challenge("https://example.com", "challenge/challenge.yml"), (1, "Test Challenge")
+        )
+        self.assertIsNone(store.get_remote_challenge("https://other.example.com", "challenge/challenge.yml"))
+
+        store.set_remote_challenge("https://example.com", "challenge/challenge.yml", 1, "Renamed Challenge")
+        self.assertEqual(
+            store.get_remote_challenge("https://example.com", "challenge/challenge.yml"), (1, "Renamed Challenge")
+        )
+
+    def test_stores_file_digests_per_file_version(self):
+        store = Store(self.project_path)
+        self.assertIsNone(store.get_file_digest("/challenge/dist/file.bin", "sha1", 10, 1000, 1))
+
+        store.set_file_digest("/challenge/dist/file.bin", "sha1", 10, 1000, 1, "abc")
+        store.set_file_digest("/challenge/dist/file.bin", "sha256", 10, 1000, 1, "def")
+        self.assertEqual(store.get_file_digest("/challenge/dist/file.bin", "sha1", 10, 1000, 1), "abc")
+        self.assertEqual(store.get_file_digest("/challenge/dist/file.bin", "sha256", 10, 1000, 1), "def")
+
+        # size, modification time or inode changes invalidate the digest
+        self.assertIsNone(store.get_file_digest("/challenge/dist/file.bin", "sha1", 11, 1000, 1))
+        self.assertIsNone(store.get_file_digest("/challenge/dist/file.bin", "sha1", 10, 1001, 1))
+        self.assertIsNone(store.get_file_digest("/challenge/dist/file.bin", "sha1", 10, 1000, 2))
+
+    def test_stores_deployments_per_target(self):
+        store = Store(self.project_path)
+        self.assertIsNone(store.get_deployment("challenge/challenge.yml", "ssh://root@10.0.0.1"))
+
+        store.set_deployment("challenge/challenge.yml", "ssh://root@10.0.0.1", "sha256:abc", "8080", "http://10.0.0.1")
+        store.set_deployment("challenge/challenge.yml", "https://example.ctfd.io", "sha256:abc")
+
+        deployment = store.get_deployment("challenge/challenge.yml", "ssh://root@10.0.0.1")
+        self.assertEqual(deployment["image_digest"], "sha256:abc")
+        self.assertEqual(deployment["port"], "8080")
+        self.assertEqual(deployment["connection_info"], "http://10.0.0.1")
+        self.assertIsNotNone(deployment["deployed_at"])
+        self.assertIsNone(store.get_deployment("challenge/challenge.yml", "https://example.ctfd.io")["port"])
+
+        store.remove_deployment("challenge/challenge.yml", "ssh://root@10.0.0.1")
+        self.assertIsNone(store.get_deployment("challenge/challenge.yml", "ssh://root@10.0.0.1"))
+        self.assertIsNotNone(store.get_deployment("challenge/challenge.yml", "https://example.ctfd.io"))
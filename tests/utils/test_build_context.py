@@ -0,0 +1,65 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from ctfcli.utils.build_context import DockerIgnore, get_context_digest, get_context_paths
+
+
+class TestDockerIgnore(unittest.TestCase):
+    def test_matches_patterns(self):
+        dockerignore = DockerIgnore(["# comment", "", "*.md", "/build", "**/*.pyc", "src/tmp?", "data/[!a]*"])
+
+        for path in ["README.md", "build", "build/output.bin", "app.pyc", "src/deep/app.pyc", "src/tmp1", "data/b"]:
+            self.assertTrue(dockerignore.is_ignored(path), path)
+
+        for path in ["docs/README.md", "src/build", "app.py", "src/tmp12", "data/a", "comment"]:
+            self.assertFalse(dockerignore.is_ignored(path), path)
+
+    def test_last_matching_pattern_wins(self):
+        dockerignore = DockerIgnore(["*.md", "!README.md", "docs", "!docs/index.md"])
+
+        self.assertTrue(dockerignore.is_ignored("CHANGELOG.md"))
+        self.assertFalse(dockerignore.is_ignored("README.md"))
+        self.assertTrue(dockerignore.is_ignored("docs/usage.md"))
+        self.assertFalse(dockerignore.is_ignored("docs/index.md"))
+
+
+class TestGetContextDigest(unittest.TestCase):
+    def setUp(self):
+        self.context_path = Path(tempfile.mkdtemp())
+        (self.context_path / "Dockerfile").write_text("FROM python:3.12\nCOPY . /app\nEXPOSE 80\n")
+        (self.context_path / "app.py").write_text("print('hello')\n")
+        (self.context_path / "node_modules" / "package").mkdir(parents=True)
+        (self.context_path / "node_modules" / "package" / "index.js").write_text("")
+        (self.context_path / ".dockerignore").write_text("node_modules\n*.log\n")
+
+    def test_lists_context_paths(self):
+        (self.context_path / "debug.log").write_text("ignored")
+
+        self.assertEqual(get_context_paths(self.context_path), [".dockerignore", "Dockerfile", "app.py"])
+
+    def test_digest_ignores_excluded_files(self):
+        digest = get_context_digest(self.context_path)
+        self.assertTrue(digest.startswith("sha256:"))
+
+        (self.context_path / "debug.log").write_text("ignored")
+        (self.context_path / "node_modules" / "package" / "index.js").write_text("module.exports = {}")
+        self.assertEqual(get_context_digest(self.context_path), digest)
+
+    def test_digest_changes_with_context(self):
+        digests = {get_context_digest(self.context_path)}
+
+        (self.context_path / "app.py").write_text("print('changed')\n")
+        digests.add(get_context_digest(self.context_path))
+
+        os.chmod(self.context_path / "app.py", 0o755)
+        digests.add(get_context_digest(self.context_path))
+
+        (self.context_path / "app.py").rename(self.context_path / "main.py")
+        digests.add(get_context_digest(self.context_path))
+
+        (self.context_path / "Dockerfile").write_text("FROM python:3.13\nCOPY . /app\nEXPOSE 80\n")
+        digests.add(get_context_digest(self.context_path))
+
+        self.assertEqual(len(digests), 5)
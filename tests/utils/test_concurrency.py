@@ -0,0 +1,197 @@
+import threading
+import time
+import unittest
+
+from ctfcli.utils.concurrency import run_concurrently, run_pipeline
+
+
+class TestRunConcurrently(unittest.TestCase):
+    def test_returns_results_in_item_order(self):
+        def slow_square(n: int) -> int:
+            # finish items in reverse order
+            time.sleep((5 - n) * 0.01)
+            return n * n
+
+        self.assertEqual(run_concurrently(slow_square, [1, 2, 3, 4], jobs=4), [1, 4, 9, 16])
+
+    def test_runs_sequentially_in_calling_thread_with_one_job(self):
+        threads = set()
+
+        def record_thread(n: int) -> int:
+            threads.add(threading.get_ident())
+            return n
+
+        self.assertEqual(run_concurrently(record_thread, [1, 2, 3], jobs=1), [1, 2, 3])
+        self.assertEqual(threads, {threading.get_ident()})
+
+    def test_limits_concurrency_to_jobs(self):
+        lock = threading.Lock()
+        running = 0
+        max_running = 0
+
+        def track(n: int) -> int:
+            nonlocal running, max_running
+            with lock:
+                running += 1
+                max_running = max(max_running, running)
+
+            time.sleep(0.02)
+
+            with lock:
+                running -= 1
+
+            return n
+
+        run_concurrently(track, list(range(8)), jobs=3)
+        self.assertGreater(max_running, 1)
+        self.assertLessEqual(max_running, 3)
+
+    def test_calls_on_done_in_calling_thread(self):
+        done = []
+
+        def on_done(item, result):
+            done.append((item, result, threading.get_ident()))
+
+        run_concurrently(lambda n: n + 1, [1, 2, 3], jobs=3, on_done=on_done)
+
+        self.assertEqual(sorted((item, result) for item, result, _ in done), [(1, 2), (2, 3), (3, 4)])
+        self.assertEqual({thread for _, _, thread in done}, {threading.get_ident()})
+
+    def test_propagates_exceptions(self):
+        def fail_on_two(n: int) -> int:
+            if n == 2:
+                raise RuntimeError("failed")
+
+            return n
+
+        with self.assertRaises(RuntimeError):
+            run_concurrently(fail_on_two, [1, 2, 3], jobs=2)
+
+    def test_runs_dependencies_first(self):
+        order = []
+
+        # 0 depends on 2, 2 depends on 1
+        run_concurrently(order.append, ["a", "b", "c"], jobs=1, dependencies=[{2}, set(), {1}])
+        self.assertEqual(order, ["b", "c", "a"])
+
+    def test_waits_for_dependencies_between_workers(self):
+        lock = threading.Lock()
+        events = []
+
+        def record(item: str) -> str:
+            with lock:
+                events.append(f"start:{item}")
+
+            # the prerequisite is the slowest item
+            time.sleep(0.05 if item == "prerequisite" else 0.01)
+
+            with lock:
+                events.append(f"end:{item}")
+
+            return item
+
+        items = ["dependent", "prerequisite", "independent"]
+        results = run_concurrently(record, items, jobs=3, dependencies=[{1}, set(), set()])
+
+        self.assertEqual(results, items)
+        self.assertLess(events.index("end:prerequisite"), events.index("start:dependent"))
+        # independent items do not wait for the prerequisite
+        self.assertLess(events.index("end:independent"), events.index("end:prerequisite"))
+
+    def test_breaks_dependency_cycles(self):
+        for jobs in [1, 2]:
+            results = run_concurrently(str.upper, ["a", "b", "c"], jobs=jobs, dependencies=[{1}, {0}, set()])
+            self.assertEqual(results, ["A", "B", "C"])
+
+
+class TestRunPipeline(unittest.TestCase):
+    def test_overlaps_stages_of_different_items(self):
+        lock = threading.Lock()
+        events = []
+
+        def stage(name: str, duration: float):
+            def run(item: str) -> bool:
+                with lock:
+                    events.append(f"start:{name}:{item}")
+                time.sleep(duration)
+                with lock:
+                    events.append(f"end:{name}:{item}")
+                return True
+
+            return run
+
+        results = run_pipeline(["a", "b"], [(stage("build", 0.02), 1), (stage("push", 0.05), 1)])
+
+        self.assertEqual(results, [None, None])
+        # b is built while a is pushed, and builds are limited to a single job
+        self.assertLess(events.index("start:push:a"), events.index("end:build:b"))
+        self.assertLess(events.index("end:build:a"), events.index("start:build:b"))
+
+    def test_limits_concurrency_per_stage(self):
+        lock = threading.Lock()
+        running = {"build": 0, "push": 0}
+        max_running = {"build": 0, "push": 0}
+
+        def stage(name: str):
+            def run(item: int) -> bool:
+                with lock:
+                    running[name] += 1
+                    max_running[name] = max(max_running[name], running[name])
+                time.sleep(0.01)
+                with lock:
+                    running[name] -= 1
+                return True
+
+            return run
+
+        run_pipeline(list(range(8)), [(stage("build"), 3), (stage("push"), 1)])
+        self.assertEqual(max_running["push"], 1)
+        self.assertGreater(max_running["build"], 1)
+        self.assertLessEqual(max_running["build"], 3)
+
+    def test_stops_items_at_failed_stage(self):
+        done = []
+        passed = []
+
+        results = run_pipeline(
+            [1, 2, 3, 4],
+            [(lambda n: n != 2, 2), (lambda n: n != 3, 2), (passed.append, 1)],
+            on_done=lambda item, failed_stage: done.append((item, failed_stage, threading.get_ident())),
+        )
+
+        # the last stage returns None, which counts as a failure
+        self.assertEqual(results, [2, 0, 1, 2])
+        self.assertEqual(sorted(passed), [1, 4])
+        self.assertEqual(
+            sorted((item, failed_stage) for item, failed_stage, _ in done), [(1, 2), (2, 0), (3, 1), (4, 2)]
+        )
+        self.assertEqual({thread for _, _, thread in done}, {threading.get_ident()})
+
+    def test_waits_for_dependencies_in_every_stage(self):
+        order = []
+        lock = threading.Lock()
+
+        def sync(item: str) -> bool:
+            time.sleep(0.05 if item == "prerequisite" else 0.01)
+            with lock:
+                order.append(item)
+            return True
+
+        results = run_pipeline(["dependent", "prerequisite"], [(sync, 2)], dependencies=[{1}, set()])
+
+        self.assertEqual(results, [None, None])
+        self.assertEqual(order, ["prerequisite", "dependent"])
+
+    def test_breaks_dependency_cycles(self):
+        results = run_pipeline(["a", "b", "c"], [(str.isalpha, 2), (str.islower, 1)], dependencies=[{1}, {0}, set()])
+        self.assertEqual(results, [None, None, None])
+
+    def test_propagates_exceptions(self):
+        def fail_on_two(n: int) -> bool:
+            if n == 2:
+                raise RuntimeError("failed")
+
+            return True
+
+        with self.assertRaises(RuntimeError):
+            run_pipeline([1, 2, 3], [(lambda n: True, 2), (fail_on_two, 2)])
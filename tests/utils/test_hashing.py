@@ -0,0 +1,120 @@
+import hashlib
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from ctfcli.core.store import Store
+from ctfcli.utils.hashing import CHUNK_SIZE, hash_file, hash_file_digests, hash_path, hash_path_digests, hash_paths
+
+
+class TestHashFile(unittest.TestCase):
+    def test_hashes_file_and_rewinds_it(self):
+        with tempfile.TemporaryFile() as fp:
+            fp.write(b"file contents" * 1000)
+
+            self.assertEqual(hash_file(fp), hashlib.sha1(b"file contents" * 1000).hexdigest())
+            self.assertEqual(fp.tell(), 0)
+
+    def test_computes_several_digests_in_one_pass(self):
+        # spans several chunks
+        contents = os.urandom(CHUNK_SIZE * 2 + 123)
+
+        with tempfile.TemporaryFile() as fp:
+            fp.write(contents)
+
+            with mock.patch.object(fp, "seek", wraps=fp.seek) as mock_seek:
+                digests = hash_file_digests(fp, algos=("sha1", "sha256", "blake2b"))
+
+            # the file is only rewound before and after reading it once
+            self.assertEqual(mock_seek.call_count, 2)
+
+        self.assertEqual(
+            digests,
+            {
+                "sha1": hashlib.sha1(contents).hexdigest(),
+                "sha256": hashlib.sha256(contents).hexdigest(),
+                "blake2b": hashlib.blake2b(contents).hexdigest(),
+            },
+        )
+
+    def test_raises_on_unknown_algorithm(self):
+        with tempfile.TemporaryFile() as fp, self.assertRaises(NotImplementedError):
+            hash_file(fp, algo="unknown")
+
+
+class TestHashPath(unittest.TestCase):
+    def setUp(self):
+        self.project_path = Path(tempfile.mkdtemp())
+        (self.project_path / ".ctf").mkdir()
+        self.store = Store(self.project_path)
+
+        self.file_path = self.project_path / "file.bin"
+        self.file_path.write_bytes(b"file contents")
+
+    def test_hashes_without_store(self):
+        self.assertEqual(hash_path(self.file_path), hashlib.sha1(b"file contents").hexdigest())
+        self.assertEqual(hash_path(self.file_path, algo="sha256"), hashlib.sha256(b"file contents").hexdigest())
+
+    def test_reuses_cached_digests(self):
+        digest = hash_path(self.file_path, store=self.store)
+
+        with mock.patch("ctfcli.utils.hashing.hash_file") as mock_hash_file:
+            self.assertEqual(hash_path(self.file_path, store=self.store), digest)
+
+        mock_hash_file.assert_not_called()
+
+    def test_invalidates_cached_digests_of_modified_files(self):
+        hash_path(self.file_path, store=self.store)
+
+        self.file_path.write_bytes(b"modified contents")
+        # make sure the modification time changes regardless of the timestamp resolution
+        stat = self.file_path.stat()
+        os.utime(self.file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        self.assertEqual(
+            hash_path(self.file_path, store=self.store),
+            hashlib.sha1(b"modified contents").hexdigest(),
+        )
+
+    def test_rehashes_files(self):
+        stat = self.file_path.stat()
+        self.store.set_file_digest(
+            str(self.file_path.resolve()), "sha1", stat.st_size, stat.st_mtime_ns, stat.st_ino, "stale"
+        )
+        self.assertEqual(hash_path(self.file_path, store=self.store), "stale")
+
+        digest = hash_path(self.file_path, store=self.store, rehash=True)
+        self.assertEqual(digest, hashlib.sha1(b"file contents").hexdigest())
+
+        # the freshly computed digest replaces the cached one
+        self.assertEqual(hash_path(self.file_path, store=self.store), digest)
+
+    def test_only_computes_missing_digests(self):
+        hash_path(self.file_path, algo="sha256", store=self.store)
+
+        with mock.patch("ctfcli.utils.hashing.hash_file_digests", wraps=hash_file_digests) as mock_hash_file_digests:
+            digests = hash_path_digests(self.file_path, algos=("sha1", "sha256"), store=self.store)
+
+        mock_hash_file_digests.assert_called_once_with(mock.ANY, algos=["sha1"])
+        self.assertEqual(
+            digests,
+            {
+                "sha1": hashlib.sha1(b"file contents").hexdigest(),
+                "sha256": hashlib.sha256(b"file contents").hexdigest(),
+            },
+        )
+
+    def test_hashes_many_files_in_order(self):
+        paths = []
+        for i in range(8):
+            path = self.project_path / f"file-{i}.bin"
+            path.write_bytes(f"file {i}".encode())
+            paths.append(path)
+
+        self.assertEqual(
+            hash_paths(paths, algos=("sha256",), store=self.store, jobs=4),
+            [{"sha256": hashlib.sha256(f"file {i}".encode()).hexdigest()} for i in range(8)],
+        )
+        self.assertEqual(hash_paths([]), [])
@@ -0,0 +1,69 @@
+import threading
+import unittest
+
+from ctfcli.utils.ratelimit import TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+        self._lock = threading.Lock()
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, delay: float) -> None:
+        with self._lock:
+            self.sleeps.append(delay)
+
+
+class TestTokenBucket(unittest.TestCase):
+    def test_allows_bursts_up_to_capacity(self):
+        clock = FakeClock()
+        bucket = TokenBucket(2, capacity=3, clock=clock, sleep=clock.sleep)
+
+        for _ in range(3):
+            self.assertEqual(bucket.acquire(), 0)
+
+        self.assertEqual(clock.sleeps, [])
+
+    def test_waits_for_tokens_once_empty(self):
+        clock = FakeClock()
+        bucket = TokenBucket(2, capacity=1, clock=clock, sleep=clock.sleep)
+
+        bucket.acquire()
+        self.assertEqual(bucket.acquire(), 0.5)
+        # tokens are reserved ahead, so the next caller waits behind the previous one
+        self.assertEqual(bucket.acquire(), 1.0)
+        self.assertEqual(clock.sleeps, [0.5, 1.0])
+
+    def test_refills_over_time(self):
+        clock = FakeClock()
+        bucket = TokenBucket(1, clock=clock, sleep=clock.sleep)
+
+        bucket.acquire()
+        clock.now += 1
+        self.assertEqual(bucket.acquire(), 0)
+
+        # tokens do not accumulate over capacity
+        clock.now += 10
+        bucket.acquire()
+        self.assertEqual(bucket.acquire(), 1.0)
+
+    def test_limits_rate_across_threads(self):
+        clock = FakeClock()
+        bucket = TokenBucket(10, capacity=1, clock=clock, sleep=clock.sleep)
+
+        threads = [threading.Thread(target=bucket.acquire) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # one request passes immediately, the others are spaced 0.1s apart
+        self.assertEqual(sorted(round(delay, 6) for delay in clock.sleeps), [0.1, 0.2, 0.3, 0.4])
+
+    def test_requires_positive_rate(self):
+        with self.assertRaises(ValueError):
+            TokenBucket(0)
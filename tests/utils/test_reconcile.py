@@ -0,0 +1,38 @@
+import unittest
+
+from ctfcli.utils.reconcile import reconcile
+
+
+class TestReconcile(unittest.TestCase):
+    def test_does_not_change_identical_items(self):
+        remote = [{"id": 1, "value": "a"}, {"id": 2, "value": "b"}]
+        plan = reconcile(["b", "a"], remote, key=lambda v: v, remote_key=lambda r: r["value"])
+
+        self.assertFalse(plan.has_changes)
+        self.assertEqual(plan.unchanged, [(0, remote[1]), (1, remote[0])])
+
+    def test_updates_leftover_remote_items_in_place(self):
+        remote = [{"id": 1, "value": "a"}, {"id": 2, "value": "old"}, {"id": 3, "value": "stale"}]
+        plan = reconcile(["a", "new"], remote, key=lambda v: v, remote_key=lambda r: r["value"])
+
+        self.assertEqual(plan.unchanged, [(0, remote[0])])
+        self.assertEqual(plan.updated, [(1, remote[1])])
+        self.assertEqual(plan.created, [])
+        self.assertEqual(plan.deleted, [remote[2]])
+
+    def test_creates_and_deletes_without_updates(self):
+        remote = [{"id": 1, "value": "a"}, {"id": 2, "value": "old"}]
+        plan = reconcile(
+            ["new", "a", "newer"], remote, key=lambda v: v, remote_key=lambda r: r["value"], allow_updates=False
+        )
+
+        self.assertEqual(plan.updated, [])
+        self.assertEqual(plan.created, [0, 2])
+        self.assertEqual(plan.deleted, [remote[1]])
+
+    def test_matches_duplicates_individually(self):
+        remote = [{"id": 1, "value": "a"}, {"id": 2, "value": "a"}, {"id": 3, "value": "a"}]
+        plan = reconcile(["a", "a"], remote, key=lambda v: v, remote_key=lambda r: r["value"], allow_updates=False)
+
+        self.assertEqual(plan.unchanged, [(0, remote[0]), (1, remote[1])])
+        self.assertEqual(plan.deleted, [remote[2]])
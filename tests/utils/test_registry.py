@@ -0,0 +1,121 @@
+import base64
+import json
+import tempfile
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest import mock
+from unittest.mock import MagicMock
+
+from ctfcli.utils.registry import RegistryLogins, get_stored_username
+
+
+class TestGetStoredUsername(unittest.TestCase):
+    def setUp(self):
+        self.docker_config_directory = Path(tempfile.mkdtemp())
+        environ_patcher = mock.patch.dict("os.environ", {"DOCKER_CONFIG": str(self.docker_config_directory)})
+        environ_patcher.start()
+        self.addCleanup(environ_patcher.stop)
+
+    def write_docker_config(self, config: dict):
+        (self.docker_config_directory / "config.json").write_text(json.dumps(config))
+
+    def test_reads_credentials_from_docker_config(self):
+        self.write_docker_config(
+            {
+                "auths": {
+                    "registry.example.com": {"auth": base64.b64encode(b"admin:secret").decode()},
+                    "https://index.docker.io/v1/": {"auth": base64.b64encode(b"user:secret").decode()},
+                    "empty.example.com": {},
+                }
+            }
+        )
+
+        self.assertEqual(get_stored_username("registry.example.com"), "admin")
+        self.assertEqual(get_stored_username("index.docker.io"), "user")
+        self.assertIsNone(get_stored_username("empty.example.com"))
+        self.assertIsNone(get_stored_username("other.example.com"))
+
+    def test_handles_missing_docker_config(self):
+        self.assertIsNone(get_stored_username("registry.example.com"))
+
+    @mock.patch("ctfcli.utils.registry.subprocess.run")
+    def test_reads_credentials_from_credential_helper(self, mock_run: MagicMock):
+        self.write_docker_config({"credsStore": "desktop", "credHelpers": {"registry.ctfd.io": "pass"}})
+
+        mock_run.return_value = MagicMock(
+            returncode=0,
+            stdout=json.dumps(
+                {"ServerURL": "registry.ctfd.io", "Username": "admin@example.ctfd.io", "Secret": "deadbeef"}
+            ).encode(),
+        )
+        self.assertEqual(get_stored_username("registry.ctfd.io"), "admin@example.ctfd.io")
+        mock_run.assert_called_once_with(
+            ["docker-credential-pass", "get"], input=b"registry.ctfd.io", capture_output=True
+        )
+
+        mock_run.reset_mock()
+        mock_run.return_value = MagicMock(returncode=1, stdout=b"credentials not found in native keychain")
+        self.assertIsNone(get_stored_username("registry.example.com"))
+        mock_run.assert_called_once_with(
+            ["docker-credential-desktop", "get"], input=b"registry.example.com", capture_output=True
+        )
+
+        mock_run.side_effect = FileNotFoundError
+        self.assertIsNone(get_stored_username("registry.example.com"))
+
+
+class TestRegistryLogins(unittest.TestCase):
+    @mock.patch("ctfcli.utils.registry.get_stored_username", return_value=None)
+    def test_logs_in_once_per_registry(self, *args, **kwargs):
+        logins = RegistryLogins()
+        login = MagicMock(return_value=True)
+        failed_login = MagicMock(return_value=False)
+
+        self.assertTrue(logins.login("registry.example.com", login))
+        self.assertTrue(logins.login("registry.example.com", login))
+        self.assertFalse(logins.login("other.example.com", failed_login))
+        self.assertFalse(logins.login("other.example.com", failed_login))
+
+        login.assert_called_once_with()
+        failed_login.assert_called_once_with()
+
+        logins.clear()
+        self.assertTrue(logins.login("registry.example.com", login))
+        self.assertEqual(login.call_count, 2)
+
+    @mock.patch("ctfcli.utils.registry.get_stored_username", return_value=None)
+    def test_shares_login_between_concurrent_deployments(self, *args, **kwargs):
+        logins = RegistryLogins()
+
+        def slow_login():
+            # the other deployments wait for the login in progress
+            time.sleep(0.05)
+            return True
+
+        login = MagicMock(side_effect=slow_login)
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(lambda _: logins.login("registry.example.com", login), range(8)))
+
+        self.assertEqual(results, [True] * 8)
+        login.assert_called_once_with()
+
+    @mock.patch("ctfcli.utils.registry.get_stored_username", return_value="admin@example.ctfd.io")
+    def test_uses_stored_credentials(self, mock_get_stored_username: MagicMock):
+        logins = RegistryLogins()
+        login = MagicMock(return_value=True)
+
+        self.assertTrue(
+            logins.login(
+                "registry.ctfd.io", login, accepts_username=lambda username: username.endswith("@example.ctfd.io")
+            )
+        )
+        login.assert_not_called()
+        mock_get_stored_username.assert_called_once_with("registry.ctfd.io")
+
+        # credentials of another user are not used
+        self.assertTrue(
+            logins.login("registry.example.com", login, accepts_username=lambda username: username == "test")
+        )
+        login.assert_called_once_with()
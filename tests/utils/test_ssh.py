@@ -0,0 +1,71 @@
+import os
+import unittest
+from unittest import mock
+from unittest.mock import MagicMock, call
+
+from ctfcli.utils.ssh import SSHConnections
+
+
+@unittest.skipIf(os.name == "nt", "ssh connections are not multiplexed on windows")
+class TestSSHConnections(unittest.TestCase):
+    def setUp(self):
+        self.connections = SSHConnections(persist=30)
+        self.addCleanup(self.connections.close)
+
+    @mock.patch("ctfcli.utils.ssh.subprocess.run", return_value=MagicMock(returncode=0))
+    def test_starts_one_master_per_host(self, mock_run: MagicMock):
+        options = self.connections.get_options("root@10.0.0.1")
+        self.assertEqual(self.connections.get_options("root@10.0.0.1"), options)
+        other_options = self.connections.get_options("root@10.0.0.2")
+
+        control_path = self.connections.get_control_path("root@10.0.0.1")
+        self.assertTrue(control_path.startswith(self.connections.control_directory))
+        self.assertEqual(options, ["-o", f"ControlPath={control_path}"])
+        self.assertNotEqual(options, other_options)
+
+        self.assertEqual(mock_run.call_count, 2)
+        mock_run.assert_any_call(
+            [
+                "ssh",
+                "-f",
+                "-N",
+                "-o",
+                "ControlMaster=yes",
+                "-o",
+                "ControlPersist=30",
+                "-o",
+                f"ControlPath={control_path}",
+                "root@10.0.0.1",
+            ],
+            stdout=mock.ANY,
+            stderr=mock.ANY,
+        )
+
+        self.connections.close()
+        self.assertEqual(mock_run.call_count, 4)
+
+    @mock.patch("ctfcli.utils.ssh.subprocess.run", return_value=MagicMock(returncode=255))
+    def test_does_not_multiplex_if_master_cannot_be_started(self, mock_run: MagicMock):
+        self.assertEqual(self.connections.get_options("root@10.0.0.1"), [])
+        self.assertEqual(self.connections.get_options("root@10.0.0.1"), [])
+        mock_run.assert_called_once()
+
+    @mock.patch("ctfcli.utils.ssh.subprocess.run", return_value=MagicMock(returncode=0))
+    def test_closes_masters(self, mock_run: MagicMock):
+        self.connections.get_options("root@10.0.0.1")
+        control_path = self.connections.get_control_path("root@10.0.0.1")
+        control_directory = self.connections.control_directory
+        self.assertTrue(os.path.isdir(control_directory))
+
+        self.connections.close()
+
+        self.assertEqual(
+            mock_run.call_args,
+            call(
+                ["ssh", "-o", f"ControlPath={control_path}", "-O", "exit", "root@10.0.0.1"],
+                stdout=mock.ANY,
+                stderr=mock.ANY,
+            ),
+        )
+        self.assertFalse(os.path.exists(control_directory))
+        self.assertEqual(self.connections.masters, {})
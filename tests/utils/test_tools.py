@@ -1,27 +1,82 @@
+import tempfile
 import unittest
-from unittest import mock
+from pathlib import Path
 
-from ctfcli.utils.tools import strings
+from ctfcli.utils.tools import find_flags, strings
 
 
 class TestStrings(unittest.TestCase):
-    @mock.patch("builtins.open", mock.mock_open(read_data="Hello\x02World\x88!"))
+    def write_file(self, contents: bytes) -> Path:
+        path = Path(tempfile.mkdtemp()) / "doesnotmatter.bin"
+        path.write_bytes(contents)
+        return path
+
     def test_returns_printable(self):
-        result = strings("/tmp/test/ctfcli/doesnotmatter.bin")
+        result = strings(self.write_file(b"Hello\x02World\x88!"))
         self.assertEqual(["Hello", "World"], list(result))
 
-    @mock.patch("builtins.open", mock.mock_open(read_data="Hello\x02Wor\x02ld\x88!"))
     def test_does_not_catch_results_shorter_than_min_length(self):
-        result = strings("/tmp/test/ctfcli/doesnotmatter.bin", min_length=10)
+        path = self.write_file(b"Hello\x02Wor\x02ld\x88!")
+
+        result = strings(path, min_length=10)
         self.assertEqual([], list(result))
 
-        result = strings("/tmp/test/ctfcli/doesnotmatter.bin")
+        result = strings(path)
         self.assertEqual(["Hello"], list(result))
 
-        result = strings("/tmp/test/ctfcli/doesnotmatter.bin", min_length=2)
+        result = strings(path, min_length=2)
         self.assertEqual(["Hello", "Wor", "ld"], list(result))
 
-    @mock.patch("builtins.open", mock.mock_open(read_data="\x88\x02\x02\x88"))
     def test_returns_empty_generator_if_no_strings_found(self):
-        result = strings("/tmp/test/ctfcli/doesnotmatter.bin")
+        result = strings(self.write_file(b"\x88\x02\x02\x88"))
+        self.assertEqual([], list(result))
+
+        result = strings(self.write_file(b""))
         self.assertEqual([], list(result))
+
+    def test_returns_utf16_strings(self):
+        path = self.write_file(b"ascii\x00\x00" + "wide string".encode("utf-16-le") + b"\x01\x02")
+
+        self.assertEqual(["ascii"], list(strings(path)))
+        self.assertEqual(["ascii", "wide string"], list(strings(path, utf16=True)))
+
+    def test_splits_long_strings(self):
+        result = strings(self.write_file(b"a" * 10), max_length=4)
+        self.assertEqual(["aaaa", "aaaa"], list(result))
+
+
+class TestFindFlags(unittest.TestCase):
+    def setUp(self):
+        self.path = Path(tempfile.mkdtemp()) / "flags.bin"
+        self.path.write_bytes(
+            b"\x00first flag{one}\x00second CTF{two}\x00third x-1234-y\x00no flag here\x00"
+            + "wide flag{three}".encode("utf-16-le")
+        )
+
+    def test_finds_flags_in_several_formats(self):
+        self.assertEqual(["first flag{one}"], list(find_flags(self.path, ["flag{"])))
+        self.assertEqual(
+            ["first flag{one}", "second CTF{two}", "third x-1234-y"],
+            list(find_flags(self.path, ["flag{", "CTF{"], [r"x-\d+-y"])),
+        )
+
+    def test_finds_flags_with_str_only_regexes(self):
+        # these patterns are valid as str patterns, but not as bytes patterns
+        self.assertEqual(
+            ["first flag{one}", "second CTF{two}"],
+            list(find_flags(self.path, flag_regexes=[r"\N{LATIN SMALL LETTER F}lag\{", r"\u0043TF\{"])),
+        )
+        self.assertEqual(["third x-1234-y"], list(find_flags(self.path, flag_regexes=[r"x-\U00000031\d+-y"])))
+        self.assertEqual(["first flag{one}"], list(find_flags(self.path, flag_regexes=["flag{(?:one|ünö)}"])))
+
+    def test_finds_flags_with_anchored_regexes(self):
+        self.assertEqual(["second CTF{two}"], list(find_flags(self.path, flag_regexes=[r"^second CTF\{[^}]+\}$"])))
+
+        # the same on decoded strings
+        self.assertEqual(["second CTF{two}"], list(find_flags(self.path, flag_regexes=[r"^second \u0043TF\{[^}]+\}$"])))
+
+    def test_finds_utf16_flags(self):
+        self.assertEqual(["first flag{one}", "wide flag{three}"], list(find_flags(self.path, ["flag{"], utf16=True)))
+
+    def test_does_not_scan_without_flag_formats(self):
+        self.assertEqual([], list(find_flags(self.path)))